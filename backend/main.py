@@ -5,19 +5,27 @@ Main application file with API endpoints.
 Author: Actuarial Insights Workbench Team
 """
 
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Header, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import JSONResponse
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field, ValidationError
 from typing import Optional, Dict, List
+from urllib.parse import urlencode
 import pandas as pd
+import asyncio
+import hashlib
+import io
+import json
 import os
 from dotenv import load_dotenv
 
 # Import service modules
-from services.loss_triangle import calculate_loss_triangle, LossTriangleCalculator
-from services.segment_kpis import calculate_segment_kpis, SegmentKPICalculator
-from services.prediction import get_prediction_service
-from services.explain import get_explanation, ActuarialExplainer
+from services.prediction import MICRO_BATCH_MAX_SIZE, get_prediction_service, parse_grid, parse_rounding
+from services.explain import get_explanation
+from services.data_snapshot import DataSnapshot, SnapshotManager
+from services.startup import RETRY_AFTER_SECONDS, StartupTracker
+from services.worker_pool import WorkerPool
 
 # Load environment variables
 load_dotenv()
@@ -38,37 +46,264 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load data on startup
-policies_df = None
-claims_df = None
-exposure_df = None
+# Earned premium source: 'exposure' (exposure.csv) or 'policies' (computed
+# pro-rata from policy effective dates, exposure.csv is not loaded)
+EARNED_PREMIUM_SOURCE = os.getenv('EARNED_PREMIUM_SOURCE', 'exposure')
+
+# Segment aggregate engine: 'pandas', or an embedded SQL engine ('duckdb',
+# 'sqlite'); SQL engines need the exposure table
+SEGMENT_QUERY_ENGINE = os.getenv('SEGMENT_QUERY_ENGINE', 'pandas')
+
+# Data load mode: 'memory' (prepared tables) or 'streaming' (claims and exposure
+# read in chunks into aggregates; full-portfolio queries only)
+DATA_LOAD_MODE = os.getenv('DATA_LOAD_MODE', 'memory')
+
+# Directory for persisted prepared snapshots ('' disables); default: data/cache
+SNAPSHOT_CACHE_DIR = os.getenv('SNAPSHOT_CACHE_DIR')
+
+# Seconds between checks for changed data files (0 disables the watcher)
+DATA_WATCH_INTERVAL = float(os.getenv('DATA_WATCH_INTERVAL', '0'))
+
+# Token required by /admin endpoints when set (X-Admin-Token header)
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+
+# Largest batch accepted by /predict/batch
+PREDICT_BATCH_MAX_ROWS = int(os.getenv('PREDICT_BATCH_MAX_ROWS', '100000'))
+
+# Upload content types accepted by /predict/batch besides JSON
+CSV_CONTENT_TYPES = {'text/csv', 'application/csv'}
+PARQUET_CONTENT_TYPES = {'application/vnd.apache.parquet', 'application/x-parquet', 'application/octet-stream'}
+
+# GenAI prediction types (/explain) and the model whose drivers describe them
+PREDICTION_TYPES = {'Loss Ratio': 'loss_ratio', 'Severity': 'severity'}
+
+# Threads for CPU-bound endpoint work (pandas aggregation, model scoring) so the
+# event loop stays responsive; 0 runs that work inline on the event loop
+CPU_POOL_WORKERS = int(os.getenv('CPU_POOL_WORKERS', str(max(2, os.cpu_count() or 1))))
+
+# Threads for single-policy predictions, kept apart so they never queue behind
+# heavy analytics or batch scoring (0 runs them inline on the event loop)
+PREDICT_POOL_WORKERS = int(os.getenv('PREDICT_POOL_WORKERS', '2'))
+
+# Micro-batching of concurrent single-policy predictions: milliseconds a batch
+# stays open for more requests (0 disables) and the largest batch per model call
+MICRO_BATCH_WINDOW_MS = float(os.getenv('MICRO_BATCH_WINDOW_MS', '0'))
+MICRO_BATCH_MAX = int(os.getenv('MICRO_BATCH_MAX', str(MICRO_BATCH_MAX_SIZE)))
+
+# Single-policy prediction cache: entries (0 disables) and optional rounding of
+# continuous features before lookup, e.g. "AnnualPremium=-2,ExposureUnits=0"
+PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', '4096'))
+PREDICTION_CACHE_ROUNDING = parse_rounding(os.getenv('PREDICTION_CACHE_ROUNDING', ''))
+
+# Single-policy feature contribution cache for /predict/explain (0 disables)
+EXPLAIN_CACHE_SIZE = int(os.getenv('EXPLAIN_CACHE_SIZE', '1024'))
+
+# Grid mode for high-QPS quoting: single-policy predictions interpolated from a
+# grid precomputed at model load ("1" for the default axes, or e.g.
+# "RiskRating=2.5:7.5:21,AnnualPremium=4000:1250000:24:log"; "0" disables)
+PREDICTION_GRID = parse_grid(os.getenv('PREDICTION_GRID', '0'))
+
+# Grid mode error tolerance: models whose p99 interpolation error exceeds this
+# fraction of their mean prediction are scored exactly ("0" serves every model)
+PREDICTION_GRID_MAX_ERROR = float(os.getenv('PREDICTION_GRID_MAX_ERROR', '0.05')) or None
+
+# Evaluate small prediction batches with NumPy-compiled trees (set to 0 to
+# always call LightGBM's predict)
+COMPILED_TREES = os.getenv('COMPILED_TREES', '1') != '0'
+
+# Threads for blocking GenAI (OpenAI) calls, kept apart so slow LLM responses
+# never hold CPU pool slots
+LLM_POOL_WORKERS = int(os.getenv('LLM_POOL_WORKERS', '8'))
+
+# Data and models load in the background; the manager holds the current data snapshot
+snapshot_manager = None
 prediction_service = None
+startup = StartupTracker(['data', 'models'])
+cpu_pool = WorkerPool('cpu', CPU_POOL_WORKERS)
+predict_pool = WorkerPool('predict', PREDICT_POOL_WORKERS)
+llm_pool = WorkerPool('llm', LLM_POOL_WORKERS)
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Load data and initialize services on startup."""
-    global policies_df, claims_df, exposure_df, prediction_service
+    """Start loading data and models in the background so the app serves immediately."""
+    global snapshot_manager
+
+    # Load data (path is /app/data due to volume mount)
+    data_dir = os.path.join(os.path.dirname(__file__), "data")
+    query_engine = SEGMENT_QUERY_ENGINE if SEGMENT_QUERY_ENGINE != 'pandas' else None
+    snapshot_manager = SnapshotManager(
+        data_dir,
+        earned_premium_source=EARNED_PREMIUM_SOURCE,
+        query_engine=query_engine,
+        load_mode=DATA_LOAD_MODE,
+        cache_dir=SNAPSHOT_CACHE_DIR if SNAPSHOT_CACHE_DIR is not None else os.path.join(data_dir, "cache")
+    )
+
+    startup.start('data', snapshot_manager.load, on_loaded=data_loaded)
+    startup.start('models', load_models)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Let in-flight pool work finish."""
+    for pool in (cpu_pool, predict_pool, llm_pool):
+        pool.shutdown()
+
+
+def data_loaded(snapshot: DataSnapshot):
+    """Report a loaded snapshot and start the data watcher."""
+    startup.record(snapshot.timings)
+
+    timings = ', '.join(f"{stage} {seconds:.2f}s" for stage, seconds in snapshot.timings.items())
+    print(f"✅ Data loaded successfully ({snapshot.source}, version {snapshot.version}; {timings})")
+    print(f"   - Policies: {len(snapshot.policies_df)}")
+    if snapshot.mode == 'streaming':
+        totals = snapshot.kpi_calculator.totals
+        print(f"   - Claims: {totals['claim_count']} (streamed)")
+        print(f"   - Exposure records: {totals['exposure_rows']} (streamed)")
+    else:
+        print(f"   - Claims: {len(snapshot.claims_df)}")
+        if snapshot.exposure_df is not None:
+            print(f"   - Exposure records: {len(snapshot.exposure_df)}")
+        else:
+            print("   - Exposure: earned pro-rata from policies")
+
+    query_engine = snapshot_manager.load_options.get('query_engine')
+    if snapshot.kpi_calculator.sql_engine is not None:
+        print(f"✅ Segment queries running on {query_engine}")
+    elif query_engine is not None and snapshot.mode == 'streaming':
+        print("⚠️  SQL query engine is not used in streaming mode")
+    elif query_engine is not None:
+        print("⚠️  SQL query engine needs exposure data - using pandas")
+
+    if DATA_WATCH_INTERVAL > 0:
+        snapshot_manager.watch(DATA_WATCH_INTERVAL)
+        print(f"✅ Watching data files every {DATA_WATCH_INTERVAL:g}s")
+
+
+def load_models():
+    """Initialize the prediction service (background startup stage)."""
+    global prediction_service
+
+    models_dir = os.path.join(os.path.dirname(__file__), "models")
+    with startup.stage('model_load'):
+        service = get_prediction_service(
+            models_dir, batch_window_ms=MICRO_BATCH_WINDOW_MS, max_batch_size=MICRO_BATCH_MAX,
+            cache_size=PREDICTION_CACHE_SIZE, cache_rounding=PREDICTION_CACHE_ROUNDING,
+            compile_models=COMPILED_TREES, explain_cache_size=EXPLAIN_CACHE_SIZE, grid_axes=PREDICTION_GRID,
+            grid_max_error=PREDICTION_GRID_MAX_ERROR
+        )
 
-    try:
-        # Load data (path is /app/data due to volume mount)
-        data_dir = os.path.join(os.path.dirname(__file__), "data")
-        policies_df = pd.read_csv(os.path.join(data_dir, "policies.csv"))
-        claims_df = pd.read_csv(os.path.join(data_dir, "claims.csv"))
-        exposure_df = pd.read_csv(os.path.join(data_dir, "exposure.csv"))
-
-        print("✅ Data loaded successfully")
-        print(f"   - Policies: {len(policies_df)}")
-        print(f"   - Claims: {len(claims_df)}")
-        print(f"   - Exposure records: {len(exposure_df)}")
-
-        # Initialize prediction service
-        models_dir = os.path.join(os.path.dirname(__file__), "models")
-        prediction_service = get_prediction_service(models_dir)
-        print("✅ Prediction service initialized")
+    prediction_service = service
+    print(f"✅ Prediction service initialized ({startup.timings['model_load']:.2f}s)")
+    return service
 
-    except Exception as e:
-        print(f"⚠️  Error loading data: {e}")
+
+def not_ready(component: str, name: str) -> HTTPException:
+    """
+    503 for a component that is still loading or failed to load.
+
+    Args:
+        component: Startup component ('data' or 'models')
+        name: Name used in the error message
+
+    Returns:
+        HTTPException with a Retry-After header
+    """
+    if startup.components.get(component) == 'failed':
+        detail = f"{name} failed to load: {startup.errors.get(component)}"
+    else:
+        detail = f"{name} is loading"
+    return HTTPException(
+        status_code=503,
+        detail=detail,
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+    )
+
+
+def get_snapshot() -> DataSnapshot:
+    """
+    Get the current data snapshot.
+
+    Endpoints take one reference at the start of a request and use it
+    throughout, so a reload swapping in a new snapshot never mixes data
+    versions within a response.
+
+    Returns:
+        Current DataSnapshot
+
+    Raises:
+        HTTPException: 503 with Retry-After until data is loaded
+    """
+    snapshot = snapshot_manager.current if snapshot_manager is not None else None
+    if snapshot is None:
+        raise not_ready('data', "Data")
+    return snapshot
+
+
+def data_etag(snapshot: DataSnapshot, request: Request) -> str:
+    """
+    Entity tag of a data endpoint response.
+
+    A data endpoint's response is determined by the data fingerprint and the
+    request's path and query parameters, so the tag is a digest of those.
+
+    Args:
+        snapshot: Snapshot the response is computed from
+        request: Incoming request
+
+    Returns:
+        Quoted strong ETag
+    """
+    query = urlencode(sorted(request.query_params.multi_items()))
+    text = f"{snapshot.version}|{request.url.path}?{query}"
+    return '"' + hashlib.sha256(text.encode()).hexdigest()[:24] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches the ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or any(tag.removeprefix('W/') == etag for tag in tags)
+
+
+def check_not_modified(snapshot: DataSnapshot, request: Request, response: Response) -> Optional[Response]:
+    """
+    Handle If-None-Match for a data endpoint.
+
+    Args:
+        snapshot: Snapshot the response is computed from
+        request: Incoming request
+        response: Response whose headers receive the ETag
+
+    Returns:
+        A 304 response when the client's copy is current, otherwise None
+        (the ETag is set on response)
+    """
+    etag = data_etag(snapshot, request)
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return None
+
+
+def get_predictor():
+    """
+    Get the prediction service.
+
+    Returns:
+        PredictionService instance
+
+    Raises:
+        HTTPException: 503 with Retry-After until models are loaded
+    """
+    if prediction_service is None:
+        raise not_ready('models', "Prediction service")
+    return prediction_service
 
 
 # Pydantic models for request/response
@@ -82,6 +317,41 @@ class PredictionRequest(BaseModel):
     annual_premium: float = Field(..., gt=0, example=25000.0)
 
 
+class BatchPredictionRequest(BaseModel):
+    """Request model for batch predictions."""
+    policies: List[PredictionRequest] = Field(..., min_length=1)
+
+
+def read_batch_body(body: bytes, content_type: str):
+    """
+    Parse a /predict/batch request body.
+
+    Args:
+        body: Raw request body
+        content_type: Media type without parameters
+
+    Returns:
+        DataFrame for CSV / Parquet uploads, list of validated records for JSON
+
+    Raises:
+        ValidationError: If a JSON body does not match BatchPredictionRequest
+        ValueError: If the body cannot be parsed
+    """
+    if content_type in CSV_CONTENT_TYPES:
+        return pd.read_csv(io.BytesIO(body))
+    if content_type in PARQUET_CONTENT_TYPES:
+        return pd.read_parquet(io.BytesIO(body))
+
+    try:
+        payload = json.loads(body)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON body: {e}")
+    if isinstance(payload, list):
+        payload = {'policies': payload}
+    request = BatchPredictionRequest.model_validate(payload)
+    return [policy.model_dump() for policy in request.policies]
+
+
 class ExplanationRequest(BaseModel):
     """Request model for GenAI explanations."""
     explanation_type: str = Field(..., example="question")
@@ -94,6 +364,113 @@ class SegmentInsightsQuery(BaseModel):
     min_premium: float = Field(default=0, example=0)
 
 
+async def run_prediction(predictor, kind: str, input_data: Dict) -> Dict:
+    """
+    Run a single-policy prediction without blocking the event loop.
+
+    With micro-batching the request joins the next batch and is awaited
+    without holding a thread; otherwise it runs on the predict pool.
+
+    Args:
+        predictor: Prediction service
+        kind: 'loss_ratio', 'severity' or 'both'
+        input_data: Input features dictionary
+
+    Returns:
+        Prediction result
+    """
+    if predictor.batcher is not None:
+        return await asyncio.wrap_future(predictor.submit(kind, input_data))
+    return await predict_pool.run(getattr(predictor, f"predict_{kind}"), input_data)
+
+
+def parse_segment_filters(
+    geography: Optional[str] = None,
+    industry: Optional[str] = None,
+    policy_size: Optional[str] = None
+) -> Dict[str, List[str]]:
+    """
+    Build segment filters from comma-separated query parameters.
+
+    Args:
+        geography: Comma-separated geographies to include
+        industry: Comma-separated industries to include
+        policy_size: Comma-separated policy sizes to include
+
+    Returns:
+        Mapping of segment dimension to allowed values
+    """
+    filters = {}
+    for column, value in [('Geography', geography), ('Industry', industry), ('PolicySize', policy_size)]:
+        if value:
+            filters[column] = [v.strip() for v in value.split(',') if v.strip()]
+    return filters
+
+
+def summarize_data(snapshot: DataSnapshot) -> Dict:
+    """
+    Summary statistics of a data snapshot.
+
+    Args:
+        snapshot: Data snapshot
+
+    Returns:
+        Summary of policies, claims, and exposure data
+    """
+    policies_df = snapshot.policies_df
+    claims_df = snapshot.claims_df
+    exposure_df = snapshot.exposure_df
+
+    if snapshot.mode == 'streaming':
+        totals = snapshot.kpi_calculator.totals
+        claims_summary = {
+            "count": totals['claim_count'],
+            "total_incurred": totals['incurred'],
+            "total_paid": totals['paid'],
+            "avg_severity": totals['incurred'] / totals['claim_count'] if totals['claim_count'] else 0.0
+        }
+    else:
+        claims_summary = {
+            "count": len(claims_df),
+            "total_incurred": float(claims_df['IncurredAmount'].sum()),
+            "total_paid": float(claims_df['PaidAmount'].sum()),
+            "avg_severity": float(claims_df['IncurredAmount'].mean())
+        }
+
+    if snapshot.mode == 'streaming':
+        exposure_summary = {
+            "records": totals['exposure_rows'],
+            "total_earned_premium": totals['earned_premium']
+        }
+    elif exposure_df is not None:
+        exposure_summary = {
+            "records": len(exposure_df),
+            "total_earned_premium": float(exposure_df['EarnedPremium'].sum())
+        }
+    else:
+        exposure_summary = {
+            "records": None,
+            "source": "policies",
+            "total_earned_premium": float(snapshot.kpi_calculator.calculate_overall_kpis()['total_earned_premium'])
+        }
+
+    return {
+        "policies": {
+            "count": len(policies_df),
+            "date_range": {
+                "start": str(pd.Timestamp(policies_df['EffectiveDate'].min()).date()),
+                "end": str(pd.Timestamp(policies_df['EffectiveDate'].max()).date())
+            },
+            "total_premium": float(policies_df['AnnualPremium'].sum()),
+            "avg_premium": float(policies_df['AnnualPremium'].mean())
+        },
+        "claims": claims_summary,
+        "exposure": exposure_summary,
+        "data_version": snapshot.version,
+        "load_mode": snapshot.mode
+    }
+
+
 # API Endpoints
 
 @app.get("/")
@@ -104,23 +481,110 @@ async def root():
         "version": "1.0.0",
         "status": "running",
         "endpoints": {
-            "predictions": "/predict/loss_ratio, /predict/severity, /predict/both",
-            "analytics": "/segment_insights, /loss_triangle",
-            "genai": "/explain"
+            "predictions": "/predict/loss_ratio, /predict/severity, /predict/both, /predict/batch, /predict/explain",
+            "analytics": "/segment_insights, /segment_insights/top, /segment_trends, /loss_triangle",
+            "genai": "/explain",
+            "admin": "/admin/reload",
+            "status": "/health, /ready"
         }
     }
 
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
+    """
+    Liveness check: the process is up and serving.
+
+    Use /ready to find out whether data and models have finished loading.
+    """
+    data = snapshot_manager.info() if snapshot_manager is not None else {}
+    batcher = prediction_service.batcher if prediction_service is not None else None
+    cache = prediction_service.cache if prediction_service is not None else None
+    explain_cache = prediction_service.explain_cache if prediction_service is not None else None
+    compiled = prediction_service.compiled if prediction_service is not None else {}
+    grid = prediction_service.grid if prediction_service is not None else None
     return {
         "status": "healthy",
-        "data_loaded": policies_df is not None,
-        "model_loaded": prediction_service is not None
+        "ready": startup.status == 'ready',
+        "data_loaded": data.get('data_version') is not None,
+        "model_loaded": prediction_service is not None,
+        "data_version": data.get('data_version'),
+        "load_mode": data.get('load_mode'),
+        "reload_status": data.get('reload_status'),
+        "worker_pools": {pool.name: pool.info() for pool in (cpu_pool, predict_pool, llm_pool)},
+        "prediction_batching": batcher.info() if batcher is not None else None,
+        "prediction_cache": cache.info() if cache is not None else None,
+        "explain_cache": explain_cache.info() if explain_cache is not None else None,
+        "compiled_models": {name: model.info() for name, model in compiled.items()},
+        "prediction_grid": grid.info() if grid is not None else None
+    }
+
+
+@app.get("/ready")
+async def readiness_check(response: Response):
+    """
+    Readiness check: data and models are loaded.
+
+    Returns 200 once every startup component is ready, otherwise 503 (with
+    Retry-After while still loading). The body reports each component's
+    state, per-stage timings (parse, prepare, cache_warm, model_load) and
+    any load errors.
+    """
+    if snapshot_manager is not None and snapshot_manager.current is not None:
+        # A reload may have recovered from a failed startup load
+        startup.mark_ready('data')
+
+    info = startup.info()
+    if info['status'] != 'ready':
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        if info['status'] == 'starting':
+            response.headers['Retry-After'] = str(RETRY_AFTER_SECONDS)
+
+    return info
+
+
+@app.post("/admin/reload", status_code=202)
+async def reload_data(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Reload data files in the background.
+
+    The current snapshot keeps serving requests until the new one is fully
+    prepared, then it is swapped in atomically. All cached results belong
+    to a snapshot, so they are invalidated by the swap.
+
+    Args:
+        x_admin_token: Must match ADMIN_TOKEN when that is configured
+
+    Returns:
+        Whether a reload was started, with the current data version
+    """
+    if ADMIN_TOKEN and x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    if snapshot_manager is None:
+        raise HTTPException(status_code=503, detail="Data not loaded")
+
+    started = snapshot_manager.reload()
+
+    return {
+        "reload_started": started,
+        **snapshot_manager.info()
     }
 
 
+@app.get("/admin/reload")
+async def reload_status():
+    """
+    Get the data reload status.
+
+    Returns:
+        Current data version, source, load time and reload state
+    """
+    if snapshot_manager is None:
+        raise HTTPException(status_code=503, detail="Data not loaded")
+
+    return snapshot_manager.info()
+
+
 @app.post("/predict/loss_ratio")
 async def predict_loss_ratio(request: PredictionRequest):
     """
@@ -132,12 +596,11 @@ async def predict_loss_ratio(request: PredictionRequest):
     Returns:
         Predicted loss ratio with confidence interval
     """
-    if prediction_service is None:
-        raise HTTPException(status_code=503, detail="Prediction service not available")
+    predictor = get_predictor()
 
     try:
         input_data = request.dict()
-        result = prediction_service.predict_loss_ratio(input_data)
+        result = await run_prediction(predictor, 'loss_ratio', input_data)
         return result
 
     except Exception as e:
@@ -155,12 +618,11 @@ async def predict_severity(request: PredictionRequest):
     Returns:
         Predicted severity with confidence interval
     """
-    if prediction_service is None:
-        raise HTTPException(status_code=503, detail="Prediction service not available")
+    predictor = get_predictor()
 
     try:
         input_data = request.dict()
-        result = prediction_service.predict_severity(input_data)
+        result = await run_prediction(predictor, 'severity', input_data)
         return result
 
     except Exception as e:
@@ -178,22 +640,101 @@ async def predict_both(request: PredictionRequest):
     Returns:
         Both predictions with confidence intervals
     """
-    if prediction_service is None:
-        raise HTTPException(status_code=503, detail="Prediction service not available")
+    predictor = get_predictor()
 
     try:
         input_data = request.dict()
-        result = prediction_service.predict_both(input_data)
+        result = await run_prediction(predictor, 'both', input_data)
         return result
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/predict/batch")
+async def predict_batch(request: Request, contributions: bool = False):
+    """
+    Predict loss ratio and severity for many policies in one call.
+
+    The body is JSON (``{"policies": [...]}`` or a bare array of
+    /predict/both inputs), or a raw CSV (``text/csv``) or Parquet
+    (``application/vnd.apache.parquet``) upload with either the request
+    field names or the policies.csv column names. A PolicyID column is
+    echoed back with each prediction.
+
+    Args:
+        request: HTTP request carrying the batch
+        contributions: Add each row's per-feature contributions (TreeSHAP)
+            for both models
+
+    Returns:
+        One prediction per row plus batch metrics (rows, encode / predict /
+        contributions / total milliseconds, rows per second)
+    """
+    predictor = get_predictor()
+    content_type = request.headers.get('content-type', 'application/json').split(';')[0].strip().lower()
+    body = await request.body()
+
+    def score():
+        records = read_batch_body(body, content_type)
+        if len(records) > PREDICT_BATCH_MAX_ROWS:
+            raise ValueError(f"Batch has {len(records)} rows; the limit is {PREDICT_BATCH_MAX_ROWS}")
+        # Render here: serializing a large body on the event loop would stall it
+        return JSONResponse(predictor.predict_batch(records, contributions=contributions))
+
+    try:
+        return await cpu_pool.run(score)
+
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/predict/explain")
+async def predict_explain(request: PredictionRequest, model_type: str = "both"):
+    """
+    Explain a policy's predictions with per-feature contributions.
+
+    Contributions (TreeSHAP) plus the base value add up to the prediction;
+    results are cached by encoded policy.
+
+    Args:
+        request: Policy characteristics
+        model_type: 'loss_ratio', 'severity' or 'both'
+
+    Returns:
+        Per model: prediction, base value, contributions by feature and
+        drivers ordered by absolute contribution
+    """
+    predictor = get_predictor()
+
+    try:
+        return await predict_pool.run(predictor.explain, request.dict(), model_type)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/segment_insights")
 async def get_segment_insights(
+    request: Request,
+    response: Response,
     segment_by: str = "Geography",
-    min_premium: float = 0
+    min_premium: float = 0,
+    bootstrap: bool = False,
+    n_replicates: int = 2000,
+    seed: Optional[int] = None,
+    confidence: float = 0.95,
+    start_period: Optional[str] = None,
+    end_period: Optional[str] = None,
+    geography: Optional[str] = None,
+    industry: Optional[str] = None,
+    policy_size: Optional[str] = None
 ):
     """
     Get KPIs by segment.
@@ -201,33 +742,194 @@ async def get_segment_insights(
     Args:
         segment_by: Dimension to segment by (Geography, Industry, PolicySize, RiskRating)
         min_premium: Minimum earned premium filter
+        bootstrap: Add bootstrap confidence intervals for LossRatio, Frequency and Severity
+        n_replicates: Number of bootstrap replicates
+        seed: Random seed for bootstrap resampling
+        confidence: Two-sided confidence level for bootstrap intervals
+        start_period: First period to include (YYYY-MM), inclusive
+        end_period: Last period to include (YYYY-MM), inclusive
+        geography: Comma-separated geographies to include
+        industry: Comma-separated industries to include
+        policy_size: Comma-separated policy sizes to include
 
     Returns:
-        Segment-level KPIs and overall portfolio metrics
+        Segment-level KPIs (with credibility-weighted loss ratios) and
+        overall portfolio metrics. Tagged with an ETag unless unseeded
+        bootstrap intervals make the response random
     """
-    if policies_df is None or claims_df is None or exposure_df is None:
-        raise HTTPException(status_code=503, detail="Data not loaded")
+    snapshot = get_snapshot()
+    calculator = snapshot.kpi_calculator
 
-    try:
-        calculator = SegmentKPICalculator(policies_df, claims_df, exposure_df)
+    if bootstrap and not (1 <= n_replicates <= 20000):
+        raise HTTPException(status_code=400, detail="n_replicates must be between 1 and 20000")
+
+    if not (bootstrap and seed is None):
+        not_modified = check_not_modified(snapshot, request, response)
+        if not_modified is not None:
+            return not_modified
+
+    selection = {
+        "start_period": start_period,
+        "end_period": end_period,
+        "segment_filters": parse_segment_filters(geography, industry, policy_size)
+    }
 
-        result = {
-            "segment_kpis": calculator.calculate_kpis_by_segment(
+    def compute():
+        segment_kpis = calculator.calculate_kpis_by_segment(
+            segment_by,
+            min_premium,
+            include_credibility=True,
+            **selection
+        )
+        credibility = segment_kpis.attrs.get('credibility')
+
+        if bootstrap:
+            intervals = calculator.calculate_bootstrap_intervals(
                 segment_by,
-                min_premium
-            ).to_dict('records'),
-            "overall_kpis": calculator.calculate_overall_kpis(),
-            "segment_by": segment_by
+                n_replicates=n_replicates,
+                seed=seed,
+                confidence=confidence,
+                **selection
+            )
+            segment_kpis = segment_kpis.merge(intervals, on=segment_by, how='left')
+
+        return {
+            "segment_kpis": segment_kpis.to_dict('records'),
+            "overall_kpis": calculator.calculate_overall_kpis(**selection),
+            "credibility": credibility,
+            "segment_by": segment_by,
+            "filters": selection
         }
 
-        return result
+    try:
+        return await cpu_pool.run(compute)
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/segment_insights/top")
+async def get_top_segment_insights(
+    segment_by: str = "Geography",
+    metric: str = "LossRatio",
+    top_n: int = 10,
+    ascending: bool = False,
+    min_credibility: Optional[float] = None,
+    min_claims: int = 0,
+    start_period: Optional[str] = None,
+    end_period: Optional[str] = None,
+    geography: Optional[str] = None,
+    industry: Optional[str] = None,
+    policy_size: Optional[str] = None
+):
+    """
+    Rank segments (or multi-dimensional micro-segments) by a KPI.
+
+    Args:
+        segment_by: Comma-separated dimensions, e.g. Geography,Industry,PolicySize
+        metric: KPI to rank by (LossRatio, Frequency, Severity, EarnedPremium, ...)
+        top_n: Number of segments to return
+        ascending: Return the lowest values instead of the highest
+        min_credibility: Minimum Buhlmann-Straub credibility factor to qualify
+        min_claims: Minimum claim count to qualify
+        start_period: First period to include (YYYY-MM), inclusive
+        end_period: Last period to include (YYYY-MM), inclusive
+        geography: Comma-separated geographies to include
+        industry: Comma-separated industries to include
+        policy_size: Comma-separated policy sizes to include
+
+    Returns:
+        Top segments ordered by the metric
+    """
+    calculator = get_snapshot().kpi_calculator
+
+    dimensions = [d.strip() for d in segment_by.split(',') if d.strip()]
+
+    try:
+        top_segments = await cpu_pool.run(
+            calculator.get_top_segments,
+            dimensions,
+            metric=metric,
+            top_n=top_n,
+            ascending=ascending,
+            min_credibility=min_credibility,
+            min_claims=min_claims,
+            start_period=start_period,
+            end_period=end_period,
+            segment_filters=parse_segment_filters(geography, industry, policy_size)
+        )
+
+        return {
+            "top_segments": top_segments.to_dict('records'),
+            "segment_by": dimensions,
+            "metric": metric,
+            "ascending": ascending
+        }
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/segment_trends")
+async def get_segment_trends(
+    segment_by: str = "Geography",
+    time_period: str = "year",
+    start_period: Optional[str] = None,
+    end_period: Optional[str] = None,
+    geography: Optional[str] = None,
+    industry: Optional[str] = None,
+    policy_size: Optional[str] = None
+):
+    """
+    Get KPI trends over time by segment.
+
+    Args:
+        segment_by: Dimension to segment by
+        time_period: year or quarter
+        start_period: First period to include (YYYY-MM), inclusive
+        end_period: Last period to include (YYYY-MM), inclusive
+        geography: Comma-separated geographies to include
+        industry: Comma-separated industries to include
+        policy_size: Comma-separated policy sizes to include
+
+    Returns:
+        KPIs by segment and time period
+    """
+    calculator = get_snapshot().kpi_calculator
+
+    if time_period not in ['year', 'quarter']:
+        raise HTTPException(status_code=400, detail="time_period must be 'year' or 'quarter'")
+
+    try:
+        trends = await cpu_pool.run(
+            calculator.calculate_trend_analysis,
+            segment_by,
+            time_period,
+            start_period=start_period,
+            end_period=end_period,
+            segment_filters=parse_segment_filters(geography, industry, policy_size)
+        )
+
+        return {
+            "trends": trends.to_dict('records'),
+            "segment_by": segment_by,
+            "time_period": time_period
+        }
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/loss_triangle")
 async def get_loss_triangle(
+    request: Request,
+    response: Response,
     value_col: str = "IncurredAmount",
     triangle_type: str = "cumulative",
     max_dev_months: int = 36
@@ -242,24 +944,51 @@ async def get_loss_triangle(
 
     Returns:
         Loss triangle with development factors and ultimate projections
+        (304 when If-None-Match matches the ETag)
     """
-    if claims_df is None:
-        raise HTTPException(status_code=503, detail="Claims data not loaded")
+    snapshot = get_snapshot()
+    not_modified = check_not_modified(snapshot, request, response)
+    if not_modified is not None:
+        return not_modified
 
     try:
-        result = calculate_loss_triangle(
-            claims_df,
-            triangle_type,
-            value_col,
-            max_dev_months
-        )
-
-        return result
+        return await cpu_pool.run(snapshot.loss_triangle, value_col, max_dev_months)
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def add_prediction_drivers(data: Dict) -> Dict:
+    """
+    Add the model's feature contributions to a prediction explanation request.
+
+    The contributions come from the /predict/explain cache when the policy
+    was explained before; the predicted value is filled in from them when
+    missing. Without loaded models the request is returned unchanged.
+
+    Args:
+        data: Explanation data with prediction_type and input_features
+
+    Returns:
+        Data with drivers (and predicted_value) added
+    """
+    kind = PREDICTION_TYPES.get(data.get('prediction_type'))
+    input_features = data.get('input_features')
+    if prediction_service is None or kind is None or not isinstance(input_features, dict):
+        return data
+
+    explanation = await predict_pool.run(prediction_service.explain, input_features, kind)
+    if kind not in explanation:
+        return data
+    return {
+        **data,
+        'predicted_value': data.get('predicted_value', explanation[kind]['prediction']),
+        'drivers': explanation[kind]['drivers']
+    }
+
+
 @app.post("/explain")
 async def get_explanation_endpoint(request: ExplanationRequest):
     """
@@ -280,9 +1009,14 @@ async def get_explanation_endpoint(request: ExplanationRequest):
         )
 
     try:
-        explanation = get_explanation(
+        data = request.data
+        if request.explanation_type == 'prediction' and 'drivers' not in data:
+            data = await add_prediction_drivers(data)
+
+        explanation = await llm_pool.run(
+            get_explanation,
             request.explanation_type,
-            request.data,
+            data,
             api_key
         )
 
@@ -306,14 +1040,13 @@ async def get_feature_importance(model_type: str):
     Returns:
         Feature importance scores
     """
-    if prediction_service is None:
-        raise HTTPException(status_code=503, detail="Prediction service not available")
+    predictor = get_predictor()
 
     if model_type not in ['loss_ratio', 'severity']:
         raise HTTPException(status_code=400, detail="Invalid model_type")
 
     try:
-        importance = prediction_service.get_feature_importance(model_type)
+        importance = predictor.get_feature_importance(model_type)
 
         if importance is None:
             return {
@@ -332,38 +1065,21 @@ async def get_feature_importance(model_type: str):
 
 
 @app.get("/data_summary")
-async def get_data_summary():
+async def get_data_summary(request: Request, response: Response):
     """
     Get summary statistics of loaded data.
 
     Returns:
-        Summary of policies, claims, and exposure data
+        Summary of policies, claims, and exposure data (304 when
+        If-None-Match matches the ETag)
     """
-    if policies_df is None or claims_df is None or exposure_df is None:
-        raise HTTPException(status_code=503, detail="Data not loaded")
+    snapshot = get_snapshot()
+    not_modified = check_not_modified(snapshot, request, response)
+    if not_modified is not None:
+        return not_modified
 
     try:
-        return {
-            "policies": {
-                "count": len(policies_df),
-                "date_range": {
-                    "start": policies_df['EffectiveDate'].min(),
-                    "end": policies_df['EffectiveDate'].max()
-                },
-                "total_premium": float(policies_df['AnnualPremium'].sum()),
-                "avg_premium": float(policies_df['AnnualPremium'].mean())
-            },
-            "claims": {
-                "count": len(claims_df),
-                "total_incurred": float(claims_df['IncurredAmount'].sum()),
-                "total_paid": float(claims_df['PaidAmount'].sum()),
-                "avg_severity": float(claims_df['IncurredAmount'].mean())
-            },
-            "exposure": {
-                "records": len(exposure_df),
-                "total_earned_premium": float(exposure_df['EarnedPremium'].sum())
-            }
-        }
+        return await cpu_pool.run(summarize_data, snapshot)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
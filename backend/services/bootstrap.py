@@ -0,0 +1,217 @@
+"""
+Bootstrap Service
+Bootstrap confidence intervals for segment KPIs.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, Optional
+
+# Upper bound on replicate x claim cells held in memory per chunk
+MAX_WEIGHT_CELLS = 4_000_000
+
+
+class SegmentBootstrap:
+    """
+    Percentile bootstrap intervals for Loss Ratio, Frequency and Severity.
+
+    Claims are resampled with replacement within each segment. Every
+    replicate is a row of a multinomial weight matrix W (replicates x claims),
+    so resampled segment losses for all replicates come from one product of
+    W with the claim amounts, summed over each segment's contiguous block of
+    claims. Because resampling within a segment keeps its claim count fixed,
+    the count itself is drawn as Poisson(n) to give frequency its variability.
+    """
+
+    def __init__(self, claims_df: pd.DataFrame, exposure_df: pd.DataFrame):
+        """
+        Initialize the bootstrap calculator.
+
+        Args:
+            claims_df: DataFrame containing claims data
+            exposure_df: DataFrame containing exposure/premium data
+        """
+        self.claims_df = claims_df
+        self.exposure_df = exposure_df
+
+    def calculate(
+        self,
+        segment_by: str,
+        n_replicates: int = 2000,
+        seed: Optional[int] = None,
+        confidence: float = 0.95
+    ) -> pd.DataFrame:
+        """
+        Calculate bootstrap confidence intervals by segment.
+
+        Args:
+            segment_by: Dimension to segment by
+            n_replicates: Number of bootstrap replicates
+            seed: Random seed for reproducible intervals
+            confidence: Two-sided confidence level
+
+        Returns:
+            DataFrame with lower/upper bounds for LossRatio, Frequency and Severity
+        """
+        exposure_agg = self.exposure_df.groupby(segment_by, observed=True).agg({
+            'EarnedPremium': 'sum',
+            'ExposureUnits': 'sum'
+        })
+
+        if len(self.claims_df) > 0:
+            codes = exposure_agg.index.get_indexer(self.claims_df[segment_by])
+            incurred = self.claims_df['IncurredAmount'].to_numpy(dtype=float)
+            valid = codes >= 0
+            codes, incurred = codes[valid], incurred[valid]
+        else:
+            codes = np.array([], dtype=np.int64)
+            incurred = np.array([], dtype=float)
+
+        intervals = bootstrap_segment_kpis(
+            codes,
+            incurred,
+            exposure_agg['EarnedPremium'].to_numpy(dtype=float),
+            exposure_agg['ExposureUnits'].to_numpy(dtype=float),
+            n_replicates=n_replicates,
+            seed=seed,
+            confidence=confidence
+        )
+
+        result = pd.DataFrame({segment_by: exposure_agg.index})
+        result['LossRatioLower'] = (intervals['loss_ratio'][0] * 100).round(2)
+        result['LossRatioUpper'] = (intervals['loss_ratio'][1] * 100).round(2)
+        result['FrequencyLower'] = (intervals['frequency'][0] * 100).round(4)
+        result['FrequencyUpper'] = (intervals['frequency'][1] * 100).round(4)
+        result['SeverityLower'] = intervals['severity'][0].round(2)
+        result['SeverityUpper'] = intervals['severity'][1].round(2)
+
+        return result
+
+
+def _multinomial_weights(
+    rng: np.random.Generator,
+    codes: np.ndarray,
+    offsets: np.ndarray,
+    counts: np.ndarray,
+    n_replicates: int
+) -> np.ndarray:
+    """
+    Draw within-segment resampling weights for a block of replicates.
+
+    Args:
+        rng: Random generator
+        codes: Segment code of each claim, sorted ascending
+        offsets: Start position of each segment's claims
+        counts: Number of claims in each segment
+        n_replicates: Number of replicates in this block
+
+    Returns:
+        Weight matrix (replicates x claims); each segment's block of every
+        row sums to that segment's claim count
+    """
+    n_claims = len(codes)
+    draws = rng.random((n_replicates, n_claims))
+    picked = offsets[codes] + (draws * counts[codes]).astype(np.int64)
+    flat = picked + np.arange(n_replicates)[:, None] * n_claims
+
+    return np.bincount(
+        flat.ravel(),
+        minlength=n_replicates * n_claims
+    ).reshape(n_replicates, n_claims).astype(float)
+
+
+def bootstrap_segment_kpis(
+    codes: np.ndarray,
+    incurred: np.ndarray,
+    earned_premium: np.ndarray,
+    exposure: np.ndarray,
+    n_replicates: int = 2000,
+    seed: Optional[int] = None,
+    confidence: float = 0.95
+) -> Dict:
+    """
+    Bootstrap loss ratio, frequency and severity for all segments at once.
+
+    Args:
+        codes: Segment code (0..n_segments-1) of each claim
+        incurred: Incurred amount of each claim
+        earned_premium: Earned premium per segment
+        exposure: Exposure units per segment
+        n_replicates: Number of bootstrap replicates
+        seed: Random seed
+        confidence: Two-sided confidence level
+
+    Returns:
+        Dictionary mapping KPI name to (lower, upper) arrays, as ratios
+    """
+    if n_replicates < 1:
+        raise ValueError("n_replicates must be at least 1")
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+
+    n_segments = len(earned_premium)
+    rng = np.random.default_rng(seed)
+
+    order = np.argsort(codes, kind='stable')
+    codes = np.asarray(codes)[order]
+    incurred = np.asarray(incurred, dtype=float)[order]
+
+    counts = np.bincount(codes, minlength=n_segments)
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    # Claims are contiguous per segment, so segment sums are a reduceat
+    # over the claim axis of W * incurred (equivalent to W @ indicator)
+    populated = np.flatnonzero(counts)
+
+    severity = np.zeros((n_replicates, n_segments))
+    block = max(1, MAX_WEIGHT_CELLS // max(len(codes), 1))
+    for start in range(0, n_replicates, block):
+        size = min(block, n_replicates - start)
+        if len(populated) == 0:
+            break
+        weights = _multinomial_weights(rng, codes, offsets, counts, size)
+        segment_losses = np.add.reduceat(weights * incurred, offsets[populated], axis=1)
+        severity[start:start + size, populated] = segment_losses / counts[populated]
+
+    claim_counts = rng.poisson(counts, size=(n_replicates, n_segments))
+    losses = severity * claim_counts
+
+    loss_ratio = np.divide(losses, earned_premium, out=np.zeros_like(losses), where=earned_premium > 0)
+    frequency = np.divide(
+        claim_counts.astype(float), exposure,
+        out=np.zeros_like(losses), where=exposure > 0
+    )
+
+    tail = (1 - confidence) / 2 * 100
+    quantiles = [tail, 100 - tail]
+
+    return {
+        'loss_ratio': np.percentile(loss_ratio, quantiles, axis=0),
+        'frequency': np.percentile(frequency, quantiles, axis=0),
+        'severity': np.percentile(severity, quantiles, axis=0)
+    }
+
+
+def calculate_bootstrap_intervals(
+    claims_df: pd.DataFrame,
+    exposure_df: pd.DataFrame,
+    segment_by: str = 'Geography',
+    n_replicates: int = 2000,
+    seed: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Convenience function to calculate bootstrap KPI intervals.
+
+    Args:
+        claims_df: Claims DataFrame
+        exposure_df: Exposure DataFrame
+        segment_by: Segment dimension
+        n_replicates: Number of bootstrap replicates
+        seed: Random seed
+
+    Returns:
+        DataFrame with confidence interval columns by segment
+    """
+    return SegmentBootstrap(claims_df, exposure_df).calculate(segment_by, n_replicates, seed)
@@ -0,0 +1,380 @@
+"""
+Column Store Service
+Compiled snapshot of policies, claims and exposure as memory-mapped NumPy columns.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from services.snapshot_cache import file_hash
+from services.storage import TABLE_LAYOUT, StaleSourceError, load_tables, source_files
+from services.segment_kpis import period_ordinal
+
+SNAPSHOT_DIR = 'snapshot'
+MANIFEST_FILE = 'manifest.json'
+DICTIONARY_DIR = 'dictionaries'
+SNAPSHOT_VERSION = 1
+
+DATE_COLUMNS = ['EffectiveDate', 'LossDate', 'ReportDate']
+
+# Month ordinal column derived at compile time, and the column it comes from
+ORDINAL_SOURCE = {'claims': 'LossDate', 'exposure': 'Period'}
+
+
+def _code_dtype(n_categories: int) -> np.dtype:
+    """
+    Smallest signed integer dtype for dictionary codes.
+
+    pandas stores categorical codes at this width, so matching it lets
+    Categorical.from_codes wrap the mapped array without a copy.
+    """
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _column_kind(name: str, series: pd.Series) -> str:
+    """Storage kind of a column: 'datetime', 'category' or 'numeric'."""
+    if name in DATE_COLUMNS or pd.api.types.is_datetime64_any_dtype(series):
+        return 'datetime'
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return 'numeric'
+    return 'category'
+
+
+def snapshot_path(data_dir: str) -> str:
+    """Directory of the compiled snapshot for a data directory."""
+    return os.path.join(data_dir, SNAPSHOT_DIR)
+
+
+def has_snapshot(data_dir: str) -> bool:
+    """
+    Check whether a compiled snapshot exists.
+
+    Args:
+        data_dir: Data directory
+
+    Returns:
+        True if the snapshot manifest is present
+    """
+    return os.path.exists(os.path.join(snapshot_path(data_dir), MANIFEST_FILE))
+
+
+def compile_snapshot(
+    data_dir: str,
+    tables: Optional[Dict[str, pd.DataFrame]] = None,
+    out_dir: Optional[str] = None
+) -> Dict:
+    """
+    Compile tables into a memory-mappable column store.
+
+    Every column becomes one .npy file. Text columns are dictionary encoded:
+    codes are stored per table and the sorted values once per column name,
+    so the same segment value has the same code in every table. Dates are
+    stored as datetime64[ns], rows are sorted by the table's period column
+    and a PeriodOrdinal column is added to claims and exposure, so the KPI
+    service can use the arrays as-is.
+
+    Args:
+        data_dir: Data directory with the Parquet or CSV inputs
+        tables: Tables to compile (default: load all from data_dir)
+        out_dir: Snapshot directory (default: data_dir/snapshot)
+
+    Returns:
+        Snapshot manifest
+    """
+    out_dir = out_dir or snapshot_path(data_dir)
+    # Hashed before reading, so an edit during the compile marks it stale
+    sources = _source_hashes(data_dir)
+    if tables is None:
+        tables, _ = load_tables(data_dir, {name: None for name in TABLE_LAYOUT})
+
+    prepared = {}
+    for name, df in tables.items():
+        df = df.copy()
+        for column in df.columns:
+            if column in DATE_COLUMNS:
+                df[column] = pd.to_datetime(df[column])
+
+        if name in TABLE_LAYOUT:
+            df = df.sort_values(TABLE_LAYOUT[name]['sort'], kind='stable').reset_index(drop=True)
+        if name in ORDINAL_SOURCE and ORDINAL_SOURCE[name] in df.columns:
+            df['PeriodOrdinal'] = period_ordinal(df[ORDINAL_SOURCE[name]])
+        prepared[name] = df
+
+    # One dictionary per column name, shared by all tables
+    dictionaries = {}
+    for df in prepared.values():
+        for column in df.columns:
+            if _column_kind(column, df[column]) == 'category':
+                values = pd.Index(df[column].dropna().astype(str).unique())
+                dictionaries[column] = dictionaries.get(column, pd.Index([])).union(values)
+
+    # Build in a temporary directory and swap it in when complete
+    staging = out_dir + '.tmp'
+    if os.path.isdir(staging):
+        shutil.rmtree(staging)
+    os.makedirs(os.path.join(staging, DICTIONARY_DIR))
+
+    for column, categories in dictionaries.items():
+        with open(os.path.join(staging, DICTIONARY_DIR, f"{column}.json"), 'w') as f:
+            json.dump([str(value) for value in categories], f)
+
+    manifest = {
+        'version': SNAPSHOT_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'sources': sources,
+        'tables': {}
+    }
+
+    for name, df in prepared.items():
+        os.makedirs(os.path.join(staging, name))
+        columns = {}
+        for column in df.columns:
+            kind = _column_kind(column, df[column])
+            if kind == 'datetime':
+                values = df[column].to_numpy(dtype='datetime64[ns]')
+            elif kind == 'category':
+                categories = dictionaries[column]
+                codes = categories.get_indexer(df[column].astype(str).where(df[column].notna()))
+                values = codes.astype(_code_dtype(len(categories)))
+            else:
+                values = df[column].to_numpy()
+
+            np.save(os.path.join(staging, name, f"{column}.npy"), values)
+            columns[column] = {'kind': kind, 'dtype': str(values.dtype)}
+
+        manifest['tables'][name] = {'rows': len(df), 'columns': columns}
+
+    with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.rename(staging, out_dir)
+
+    return manifest
+
+
+def _source_hashes(data_dir: str) -> Dict[str, str]:
+    """Hash of every existing source file, keyed by its path relative to data_dir."""
+    return {
+        os.path.relpath(path, data_dir).replace(os.sep, '/'): file_hash(path)
+        for path in source_files(data_dir) if os.path.exists(path)
+    }
+
+
+def changed_sources(data_dir: str) -> List[str]:
+    """
+    List the source files added, removed or changed since the snapshot was compiled.
+
+    Snapshots compiled before sources were recorded compare modification
+    times with the manifest's instead.
+
+    Args:
+        data_dir: Data directory with a compiled snapshot
+
+    Returns:
+        Sorted paths relative to data_dir
+    """
+    manifest_path = os.path.join(snapshot_path(data_dir), MANIFEST_FILE)
+    with open(manifest_path) as f:
+        recorded = json.load(f).get('sources')
+
+    if recorded is None:
+        compiled = os.path.getmtime(manifest_path)
+        return sorted(
+            os.path.relpath(path, data_dir).replace(os.sep, '/')
+            for path in source_files(data_dir)
+            if os.path.exists(path) and os.path.getmtime(path) > compiled
+        )
+
+    current = _source_hashes(data_dir)
+    return sorted(
+        path for path in set(recorded) | set(current)
+        if recorded.get(path) != current.get(path)
+    )
+
+
+def check_snapshot_sources(data_dir: str):
+    """
+    Refuse to read a compiled snapshot whose source files changed.
+
+    The snapshot is preferred over Parquet and CSV, so edits to them would
+    otherwise be silently ignored.
+
+    Args:
+        data_dir: Data directory with a compiled snapshot
+
+    Raises:
+        StaleSourceError: If any source file changed
+    """
+    changed = changed_sources(data_dir)
+    if changed:
+        raise StaleSourceError(
+            f"{', '.join(changed)} changed after {SNAPSHOT_DIR}/ was compiled; re-run "
+            f"scripts/compile_snapshot.py (or remove {SNAPSHOT_DIR}/) to load the sources"
+        )
+
+
+class ColumnTable:
+    """
+    One table of a compiled snapshot.
+
+    Columns are opened with np.load(mmap_mode='r'), so the data lives in the
+    OS page cache and is shared by every process that maps the same files.
+    Column access returns pandas Series that wrap the mapped arrays without
+    copying (categoricals wrap the mapped codes).
+    """
+
+    def __init__(self, path: str, name: str, spec: Dict, dictionaries: Dict[str, pd.Index]):
+        """
+        Initialize a snapshot table.
+
+        Args:
+            path: Snapshot directory
+            name: Table name
+            spec: Table entry from the manifest
+            dictionaries: Shared category dictionaries by column name
+        """
+        self.name = name
+        self.path = os.path.join(path, name)
+        self.spec = spec
+        self.dictionaries = dictionaries
+        self._arrays = {}
+
+    @property
+    def columns(self) -> List[str]:
+        """Column names in snapshot order."""
+        return list(self.spec['columns'])
+
+    def __len__(self) -> int:
+        return self.spec['rows']
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.spec['columns']
+
+    def array(self, column: str) -> np.ndarray:
+        """
+        Raw memory-mapped array of a column (codes for categoricals).
+
+        Args:
+            column: Column name
+
+        Returns:
+            Read-only memory-mapped array
+        """
+        if column not in self:
+            raise KeyError(f"Column {column} not in snapshot table {self.name}")
+
+        if column not in self._arrays:
+            self._arrays[column] = np.load(os.path.join(self.path, f"{column}.npy"), mmap_mode='r')
+        return self._arrays[column]
+
+    def __getitem__(self, column: str) -> pd.Series:
+        """Zero-copy Series view of a column."""
+        values = self.array(column)
+        if self.spec['columns'][column]['kind'] == 'category':
+            values = pd.Categorical.from_codes(values, categories=self.dictionaries[column])
+        return pd.Series(values, name=column, copy=False)
+
+    def to_frame(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Build a DataFrame whose columns wrap the mapped arrays.
+
+        Args:
+            columns: Columns to include (default: all). The derived
+                PeriodOrdinal column is always included when present.
+
+        Returns:
+            DataFrame sharing memory with the snapshot files
+        """
+        columns = list(columns) if columns is not None else self.columns
+        if 'PeriodOrdinal' in self and 'PeriodOrdinal' not in columns:
+            columns.append('PeriodOrdinal')
+
+        return pd.DataFrame({column: self[column] for column in columns}, copy=False)
+
+
+class ColumnStore:
+    """
+    Read access to a compiled snapshot directory.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a compiled snapshot.
+
+        Args:
+            path: Snapshot directory (see compile_snapshot)
+        """
+        self.path = path
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            self.manifest = json.load(f)
+
+        if self.manifest.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {self.manifest.get('version')}")
+
+        self.dictionaries = {}
+        dictionary_dir = os.path.join(path, DICTIONARY_DIR)
+        for filename in os.listdir(dictionary_dir):
+            with open(os.path.join(dictionary_dir, filename)) as f:
+                self.dictionaries[filename[:-len('.json')]] = pd.Index(json.load(f), dtype=object)
+
+        self.tables = {
+            name: ColumnTable(path, name, spec, self.dictionaries)
+            for name, spec in self.manifest['tables'].items()
+        }
+
+    def table(self, name: str) -> ColumnTable:
+        """
+        Get a snapshot table.
+
+        Args:
+            name: Table name ('policies', 'claims' or 'exposure')
+
+        Returns:
+            ColumnTable instance
+        """
+        if name not in self.tables:
+            raise ValueError(f"Table {name} not in snapshot")
+        return self.tables[name]
+
+    def frame(self, name: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Get a zero-copy DataFrame over a snapshot table.
+
+        Args:
+            name: Table name
+            columns: Columns to include (default: all)
+
+        Returns:
+            DataFrame backed by the memory-mapped columns
+        """
+        return self.table(name).to_frame(columns)
+
+
+def load_snapshot(data_dir: str) -> ColumnStore:
+    """
+    Convenience function to open the snapshot of a data directory.
+
+    Args:
+        data_dir: Data directory
+
+    Returns:
+        ColumnStore instance
+
+    Raises:
+        StaleSourceError: If a source file changed after the snapshot was compiled
+    """
+    check_snapshot_sources(data_dir)
+    return ColumnStore(snapshot_path(data_dir))
@@ -0,0 +1,212 @@
+"""
+Credibility Service
+Buhlmann-Straub credibility weighting of segment loss ratios.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Tuple, Union
+
+
+class BuhlmannStraubCredibility:
+    """
+    Blends each segment's own loss ratio with the portfolio loss ratio.
+
+    Monthly loss ratios (incurred loss / earned premium) are built for every
+    segment and period, weighted by earned premium. Within-segment (process)
+    and between-segment (hypothesis) variances are estimated from that grid,
+    and the credibility factor Z = w / (w + k) is computed for all segments
+    at once.
+    """
+
+    def __init__(
+        self,
+        claims_df: pd.DataFrame,
+        exposure_df: pd.DataFrame,
+        loss_col: str = 'IncurredAmount',
+        weight_col: str = 'EarnedPremium'
+    ):
+        """
+        Initialize the credibility calculator.
+
+        Args:
+            claims_df: DataFrame containing claims data (needs LossDate)
+            exposure_df: DataFrame containing monthly exposure data (needs Period)
+            loss_col: Claims column used as the loss measure
+            weight_col: Exposure column used as the credibility weight
+        """
+        self.claims_df = claims_df
+        self.exposure_df = exposure_df
+        self.loss_col = loss_col
+        self.weight_col = weight_col
+
+    def _build_matrices(
+        self,
+        segment_cols: List[str]
+    ) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+        """
+        Build segment x period matrices of losses and weights.
+
+        Args:
+            segment_cols: Segment dimension columns
+
+        Returns:
+            Tuple of (segment keys, loss matrix, weight matrix)
+        """
+        exposure_periods = self.exposure_df['Period'].astype(str).str[:7]
+
+        if len(self.claims_df) > 0:
+            claim_periods = pd.to_datetime(self.claims_df['LossDate']).dt.strftime('%Y-%m')
+        else:
+            claim_periods = pd.Series([], dtype=object)
+
+        # Segments are defined by exposure; claims outside them carry no weight
+        segment_index = pd.MultiIndex.from_frame(
+            self.exposure_df[segment_cols].drop_duplicates()
+        ).sort_values()
+        period_index = pd.Index(np.sort(exposure_periods.unique()))
+
+        n_segments = len(segment_index)
+        n_periods = len(period_index)
+
+        exp_seg = segment_index.get_indexer(pd.MultiIndex.from_frame(self.exposure_df[segment_cols]))
+        exp_per = period_index.get_indexer(exposure_periods)
+        weights = np.bincount(
+            exp_seg * n_periods + exp_per,
+            weights=self.exposure_df[self.weight_col].to_numpy(dtype=float),
+            minlength=n_segments * n_periods
+        ).reshape(n_segments, n_periods)
+
+        losses = np.zeros(n_segments * n_periods)
+        if len(self.claims_df) > 0:
+            clm_seg = segment_index.get_indexer(pd.MultiIndex.from_frame(self.claims_df[segment_cols]))
+            clm_per = period_index.get_indexer(claim_periods)
+            valid = (clm_seg >= 0) & (clm_per >= 0)
+            losses = np.bincount(
+                clm_seg[valid] * n_periods + clm_per[valid],
+                weights=self.claims_df[self.loss_col].to_numpy(dtype=float)[valid],
+                minlength=n_segments * n_periods
+            )
+        losses = losses.reshape(n_segments, n_periods)
+
+        keys = segment_index.to_frame(index=False)
+        return keys, losses, weights
+
+    def calculate(self, segment_by: Union[str, List[str]]) -> pd.DataFrame:
+        """
+        Calculate credibility-weighted loss ratios for every segment.
+
+        Args:
+            segment_by: Segment dimension, or list of dimensions for a crosstab
+
+        Returns:
+            DataFrame with segment keys, CredibilityWeight, CredibilityFactor
+            and CredibilityLossRatio (percent)
+        """
+        segment_cols = [segment_by] if isinstance(segment_by, str) else list(segment_by)
+
+        keys, losses, weights = self._build_matrices(segment_cols)
+        result = buhlmann_straub(losses, weights)
+
+        keys['CredibilityWeight'] = result['segment_weights'].round(2)
+        keys['CredibilityFactor'] = result['credibility_factors'].round(4)
+        keys['CredibilityLossRatio'] = (result['credibility_estimates'] * 100).round(2)
+        keys.attrs['structural_parameters'] = result['structural_parameters']
+
+        return keys
+
+
+def buhlmann_straub(losses: np.ndarray, weights: np.ndarray) -> Dict:
+    """
+    Buhlmann-Straub estimator over a segment x period grid.
+
+    Cells with zero weight are treated as missing observations.
+
+    Args:
+        losses: Loss matrix (segments x periods)
+        weights: Weight matrix (segments x periods), e.g. earned premium
+
+    Returns:
+        Dictionary with per-segment arrays and the structural parameters
+    """
+    observed = weights > 0
+    ratios = np.divide(losses, weights, out=np.zeros_like(weights, dtype=float), where=observed)
+
+    segment_weights = weights.sum(axis=1)
+    segment_means = np.divide(
+        (weights * ratios).sum(axis=1),
+        segment_weights,
+        out=np.zeros_like(segment_weights, dtype=float),
+        where=segment_weights > 0
+    )
+
+    has_weight = segment_weights > 0
+    total_weight = segment_weights.sum()
+    overall_mean = (segment_weights * segment_means).sum() / total_weight if total_weight > 0 else 0.0
+
+    # Expected value of process variance (within-segment)
+    n_obs = observed.sum(axis=1)
+    dof = np.clip(n_obs - 1, 0, None).sum()
+    squared_dev = weights * (ratios - segment_means[:, None]) ** 2
+    within_variance = squared_dev[observed].sum() / dof if dof > 0 else np.nan
+
+    # Variance of hypothetical means (between-segment)
+    n_segments = int(has_weight.sum())
+    between_variance = np.nan
+    if n_segments > 1 and not np.isnan(within_variance):
+        denominator = total_weight - (segment_weights ** 2).sum() / total_weight
+        numerator = (
+            (segment_weights * (segment_means - overall_mean) ** 2).sum()
+            - (n_segments - 1) * within_variance
+        )
+        between_variance = max(numerator / denominator, 0.0) if denominator > 0 else np.nan
+
+    if np.isnan(between_variance):
+        # Variance components not estimable: leave segment experience unadjusted
+        k = 0.0
+        z = np.where(has_weight, 1.0, 0.0)
+    elif between_variance == 0:
+        k = np.inf
+        z = np.zeros_like(segment_weights, dtype=float)
+    else:
+        k = within_variance / between_variance
+        z = segment_weights / (segment_weights + k)
+
+    # Complement of credibility: credibility-weighted collective mean
+    collective_mean = (z * segment_means).sum() / z.sum() if z.sum() > 0 else overall_mean
+    estimates = z * segment_means + (1 - z) * collective_mean
+
+    return {
+        'segment_weights': segment_weights,
+        'segment_means': segment_means,
+        'credibility_factors': z,
+        'credibility_estimates': estimates,
+        'structural_parameters': {
+            'overall_mean': float(overall_mean),
+            'collective_mean': float(collective_mean),
+            'within_variance': None if np.isnan(within_variance) else float(within_variance),
+            'between_variance': None if np.isnan(between_variance) else float(between_variance),
+            'k': None if np.isinf(k) else float(k)
+        }
+    }
+
+
+def calculate_credibility_loss_ratios(
+    claims_df: pd.DataFrame,
+    exposure_df: pd.DataFrame,
+    segment_by: Union[str, List[str]] = 'Geography'
+) -> pd.DataFrame:
+    """
+    Convenience function to calculate credibility-weighted loss ratios.
+
+    Args:
+        claims_df: Claims DataFrame
+        exposure_df: Exposure DataFrame
+        segment_by: Segment dimension(s)
+
+    Returns:
+        DataFrame with credibility columns by segment
+    """
+    return BuhlmannStraubCredibility(claims_df, exposure_df).calculate(segment_by)
@@ -0,0 +1,567 @@
+"""
+Data Snapshot Service
+Immutable prepared data snapshots with background reload and atomic swap.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from services.segment_kpis import SEGMENT_DIMENSIONS, SegmentKPICalculator
+from services.portfolio_model import POLICY_ATTRIBUTES
+from services.loss_triangle import LossTriangleCalculator
+from services.streaming import TriangleAccumulator, stream_portfolio
+from services.storage import (
+    PARQUET_DIR, SERVICE_COLUMNS, TABLE_LAYOUT, StaleSourceError, check_parquet_source,
+    has_parquet, load_tables
+)
+from services.column_store import check_snapshot_sources, has_snapshot, load_snapshot, snapshot_path
+from services.snapshot_cache import SnapshotCache, content_hash
+
+# 'memory' holds the prepared tables; 'streaming' keeps only aggregates
+LOAD_MODES = ['memory', 'streaming']
+
+# Maximum number of derived results kept per snapshot
+RESULT_CACHE_SIZE = 64
+
+
+def _walk(path: str) -> List[str]:
+    """Every file under a directory."""
+    return [os.path.join(root, name) for root, _, files in os.walk(path) for name in files]
+
+
+def input_files(data_dir: str) -> List[str]:
+    """
+    Files a load of the data directory reads.
+
+    The same choice as the loaders: the compiled snapshot when present,
+    otherwise each table's Parquet dataset, or its CSV without one. Sources
+    shadowed by these are not inputs; check_sources guards them.
+
+    Args:
+        data_dir: Data directory
+
+    Returns:
+        File paths
+    """
+    if has_snapshot(data_dir):
+        return _walk(snapshot_path(data_dir))
+
+    paths = []
+    for name in TABLE_LAYOUT:
+        if has_parquet(data_dir, name):
+            paths.extend(_walk(os.path.join(data_dir, PARQUET_DIR, name)))
+        else:
+            paths.append(os.path.join(data_dir, f"{name}.csv"))
+    return paths
+
+
+def check_sources(data_dir: str):
+    """
+    Check that no source shadowed by the files a load reads has changed.
+
+    Args:
+        data_dir: Data directory
+
+    Raises:
+        StaleSourceError: If a CSV or Parquet file changed after the Parquet
+            dataset or compiled snapshot read in its place was written
+    """
+    if has_snapshot(data_dir):
+        check_snapshot_sources(data_dir)
+        return
+    for name in TABLE_LAYOUT:
+        check_parquet_source(data_dir, name)
+
+
+def _fact_columns(store, name: str, columns: List[str]) -> List[str]:
+    """
+    Columns to map from a compiled snapshot fact table.
+
+    The service's columns plus the table's dictionary-coded policy
+    attributes: fact tables keep those as-is when they agree with the policy
+    dimension, so request views use the mapped codes instead of gathering.
+
+    Args:
+        store: Open ColumnStore
+        name: Table name ('claims' or 'exposure')
+        columns: Columns the service needs
+
+    Returns:
+        Column names
+    """
+    table = store.table(name)
+    coded = [
+        column for column in POLICY_ATTRIBUTES
+        if column in table and table.spec['columns'][column]['kind'] == 'category'
+    ]
+    return list(columns) + [column for column in coded if column not in columns]
+
+
+def data_version(data_dir: str) -> str:
+    """
+    Content fingerprint of the input data.
+
+    Built from the relative path, size and SHA-256 of the files a load
+    reads (see input_files), so edits to shadowed sources do not change the
+    version; check_sources reports those instead. File hashes are
+    reused while size and mtime are unchanged, so polling costs a stat per
+    file. The fingerprint is the version of a snapshot and the key of every
+    result cache derived from it (persisted snapshots, HTTP ETags).
+
+    Args:
+        data_dir: Data directory
+
+    Returns:
+        Short hex digest
+    """
+    return content_hash(input_files(data_dir), root=data_dir)[:16]
+
+
+class DataSnapshot:
+    """
+    One loaded, prepared version of the data.
+
+    A snapshot is never modified after it is built. Every derived result
+    (segment cubes in the calculator, cached endpoint results) hangs off the
+    snapshot, so replacing the snapshot invalidates all of them at once.
+    """
+
+    def __init__(
+        self,
+        policies_df: pd.DataFrame,
+        claims_df: Optional[pd.DataFrame],
+        exposure_df: Optional[pd.DataFrame],
+        kpi_calculator: SegmentKPICalculator,
+        version: str,
+        source: str,
+        triangles: Optional[TriangleAccumulator] = None
+    ):
+        """
+        Initialize the snapshot.
+
+        Args:
+            policies_df: Policies DataFrame
+            claims_df: Claims fact table (None in streaming mode)
+            exposure_df: Exposure fact table (None when earned from policies
+                or in streaming mode)
+            kpi_calculator: Calculator prepared over these tables
+                (StreamingKPICalculator in streaming mode)
+            version: Data version the snapshot was built from
+            source: Storage format it was read from ('snapshot', 'parquet', 'csv')
+            triangles: Streamed triangle sums (streaming mode only)
+        """
+        self.policies_df = policies_df
+        self.claims_df = claims_df
+        self.exposure_df = exposure_df
+        self.kpi_calculator = kpi_calculator
+        self.version = version
+        self.source = source
+        self.triangles = triangles
+        self.mode = 'streaming' if claims_df is None else 'memory'
+        self.loaded_at = datetime.now().isoformat(timespec='seconds')
+        self.timings: Dict[str, float] = {}
+        self._results = {}
+        self._results_lock = threading.Lock()
+
+    def __getstate__(self):
+        """Pickle the prepared tables and results (see SnapshotCache), not the lock."""
+        state = self.__dict__.copy()
+        del state['_results_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._results_lock = threading.Lock()
+
+    @classmethod
+    def load(
+        cls,
+        data_dir: str,
+        earned_premium_source: str = 'exposure',
+        query_engine: Optional[str] = None,
+        load_mode: str = 'memory',
+        cache_dir: Optional[str] = None
+    ) -> 'DataSnapshot':
+        """
+        Load and prepare the data.
+
+        A compiled snapshot under data/snapshot is memory-mapped and shared by
+        all workers; otherwise Parquet under data/parquet, then CSV. In
+        streaming mode claims and exposure are read in chunks into segment
+        and triangle accumulators and never held in memory as tables.
+
+        With a cache directory, the prepared snapshot (tables, segment cubes
+        and warmed results) is saved after loading and restored instead of
+        rebuilt while the input contents are unchanged. Memory-mapped
+        snapshots are not cached: they already load without parsing, and a
+        pickled copy would not be shared between workers.
+
+        Args:
+            data_dir: Data directory
+            earned_premium_source: 'exposure' (exposure table) or 'policies'
+                (earned pro-rata from policy terms, exposure is not loaded)
+            query_engine: SQL engine for segment aggregates (None for pandas)
+            load_mode: 'memory' or 'streaming'
+            cache_dir: Directory for persisted snapshots (None disables)
+
+        Returns:
+            DataSnapshot instance
+
+        Raises:
+            StaleSourceError: If a source changed after the Parquet dataset or
+                compiled snapshot read in its place was written
+        """
+        if load_mode not in LOAD_MODES:
+            raise ValueError(f"Invalid load_mode: {load_mode}")
+        if load_mode == 'streaming' and earned_premium_source == 'policies':
+            raise ValueError("Streaming mode reads earned premium from the exposure table")
+
+        # Stamp the version first so changes made while loading trigger another reload
+        start = time.perf_counter()
+        version = data_version(data_dir)
+        # The version only covers the files read, so shadowed sources are checked too
+        check_sources(data_dir)
+        fingerprinted = time.perf_counter()
+
+        cache = None
+        cache_key = None
+        if cache_dir and not has_snapshot(data_dir):
+            cache = SnapshotCache(cache_dir)
+            cache_key = cache.key(version, earned_premium_source, query_engine, load_mode)
+            snapshot = cache.load(cache_key)
+            if isinstance(snapshot, cls):
+                snapshot.version = version
+                snapshot.source = 'cache'
+                snapshot.loaded_at = datetime.now().isoformat(timespec='seconds')
+                snapshot.timings = {
+                    'fingerprint': fingerprinted - start,
+                    'cache_load': time.perf_counter() - fingerprinted
+                }
+                return snapshot
+
+        snapshot = cls._build(data_dir, earned_premium_source, query_engine, load_mode, version)
+        snapshot.timings = {'fingerprint': fingerprinted - start, **snapshot.timings}
+
+        if cache is not None:
+            start = time.perf_counter()
+            try:
+                cache.save(cache_key, snapshot)
+            except Exception as e:
+                print(f"⚠️  Could not save snapshot cache: {e}")
+            snapshot.timings['cache_save'] = time.perf_counter() - start
+
+        return snapshot
+
+    @classmethod
+    def _build(
+        cls,
+        data_dir: str,
+        earned_premium_source: str,
+        query_engine: Optional[str],
+        load_mode: str,
+        version: str
+    ) -> 'DataSnapshot':
+        """Read, prepare and warm a snapshot (see load)."""
+        columns = SERVICE_COLUMNS['segment_kpis']
+        exposure_df = None
+
+        if has_snapshot(data_dir):
+            source = "snapshot"
+        else:
+            source = "parquet" if has_parquet(data_dir, "claims") else "csv"
+
+        if load_mode == 'streaming':
+            # Reading and aggregating happen together, chunk by chunk
+            start = time.perf_counter()
+            kpi_calculator, triangles = stream_portfolio(data_dir)
+            snapshot = cls(
+                kpi_calculator.policies_df, None, None, kpi_calculator, version, source,
+                triangles=triangles
+            )
+            snapshot.timings['parse'] = time.perf_counter() - start
+            snapshot.warm()
+            return snapshot
+
+        start = time.perf_counter()
+        read_timings = {}
+        if has_snapshot(data_dir):
+            store = load_snapshot(data_dir)
+            policies_df = store.frame("policies", columns['policies'])
+            # Fact tables also map their dictionary-coded segment columns
+            claims_df = store.frame("claims", _fact_columns(store, "claims", columns['claims']))
+            if earned_premium_source != 'policies':
+                exposure_df = store.frame("exposure", _fact_columns(store, "exposure", columns['exposure']))
+        else:
+            # Tables are read concurrently; each read is timed on its own. No
+            # period pushdown here: the snapshot serves every period window
+            names = ['policies', 'claims'] + (['exposure'] if earned_premium_source != 'policies' else [])
+            tables, read_timings = load_tables(data_dir, {name: columns[name] for name in names})
+            policies_df = tables['policies']
+            claims_df = tables['claims']
+            exposure_df = tables.get('exposure')
+        parsed = time.perf_counter()
+
+        # SQL engines need the exposure table
+        if exposure_df is None:
+            query_engine = None
+
+        kpi_calculator = SegmentKPICalculator(
+            policies_df, claims_df, exposure_df, query_engine=query_engine
+        )
+
+        # The snapshot keeps the normalized fact tables (policy key plus measures)
+        snapshot = cls(
+            policies_df, kpi_calculator.claims_df, kpi_calculator.exposure_df,
+            kpi_calculator, version, source
+        )
+        snapshot.timings['parse'] = parsed - start
+        snapshot.timings.update({f"read_{name}": seconds for name, seconds in read_timings.items()})
+        snapshot.timings['prepare'] = time.perf_counter() - parsed
+        snapshot.warm()
+        return snapshot
+
+    def warm(self):
+        """
+        Precompute the default results so the first requests are cache hits.
+
+        Builds the default loss triangles and, in memory mode, the segment
+        cube of every dimension. Called before the snapshot is swapped in.
+        """
+        start = time.perf_counter()
+        for value_col in ['IncurredAmount', 'PaidAmount']:
+            self.loss_triangle(value_col)
+        if self.mode == 'memory':
+            for dimension in SEGMENT_DIMENSIONS:
+                self.kpi_calculator.get_segment_cube(dimension)
+        self.timings['cache_warm'] = time.perf_counter() - start
+
+    def loss_triangle(self, value_col: str = 'IncurredAmount', max_dev_months: int = 36) -> Dict:
+        """
+        Loss triangle summary, computed once per snapshot.
+
+        Args:
+            value_col: Column to aggregate (IncurredAmount or PaidAmount)
+            max_dev_months: Maximum development months
+
+        Returns:
+            Triangle summary (see LossTriangleCalculator.get_triangle_summary)
+        """
+        return self.cached(
+            ('loss_triangle', value_col, max_dev_months),
+            lambda: self.triangle_calculator(max_dev_months).get_triangle_summary(value_col)
+        )
+
+    def triangle_calculator(self, max_dev_months: int = 36) -> LossTriangleCalculator:
+        """
+        Get a loss triangle calculator for this snapshot.
+
+        Args:
+            max_dev_months: Maximum development months
+
+        Returns:
+            Claim-level calculator, or one over the streamed sums
+        """
+        if self.triangles is not None:
+            return self.triangles.calculator(max_dev_months)
+        return LossTriangleCalculator(self.claims_df, max_dev_months)
+
+    def cached(self, key, compute: Callable):
+        """
+        Get a derived result, computing it once per snapshot.
+
+        Entries live and die with the snapshot, so every cached result is
+        keyed by the snapshot's data fingerprint as well as by key.
+
+        Args:
+            key: Hashable cache key (e.g. endpoint name and parameters)
+            compute: Zero-argument function producing the result
+
+        Returns:
+            Cached or freshly computed result
+        """
+        with self._results_lock:
+            if key in self._results:
+                return self._results[key]
+
+        result = compute()
+
+        with self._results_lock:
+            if len(self._results) >= RESULT_CACHE_SIZE:
+                self._results.pop(next(iter(self._results)))
+            self._results[key] = result
+
+        return result
+
+
+class SnapshotManager:
+    """
+    Owns the current DataSnapshot and replaces it without downtime.
+
+    Reloads build a complete new snapshot on a background thread while the
+    old one keeps serving. The swap is a single reference assignment, so a
+    request that already holds the old snapshot finishes on it and the next
+    request sees the new one. An optional watcher thread polls the data
+    version and reloads when the inputs change.
+    """
+
+    def __init__(self, data_dir: str, **load_options):
+        """
+        Initialize the manager.
+
+        Args:
+            data_dir: Data directory
+            **load_options: Passed to DataSnapshot.load
+                (earned_premium_source, query_engine, load_mode)
+        """
+        self.data_dir = data_dir
+        self.load_options = load_options
+        self.current: Optional[DataSnapshot] = None
+        self.status = 'idle'
+        self.last_error: Optional[str] = None
+        self.last_reload_seconds: Optional[float] = None
+        # Data version whose load failed; the watcher skips it until the inputs change again
+        self.failed_version: Optional[str] = None
+        # Whether the watcher found a changed source shadowed by the files loaded
+        self._stale = False
+        self._reload_lock = threading.Lock()
+        self._reload_thread: Optional[threading.Thread] = None
+        self._watch_stop = threading.Event()
+
+    def load(self) -> DataSnapshot:
+        """
+        Build a snapshot and swap it in (blocking).
+
+        Returns:
+            The new current snapshot
+        """
+        start = time.perf_counter()
+        version = None
+        try:
+            version = data_version(self.data_dir)
+            snapshot = DataSnapshot.load(self.data_dir, **self.load_options)
+        except StaleSourceError as e:
+            # Not the version's fault: it loads once the sources agree again
+            self.status = 'failed'
+            self.last_error = str(e)
+            self._stale = True
+            raise
+        except Exception as e:
+            self.status = 'failed'
+            self.last_error = str(e)
+            self.failed_version = version
+            raise
+
+        # Atomic swap: readers see either the old or the new snapshot
+        self.current = snapshot
+        self.status = 'idle'
+        self.last_error = None
+        self.failed_version = None
+        self.last_reload_seconds = round(time.perf_counter() - start, 3)
+        return snapshot
+
+    def reload(self) -> bool:
+        """
+        Start a background reload unless one is already running.
+
+        Returns:
+            True if a reload was started, False if one was in progress
+        """
+        with self._reload_lock:
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                return False
+            self.status = 'reloading'
+            self._reload_thread = threading.Thread(target=self._reload_worker, daemon=True)
+            self._reload_thread.start()
+            return True
+
+    def _reload_worker(self):
+        """Background reload; the old snapshot is kept if loading fails."""
+        try:
+            self.load()
+            print(f"✅ Data reloaded (version {self.current.version})")
+        except Exception as e:
+            print(f"⚠️  Data reload failed: {e}")
+
+    def wait(self, timeout: Optional[float] = None):
+        """Wait for a running reload to finish."""
+        thread = self._reload_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def is_stale(self) -> bool:
+        """Whether the inputs changed since the current snapshot was built."""
+        return self.current is None or data_version(self.data_dir) != self.current.version
+
+    def watch(self, interval: float):
+        """
+        Poll the data version and reload on change.
+
+        A version that failed to load is not retried until the inputs change
+        again (POST /admin/reload still retries it on demand), so broken
+        input does not trigger a full rebuild every interval. A changed
+        source shadowed by Parquet or the compiled snapshot does not change
+        the version; it is reported as a failed status, without reloading,
+        until the derived files are rebuilt or the source is restored.
+
+        Args:
+            interval: Seconds between checks
+        """
+        def poll():
+            while not self._watch_stop.wait(interval):
+                if self.status == 'reloading':
+                    continue
+                try:
+                    check_sources(self.data_dir)
+                except StaleSourceError as e:
+                    if self.last_error != str(e):
+                        print(f"⚠️  {e}")
+                    self.status, self.last_error, self._stale = 'failed', str(e), True
+                    continue
+                if self._stale:
+                    self._stale = False
+                    if self.status == 'failed' and self.failed_version is None:
+                        self.status, self.last_error = 'idle', None
+                version = data_version(self.data_dir)
+                current = self.current
+                if current is not None and version == current.version:
+                    continue
+                if version == self.failed_version:
+                    continue
+                self.reload()
+
+        threading.Thread(target=poll, daemon=True).start()
+
+    def stop(self):
+        """Stop the watcher."""
+        self._watch_stop.set()
+
+    def info(self) -> Dict:
+        """
+        Describe the current snapshot and reload state.
+
+        Returns:
+            Dictionary with data_version, source, load_mode, loaded_at, reload status,
+            last error, the data version that failed to load, last reload
+            duration and the snapshot's stage timings
+        """
+        snapshot = self.current
+        return {
+            'data_version': snapshot.version if snapshot else None,
+            'source': snapshot.source if snapshot else None,
+            'load_mode': snapshot.mode if snapshot else None,
+            'loaded_at': snapshot.loaded_at if snapshot else None,
+            'reload_status': self.status,
+            'last_error': self.last_error,
+            'failed_version': self.failed_version,
+            'last_reload_seconds': self.last_reload_seconds,
+            'timings': {
+                stage: round(seconds, 3) for stage, seconds in snapshot.timings.items()
+            } if snapshot else {}
+        }
@@ -0,0 +1,208 @@
+"""
+Earned Premium Service
+Exact daily pro-rata earned premium and exposure from policy terms.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional
+
+# Matches the 36-month coverage horizon used by scripts/generate_data.py
+DEFAULT_TERM_MONTHS = 36
+
+SEGMENT_COLUMNS = ['Geography', 'Industry', 'PolicySize', 'RiskRating']
+
+
+def _month_start(ordinal) -> np.datetime64:
+    """Convert a month ordinal (year * 12 + month - 1) to its first day."""
+    return (np.datetime64('1970-01', 'M') + (int(ordinal) - 1970 * 12)).astype('datetime64[D]')
+
+
+def _to_ordinal(period: str) -> int:
+    """Convert a 'YYYY-MM' period to a month ordinal."""
+    date = pd.Timestamp(period)
+    return date.year * 12 + date.month - 1
+
+
+class EarnedPremiumEngine:
+    """
+    Computes earned premium and exposure for any calendar window.
+
+    Each policy earns its term premium evenly per day between EffectiveDate
+    and the end of its term, so a window's earned premium is the policy's
+    daily rate times the days of overlap. Everything is vectorized over
+    policies; no policy-month rows are materialized.
+
+    Earned exposure is expressed in unit-months (ExposureUnits for each
+    month in force) to stay comparable with exposure.csv.
+    """
+
+    def __init__(
+        self,
+        policies_df: pd.DataFrame,
+        term_months: int = DEFAULT_TERM_MONTHS,
+        as_of: Optional[str] = None
+    ):
+        """
+        Initialize the earned premium engine.
+
+        Args:
+            policies_df: DataFrame containing policy data
+            term_months: Coverage term in months from EffectiveDate
+            as_of: Valuation date; premium is not earned after it
+                (default: end of the month of the latest EffectiveDate)
+        """
+        if term_months < 1:
+            raise ValueError("term_months must be at least 1")
+
+        self.policies_df = policies_df.reset_index(drop=True)
+        self.term_months = term_months
+
+        effective = pd.to_datetime(self.policies_df['EffectiveDate'])
+        self.effective = effective.to_numpy(dtype='datetime64[D]')
+        self.term_end = (effective + pd.DateOffset(months=term_months)).to_numpy(dtype='datetime64[D]')
+
+        if as_of is None:
+            as_of = (effective.max() + pd.offsets.MonthEnd(0)) if len(effective) else pd.Timestamp.today()
+        # Exclusive upper bound: the valuation date itself is earned
+        self.valuation_end = np.datetime64(pd.Timestamp(as_of).date(), 'D') + 1
+
+        term_days = (self.term_end - self.effective).astype(np.int64)
+        self.daily_premium = (
+            self.policies_df['AnnualPremium'].to_numpy(dtype=float) * term_months / 12 / term_days
+        )
+        self.daily_exposure = (
+            self.policies_df['ExposureUnits'].to_numpy(dtype=float) * term_months / term_days
+        )
+
+    @property
+    def first_period(self) -> int:
+        """Month ordinal of the earliest effective date."""
+        first = pd.Timestamp(self.effective.min())
+        return first.year * 12 + first.month - 1
+
+    @property
+    def last_period(self) -> int:
+        """Month ordinal of the valuation date."""
+        last = pd.Timestamp(self.valuation_end - 1)
+        return last.year * 12 + last.month - 1
+
+    def _policy_mask(self, segment_filters: Optional[Dict[str, List]] = None) -> np.ndarray:
+        """Boolean mask of policies matching the segment filters."""
+        mask = np.ones(len(self.policies_df), dtype=bool)
+        for column, values in (segment_filters or {}).items():
+            mask &= self.policies_df[column].isin(values).to_numpy()
+        return mask
+
+    def _window(self, start_period: Optional[str], end_period: Optional[str]):
+        """Resolve a period window to month ordinals clipped to the data."""
+        start = _to_ordinal(start_period) if start_period is not None else self.first_period
+        end = _to_ordinal(end_period) if end_period is not None else self.last_period
+        if start > end:
+            raise ValueError(f"start_period {start_period} is after end_period {end_period}")
+        return max(start, self.first_period), min(end, self.last_period)
+
+    def _overlap_days(self, window_start: np.datetime64, window_end: np.datetime64, mask: np.ndarray) -> np.ndarray:
+        """
+        Days each policy is in force within [window_start, window_end).
+
+        Args:
+            window_start: First day of the window
+            window_end: Day after the last day of the window
+            mask: Policies to include
+
+        Returns:
+            Overlap in days for the masked policies
+        """
+        lo = np.maximum(self.effective[mask], window_start)
+        hi = np.minimum(np.minimum(self.term_end[mask], window_end), self.valuation_end)
+        return np.clip((hi - lo).astype(np.int64), 0, None)
+
+    def earned(
+        self,
+        start_period: Optional[str] = None,
+        end_period: Optional[str] = None,
+        segment_filters: Optional[Dict[str, List]] = None
+    ) -> pd.DataFrame:
+        """
+        Earned premium and exposure per policy for a calendar window.
+
+        Args:
+            start_period: First month of the window ('YYYY-MM'), inclusive
+            end_period: Last month of the window ('YYYY-MM'), inclusive
+            segment_filters: Mapping of segment dimension to allowed values
+
+        Returns:
+            DataFrame with PolicyID, segment columns, EarnedPremium and
+            ExposureUnits for policies with earned premium in the window
+        """
+        start, end = self._window(start_period, end_period)
+        mask = self._policy_mask(segment_filters)
+
+        days = self._overlap_days(_month_start(start), _month_start(end + 1), mask)
+
+        columns = ['PolicyID'] + [c for c in SEGMENT_COLUMNS if c in self.policies_df.columns]
+        result = self.policies_df.loc[mask, columns].reset_index(drop=True)
+        result['EarnedPremium'] = self.daily_premium[mask] * days
+        result['ExposureUnits'] = self.daily_exposure[mask] * days
+
+        return result[days > 0].reset_index(drop=True)
+
+    def earned_by_period(
+        self,
+        group_cols: List[str],
+        start_period: Optional[str] = None,
+        end_period: Optional[str] = None,
+        segment_filters: Optional[Dict[str, List]] = None
+    ) -> pd.DataFrame:
+        """
+        Earned premium and exposure by group and calendar month.
+
+        Each month is one vectorized pass over the policies, reduced to the
+        groups with bincount, so memory stays proportional to the number of
+        policies rather than policy-months.
+
+        Args:
+            group_cols: Policy columns to group by (e.g. segment dimensions)
+            start_period: First month ('YYYY-MM'), inclusive
+            end_period: Last month ('YYYY-MM'), inclusive
+            segment_filters: Mapping of segment dimension to allowed values
+
+        Returns:
+            DataFrame with group columns, Period, EarnedPremium and ExposureUnits
+        """
+        start, end = self._window(start_period, end_period)
+        mask = self._policy_mask(segment_filters)
+
+        groups = self.policies_df.loc[mask, group_cols]
+        codes, uniques = pd.MultiIndex.from_frame(groups).factorize() if len(group_cols) > 1 \
+            else pd.factorize(groups[group_cols[0]])
+        n_groups = len(uniques)
+
+        daily_premium = self.daily_premium[mask]
+        daily_exposure = self.daily_exposure[mask]
+
+        frames = []
+        for ordinal in range(start, end + 1):
+            days = self._overlap_days(_month_start(ordinal), _month_start(ordinal + 1), mask)
+            premium = np.bincount(codes, weights=daily_premium * days, minlength=n_groups)
+            exposure = np.bincount(codes, weights=daily_exposure * days, minlength=n_groups)
+
+            active = premium > 0
+            frame = pd.DataFrame({'EarnedPremium': premium[active], 'ExposureUnits': exposure[active]})
+            frame['Period'] = f"{ordinal // 12:04d}-{ordinal % 12 + 1:02d}"
+            frame['_group'] = np.flatnonzero(active)
+            frames.append(frame)
+
+        if frames:
+            result = pd.concat(frames, ignore_index=True)
+        else:
+            result = pd.DataFrame(columns=['EarnedPremium', 'ExposureUnits', 'Period', '_group'])
+
+        keys = pd.DataFrame(list(uniques), columns=group_cols) if len(group_cols) > 1 \
+            else pd.DataFrame({group_cols[0]: uniques})
+        keys = keys.iloc[result['_group'].to_numpy(dtype=np.int64)].reset_index(drop=True)
+
+        return pd.concat([keys, result.drop(columns='_group')], axis=1)
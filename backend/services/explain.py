@@ -6,7 +6,7 @@ Author: Actuarial Insights Workbench Team
 """
 
 import os
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from openai import OpenAI
 import json
 
@@ -132,7 +132,8 @@ Keep the tone professional but accessible."""
         prediction_type: str,
         predicted_value: float,
         input_features: Dict,
-        model_confidence: Optional[float] = None
+        model_confidence: Optional[float] = None,
+        drivers: Optional[List[Dict]] = None
     ) -> str:
         """
         Explain a model prediction.
@@ -142,6 +143,8 @@ Keep the tone professional but accessible."""
             predicted_value: Predicted value
             input_features: Input features used for prediction
             model_confidence: Optional confidence score
+            drivers: Optional per-feature contributions from the model
+                ({'feature', 'value', 'contribution'}, largest first)
 
         Returns:
             Natural language explanation
@@ -150,6 +153,18 @@ Keep the tone professional but accessible."""
         if model_confidence is not None:
             confidence_str = f"\nModel Confidence: {model_confidence:.1f}%"
 
+        drivers_str = ""
+        factors_str = "Highlights key factors driving the prediction"
+        if drivers:
+            unit = ' points' if prediction_type == 'Loss Ratio' else ''
+            lines = [
+                f"- {d['feature']} = {d['value']}: {d['contribution']:+.2f}{unit}"
+                for d in drivers
+            ]
+            drivers_str = "\n\nModel Drivers (contribution of each feature to the prediction, largest first):\n" + \
+                "\n".join(lines)
+            factors_str = "Highlights the largest model drivers listed above"
+
         prompt = f"""You are an expert actuarial analyst explaining ML model predictions.
 
 Explain the following prediction for Commercial Property insurance:
@@ -159,11 +174,11 @@ Predicted Value: {predicted_value:.2f}{'%' if prediction_type == 'Loss Ratio' el
 {confidence_str}
 
 Input Features:
-{json.dumps(input_features, indent=2)}
+{json.dumps(input_features, indent=2)}{drivers_str}
 
 Provide a concise 2-3 sentence explanation that:
 1. Interprets the prediction
-2. Highlights key factors driving the prediction
+2. {factors_str}
 3. Notes any important considerations or caveats
 
 Keep the tone professional but accessible."""
@@ -309,7 +324,8 @@ def get_explanation(
                 data.get("prediction_type"),
                 data.get("predicted_value"),
                 data.get("input_features"),
-                data.get("model_confidence")
+                data.get("model_confidence"),
+                data.get("drivers")
             )
         elif explanation_type == "question":
             return explainer.answer_question(
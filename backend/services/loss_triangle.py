@@ -11,6 +11,56 @@ from datetime import datetime
 from typing import Dict, List, Optional
 
 
+def _month_ordinals(dates: pd.Series) -> np.ndarray:
+    """
+    Convert dates to month ordinals (year * 12 + month - 1).
+
+    Missing dates (NaT) have no ordinal; callers drop them first.
+
+    Args:
+        dates: Date strings or datetime64 values
+
+    Returns:
+        Integer month ordinals
+    """
+    values = pd.to_datetime(dates).to_numpy(dtype='datetime64[ns]')
+    return values.astype('datetime64[M]').astype(np.int64) + 1970 * 12
+
+
+def _month_label(month: int) -> str:
+    """'YYYY-MM' label of a month ordinal."""
+    return f"{month // 12:04d}-{month % 12 + 1:02d}"
+
+
+def _triangle_frame(
+    keys,
+    grid: np.ndarray,
+    triangle_type: str,
+    index_name: str
+) -> pd.DataFrame:
+    """
+    Wrap an incremental (row key x development month) grid as a triangle.
+
+    Args:
+        keys: Row keys (accident years or month labels)
+        grid: Incremental sums, one column per development month from 0
+        triangle_type: 'cumulative' or 'incremental'
+        index_name: Name of the row index
+
+    Returns:
+        DataFrame with development months as columns
+    """
+    # Generate cumulative if requested
+    if triangle_type == 'cumulative':
+        grid = grid.cumsum(axis=1)
+
+    return pd.DataFrame(
+        grid,
+        index=pd.Index(keys, name=index_name),
+        columns=pd.Index(range(grid.shape[1]), name='DevMonths')
+    )
+
+
 class LossTriangleCalculator:
     """
     Calculates loss development triangles from claims data.
@@ -24,31 +74,61 @@ class LossTriangleCalculator:
         Initialize the loss triangle calculator.
 
         Args:
-            claims_df: DataFrame containing claims data
+            claims_df: DataFrame containing claims data; frames backed by
+                memory-mapped column store arrays are used without copying
             max_dev_months: Maximum development months to include (default: 36)
         """
-        self.claims_df = claims_df.copy()
+        # Shallow copy: derived columns are added without duplicating the claims
+        self.claims_df = claims_df.copy(deep=False)
         self.max_dev_months = max_dev_months
         self._prepare_data()
 
     def _prepare_data(self):
         """Prepare claims data for triangle calculation."""
-        # Convert date columns to datetime
-        self.claims_df['LossDate'] = pd.to_datetime(self.claims_df['LossDate'])
-        self.claims_df['ReportDate'] = pd.to_datetime(self.claims_df['ReportDate'])
+        loss_dates = pd.to_datetime(self.claims_df['LossDate'])
+        report_dates = pd.to_datetime(self.claims_df['ReportDate'])
+
+        # Claims missing either date cannot be placed in the triangle
+        dated = (loss_dates.notna() & report_dates.notna()).to_numpy()
+        if not dated.all():
+            self.claims_df = self.claims_df[dated].reset_index(drop=True)
+            loss_dates, report_dates = loss_dates[dated], report_dates[dated]
+
+        # Month ordinals (year * 12 + month - 1) of loss and report dates
+        loss_months = _month_ordinals(loss_dates)
+        report_months = _month_ordinals(report_dates)
 
         # Extract accident year and month
-        self.claims_df['AccidentYear'] = self.claims_df['LossDate'].dt.year
-        self.claims_df['AccidentMonth'] = self.claims_df['LossDate'].dt.to_period('M')
+        self.claims_df['AccidentYear'] = loss_months // 12
+        self.claims_df['AccidentMonth'] = loss_months
 
-        # Calculate development months (from loss date to report date)
-        self.claims_df['DevMonths'] = (
-            (self.claims_df['ReportDate'].dt.year - self.claims_df['LossDate'].dt.year) * 12 +
-            (self.claims_df['ReportDate'].dt.month - self.claims_df['LossDate'].dt.month)
-        )
+        # Development months from loss date to report date, never negative
+        self.claims_df['DevMonths'] = np.clip(report_months - loss_months, 0, None)
 
-        # Ensure development months is non-negative
-        self.claims_df['DevMonths'] = self.claims_df['DevMonths'].clip(lower=0)
+    def _aggregate(self, row_keys: np.ndarray, value_col: str, mask: np.ndarray):
+        """
+        Sum a value column into a dense (row key x development month) grid.
+
+        Args:
+            row_keys: Row key (accident year or month) of each claim
+            value_col: Column to aggregate
+            mask: Claims to include
+
+        Returns:
+            Tuple of (sorted unique row keys, grid of sums)
+        """
+        dev_months = self.claims_df['DevMonths'].to_numpy()[mask]
+        values = self.claims_df[value_col].to_numpy(dtype=float)[mask]
+        keys, codes = np.unique(row_keys[mask], return_inverse=True)
+
+        n_dev = self.max_dev_months + 1
+        grid = np.bincount(
+            codes * n_dev + dev_months,
+            weights=values,
+            minlength=len(keys) * n_dev
+        ).reshape(len(keys), n_dev)
+
+        return keys, grid
 
     def get_triangle_by_accident_year(
         self,
@@ -66,31 +146,12 @@ class LossTriangleCalculator:
             DataFrame with accident years as rows and development months as columns
         """
         # Filter to max development months
-        df_filtered = self.claims_df[self.claims_df['DevMonths'] <= self.max_dev_months].copy()
-
-        # Group by accident year and development month
-        triangle = df_filtered.groupby(['AccidentYear', 'DevMonths'])[value_col].sum().reset_index()
-
-        # Pivot to create triangle structure
-        triangle_pivot = triangle.pivot(
-            index='AccidentYear',
-            columns='DevMonths',
-            values=value_col
-        ).fillna(0)
-
-        # Generate cumulative if requested
-        if triangle_type == 'cumulative':
-            triangle_pivot = triangle_pivot.cumsum(axis=1)
+        mask = self.claims_df['DevMonths'].to_numpy() <= self.max_dev_months
 
-        # Ensure all development months are present (0 to max_dev_months)
-        for month in range(self.max_dev_months + 1):
-            if month not in triangle_pivot.columns:
-                triangle_pivot[month] = 0
+        # Sum by accident year and development month (all months 0 to max_dev_months)
+        years, grid = self._aggregate(self.claims_df['AccidentYear'].to_numpy(), value_col, mask)
 
-        # Sort columns
-        triangle_pivot = triangle_pivot.sort_index(axis=1)
-
-        return triangle_pivot
+        return _triangle_frame(years, grid, triangle_type, 'AccidentYear')
 
     def get_triangle_by_accident_month(
         self,
@@ -109,31 +170,22 @@ class LossTriangleCalculator:
         Returns:
             DataFrame with accident months as rows and development months as columns
         """
-        # Get most recent accident months
-        recent_months = sorted(self.claims_df['AccidentMonth'].unique(), reverse=True)[:num_months]
-        df_filtered = self.claims_df[
-            (self.claims_df['AccidentMonth'].isin(recent_months)) &
-            (self.claims_df['DevMonths'] <= self.max_dev_months)
-        ].copy()
-
-        # Group by accident month and development month
-        triangle = df_filtered.groupby(['AccidentMonth', 'DevMonths'])[value_col].sum().reset_index()
+        accident_months = self.claims_df['AccidentMonth'].to_numpy()
 
-        # Pivot to create triangle structure
-        triangle_pivot = triangle.pivot(
-            index='AccidentMonth',
-            columns='DevMonths',
-            values=value_col
-        ).fillna(0)
+        # Get most recent accident months
+        recent_months = np.unique(accident_months)[::-1][:num_months]
+        mask = (
+            np.isin(accident_months, recent_months) &
+            (self.claims_df['DevMonths'].to_numpy() <= self.max_dev_months)
+        )
 
-        # Generate cumulative if requested
-        if triangle_type == 'cumulative':
-            triangle_pivot = triangle_pivot.cumsum(axis=1)
+        # Sum by accident month and development month
+        months, grid = self._aggregate(accident_months, value_col, mask)
 
-        # Convert period index to string for JSON serialization
-        triangle_pivot.index = triangle_pivot.index.astype(str)
+        # Period labels as strings for JSON serialization
+        labels = [_month_label(month) for month in months]
 
-        return triangle_pivot
+        return _triangle_frame(labels, grid, triangle_type, 'AccidentMonth')
 
     def calculate_development_factors(
         self,
@@ -268,6 +320,98 @@ class LossTriangleCalculator:
         }
 
 
+class AggregatedLossTriangle(LossTriangleCalculator):
+    """
+    Loss triangles over pre-aggregated sums instead of claim rows.
+
+    Takes incremental (accident month x development month) grids, e.g. from
+    a streaming accumulator, so the claims table never has to be held in
+    memory. Development factors, ultimates and the summary are inherited.
+    """
+
+    def __init__(
+        self,
+        accident_months: np.ndarray,
+        grids: Dict[str, np.ndarray],
+        max_dev_months: int = 36
+    ):
+        """
+        Initialize from aggregated grids.
+
+        Args:
+            accident_months: Sorted accident month ordinals, one per grid row
+            grids: Incremental grids by value column, plus 'ClaimCount'; each
+                has one column per development month from 0
+            max_dev_months: Maximum development months to include (default: 36)
+        """
+        available = grids['ClaimCount'].shape[1] - 1
+        if max_dev_months > available:
+            raise ValueError(f"max_dev_months must be at most {available}")
+
+        self.claims_df = None
+        self.max_dev_months = max_dev_months
+
+        # Accident months without claims inside the window don't appear,
+        # matching the claim-level calculator
+        grids = {column: grid[:, :max_dev_months + 1] for column, grid in grids.items()}
+        observed = grids['ClaimCount'].sum(axis=1) > 0
+        self.accident_months = np.asarray(accident_months, dtype=np.int64)[observed]
+        self.grids = {column: grid[observed] for column, grid in grids.items()}
+
+    def _grid(self, value_col: str) -> np.ndarray:
+        """Incremental grid of a value column."""
+        if value_col not in self.grids:
+            raise ValueError(f"Invalid value_col: {value_col}")
+        return self.grids[value_col]
+
+    def get_triangle_by_accident_year(
+        self,
+        value_col: str = 'IncurredAmount',
+        triangle_type: str = 'cumulative'
+    ) -> pd.DataFrame:
+        """
+        Generate loss triangle by accident year.
+
+        Args:
+            value_col: Column to aggregate ('IncurredAmount' or 'PaidAmount')
+            triangle_type: 'cumulative' or 'incremental'
+
+        Returns:
+            DataFrame with accident years as rows and development months as columns
+        """
+        months_grid = self._grid(value_col)
+        years, codes = np.unique(self.accident_months // 12, return_inverse=True)
+
+        grid = np.zeros((len(years), months_grid.shape[1]))
+        np.add.at(grid, codes, months_grid)
+
+        return _triangle_frame(years, grid, triangle_type, 'AccidentYear')
+
+    def get_triangle_by_accident_month(
+        self,
+        value_col: str = 'IncurredAmount',
+        triangle_type: str = 'cumulative',
+        num_months: int = 12
+    ) -> pd.DataFrame:
+        """
+        Generate loss triangle by accident month (more granular).
+
+        Args:
+            value_col: Column to aggregate
+            triangle_type: 'cumulative' or 'incremental'
+            num_months: Number of recent accident months to include
+
+        Returns:
+            DataFrame with accident months as rows and development months as columns
+        """
+        # Most recent accident months
+        start = max(len(self.accident_months) - num_months, 0)
+        grid = self._grid(value_col)[start:]
+        labels = [_month_label(month) for month in self.accident_months[start:]]
+
+        return _triangle_frame(labels, grid, triangle_type, 'AccidentMonth')
+
+
 def calculate_loss_triangle(
     claims_df: pd.DataFrame,
     triangle_type: str = 'cumulative',
@@ -0,0 +1,247 @@
+"""
+Portfolio Model Service
+Normalized in-memory schema: a dictionary-encoded policy dimension and
+fact tables that carry only a policy key and measures.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional
+
+POLICY_KEY = 'PolicyKey'
+
+# Policy attributes held once per policy in the dimension
+POLICY_ATTRIBUTES = ['Geography', 'Industry', 'PolicySize', 'RiskRating']
+
+# Low-cardinality fact columns stored dictionary encoded
+DICTIONARY_COLUMNS = ['Period']
+
+
+class PolicyDimension:
+    """
+    Policy attributes stored once per policy, addressed by an int32 key.
+
+    Claims and exposure repeat the segment attributes of their policy on
+    every row. Here each attribute is one array with an entry per policy
+    (text attributes as categorical codes plus a dictionary, numeric ones as
+    floats), and fact rows carry only the policy key. An attribute of a fact
+    row is a gather, values[fact_keys]. Every attribute array has a trailing
+    missing entry, so the key -1 (policy not in the dimension) gathers as
+    missing without a bounds check.
+    """
+
+    def __init__(self, policy_ids: pd.Index, attributes: Dict[str, pd.Series]):
+        """
+        Initialize the dimension.
+
+        Args:
+            policy_ids: Unique policy IDs; a policy's position is its key
+            attributes: Attribute values aligned with policy_ids
+        """
+        self.policy_ids = pd.Index(policy_ids)
+        if not self.policy_ids.is_unique:
+            raise ValueError("Policy IDs must be unique")
+
+        self._codes = {}
+        self._categories = {}
+        self._values = {}
+        for column, values in attributes.items():
+            values = pd.Series(values).reset_index(drop=True)
+            if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+                self._values[column] = np.append(values.to_numpy(dtype=float), np.nan)
+            else:
+                categorical = pd.Categorical(values)
+                self._codes[column] = np.append(categorical.codes, -1).astype(categorical.codes.dtype)
+                self._categories[column] = categorical.categories
+
+    @classmethod
+    def from_frames(cls, policies_df: pd.DataFrame, *fact_frames: Optional[pd.DataFrame]) -> 'PolicyDimension':
+        """
+        Build the dimension from the policies table.
+
+        Policies, attributes or values missing from the policies table are
+        taken from the first fact rows that carry them, so facts of unknown
+        policies keep their segment. When PolicyID is categorical (the
+        shared dictionary of a compiled snapshot), policy keys follow its
+        categories, so the fact tables' PolicyID codes are the keys as-is.
+
+        Args:
+            policies_df: Policies DataFrame (PolicyID and attributes)
+            *fact_frames: Claims / exposure DataFrames (None is skipped)
+
+        Returns:
+            PolicyDimension instance
+        """
+        table = None
+        for frame in (policies_df,) + fact_frames:
+            if frame is None or 'PolicyID' not in frame.columns:
+                continue
+            columns = ['PolicyID'] + [c for c in POLICY_ATTRIBUTES if c in frame.columns]
+            part = frame[columns].drop_duplicates('PolicyID').set_index('PolicyID')
+            table = part if table is None else table.combine_first(part)
+
+        if table is None:
+            raise ValueError("Policies table needs a PolicyID column")
+
+        policy_ids = policies_df['PolicyID'] if 'PolicyID' in policies_df.columns else None
+        if policy_ids is not None and isinstance(policy_ids.dtype, pd.CategoricalDtype):
+            table.index = table.index.astype(object)
+            table = table.reindex(policy_ids.cat.categories)
+
+        return cls(table.index, {column: table[column] for column in table.columns})
+
+    def __len__(self) -> int:
+        return len(self.policy_ids)
+
+    @property
+    def columns(self) -> List[str]:
+        """Attribute columns."""
+        return list(self._codes) + list(self._values)
+
+    def keys(self, policy_ids) -> np.ndarray:
+        """
+        Look up policy keys.
+
+        Args:
+            policy_ids: PolicyID values (categorical IDs are mapped through
+                their dictionary rather than row by row)
+
+        Returns:
+            Integer keys, -1 for policies not in the dimension: the
+            categorical codes themselves (no copy) when the dictionary is
+            the dimension's policy IDs, int32 otherwise
+        """
+        policy_ids = pd.Series(policy_ids, copy=False)
+        if isinstance(policy_ids.dtype, pd.CategoricalDtype):
+            if policy_ids.cat.categories.equals(self.policy_ids):
+                return policy_ids.cat.codes.to_numpy()
+            lookup = np.append(self.policy_ids.get_indexer(policy_ids.cat.categories), -1)
+            return lookup[policy_ids.cat.codes.to_numpy()].astype(np.int32)
+
+        return self.policy_ids.get_indexer(policy_ids).astype(np.int32)
+
+    def gather(self, column: str, keys: np.ndarray, index: Optional[pd.Index] = None) -> pd.Series:
+        """
+        Attribute values for fact rows.
+
+        Args:
+            column: Attribute column, or 'PolicyID'
+            keys: Policy keys of the fact rows
+            index: Index of the result (default: RangeIndex)
+
+        Returns:
+            Series (categorical for text attributes and PolicyID)
+        """
+        if column == 'PolicyID':
+            values = pd.Categorical.from_codes(keys, categories=self.policy_ids)
+        elif column in self._codes:
+            values = pd.Categorical.from_codes(self._codes[column][keys], categories=self._categories[column])
+        elif column in self._values:
+            values = self._values[column][keys]
+        else:
+            raise ValueError(f"Unknown policy attribute: {column}")
+
+        return pd.Series(values, index=index, name=column, copy=False)
+
+    def select(self, segment_filters: Optional[Dict[str, List]]) -> Optional[np.ndarray]:
+        """
+        Evaluate segment filters once per policy.
+
+        Args:
+            segment_filters: Mapping of attribute to allowed values
+
+        Returns:
+            Boolean mask indexed by policy key (the trailing entry, used by
+            key -1, is False), or None without filters
+        """
+        if not segment_filters:
+            return None
+
+        all_keys = np.arange(len(self))
+        mask = np.zeros(len(self) + 1, dtype=bool)
+        mask[:-1] = True
+        for column, values in segment_filters.items():
+            mask[:-1] &= self.gather(column, all_keys).isin(list(values)).to_numpy()
+
+        return mask
+
+    def to_fact(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Normalize a claims or exposure frame into a fact table.
+
+        PolicyID and the policy attributes are replaced by the PolicyKey;
+        other columns are kept without copying, except those in
+        DICTIONARY_COLUMNS, which are dictionary encoded. Attributes that
+        are already dictionary coded (a compiled snapshot's) and agree with
+        the dimension on every row are kept as well, so views use them
+        as-is instead of gathering.
+
+        Args:
+            frame: DataFrame with a PolicyID column
+
+        Returns:
+            Fact DataFrame (same index as frame)
+        """
+        if 'PolicyID' not in frame.columns:
+            raise ValueError("Fact tables need a PolicyID column")
+
+        keys = self.keys(frame['PolicyID'])
+        data = {POLICY_KEY: pd.Series(keys, index=frame.index, copy=False)}
+        for column in frame.columns:
+            values = frame[column]
+            if column == 'PolicyID':
+                continue
+            if column in POLICY_ATTRIBUTES and not self._agrees(column, values, keys):
+                continue
+            if column in DICTIONARY_COLUMNS and not isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.astype('category')
+            data[column] = values
+
+        return pd.DataFrame(data, copy=False)
+
+    def _agrees(self, column: str, values: pd.Series, keys: np.ndarray) -> bool:
+        """Whether a categorical fact column holds its policies' attribute on every row."""
+        if column not in self._codes or not isinstance(values.dtype, pd.CategoricalDtype):
+            return False
+
+        lookup = np.append(self._categories[column].get_indexer(values.cat.categories), -1)
+        return np.array_equal(lookup[values.cat.codes.to_numpy()], self._codes[column][keys])
+
+    def view(self, fact: pd.DataFrame, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Fact rows with policy attributes gathered from the dimension.
+
+        Args:
+            fact: Fact DataFrame with PolicyKey
+            columns: Attributes to add (default: PolicyID and all attributes);
+                attributes the fact table already carries are not gathered
+
+        Returns:
+            DataFrame with the fact columns plus the gathered attributes
+        """
+        if columns is None:
+            columns = ['PolicyID'] + self.columns
+        columns = [column for column in columns if column not in fact.columns]
+
+        keys = fact[POLICY_KEY].to_numpy()
+        data = {column: fact[column] for column in fact.columns}
+        data.update({column: self.gather(column, keys, fact.index) for column in columns})
+
+        return pd.DataFrame(data, copy=False)
+
+    def totals(self, keys: np.ndarray, values: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Sum fact values per policy (row count when values is None).
+
+        Args:
+            keys: Policy keys of the fact rows
+            values: Measure to sum
+
+        Returns:
+            Array indexed by policy key; rows with key -1 are ignored
+        """
+        known = keys >= 0
+        weights = None if values is None else np.asarray(values, dtype=float)[known]
+        return np.bincount(keys[known], weights=weights, minlength=len(self)).astype(float)
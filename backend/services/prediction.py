@@ -7,11 +7,587 @@ Author: Actuarial Insights Workbench Team
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from concurrent.futures import Future, ThreadPoolExecutor
 import joblib
 import os
+import queue
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 
+from services.compiled_trees import CompiledTreeModel, compile_model
+from services.prediction_grid import CATEGORY, LINEAR, LOG, PredictionGrid
+
+# Model input columns, in training order
+FEATURE_NAMES = ['RiskRating', 'Geography', 'Industry', 'PolicySize', 'ExposureUnits', 'AnnualPremium']
+
+# Category encodings used at training time (scripts/train_models.py)
+GEOGRAPHY_CODES = {
+    'Northeast': 0, 'Southeast': 1, 'Midwest': 2,
+    'Southwest': 3, 'West': 4, 'Northwest': 5
+}
+INDUSTRY_CODES = {
+    'Manufacturing': 0, 'Retail': 1, 'Office': 2, 'Warehouse': 3,
+    'Healthcare': 4, 'Education': 5, 'Hospitality': 6, 'Technology': 7
+}
+POLICY_SIZE_CODES = {'Small': 0, 'Medium': 1, 'Large': 2, 'Enterprise': 3}
+
+# Request field, category codes (None for numeric) and default per feature
+FEATURE_INPUTS = {
+    'RiskRating': ('risk_rating', None, 5.0),
+    'Geography': ('geography', GEOGRAPHY_CODES, 'Midwest'),
+    'Industry': ('industry', INDUSTRY_CODES, 'Office'),
+    'PolicySize': ('policy_size', POLICY_SIZE_CODES, 'Medium'),
+    'ExposureUnits': ('exposure_units', None, 50.0),
+    'AnnualPremium': ('annual_premium', None, 25000.0),
+}
+
+# Fallback severity by policy size when the severity model is not loaded
+BASE_SEVERITY = {'Small': 50000, 'Medium': 100000, 'Large': 250000, 'Enterprise': 500000}
+
+# Micro-batching defaults: how long the first queued request waits for others
+# to join its batch, and the largest batch sent to a model in one call
+MICRO_BATCH_WINDOW_MS = 2.0
+MICRO_BATCH_MAX_SIZE = 256
+
+# Quantile model bundles written by scripts/train_models.py, by model name.
+# Each interval model predicts one column per quantile (e.g. P10/P50/P90).
+QUANTILE_MODEL_FILES = {
+    'loss_ratio_interval': 'lr_quantile_models.pkl',
+    'severity_interval': 'severity_quantile_models.pkl',
+}
+
+# Models each prediction kind needs (interval models are used when trained)
+PREDICTION_MODELS = {
+    'loss_ratio': ('loss_ratio', 'loss_ratio_interval'),
+    'severity': ('severity', 'severity_interval'),
+    'both': ('loss_ratio', 'loss_ratio_interval', 'severity', 'severity_interval'),
+}
+
+# Point models whose per-feature contributions each prediction kind reports
+EXPLAIN_MODELS = {
+    'loss_ratio': ('loss_ratio',),
+    'severity': ('severity',),
+    'both': ('loss_ratio', 'severity'),
+}
+
+# Seconds between checks of the model files for changes (prediction cache)
+MODEL_CHECK_INTERVAL = 1.0
+
+# Default grid mode axes for the continuous features: (low, high, points,
+# spacing), covering the training data (RiskRating 2.9-6.8, ExposureUnits
+# 8-1,200, AnnualPremium 5,100-1.03M). Categories always span every code
+# (6 x 8 x 4 cells).
+GRID_AXES = {
+    'RiskRating': (2.5, 7.5, 11, LINEAR),
+    'ExposureUnits': (5.0, 1500.0, 12, LOG),
+    'AnnualPremium': (4000.0, 1_250_000.0, 16, LOG),
+}
+
+# Grid mode serves a model only if its p99 interpolation error at build is
+# at most this fraction of its mean absolute prediction
+GRID_MAX_ERROR = 0.05
+
+# Batches at least this large run the loss ratio and severity models
+# concurrently on one shared feature matrix (LightGBM releases the GIL);
+# smaller batches are cheaper to evaluate one model after the other
+PARALLEL_MODEL_MIN_ROWS = 2048
+
+
+def encode_row(input_data: Dict) -> List:
+    """
+    Encode one policy's features in FEATURE_NAMES order.
+
+    Missing fields and unknown categories get the defaults.
+
+    Args:
+        input_data: Input features dictionary
+
+    Returns:
+        Feature values (category codes and numbers)
+    """
+    row = []
+    for feature in FEATURE_NAMES:
+        field, codes, default = FEATURE_INPUTS[feature]
+        value = input_data.get(field, default)
+        row.append(codes.get(value, codes[default]) if codes is not None else value)
+    return row
+
+
+def prediction_value(prediction) -> Union[float, Tuple[float, ...]]:
+    """One row's model output: a float, or a tuple of quantiles for interval models."""
+    if np.ndim(prediction) == 0:
+        return float(prediction)
+    return tuple(float(value) for value in prediction)
+
+
+def interval_bounds(prediction, quantiles) -> Tuple:
+    """
+    Prediction interval from quantile predictions.
+
+    Spans the lowest and highest quantile, widened to include the point
+    prediction and floored at zero.
+
+    Args:
+        prediction: Point prediction(s)
+        quantiles: Quantile predictions (last axis: one value per quantile)
+
+    Returns:
+        Tuple of (lower, upper)
+    """
+    quantiles = np.asarray(quantiles, dtype=float)
+    lower = np.maximum(0, np.minimum(quantiles.min(axis=-1), prediction))
+    upper = np.maximum(quantiles.max(axis=-1), prediction)
+    return lower, upper
+
+
+class QuantileModels:
+    """
+    Quantile-objective models of one target, predicted as one matrix.
+
+    Uncompiled counterpart of a CompiledTreeModel built from the same
+    models; predict() returns one column per quantile.
+    """
+
+    def __init__(self, quantiles: List[float], models: List):
+        """
+        Initialize the bundle.
+
+        Args:
+            quantiles: Quantile of each model, ascending
+            models: Fitted models in the same order
+        """
+        if len(quantiles) != len(models) or len(models) < 2:
+            raise ValueError("Need at least two quantile models, one per quantile")
+        self.quantiles = list(quantiles)
+        self.models = list(models)
+
+    def predict(self, features) -> np.ndarray:
+        """
+        Predict every quantile.
+
+        Args:
+            features: Feature matrix
+
+        Returns:
+            Array of shape (rows, quantiles)
+        """
+        return np.column_stack([np.asarray(model.predict(features), dtype=float) for model in self.models])
+
+
+def batch_frame(records: Union[List[Dict], pd.DataFrame]) -> pd.DataFrame:
+    """
+    Normalize a batch of policies to request field names and validate it.
+
+    Accepts request-style records (geography, risk_rating, ...) or a
+    policies table with the training column names (Geography, RiskRating,
+    ...); a PolicyID / policy_id column is kept as policy_id.
+
+    Args:
+        records: List of input dictionaries or a DataFrame
+
+    Returns:
+        DataFrame with one column per request field
+
+    Raises:
+        ValueError: If the batch is empty, a feature column is missing, or
+            numeric values are invalid or out of range
+    """
+    frame = pd.DataFrame(records) if not isinstance(records, pd.DataFrame) else records
+    renames = {feature: field for feature, (field, _, _) in FEATURE_INPUTS.items()}
+    renames['PolicyID'] = 'policy_id'
+    frame = frame.rename(columns={c: renames[c] for c in frame.columns if c in renames})
+
+    if len(frame) == 0:
+        raise ValueError("Batch contains no policies")
+    missing = [field for field, _, _ in FEATURE_INPUTS.values() if field not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    for field, codes, _ in FEATURE_INPUTS.values():
+        if codes is None:
+            values = pd.to_numeric(frame[field], errors='coerce')
+            if values.isna().any():
+                raise ValueError(f"{field} must be numeric in every row")
+            frame[field] = values
+
+    if not frame['risk_rating'].between(1.0, 10.0).all():
+        raise ValueError("risk_rating must be between 1 and 10")
+    for field in ['exposure_units', 'annual_premium']:
+        if not (frame[field] > 0).all():
+            raise ValueError(f"{field} must be positive")
+
+    return frame
+
+
+def encode_features(frame: pd.DataFrame) -> np.ndarray:
+    """
+    Encode a batch of policies into the model feature matrix.
+
+    Categories are looked up column-wise through a categorical over the
+    training vocabulary (unknown values get the default's code), so the cost
+    does not depend on Python work per row.
+
+    Args:
+        frame: Batch with request field columns (see batch_frame)
+
+    Returns:
+        float64 matrix of shape (rows, len(FEATURE_NAMES)); float32 would
+        move premiums and ratings across split thresholds and change
+        predictions relative to the single-policy endpoints
+    """
+    matrix = np.empty((len(frame), len(FEATURE_NAMES)), dtype=np.float64)
+    for j, feature in enumerate(FEATURE_NAMES):
+        field, codes, default = FEATURE_INPUTS[feature]
+        if codes is None:
+            matrix[:, j] = frame[field].to_numpy(dtype=np.float64)
+            continue
+
+        positions = pd.Categorical(frame[field], categories=list(codes)).codes
+        lookup = np.fromiter(codes.values(), dtype=np.float64, count=len(codes))
+        matrix[:, j] = np.where(positions >= 0, lookup[positions], codes[default])
+
+    return matrix
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-policy predictions into batched model calls.
+
+    Callers queue an encoded feature row and get a future. A collector
+    thread takes the first queued row, keeps collecting until the window
+    has passed or the batch is full, stacks the rows into one matrix and
+    calls each model once for the rows that need it, then resolves every
+    future. Under load this replaces many per-call model overheads with
+    one; an idle request pays at most the window in extra latency.
+    """
+
+    def __init__(
+        self,
+        models: Dict[str, object],
+        window_ms: float = MICRO_BATCH_WINDOW_MS,
+        max_batch_size: int = MICRO_BATCH_MAX_SIZE
+    ):
+        """
+        Initialize the batcher and start its collector thread.
+
+        Args:
+            models: Loaded models by name ('loss_ratio', 'severity')
+            window_ms: Milliseconds a batch stays open after its first row
+            max_batch_size: Maximum rows per batch
+        """
+        if window_ms <= 0 or max_batch_size < 1:
+            raise ValueError("window_ms must be positive and max_batch_size at least 1")
+
+        self.models = models
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._queue: queue.Queue = queue.Queue()
+
+        # Achieved batch sizes, bucketed by powers of two (1, 2-3, 4-7, ...)
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._rows = 0
+        self._largest = 0
+        self._size_counts: Dict[int, int] = {}
+
+        self._thread = threading.Thread(target=self._collect, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, row: List, models: Tuple[str, ...], finish: Callable[[Dict[str, float]], Dict]) -> Future:
+        """
+        Queue one encoded row.
+
+        Args:
+            row: Feature values from encode_row
+            models: Names of the models to evaluate for this row
+            finish: Builds the result from {model name: prediction}; runs on
+                the collector thread
+
+        Returns:
+            Future resolving to finish's result (or the model's exception)
+        """
+        future = Future()
+        models = tuple(name for name in models if name in self.models)
+        if not models:
+            future.set_result(finish({}))
+            return future
+
+        self._queue.put((row, models, finish, future))
+        return future
+
+    def _collect(self):
+        """Collector loop: gather a batch per window and evaluate it."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            deadline = time.perf_counter() + self.window
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._evaluate(batch)
+            if stop:
+                return
+
+    def _evaluate(self, batch: List[Tuple]):
+        """Run each model once over the batch rows that need it and resolve the futures."""
+        matrix = np.array([row for row, _, _, _ in batch], dtype=np.float64)
+        values: List[Dict[str, float]] = [{} for _ in batch]
+        failed: Dict[int, Exception] = {}
+
+        for name, model in self.models.items():
+            rows = [i for i, (_, models, _, _) in enumerate(batch) if name in models]
+            if not rows:
+                continue
+            try:
+                predictions = model.predict(matrix[rows])
+            except Exception as e:
+                failed.update({i: e for i in rows})
+                continue
+            for i, prediction in zip(rows, predictions):
+                values[i][name] = prediction_value(prediction)
+
+        for i, (_, _, finish, future) in enumerate(batch):
+            if i in failed:
+                future.set_exception(failed[i])
+                continue
+            try:
+                future.set_result(finish(values[i]))
+            except Exception as e:
+                future.set_exception(e)
+
+        bucket = 1 << (len(batch).bit_length() - 1)
+        with self._lock:
+            self._batches += 1
+            self._rows += len(batch)
+            self._largest = max(self._largest, len(batch))
+            self._size_counts[bucket] = self._size_counts.get(bucket, 0) + 1
+
+    def info(self) -> Dict:
+        """
+        Batching settings and achieved batch sizes.
+
+        Returns:
+            Dictionary with window_ms, max_batch_size, batches, rows,
+            mean_batch_size, largest_batch and a batch size histogram
+            (keys are size ranges such as '4-7')
+        """
+        with self._lock:
+            histogram = {
+                (str(low) if low == 1 else f"{low}-{2 * low - 1}"): count
+                for low, count in sorted(self._size_counts.items())
+            }
+            return {
+                'window_ms': self.window * 1000,
+                'max_batch_size': self.max_batch_size,
+                'batches': self._batches,
+                'rows': self._rows,
+                'mean_batch_size': round(self._rows / self._batches, 2) if self._batches else None,
+                'largest_batch': self._largest,
+                'batch_size_histogram': histogram,
+                'queued': self._queue.qsize(),
+            }
+
+    def close(self):
+        """Evaluate rows already queued, then stop the collector thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+
+class PredictionCache:
+    """
+    Least-recently-used cache of raw model predictions for single policies.
+
+    Keyed by the encoded feature row, so requests that differ only in
+    spelling (defaults filled in, unknown categories) share an entry. An
+    entry holds the value of each model computed for that row; a lookup is
+    a hit only when every requested model is present.
+    """
+
+    def __init__(self, max_size: int, rounding: Optional[Dict[str, int]] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of feature rows kept
+            rounding: Decimals continuous features are rounded to in keys
+                (reported by info())
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.max_size = max_size
+        self.rounding = dict(rounding or {})
+        self._entries: "OrderedDict[Tuple, Dict[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def get(self, key: Tuple, models: Tuple[str, ...]) -> Optional[Dict[str, float]]:
+        """
+        Look up cached predictions.
+
+        Args:
+            key: Encoded feature row
+            models: Model names needed
+
+        Returns:
+            {model name: prediction} for the requested models, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or any(name not in entry for name in models):
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return {name: entry[name] for name in models}
+
+    @property
+    def generation(self) -> int:
+        """Number of times the cache was cleared (see put)."""
+        with self._lock:
+            return self._invalidations
+
+    def put(self, key: Tuple, values: Dict[str, float], generation: Optional[int] = None):
+        """
+        Store predictions, evicting the least recently used rows when full.
+
+        Args:
+            key: Encoded feature row
+            values: {model name: prediction}
+            generation: The cache's generation read before the models were;
+                the values are dropped if the cache was cleared since, as
+                they may come from the models it was cleared for
+        """
+        with self._lock:
+            if generation is not None and generation != self._invalidations:
+                return
+            entry = self._entries.setdefault(key, {})
+            entry.update(values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries (the models changed)."""
+        with self._lock:
+            self._entries.clear()
+            self._invalidations += 1
+
+    def info(self) -> Dict:
+        """
+        Cache size and effectiveness.
+
+        Returns:
+            Dictionary with size, hit/miss counts, hit rate and invalidations
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else None,
+                'invalidations': self._invalidations,
+                'rounding': dict(self.rounding),
+            }
+
+
+def parse_rounding(text: str) -> Dict[str, int]:
+    """
+    Parse a cache rounding setting such as "AnnualPremium=-2,ExposureUnits=0".
+
+    Args:
+        text: Comma-separated feature=decimals pairs (empty for none)
+
+    Returns:
+        {feature name: decimals}
+    """
+    rounding = {}
+    for item in filter(None, (part.strip() for part in text.split(','))):
+        feature, _, decimals = item.partition('=')
+        try:
+            rounding[feature.strip()] = int(decimals)
+        except ValueError:
+            raise ValueError(f"Invalid rounding '{item}', expected Feature=decimals")
+    return rounding
+
+
+def parse_grid(text: str) -> Optional[Dict[str, Tuple]]:
+    """
+    Parse a grid mode setting.
+
+    "0" or empty disables grid mode and "1" uses GRID_AXES. Otherwise
+    comma-separated Feature=low:high:points[:spacing] items override the
+    defaults, e.g. "RiskRating=1:10:19,AnnualPremium=500:5000000:24:log".
+
+    Args:
+        text: Grid setting
+
+    Returns:
+        {feature: (low, high, points, spacing)}, or None when disabled
+    """
+    text = text.strip()
+    if text in ('', '0'):
+        return None
+
+    axes = dict(GRID_AXES)
+    if text == '1':
+        return axes
+    for item in filter(None, (part.strip() for part in text.split(','))):
+        feature, _, spec = item.partition('=')
+        feature = feature.strip()
+        parts = spec.split(':')
+        if feature not in GRID_AXES or len(parts) not in (3, 4):
+            raise ValueError(f"Invalid grid axis '{item}', expected Feature=low:high:points[:linear|log] "
+                             f"for one of {', '.join(GRID_AXES)}")
+        try:
+            axes[feature] = (float(parts[0]), float(parts[1]), int(parts[2]), parts[3] if len(parts) == 4 else LINEAR)
+        except ValueError:
+            raise ValueError(f"Invalid grid axis '{item}', expected numbers for low, high and points")
+    return axes
+
+
+def grid_points(low: float, high: float, points: int, spacing: str) -> np.ndarray:
+    """
+    Grid points of one continuous axis.
+
+    Args:
+        low: First point
+        high: Last point
+        points: Number of points
+        spacing: 'linear' (evenly spaced) or 'log' (evenly spaced logarithms)
+
+    Returns:
+        Increasing grid points
+    """
+    if spacing not in (LINEAR, LOG):
+        raise ValueError(f"Grid spacing must be '{LINEAR}' or '{LOG}', not '{spacing}'")
+    if points < 2 or high <= low:
+        raise ValueError("A grid axis needs at least two points and high above low")
+    if spacing == LOG:
+        return np.geomspace(low, high, points)
+    return np.linspace(low, high, points)
+
 
 class PredictionService:
     """
@@ -20,34 +596,343 @@ class PredictionService:
     Supports Loss Ratio and Severity predictions using LightGBM models.
     """
 
-    def __init__(self, models_dir: str = "models"):
+    def __init__(
+        self,
+        models_dir: str = "models",
+        batch_window_ms: float = 0.0,
+        max_batch_size: int = MICRO_BATCH_MAX_SIZE,
+        cache_size: int = 0,
+        cache_rounding: Optional[Dict[str, int]] = None,
+        compile_models: bool = True,
+        parallel_min_rows: int = PARALLEL_MODEL_MIN_ROWS,
+        explain_cache_size: int = 0,
+        grid_axes: Optional[Dict[str, Tuple]] = None,
+        grid_max_error: Optional[float] = GRID_MAX_ERROR
+    ):
         """
         Initialize the prediction service.
 
         Args:
             models_dir: Directory containing trained model files
+            batch_window_ms: Micro-batching window for single-policy
+                predictions (0 disables micro-batching)
+            max_batch_size: Maximum rows per micro-batch
+            cache_size: Entries in the single-policy prediction cache (0
+                disables caching)
+            cache_rounding: Decimals to round continuous features to before
+                caching and predicting, e.g. {'AnnualPremium': -2}
+            compile_models: Evaluate small batches with NumPy-compiled trees
+                instead of LightGBM's predict (identical results)
+            parallel_min_rows: Smallest batch for which the models are
+                evaluated concurrently (0 disables)
+            explain_cache_size: Entries in the single-policy feature
+                contribution cache (0 disables caching)
+            grid_axes: Grid mode: {continuous feature: (low, high, points,
+                spacing)} (see GRID_AXES). Single-policy predictions inside
+                the grid are interpolated from predictions precomputed at
+                model load (None disables)
+            grid_max_error: Interpolation error tolerance (see
+                GRID_MAX_ERROR); models above it are scored exactly in grid
+                mode (None serves every model from the grid)
         """
         self.models_dir = Path(models_dir)
         self.lr_model = None
         self.severity_model = None
         self.feature_names = None
+        self.compile_models = compile_models
+        self.interval_models: Dict[str, QuantileModels] = {}
+        self.compiled: Dict[str, CompiledTreeModel] = {}
+        self.compiled_kinds: Dict[Tuple[str, ...], Tuple[CompiledTreeModel, Dict]] = {}
+        self.parallel_min_rows = parallel_min_rows
+        # Threads start on first use, so an idle executor costs nothing
+        self._model_executor = ThreadPoolExecutor(
+            max_workers=len(PREDICTION_MODELS['both']), thread_name_prefix='models'
+        ) if parallel_min_rows > 0 else None
+        self.batch_window_ms = batch_window_ms
+        self.max_batch_size = max_batch_size
+        self.batcher: Optional[MicroBatcher] = None
+        self.cache: Optional[PredictionCache] = None
+        self.explain_cache: Optional[PredictionCache] = None
+        self.grid: Optional[PredictionGrid] = None
+        self.grid_axes = self._grid_axes(grid_axes) if grid_axes else None
+        self.grid_max_error = grid_max_error
+        self._rounding: List[Tuple[int, int]] = []
+        self._model_signature = None
+        self._model_checked = 0.0
+        self._reload_lock = threading.Lock()
+
+        if cache_size > 0:
+            for feature, decimals in (cache_rounding or {}).items():
+                if feature not in FEATURE_INPUTS or FEATURE_INPUTS[feature][1] is not None:
+                    raise ValueError(f"Only continuous features can be rounded, not {feature}")
+                self._rounding.append((FEATURE_NAMES.index(feature), int(decimals)))
+            self.cache = PredictionCache(cache_size, cache_rounding)
+        if explain_cache_size > 0:
+            self.explain_cache = PredictionCache(explain_cache_size, cache_rounding if self.cache else None)
 
         # Load models if they exist
         self._load_models()
 
+    @staticmethod
+    def _grid_axes(spec: Dict[str, Tuple]) -> Dict[str, Tuple[np.ndarray, str]]:
+        """Grid points and spacing per feature in FEATURE_NAMES order: every category code, spec'd continuous points."""
+        unknown = set(spec) - set(GRID_AXES)
+        if unknown:
+            raise ValueError(f"Grid axes must be continuous features, not {', '.join(sorted(unknown))}")
+
+        axes = {}
+        for feature in FEATURE_NAMES:
+            codes = FEATURE_INPUTS[feature][1]
+            if codes is not None:
+                axes[feature] = (np.arange(len(codes), dtype=np.float64), CATEGORY)
+            else:
+                low, high, points, spacing = spec.get(feature, GRID_AXES[feature])
+                axes[feature] = (grid_points(low, high, points, spacing), spacing)
+        return axes
+
+    def _model_paths(self) -> List[Path]:
+        """Model file paths (loss ratio, severity, then the quantile model bundles)."""
+        return [self.models_dir / "lr_model.pkl", self.models_dir / "severity_model.pkl"] + [
+            self.models_dir / filename for filename in QUANTILE_MODEL_FILES.values()
+        ]
+
+    def _model_files_signature(self) -> Tuple:
+        """Size and modification time of each model file (None if missing)."""
+        signature = []
+        for path in self._model_paths():
+            try:
+                stat = path.stat()
+                signature.append((stat.st_size, stat.st_mtime_ns))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
     def _load_models(self):
         """Load trained models from disk."""
-        lr_model_path = self.models_dir / "lr_model.pkl"
-        severity_model_path = self.models_dir / "severity_model.pkl"
+        signature = self._model_files_signature()
+        lr_model_path, severity_model_path = self._model_paths()[:2]
+        lr_model = None
+        severity_model = None
 
         if lr_model_path.exists():
-            self.lr_model = joblib.load(lr_model_path)
+            lr_model = joblib.load(lr_model_path)
             print(f"Loaded Loss Ratio model from {lr_model_path}")
 
         if severity_model_path.exists():
-            self.severity_model = joblib.load(severity_model_path)
+            severity_model = joblib.load(severity_model_path)
             print(f"Loaded Severity model from {severity_model_path}")
 
+        interval_models = {}
+        for name, filename in QUANTILE_MODEL_FILES.items():
+            path = self.models_dir / filename
+            if path.exists():
+                bundle = joblib.load(path)
+                interval_models[name] = QuantileModels(bundle['quantiles'], bundle['models'])
+                print(f"Loaded {len(bundle['models'])} quantile models from {path}")
+
+        compiled, compiled_kinds = {}, {}
+        if self.compile_models:
+            compiled, compiled_kinds = self._compile({
+                'loss_ratio': lr_model,
+                'severity': severity_model,
+                **{name: bundle.models for name, bundle in interval_models.items()}
+            })
+
+        grid = None
+        if self.grid_axes is not None:
+            grid = self._build_grid({
+                'loss_ratio': lr_model,
+                'severity': severity_model,
+                **interval_models
+            })
+
+        # Swap everything in at once so concurrent requests never see a half-loaded service
+        self.lr_model, self.severity_model = lr_model, severity_model
+        self.interval_models, self.compiled, self.compiled_kinds = interval_models, compiled, compiled_kinds
+        self.grid = grid
+        self._model_signature = signature
+
+        models = self._models()
+        if self.batcher is not None:
+            self.batcher.models = models
+        elif self.batch_window_ms > 0 and models:
+            self.batcher = MicroBatcher(models, self.batch_window_ms, self.max_batch_size)
+
+    def _build_grid(self, models: Dict[str, object]) -> Optional[PredictionGrid]:
+        """
+        Precompute grid mode predictions for the loaded models.
+
+        Args:
+            models: {model name: fitted model or QuantileModels} (None when
+                not loaded)
+
+        Returns:
+            PredictionGrid (models over the error tolerance disabled), or
+            None when no model is loaded
+        """
+        models = {name: model for name, model in models.items() if model is not None}
+        if not models:
+            return None
+
+        grid = PredictionGrid(models, self.grid_axes, max_error=self.grid_max_error)
+        info = grid.info()
+        errors = ', '.join(f"{name} {e['p99_relative_error']:.1%}" for name, e in info['interpolation_error'].items())
+        print(f"Built prediction grid: {info['grid_points']:,} points, {info['memory_mb']} MB, "
+              f"{info['build_ms'] / 1000:.1f}s; p99 interpolation error {errors}")
+        if grid.disabled:
+            print(f"⚠️  Prediction grid disabled for {', '.join(grid.disabled)} (p99 interpolation error above "
+                  f"{self.grid_max_error:.1%} of the mean prediction); scoring them exactly")
+        return grid
+
+    def _compile(self, sources: Dict[str, object]) -> Tuple[Dict, Dict]:
+        """
+        Compile the loaded models into NumPy tree evaluators.
+
+        Besides one evaluator per model name (the quantile models of a
+        target compile into one), the models of each prediction kind are
+        compiled together, so a small batch of that kind is a single
+        traversal however many models (point and quantiles) it needs.
+
+        Args:
+            sources: {model name: fitted model, or list of quantile models}
+
+        Returns:
+            Tuple of ({model name: evaluator}, {model names: (evaluator,
+            {model name: output column index or slice})})
+        """
+        compiled = {}
+        for name, model in sources.items():
+            compiled_model = compile_model(model)
+            if compiled_model is not None:
+                compiled[name] = compiled_model
+
+        compiled_kinds = {}
+        for kind_models in PREDICTION_MODELS.values():
+            names = tuple(name for name in kind_models if name in compiled)
+            if len(names) < 2 or names in compiled_kinds:
+                continue
+            models, columns = [], {}
+            for name in names:
+                if isinstance(sources[name], list):
+                    columns[name] = slice(len(models), len(models) + len(sources[name]))
+                    models.extend(sources[name])
+                else:
+                    columns[name] = len(models)
+                    models.append(sources[name])
+            evaluator = compile_model(models)
+            if evaluator is not None:
+                compiled_kinds[names] = (evaluator, columns)
+
+        return compiled, compiled_kinds
+
+    def _models(self) -> Dict[str, object]:
+        """Loaded models by name (compiled versions where available)."""
+        compiled = self.compiled
+        models = {'loss_ratio': self.lr_model, 'severity': self.severity_model, **self.interval_models}
+        return {
+            name: compiled.get(name, model)
+            for name, model in models.items()
+            if model is not None
+        }
+
+    def evaluate(self, features: np.ndarray, models: Tuple[str, ...]) -> Dict[str, np.ndarray]:
+        """
+        Predict one encoded feature matrix with several models.
+
+        The matrix is shared by all models. Small batches whose models were
+        compiled together take one traversal; batches of at least
+        parallel_min_rows rows evaluate the models concurrently.
+
+        Args:
+            features: Feature matrix in FEATURE_NAMES order
+            models: Model names (see PREDICTION_MODELS); names of models
+                that are not loaded are skipped
+
+        Returns:
+            {model name: predictions as a float array, rows x quantiles for
+            interval models}
+        """
+        loaded = self._models()
+        selected = [(name, loaded[name]) for name in models if name in loaded]
+
+        kind = self.compiled_kinds.get(tuple(name for name, _ in selected))
+        if kind is not None and len(features) <= kind[0].max_rows:
+            evaluator, columns = kind
+            outputs = evaluator.predict(features)
+            return {name: outputs[:, column] for name, column in columns.items()}
+
+        if len(selected) > 1 and self._model_executor is not None and len(features) >= self.parallel_min_rows:
+            futures = [(name, self._model_executor.submit(model.predict, features)) for name, model in selected]
+            return {name: np.asarray(future.result(), dtype=float) for name, future in futures}
+
+        return {name: np.asarray(model.predict(features), dtype=float) for name, model in selected}
+
+    def contributions(self, features: np.ndarray, models: Tuple[str, ...] = EXPLAIN_MODELS['both']) -> Dict[str, np.ndarray]:
+        """
+        Per-feature contributions (TreeSHAP) of each prediction in a batch.
+
+        Uses LightGBM's pred_contrib, one call per model for the whole
+        matrix (concurrently from parallel_min_rows rows, like evaluate).
+        Each row's contributions plus the expected value add up to the
+        model's prediction, so callers get the prediction and its drivers
+        from the same pass.
+
+        Args:
+            features: Feature matrix in FEATURE_NAMES order
+            models: Point model names (see EXPLAIN_MODELS); models that are
+                not loaded or not LightGBM are skipped
+
+        Returns:
+            {model name: array of shape (rows, len(FEATURE_NAMES) + 1), one
+            column per feature and the expected value last}
+        """
+        explainable = self._explainable_models()
+        selected = [(name, explainable[name]) for name in models if name in explainable]
+
+        if len(selected) > 1 and self._model_executor is not None and len(features) >= self.parallel_min_rows:
+            futures = [
+                (name, self._model_executor.submit(model.predict, features, pred_contrib=True))
+                for name, model in selected
+            ]
+            return {name: np.asarray(future.result(), dtype=float) for name, future in futures}
+
+        return {name: np.asarray(model.predict(features, pred_contrib=True), dtype=float) for name, model in selected}
+
+    def _explainable_models(self) -> Dict[str, object]:
+        """Loaded LightGBM point models by name (these support pred_contrib)."""
+        models = {'loss_ratio': self.lr_model, 'severity': self.severity_model}
+        return {name: model for name, model in models.items() if hasattr(model, 'booster_')}
+
+    def _check_model_files(self):
+        """
+        Reload the models and drop cached predictions when the model files change.
+
+        Only runs with a cache or grid mode enabled (cached results must
+        never outlive the model that produced them); files are checked at
+        most once per MODEL_CHECK_INTERVAL seconds.
+        """
+        caches = [cache for cache in (self.cache, self.explain_cache) if cache is not None]
+        if not caches and self.grid_axes is None:
+            return
+        now = time.monotonic()
+        if now - self._model_checked < MODEL_CHECK_INTERVAL:
+            return
+        self._model_checked = now
+
+        if self._model_files_signature() == self._model_signature:
+            return
+        with self._reload_lock:
+            if self._model_files_signature() == self._model_signature:
+                return
+            try:
+                self._load_models()
+            except Exception as e:
+                # Probably caught mid-write; keep serving the old models and retry later
+                print(f"⚠️  Could not reload models: {e}")
+                return
+            for cache in caches:
+                cache.clear()
+
     def prepare_features(self, input_data: Dict) -> pd.DataFrame:
         """
         Prepare features from input data.
@@ -58,31 +943,78 @@ class PredictionService:
         Returns:
             DataFrame with prepared features
         """
-        # Geography encoding
-        geography_map = {
-            'Northeast': 0, 'Southeast': 1, 'Midwest': 2,
-            'Southwest': 3, 'West': 4, 'Northwest': 5
-        }
+        return pd.DataFrame([encode_row(input_data)], columns=FEATURE_NAMES)
 
-        # Industry encoding
-        industry_map = {
-            'Manufacturing': 0, 'Retail': 1, 'Office': 2, 'Warehouse': 3,
-            'Healthcare': 4, 'Education': 5, 'Hospitality': 6, 'Technology': 7
-        }
+    def encode(self, input_data: Dict) -> List:
+        """
+        Encoded feature row for one policy, with the cache rounding applied.
+
+        Args:
+            input_data: Input features dictionary
 
-        # Policy size encoding
-        policy_size_map = {'Small': 0, 'Medium': 1, 'Large': 2, 'Enterprise': 3}
+        Returns:
+            Feature values in FEATURE_NAMES order
+        """
+        row = encode_row(input_data)
+        for i, decimals in self._rounding:
+            row[i] = round(float(row[i]), decimals)
+        return row
 
-        features = {
-            'RiskRating': input_data.get('risk_rating', 5.0),
-            'Geography': geography_map.get(input_data.get('geography', 'Midwest'), 2),
-            'Industry': industry_map.get(input_data.get('industry', 'Office'), 2),
-            'PolicySize': policy_size_map.get(input_data.get('policy_size', 'Medium'), 1),
-            'ExposureUnits': input_data.get('exposure_units', 50.0),
-            'AnnualPremium': input_data.get('annual_premium', 25000.0)
-        }
+    def _predict_values(self, input_data: Dict, models: Tuple[str, ...]) -> Dict[str, float]:
+        """
+        Raw predictions of the named models for one policy.
 
-        return pd.DataFrame([features])
+        The encoded (and, with cache rounding, rounded) feature row is
+        interpolated from the prediction grid in grid mode, otherwise looked
+        up once in the cache for all requested models; misses are evaluated
+        on the micro-batcher when enabled, otherwise directly.
+
+        Args:
+            input_data: Input features dictionary
+            models: Model names ('loss_ratio', 'severity')
+
+        Returns:
+            {model name: prediction} for the requested models that are loaded
+        """
+        self._check_model_files()
+        # Read before the models, so values from models replaced meanwhile are not cached
+        generation = self.cache.generation if self.cache is not None else None
+        loaded = self._models()
+        names = tuple(name for name in models if name in loaded)
+        if not names:
+            return {}
+
+        row = self.encode(input_data)
+        key = tuple(row)
+
+        interpolated = self._grid_values(row, names)
+        if interpolated is not None:
+            return interpolated
+
+        if self.cache is not None:
+            cached = self.cache.get(key, names)
+            if cached is not None:
+                return cached
+
+        if self.batcher is not None:
+            values = self.batcher.submit(row, names, dict).result()
+        else:
+            predictions = self.evaluate(np.array([row], dtype=np.float64), names)
+            values = {name: prediction_value(prediction[0]) for name, prediction in predictions.items()}
+
+        if self.cache is not None:
+            self.cache.put(key, values, generation)
+        return values
+
+    def _grid_values(self, row: List, names: Tuple[str, ...]) -> Optional[Dict[str, float]]:
+        """Grid mode predictions for an encoded row, or None (grid mode off, a model disabled, row outside the grid)."""
+        grid = self.grid
+        if grid is None or any(name not in grid.enabled for name in names):
+            return None
+        predictions = grid.predict_row(row)
+        if predictions is None:
+            return None
+        return {name: prediction_value(predictions[grid.columns[name]]) for name in names}
 
     def predict_loss_ratio(self, input_data: Dict) -> Dict:
         """
@@ -95,32 +1027,11 @@ class PredictionService:
             Dictionary with prediction and confidence interval
         """
         if self.lr_model is None:
-            # Return dummy prediction if model not loaded
-            return {
-                'predicted_loss_ratio': 65.0,
-                'confidence_interval': [50.0, 80.0],
-                'model_loaded': False,
-                'message': 'Model not loaded - using default estimate'
-            }
-
-        features_df = self.prepare_features(input_data)
+            return self._loss_ratio_result(None, input_data)
 
         try:
-            prediction = self.lr_model.predict(features_df)[0]
-
-            # Calculate confidence interval (simplified)
-            # In production, you'd use proper confidence intervals from the model
-            confidence_interval = [
-                max(0, prediction - 15),
-                min(100, prediction + 15)
-            ]
-
-            return {
-                'predicted_loss_ratio': round(float(prediction), 2),
-                'confidence_interval': [round(ci, 2) for ci in confidence_interval],
-                'model_loaded': True,
-                'input_features': input_data
-            }
+            values = self._predict_values(input_data, PREDICTION_MODELS['loss_ratio'])
+            return self._result('loss_ratio', values, input_data)
 
         except Exception as e:
             return {
@@ -140,67 +1051,351 @@ class PredictionService:
             Dictionary with prediction and confidence interval
         """
         if self.severity_model is None:
-            # Return dummy prediction if model not loaded
-            policy_size = input_data.get('policy_size', 'Medium')
-            base_severity = {
-                'Small': 50000,
-                'Medium': 100000,
-                'Large': 250000,
-                'Enterprise': 500000
+            return self._severity_result(None, input_data)
+
+        try:
+            values = self._predict_values(input_data, PREDICTION_MODELS['severity'])
+            return self._result('severity', values, input_data)
+
+        except Exception as e:
+            return {
+                'error': str(e),
+                'model_loaded': True,
+                'message': 'Prediction failed'
             }
 
+    def predict_both(self, input_data: Dict) -> Dict:
+        """
+        Predict both loss ratio and severity.
+
+        Both models share one feature encoding, cache lookup and (when
+        micro-batching) queued row.
+
+        Args:
+            input_data: Input features dictionary
+
+        Returns:
+            Dictionary with both predictions
+        """
+        try:
+            values = self._predict_values(input_data, PREDICTION_MODELS['both'])
+        except Exception as e:
+            failure = {
+                'error': str(e),
+                'model_loaded': True,
+                'message': 'Prediction failed'
+            }
+            return {'loss_ratio': failure, 'severity': failure, 'input_features': input_data}
+
+        return self._result('both', values, input_data)
+
+    def _result(self, kind: str, values: Dict[str, float], input_data: Dict) -> Dict:
+        """Response for a prediction kind from raw model values."""
+        if kind == 'loss_ratio':
+            return self._loss_ratio_result(values.get('loss_ratio'), input_data, values.get('loss_ratio_interval'))
+        if kind == 'severity':
+            return self._severity_result(values.get('severity'), input_data, values.get('severity_interval'))
+        return {
+            'loss_ratio': self._result('loss_ratio', values, input_data),
+            'severity': self._result('severity', values, input_data),
+            'input_features': input_data
+        }
+
+    def _quantiles(self, name: str, interval: Tuple[float, ...]) -> Dict[str, float]:
+        """Quantile predictions labelled p10, p50, ... (sorted, so they never cross)."""
+        quantiles = self.interval_models[name].quantiles
+        return {f"p{q * 100:g}": round(value, 2) for q, value in zip(quantiles, sorted(interval))}
+
+    def _loss_ratio_result(
+        self, prediction: Optional[float], input_data: Dict, interval: Optional[Tuple[float, ...]] = None
+    ) -> Dict:
+        """
+        Loss ratio response for a raw prediction (None when the model is not loaded).
+
+        With quantile models the confidence interval spans the lowest and
+        highest quantile (widened to include the point prediction);
+        otherwise it is a fixed margin.
+        """
+        if prediction is None:
+            # Return dummy prediction if model not loaded
             return {
-                'predicted_severity': base_severity.get(policy_size, 100000),
-                'confidence_interval': [
-                    base_severity.get(policy_size, 100000) * 0.7,
-                    base_severity.get(policy_size, 100000) * 1.3
-                ],
+                'predicted_loss_ratio': 65.0,
+                'confidence_interval': [50.0, 80.0],
                 'model_loaded': False,
-                'message': 'Model not loaded - using policy size-based estimate'
+                'message': 'Model not loaded - using default estimate'
             }
 
-        features_df = self.prepare_features(input_data)
+        if interval is not None:
+            quantiles = self._quantiles('loss_ratio_interval', interval)
+            confidence_interval = [float(bound) for bound in interval_bounds(prediction, interval)]
+        else:
+            # Fixed margin when no quantile models are trained
+            quantiles = None
+            confidence_interval = [
+                max(0, prediction - 15),
+                min(100, prediction + 15)
+            ]
 
-        try:
-            prediction = self.severity_model.predict(features_df)[0]
+        result = {
+            'predicted_loss_ratio': round(float(prediction), 2),
+            'confidence_interval': [round(ci, 2) for ci in confidence_interval],
+            'model_loaded': True,
+            'input_features': input_data
+        }
+        if quantiles is not None:
+            result['quantiles'] = quantiles
+        return result
+
+    def _severity_result(
+        self, prediction: Optional[float], input_data: Dict, interval: Optional[Tuple[float, ...]] = None
+    ) -> Dict:
+        """Severity response for a raw prediction (None when the model is not loaded)."""
+        if prediction is None:
+            # Return dummy prediction if model not loaded
+            base_severity = BASE_SEVERITY.get(input_data.get('policy_size', 'Medium'), 100000)
+
+            return {
+                'predicted_severity': base_severity,
+                'confidence_interval': [base_severity * 0.7, base_severity * 1.3],
+                'model_loaded': False,
+                'message': 'Model not loaded - using policy size-based estimate'
+            }
 
-            # Calculate confidence interval
+        if interval is not None:
+            quantiles = self._quantiles('severity_interval', interval)
+            confidence_interval = [float(bound) for bound in interval_bounds(prediction, interval)]
+        else:
+            # Fixed ratio when no quantile models are trained
+            quantiles = None
             confidence_interval = [
                 max(0, prediction * 0.7),
                 prediction * 1.3
             ]
 
-            return {
-                'predicted_severity': round(float(prediction), 2),
-                'confidence_interval': [round(ci, 2) for ci in confidence_interval],
-                'model_loaded': True,
-                'input_features': input_data
-            }
+        result = {
+            'predicted_severity': round(float(prediction), 2),
+            'confidence_interval': [round(ci, 2) for ci in confidence_interval],
+            'model_loaded': True,
+            'input_features': input_data
+        }
+        if quantiles is not None:
+            result['quantiles'] = quantiles
+        return result
 
-        except Exception as e:
-            return {
-                'error': str(e),
-                'model_loaded': True,
-                'message': 'Prediction failed'
-            }
+    def submit(self, kind: str, input_data: Dict) -> Future:
+        """
+        Queue a single-policy prediction on the micro-batcher.
 
-    def predict_both(self, input_data: Dict) -> Dict:
+        Lets async callers await the result (asyncio.wrap_future) without
+        holding a thread while the batch fills. Grid mode and cache hits
+        resolve at once.
+
+        Args:
+            kind: 'loss_ratio', 'severity' or 'both'
+            input_data: Input features dictionary
+
+        Returns:
+            Future resolving to the same dictionary as predict_<kind>
+
+        Raises:
+            ValueError: If micro-batching is disabled or kind is unknown
         """
-        Predict both loss ratio and severity.
+        if self.batcher is None:
+            raise ValueError("Micro-batching is not enabled")
+        if kind not in PREDICTION_MODELS:
+            raise ValueError(f"Unknown prediction kind: {kind}")
+
+        self._check_model_files()
+        generation = self.cache.generation if self.cache is not None else None
+        names = tuple(name for name in PREDICTION_MODELS[kind] if name in self.batcher.models)
+        row = self.encode(input_data)
+        key = tuple(row)
+
+        values = self._grid_values(row, names) if names else None
+        if values is None and self.cache is not None and names:
+            values = self.cache.get(key, names)
+        if values is not None:
+            future = Future()
+            future.set_result(self._result(kind, values, input_data))
+            return future
+
+        def finish(values: Dict[str, float]) -> Dict:
+            if self.cache is not None and values:
+                self.cache.put(key, values, generation)
+            return self._result(kind, values, input_data)
+
+        return self.batcher.submit(row, names, finish)
+
+    def explain(self, input_data: Dict, kind: str = 'both') -> Dict:
+        """
+        Prediction and per-feature contributions for one policy.
+
+        Contributions are cached by encoded feature row like predictions,
+        so repeated explanations of a policy cost one lookup.
 
         Args:
             input_data: Input features dictionary
+            kind: 'loss_ratio', 'severity' or 'both'
 
         Returns:
-            Dictionary with both predictions
+            Dictionary with, per explained model, the prediction, the
+            expected value (base_value), contributions by feature and the
+            drivers ordered by absolute contribution
+
+        Raises:
+            ValueError: If kind is unknown
         """
-        lr_prediction = self.predict_loss_ratio(input_data)
-        severity_prediction = self.predict_severity(input_data)
+        if kind not in EXPLAIN_MODELS:
+            raise ValueError(f"Unknown prediction kind: {kind}")
+
+        self._check_model_files()
+        generation = self.explain_cache.generation if self.explain_cache is not None else None
+        explainable = self._explainable_models()
+        names = tuple(name for name in EXPLAIN_MODELS[kind] if name in explainable)
+        result = {'input_features': input_data}
+        if not names:
+            result.update({'model_loaded': False, 'message': 'Models not loaded - no contributions available'})
+            return result
 
+        row = self.encode(input_data)
+        key = tuple(row)
+        values = self.explain_cache.get(key, names) if self.explain_cache is not None else None
+        if values is None:
+            contributions = self.contributions(np.array([row], dtype=np.float64), names)
+            values = {name: tuple(float(value) for value in matrix[0]) for name, matrix in contributions.items()}
+            if self.explain_cache is not None:
+                self.explain_cache.put(key, values, generation)
+
+        for name in names:
+            result[name] = self._explanation(values[name], row)
+        result['model_loaded'] = True
+        return result
+
+    def _explanation(self, values: Tuple[float, ...], row: List) -> Dict:
+        """One model's explanation from a contribution row (expected value last)."""
+        contributions = dict(zip(FEATURE_NAMES, values[:-1]))
+        inputs = {}
+        for feature, value in zip(FEATURE_NAMES, row):
+            codes = FEATURE_INPUTS[feature][1]
+            # Report categories by name, as the request spelled them after defaults
+            inputs[feature] = next((name for name, code in codes.items() if code == value), value) if codes else value
+
+        drivers = sorted(contributions, key=lambda feature: abs(contributions[feature]), reverse=True)
         return {
-            'loss_ratio': lr_prediction,
-            'severity': severity_prediction,
-            'input_features': input_data
+            'prediction': round(sum(values), 2),
+            'base_value': round(values[-1], 2),
+            'contributions': {feature: round(value, 4) for feature, value in contributions.items()},
+            'drivers': [
+                {'feature': feature, 'value': inputs[feature], 'contribution': round(contributions[feature], 4)}
+                for feature in drivers
+            ]
+        }
+
+    def score_features(self, features: np.ndarray, policy_size: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Score an encoded feature matrix, shared by both models.
+
+        Args:
+            features: Feature matrix from encode_features
+            policy_size: Policy size names, used for the fallback severity
+                when the severity model is not loaded
+
+        Returns:
+            DataFrame with PredictedLossRatio, LossRatioLower, LossRatioUpper,
+            PredictedSeverity, SeverityLower and SeverityUpper
+        """
+        predictions = self.evaluate(features, PREDICTION_MODELS['both'])
+
+        if 'loss_ratio' in predictions and 'loss_ratio_interval' in predictions:
+            loss_ratio = predictions['loss_ratio']
+            loss_ratio_lower, loss_ratio_upper = interval_bounds(loss_ratio, predictions['loss_ratio_interval'])
+        elif 'loss_ratio' in predictions:
+            loss_ratio = predictions['loss_ratio']
+            loss_ratio_lower = np.maximum(0, loss_ratio - 15)
+            loss_ratio_upper = np.minimum(100, loss_ratio + 15)
+        else:
+            loss_ratio = np.full(len(features), 65.0)
+            loss_ratio_lower = np.full(len(features), 50.0)
+            loss_ratio_upper = np.full(len(features), 80.0)
+
+        if 'severity' in predictions and 'severity_interval' in predictions:
+            severity = predictions['severity']
+            severity_lower, severity_upper = interval_bounds(severity, predictions['severity_interval'])
+        elif 'severity' in predictions:
+            severity = predictions['severity']
+            severity_lower = np.maximum(0, severity * 0.7)
+            severity_upper = severity * 1.3
+        else:
+            sizes = pd.Series(policy_size if policy_size is not None else 'Medium', index=range(len(features)))
+            severity = sizes.map(BASE_SEVERITY).fillna(100000).to_numpy(dtype=float)
+            severity_lower = severity * 0.7
+            severity_upper = severity * 1.3
+
+        return pd.DataFrame({
+            'PredictedLossRatio': loss_ratio,
+            'LossRatioLower': loss_ratio_lower,
+            'LossRatioUpper': loss_ratio_upper,
+            'PredictedSeverity': severity,
+            'SeverityLower': severity_lower,
+            'SeverityUpper': severity_upper
+        }).round(2)
+
+    def predict_batch(self, records: Union[List[Dict], pd.DataFrame], contributions: bool = False) -> Dict:
+        """
+        Predict loss ratio and severity for a batch of policies.
+
+        All rows are encoded into one feature matrix and each model is
+        called once for the whole batch.
+
+        Args:
+            records: List of input dictionaries or a DataFrame (see batch_frame)
+            contributions: Also return each row's per-feature contributions
+                (loss_ratio_contributions / severity_contributions, with the
+                expected value as base_value)
+
+        Returns:
+            Dictionary with one prediction per row, model load state and
+            batch metrics (rows, encode / predict / contributions / total
+            milliseconds, rows per second)
+        """
+        start = time.perf_counter()
+        frame = batch_frame(records)
+        features = encode_features(frame)
+        encoded = time.perf_counter()
+
+        scores = self.score_features(features, frame['policy_size'].to_numpy())
+        predicted = time.perf_counter()
+
+        scores.columns = [
+            'predicted_loss_ratio', 'loss_ratio_lower', 'loss_ratio_upper',
+            'predicted_severity', 'severity_lower', 'severity_upper'
+        ]
+        if 'policy_id' in frame.columns:
+            scores.insert(0, 'policy_id', frame['policy_id'].astype(str).to_numpy())
+        predictions = scores.to_dict('records')
+
+        if contributions:
+            columns = FEATURE_NAMES + ['base_value']
+            for name, matrix in self.contributions(features).items():
+                for prediction, values in zip(predictions, np.round(matrix, 4).tolist()):
+                    prediction[f'{name}_contributions'] = dict(zip(columns, values))
+        explained = time.perf_counter()
+        total = explained - start
+
+        return {
+            'predictions': predictions,
+            'model_loaded': {
+                'loss_ratio': self.lr_model is not None,
+                'severity': self.severity_model is not None
+            },
+            'metrics': {
+                'rows': len(frame),
+                'encode_ms': round((encoded - start) * 1000, 3),
+                'predict_ms': round((predicted - encoded) * 1000, 3),
+                'contributions_ms': round((explained - predicted) * 1000, 3) if contributions else None,
+                'total_ms': round(total * 1000, 3),
+                'rows_per_second': round(len(frame) / total, 1) if total > 0 else None
+            }
         }
 
     def get_feature_importance(self, model_type: str = 'loss_ratio') -> Optional[Dict]:
@@ -220,10 +1415,10 @@ class PredictionService:
 
         try:
             if hasattr(model, 'feature_importances_'):
-                feature_names = ['RiskRating', 'Geography', 'Industry', 'PolicySize', 'ExposureUnits', 'AnnualPremium']
                 importances = model.feature_importances_
+                names = getattr(model, 'feature_name_', FEATURE_NAMES)
 
-                importance_dict = dict(zip(feature_names, importances.tolist()))
+                importance_dict = dict(zip(names, importances.tolist()))
 
                 # Sort by importance
                 sorted_importance = dict(sorted(importance_dict.items(), key=lambda x: x[1], reverse=True))
@@ -241,12 +1436,14 @@ class PredictionService:
 _prediction_service = None
 
 
-def get_prediction_service(models_dir: str = "models") -> PredictionService:
+def get_prediction_service(models_dir: str = "models", **options) -> PredictionService:
     """
     Get the global prediction service instance.
 
     Args:
         models_dir: Directory containing model files
+        **options: PredictionService options (micro-batching, caching), used when the
+            instance is created
 
     Returns:
         PredictionService instance
@@ -254,6 +1451,6 @@ def get_prediction_service(models_dir: str = "models") -> PredictionService:
     global _prediction_service
 
     if _prediction_service is None:
-        _prediction_service = PredictionService(models_dir)
+        _prediction_service = PredictionService(models_dir, **options)
 
     return _prediction_service
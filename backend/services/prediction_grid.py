@@ -0,0 +1,291 @@
+"""
+Prediction Grid Service
+Precomputed model predictions over a feature grid, answered by multilinear
+interpolation.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import bisect
+import itertools
+import math
+import threading
+import time
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+# Axis spacings: categories are looked up exactly; continuous axes are
+# interpolated linearly in the value or in its logarithm
+CATEGORY = 'category'
+LINEAR = 'linear'
+LOG = 'log'
+SPACINGS = (CATEGORY, LINEAR, LOG)
+
+# Random in-grid rows scored exactly at build time to measure interpolation error
+GRID_VALIDATION_ROWS = 4096
+
+
+class PredictionGrid:
+    """
+    Model predictions precomputed at every point of a feature grid.
+
+    Each feature gets an axis of grid points: every code of a categorical
+    feature, a handful of values for a continuous one. At build time every
+    model predicts the full cross product once. A lookup then finds each
+    row's category cell and its enclosing continuous cell, and blends the
+    cell's corner predictions with multilinear weights; one NumPy gather
+    and a weighted sum, independent of the size of the models.
+
+    Tree models are step functions, so interpolated values are an
+    approximation. The build scores random rows inside the grid exactly
+    and reports the interpolation error per model (info()); models whose
+    error exceeds the tolerance are disabled, so callers score them
+    exactly. Rows outside the grid are flagged for exact scoring too.
+    """
+
+    def __init__(
+        self,
+        models: Dict[str, object],
+        axes: Dict[str, Tuple[np.ndarray, str]],
+        validation_rows: int = GRID_VALIDATION_ROWS,
+        seed: int = 0,
+        max_error: Optional[float] = None
+    ):
+        """
+        Build the grid.
+
+        Args:
+            models: Fitted models by name; predict() returns one value per
+                row, or one column per output (e.g. quantiles)
+            axes: Grid points and spacing per feature, in model feature
+                order; category axes are the codes 0..n-1
+            validation_rows: Random in-grid rows scored exactly to measure
+                interpolation error (0 skips validation)
+            seed: Random seed for the validation rows
+            max_error: Largest p99 interpolation error, relative to the
+                mean absolute exact prediction, for a model to be enabled
+                (None enables every model)
+
+        Raises:
+            ValueError: If there are no models, or an axis is invalid
+        """
+        if not models:
+            raise ValueError("Need at least one model")
+
+        self.names = list(axes)
+        self.spacings = []
+        self.points: List[np.ndarray] = []
+        for feature, (points, spacing) in axes.items():
+            points = np.asarray(points, dtype=np.float64)
+            if spacing not in SPACINGS:
+                raise ValueError(f"Unknown spacing for {feature}: {spacing}")
+            if spacing == CATEGORY and not np.array_equal(points, np.arange(len(points))):
+                raise ValueError(f"Category axis {feature} must be the codes 0..{len(points) - 1}")
+            if spacing != CATEGORY and (len(points) < 2 or np.any(np.diff(points) <= 0)):
+                raise ValueError(f"{feature} needs at least two increasing grid points")
+            if spacing == LOG and points[0] <= 0:
+                raise ValueError(f"{feature} grid points must be positive for log spacing")
+            self.spacings.append(spacing)
+            self.points.append(points)
+
+        # Interpolation coordinates (log of the value on log axes)
+        self.continuous = [j for j, spacing in enumerate(self.spacings) if spacing != CATEGORY]
+        self.coords = [np.log(p) if s == LOG else p for p, s in zip(self.points, self.spacings)]
+        self.shape = tuple(len(points) for points in self.points)
+
+        start = time.perf_counter()
+        mesh = np.meshgrid(*self.points, indexing='ij')
+        features = np.column_stack([m.ravel() for m in mesh])
+        outputs, self.columns = self._predict_all(models, features)
+        self.values = outputs
+        self.build_ms = (time.perf_counter() - start) * 1000
+
+        # Flat offset of each cell corner: all 0/1 combinations over the continuous axes
+        strides = np.array([int(np.prod(self.shape[j + 1:])) for j in range(len(self.shape))], dtype=np.intp)
+        self._strides = strides
+        self._corners = np.array(list(itertools.product((0, 1), repeat=len(self.continuous))), dtype=bool)
+        self._corner_offsets = self._corners.astype(np.intp) @ strides[self.continuous]
+
+        # Plain Python copies for the single-row path (no per-call array overhead)
+        self._row_axes = [
+            (spacing, coords.tolist(), int(stride))
+            for spacing, coords, stride in zip(self.spacings, self.coords, strides)
+        ]
+        self._row_corners = self._corners.tolist()
+
+        self._lock = threading.Lock()
+        self._rows = 0
+        self._outside = 0
+        self.errors = self._validate(models, validation_rows, seed) if validation_rows > 0 else {}
+
+        self.max_error = max_error
+        self.disabled = sorted(
+            name for name, error in self.errors.items()
+            if max_error is not None and error['p99_relative_error'] > max_error
+        )
+        self.enabled = frozenset(self.columns) - set(self.disabled)
+
+    @staticmethod
+    def _predict_all(models: Dict[str, object], features: np.ndarray) -> Tuple[np.ndarray, Dict]:
+        """Predict a feature matrix with every model: (rows x outputs, {name: column index or slice})."""
+        columns, outputs = {}, []
+        for name, model in models.items():
+            prediction = np.asarray(model.predict(features), dtype=np.float64)
+            if prediction.ndim == 1:
+                columns[name] = len(outputs)
+                outputs.append(prediction)
+            else:
+                columns[name] = slice(len(outputs), len(outputs) + prediction.shape[1])
+                outputs.extend(prediction.T)
+        return np.column_stack(outputs), columns
+
+    def predict(self, features) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Interpolate a batch.
+
+        Args:
+            features: Feature matrix in axis order
+
+        Returns:
+            Tuple of (predictions of shape (rows, outputs), boolean mask of
+            rows inside the grid); rows outside are clamped to its edge
+        """
+        X = np.asarray(features, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != len(self.points):
+            raise ValueError(f"Expected {len(self.points)} features, got {X.shape[1]}")
+
+        n_rows = len(X)
+        inside = np.ones(n_rows, dtype=bool)
+        flat = np.zeros(n_rows, dtype=np.intp)
+        fractions = np.empty((n_rows, len(self.continuous)))
+
+        for j, (coords, spacing) in enumerate(zip(self.coords, self.spacings)):
+            x = X[:, j]
+            if spacing == CATEGORY:
+                index = np.clip(np.nan_to_num(x, nan=-1), 0, len(coords) - 1).astype(np.intp)
+                inside &= index == x
+                flat += index * self._strides[j]
+                continue
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                c = np.log(x) if spacing == LOG else x
+            inside &= (c >= coords[0]) & (c <= coords[-1])
+            c = np.clip(np.nan_to_num(c, nan=coords[0]), coords[0], coords[-1])
+            index = np.clip(np.searchsorted(coords, c, side='right') - 1, 0, len(coords) - 2)
+            fractions[:, self.continuous.index(j)] = (c - coords[index]) / (coords[index + 1] - coords[index])
+            flat += index * self._strides[j]
+
+        # Corner weights: product over continuous axes of t (upper) or 1 - t (lower)
+        weights = np.where(self._corners, fractions[:, None, :], 1 - fractions[:, None, :]).prod(axis=2)
+        corners = self.values.take(flat[:, None] + self._corner_offsets, axis=0)
+        predictions = np.einsum('rc,rck->rk', weights, corners)
+
+        with self._lock:
+            self._rows += n_rows
+            self._outside += int(n_rows - inside.sum())
+        return predictions, inside
+
+    def predict_row(self, row: List[float]) -> Optional[np.ndarray]:
+        """
+        Interpolate one row (same result as predict, without its batch overhead).
+
+        Args:
+            row: Feature values in axis order
+
+        Returns:
+            Predictions (one per output), or None when the row is outside the grid
+        """
+        flat = 0
+        fractions = []
+        for (spacing, coords, stride), x in zip(self._row_axes, row):
+            if spacing == CATEGORY:
+                if x != int(x) or not 0 <= x < len(coords):
+                    return self._count_outside()
+                flat += int(x) * stride
+                continue
+
+            if spacing == LOG:
+                if not x > 0:
+                    return self._count_outside()
+                x = math.log(x)
+            if not coords[0] <= x <= coords[-1]:
+                return self._count_outside()
+            index = min(bisect.bisect_right(coords, x) - 1, len(coords) - 2)
+            fractions.append((x - coords[index]) / (coords[index + 1] - coords[index]))
+            flat += index * stride
+
+        weights = [
+            math.prod(t if upper else 1 - t for t, upper in zip(fractions, corner))
+            for corner in self._row_corners
+        ]
+        with self._lock:
+            self._rows += 1
+        return np.dot(weights, self.values.take(flat + self._corner_offsets, axis=0))
+
+    def _count_outside(self) -> None:
+        """Record a single row outside the grid."""
+        with self._lock:
+            self._rows += 1
+            self._outside += 1
+        return None
+
+    def _validate(self, models: Dict[str, object], rows: int, seed: int) -> Dict[str, Dict]:
+        """Interpolation error against exact predictions at random rows inside the grid."""
+        rng = np.random.default_rng(seed)
+        features = np.empty((rows, len(self.points)))
+        for j, (points, coords, spacing) in enumerate(zip(self.points, self.coords, self.spacings)):
+            if spacing == CATEGORY:
+                features[:, j] = rng.integers(0, len(points), rows)
+            else:
+                c = rng.uniform(coords[0], coords[-1], rows)
+                features[:, j] = np.exp(c) if spacing == LOG else c
+
+        exact, _ = self._predict_all(models, features)
+        approximate, _ = self.predict(features)
+        with self._lock:
+            # Validation lookups are not traffic
+            self._rows = self._outside = 0
+
+        errors = {}
+        for name, column in self.columns.items():
+            error = np.abs(approximate[:, column] - exact[:, column])
+            p99 = float(np.percentile(error, 99))
+            # Relative to the typical prediction, so one tolerance fits every model
+            scale = float(np.abs(exact[:, column]).mean())
+            errors[name] = {
+                'max_abs_error': round(float(error.max()), 4),
+                'p99_abs_error': round(p99, 4),
+                'mean_abs_error': round(float(error.mean()), 4),
+                'p99_relative_error': round(p99 / scale, 4) if scale > 0 else float(p99 > 0),
+            }
+        return errors
+
+    def info(self) -> Dict:
+        """
+        Grid size, build cost, interpolation error and usage.
+
+        Returns:
+            Dictionary with axes (points, range, spacing per feature), grid
+            points, memory, build milliseconds, per-model interpolation
+            errors, the error tolerance, enabled and disabled models, rows
+            looked up and rows outside the grid
+        """
+        with self._lock:
+            rows, outside = self._rows, self._outside
+        return {
+            'axes': {
+                name: {'points': len(points), 'min': float(points[0]), 'max': float(points[-1]), 'spacing': spacing}
+                for name, points, spacing in zip(self.names, self.points, self.spacings)
+            },
+            'grid_points': len(self.values),
+            'memory_mb': round(self.values.nbytes / 1e6, 2),
+            'build_ms': round(self.build_ms, 1),
+            'interpolation_error': self.errors,
+            'max_error': self.max_error,
+            'enabled_models': sorted(self.enabled),
+            'disabled_models': self.disabled,
+            'rows': rows,
+            'outside_grid': outside,
+        }
@@ -0,0 +1,207 @@
+"""
+Segment Cube Service
+Cached segment aggregates and fast top-N ranking.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Union
+
+from services.credibility import BuhlmannStraubCredibility
+
+KPI_METRICS = [
+    'EarnedPremium', 'TotalExposure', 'PolicyCount', 'IncurredLoss', 'PaidLoss',
+    'ClaimCount', 'LossRatio', 'PaidLossRatio', 'Frequency', 'Severity',
+    'PurePremium', 'AvgPremium', 'CredibilityFactor', 'CredibilityLossRatio'
+]
+
+
+class SegmentCube:
+    """
+    Aggregated measures for every cell of one or more segment dimensions.
+
+    Cells are stored as aligned NumPy arrays (one per measure), so KPIs for
+    all cells are computed once and rankings never touch the raw tables.
+    """
+
+    def __init__(self, dimensions: List[str], keys: pd.DataFrame, measures: Dict[str, np.ndarray]):
+        """
+        Initialize the cube from pre-aggregated measures.
+
+        Args:
+            dimensions: Segment dimension columns
+            keys: DataFrame of dimension values, one row per cell
+            measures: Measure arrays aligned with keys
+        """
+        self.dimensions = list(dimensions)
+        self.keys = keys.reset_index(drop=True)
+        self.measures = measures
+        self.metrics = self._calculate_metrics()
+
+    @classmethod
+    def build(
+        cls,
+        exposure_df: pd.DataFrame,
+        claims_df: pd.DataFrame,
+        dimensions: Union[str, List[str]],
+        include_credibility: bool = True,
+        period_exposure_df: Optional[pd.DataFrame] = None
+    ) -> 'SegmentCube':
+        """
+        Aggregate exposure and claims into a cube.
+
+        Args:
+            exposure_df: DataFrame containing exposure/premium data
+            claims_df: DataFrame containing claims data
+            dimensions: Segment dimension, or list of dimensions for a crosstab
+            include_credibility: Compute Buhlmann-Straub credibility per cell
+            period_exposure_df: Monthly exposure (with Period) used for
+                credibility when exposure_df has no Period column
+
+        Returns:
+            SegmentCube instance
+        """
+        dimensions = [dimensions] if isinstance(dimensions, str) else list(dimensions)
+
+        exposure_agg = exposure_df.groupby(dimensions, observed=True).agg(
+            EarnedPremium=('EarnedPremium', 'sum'),
+            TotalExposure=('ExposureUnits', 'sum'),
+            PolicyCount=('PolicyID', 'nunique')
+        )
+
+        if len(claims_df) > 0:
+            claims_agg = claims_df.groupby(dimensions, observed=True).agg(
+                IncurredLoss=('IncurredAmount', 'sum'),
+                PaidLoss=('PaidAmount', 'sum'),
+                ClaimCount=('IncurredAmount', 'size')
+            ).reindex(exposure_agg.index, fill_value=0)
+        else:
+            claims_agg = pd.DataFrame(
+                0.0,
+                index=exposure_agg.index,
+                columns=['IncurredLoss', 'PaidLoss', 'ClaimCount']
+            )
+
+        measures = {
+            column: exposure_agg[column].to_numpy(dtype=float)
+            for column in ['EarnedPremium', 'TotalExposure', 'PolicyCount']
+        }
+        measures.update({
+            column: claims_agg[column].to_numpy(dtype=float)
+            for column in ['IncurredLoss', 'PaidLoss', 'ClaimCount']
+        })
+
+        keys = exposure_agg.index.to_frame(index=False)
+
+        if include_credibility:
+            if period_exposure_df is None:
+                period_exposure_df = exposure_df
+            credibility = BuhlmannStraubCredibility(claims_df, period_exposure_df).calculate(dimensions)
+            aligned = keys.merge(credibility, on=dimensions, how='left')
+            measures['CredibilityFactor'] = aligned['CredibilityFactor'].to_numpy(dtype=float)
+            measures['CredibilityLossRatio'] = aligned['CredibilityLossRatio'].to_numpy(dtype=float)
+
+        return cls(dimensions, keys, measures)
+
+    def _calculate_metrics(self) -> Dict[str, np.ndarray]:
+        """Calculate KPI arrays for all cells at once."""
+        m = self.measures
+
+        def ratio(numerator, denominator, scale=1.0):
+            return np.divide(
+                numerator * scale,
+                denominator,
+                out=np.zeros_like(numerator, dtype=float),
+                where=denominator > 0
+            )
+
+        metrics = dict(m)
+        metrics['LossRatio'] = ratio(m['IncurredLoss'], m['EarnedPremium'], 100).round(2)
+        metrics['PaidLossRatio'] = ratio(m['PaidLoss'], m['EarnedPremium'], 100).round(2)
+        metrics['Frequency'] = ratio(m['ClaimCount'], m['TotalExposure'], 100).round(4)
+        metrics['Severity'] = ratio(m['IncurredLoss'], m['ClaimCount']).round(2)
+        metrics['PurePremium'] = ratio(m['IncurredLoss'], m['TotalExposure']).round(2)
+        metrics['AvgPremium'] = ratio(m['EarnedPremium'], m['PolicyCount']).round(2)
+
+        return metrics
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def to_frame(self, rows: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Convert (a subset of) the cube to a DataFrame.
+
+        Args:
+            rows: Cell positions to include, in order (default: all)
+
+        Returns:
+            DataFrame with dimension keys and KPI columns
+        """
+        if rows is None:
+            rows = np.arange(len(self))
+
+        frame = self.keys.iloc[rows].reset_index(drop=True)
+        for metric in KPI_METRICS:
+            if metric in self.metrics:
+                frame[metric] = self.metrics[metric][rows]
+
+        for column in ['PolicyCount', 'ClaimCount']:
+            frame[column] = frame[column].astype(int)
+
+        return frame
+
+    def top(
+        self,
+        metric: str = 'LossRatio',
+        top_n: int = 10,
+        ascending: bool = False,
+        min_credibility: Optional[float] = None,
+        min_claims: int = 0,
+        min_premium: float = 0
+    ) -> pd.DataFrame:
+        """
+        Rank cells by a KPI using a partial sort.
+
+        Args:
+            metric: KPI to rank by
+            top_n: Number of cells to return
+            ascending: Return the smallest values instead of the largest
+            min_credibility: Minimum CredibilityFactor for a cell to qualify
+            min_claims: Minimum claim count for a cell to qualify
+            min_premium: Minimum earned premium for a cell to qualify
+
+        Returns:
+            DataFrame of the top cells, ordered by the metric
+        """
+        if metric not in self.metrics:
+            raise ValueError(f"Metric {metric} not found in KPIs")
+        if top_n < 1:
+            raise ValueError("top_n must be at least 1")
+
+        eligible = (
+            (self.metrics['ClaimCount'] >= min_claims) &
+            (self.metrics['EarnedPremium'] >= min_premium)
+        )
+        if min_credibility is not None:
+            if 'CredibilityFactor' not in self.metrics:
+                raise ValueError("Cube was built without credibility")
+            eligible &= self.metrics['CredibilityFactor'] >= min_credibility
+
+        candidates = np.flatnonzero(eligible)
+        values = self.metrics[metric][candidates]
+
+        # Rank on a sign-adjusted key so "largest first" is an ascending partition
+        rank_key = values if ascending else -values
+        rank_key = np.where(np.isnan(rank_key), np.inf, rank_key)
+
+        if top_n < len(candidates):
+            part = np.argpartition(rank_key, top_n - 1)[:top_n]
+        else:
+            part = np.arange(len(candidates))
+
+        ordered = part[np.argsort(rank_key[part], kind='stable')]
+
+        return self.to_frame(candidates[ordered])
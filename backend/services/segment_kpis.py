@@ -7,7 +7,83 @@ Author: Actuarial Insights Workbench Team
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Union
+
+from services.credibility import BuhlmannStraubCredibility
+from services.bootstrap import SegmentBootstrap
+from services.segment_cube import SegmentCube
+from services.earned_premium import EarnedPremiumEngine
+from services.sql_engine import SQLSegmentEngine
+from services.portfolio_model import POLICY_KEY, PolicyDimension
+
+SEGMENT_DIMENSIONS = ['Geography', 'Industry', 'PolicySize', 'RiskRating']
+
+# Maximum number of segment cubes kept per calculator (least recently used evicted)
+CUBE_CACHE_SIZE = 32
+
+
+def period_ordinal(values) -> np.ndarray:
+    """
+    Convert periods or dates to month ordinals (year * 12 + month - 1).
+
+    Args:
+        values: 'YYYY-MM' periods or dates (Series, array or scalar)
+
+    Returns:
+        Integer month ordinals (array, or int for a scalar input)
+    """
+    if np.isscalar(values):
+        date = pd.Timestamp(values)
+        return date.year * 12 + date.month - 1
+
+    dates = pd.to_datetime(pd.Series(values))
+    return (dates.dt.year * 12 + dates.dt.month - 1).to_numpy(dtype=np.int64)
+
+
+def portfolio_kpis(
+    earned_premium: float,
+    exposure: float,
+    incurred: float,
+    paid: float,
+    claim_count: int,
+    policy_count: int
+) -> Dict:
+    """
+    Portfolio-level KPIs from summed measures.
+
+    Args:
+        earned_premium: Total earned premium
+        exposure: Total exposure units
+        incurred: Total incurred loss
+        paid: Total paid loss
+        claim_count: Number of claims
+        policy_count: Number of distinct policies
+
+    Returns:
+        Dictionary containing overall portfolio metrics
+    """
+    loss_ratio = (incurred / earned_premium * 100) if earned_premium > 0 else 0
+    paid_loss_ratio = (paid / earned_premium * 100) if earned_premium > 0 else 0
+    frequency = (claim_count / exposure * 100) if exposure > 0 else 0
+    severity = (incurred / claim_count) if claim_count > 0 else 0
+    pure_premium = (incurred / exposure) if exposure > 0 else 0
+
+    return {
+        'total_earned_premium': round(earned_premium, 2),
+        'total_incurred_loss': round(incurred, 2),
+        'total_paid_loss': round(paid, 2),
+        'total_exposure': round(exposure, 2),
+        'policy_count': int(policy_count),
+        'claim_count': int(claim_count),
+        'loss_ratio': round(loss_ratio, 2),
+        'paid_loss_ratio': round(paid_loss_ratio, 2),
+        'frequency': round(frequency, 4),
+        'severity': round(severity, 2),
+        'pure_premium': round(pure_premium, 2),
+        'avg_premium_per_policy': round(earned_premium / policy_count, 2) if policy_count > 0 else 0
+    }
 
 
 class SegmentKPICalculator:
@@ -18,31 +94,234 @@ class SegmentKPICalculator:
     Calculates Loss Ratio, Frequency, Severity, and other key metrics.
     """
 
-    def __init__(self, policies_df: pd.DataFrame, claims_df: pd.DataFrame, exposure_df: pd.DataFrame):
+    def __init__(
+        self,
+        policies_df: pd.DataFrame,
+        claims_df: pd.DataFrame,
+        exposure_df: Optional[pd.DataFrame] = None,
+        earned_premium_engine: Optional[EarnedPremiumEngine] = None,
+        query_engine: Optional[str] = None
+    ):
         """
         Initialize the segment KPI calculator.
 
         Args:
             policies_df: DataFrame containing policy data
             claims_df: DataFrame containing claims data
-            exposure_df: DataFrame containing exposure/premium data
+            exposure_df: DataFrame containing exposure/premium data. If None,
+                earned premium and exposure are computed from policy terms
+            earned_premium_engine: Engine to use when exposure_df is None
+                (default: EarnedPremiumEngine over policies_df)
+            query_engine: Run segment and portfolio aggregates as SQL in an
+                embedded engine ('duckdb' or 'sqlite'); None uses pandas.
+                Requires exposure_df
         """
-        self.policies_df = policies_df.copy()
-        self.claims_df = claims_df.copy()
-        self.exposure_df = exposure_df.copy()
+        if query_engine is not None and exposure_df is None:
+            raise ValueError("The SQL query engine requires an exposure table")
+
+        # Shallow copies: frames backed by a memory-mapped column store keep
+        # sharing their arrays, and derived columns never touch the caller's frames
+        self.policies_df = policies_df.copy(deep=False)
+
+        # Normalized schema: segment attributes are held once per policy in the
+        # dimension; claims and exposure keep only the policy key and measures
+        self.dimension = PolicyDimension.from_frames(policies_df, claims_df, exposure_df)
+        self.claims_df = self.dimension.to_fact(claims_df)
+        self.exposure_df = self.dimension.to_fact(exposure_df) if exposure_df is not None else None
+        self.earned_premium_engine = None
+        if exposure_df is None:
+            self.earned_premium_engine = earned_premium_engine or EarnedPremiumEngine(self.policies_df)
+        self._cube_cache: "OrderedDict[tuple, SegmentCube]" = OrderedDict()
+        self._cube_lock = threading.Lock()
         self._prepare_data()
 
+        self.query_engine = query_engine
+        self.sql_engine = None
+        self._connect_sql_engine()
+
+    def _connect_sql_engine(self):
+        """Load the selected tables into the embedded SQL engine, if one is configured."""
+        if self.query_engine is not None:
+            exposure, claims = self._select()
+            self.sql_engine = SQLSegmentEngine(claims, exposure, self.query_engine)
+
+    def __getstate__(self):
+        """Pickle without the SQL engine connection or cube lock (rebuilt on unpickling)."""
+        state = self.__dict__.copy()
+        state['sql_engine'] = None
+        del state['_cube_lock']
+        return state
+
+    def __setstate__(self, state):
+        """Restore a pickled calculator: new cube lock, cube cache as an LRU, SQL engine reconnected."""
+        self.__dict__.update(state)
+        self._cube_cache = OrderedDict(state.get('_cube_cache', {}))
+        self._cube_lock = threading.Lock()
+        self._connect_sql_engine()
+
     def _prepare_data(self):
         """Prepare data for KPI calculations."""
         # Convert date columns
         if 'LossDate' in self.claims_df.columns:
-            self.claims_df['LossDate'] = pd.to_datetime(self.claims_df['LossDate'])
+            if not pd.api.types.is_datetime64_any_dtype(self.claims_df['LossDate']):
+                self.claims_df['LossDate'] = pd.to_datetime(self.claims_df['LossDate'])
             self.claims_df['LossYear'] = self.claims_df['LossDate'].dt.year
+            self.claims_df = self._sort_by_period(self.claims_df, 'LossDate')
+
+        # Sort exposure by period so date windows become contiguous slices
+        if self.exposure_df is not None and 'Period' in self.exposure_df.columns:
+            self.exposure_df = self._sort_by_period(self.exposure_df, 'Period')
+
+    @staticmethod
+    def _sort_by_period(df: pd.DataFrame, source: str) -> pd.DataFrame:
+        """
+        Add PeriodOrdinal (if missing) and sort rows by it.
+
+        Args:
+            df: DataFrame to prepare
+            source: Date or period column the ordinal is derived from
+
+        Returns:
+            DataFrame sorted by PeriodOrdinal; already-sorted input (such as
+            a compiled snapshot) is returned without reordering
+        """
+        if 'PeriodOrdinal' not in df.columns:
+            df['PeriodOrdinal'] = period_ordinal(df[source])
+
+        ordinals = df['PeriodOrdinal'].to_numpy()
+        if len(ordinals) > 1 and (np.diff(ordinals) < 0).any():
+            df = df.sort_values('PeriodOrdinal', kind='stable').reset_index(drop=True)
+
+        return df
+
+    @staticmethod
+    def _slice_by_period(df: pd.DataFrame, start: int, end: int) -> pd.DataFrame:
+        """
+        Slice a period-sorted DataFrame to an inclusive ordinal window.
+
+        Args:
+            df: DataFrame sorted by PeriodOrdinal
+            start: First month ordinal to keep
+            end: Last month ordinal to keep
+
+        Returns:
+            Row slice of df (no rows are scanned outside the window)
+        """
+        if 'PeriodOrdinal' not in df.columns:
+            return df
+
+        ordinals = df['PeriodOrdinal'].to_numpy()
+        lo = np.searchsorted(ordinals, start, side='left')
+        hi = np.searchsorted(ordinals, end, side='right')
+
+        return df.iloc[lo:hi]
+
+    @staticmethod
+    def _period_bounds(start_period: Optional[str], end_period: Optional[str]):
+        """
+        Convert a period window to month ordinals.
+
+        Args:
+            start_period: First period ('YYYY-MM'), inclusive, or None
+            end_period: Last period ('YYYY-MM'), inclusive, or None
+
+        Returns:
+            Tuple of (start, end) ordinals; open bounds are None
+        """
+        start = period_ordinal(start_period) if start_period is not None else None
+        end = period_ordinal(end_period) if end_period is not None else None
+        if start is not None and end is not None and start > end:
+            raise ValueError(f"start_period {start_period} is after end_period {end_period}")
+        return start, end
+
+    def _select(
+        self,
+        start_period: Optional[str] = None,
+        end_period: Optional[str] = None,
+        segment_filters: Optional[Dict[str, List]] = None
+    ):
+        """
+        Apply period window and segment filters before aggregation.
+
+        Args:
+            start_period: First period to include ('YYYY-MM'), inclusive
+            end_period: Last period to include ('YYYY-MM'), inclusive
+            segment_filters: Mapping of segment dimension to allowed values
+
+        Returns:
+            Tuple of (exposure_df, claims_df) restricted to the selection,
+            with PolicyID and the segment attributes gathered from the policy
+            dimension. Without an exposure table, exposure_df has one row per
+            policy with the premium and exposure earned in the window.
+        """
+        for column in (segment_filters or {}):
+            if column not in SEGMENT_DIMENSIONS:
+                raise ValueError(f"Invalid segment filter: {column}")
+
+        exposure = self.exposure_df
+        claims = self.claims_df
+
+        start, end = self._period_bounds(start_period, end_period)
+        if start is not None or end is not None:
+            start = start if start is not None else np.iinfo(np.int64).min
+            end = end if end is not None else np.iinfo(np.int64).max
+
+            if exposure is not None:
+                exposure = self._slice_by_period(exposure, start, end)
+            claims = self._slice_by_period(claims, start, end)
+
+        # Filters are evaluated once per policy, then gathered to fact rows by key
+        selected = self.dimension.select(segment_filters)
+        if selected is not None:
+            if exposure is not None:
+                exposure = exposure[selected[exposure[POLICY_KEY].to_numpy()]]
+            claims = claims[selected[claims[POLICY_KEY].to_numpy()]]
+
+        claims = self.dimension.view(claims)
+        if exposure is None:
+            exposure = self.earned_premium_engine.earned(start_period, end_period, segment_filters)
+        else:
+            exposure = self.dimension.view(exposure)
+
+        return exposure, claims
+
+    def _period_exposure(
+        self,
+        exposure_df: pd.DataFrame,
+        group_cols: List[str],
+        start_period: Optional[str] = None,
+        end_period: Optional[str] = None,
+        segment_filters: Optional[Dict[str, List]] = None
+    ) -> pd.DataFrame:
+        """
+        Get monthly exposure (with a Period column) for a selection.
+
+        Args:
+            exposure_df: Exposure already returned by _select
+            group_cols: Segment columns needed downstream
+            start_period: First period to include ('YYYY-MM'), inclusive
+            end_period: Last period to include ('YYYY-MM'), inclusive
+            segment_filters: Mapping of segment dimension to allowed values
+
+        Returns:
+            exposure_df itself when backed by an exposure table, otherwise
+            earned premium by group and month from the earned premium engine
+        """
+        if self.earned_premium_engine is None:
+            return exposure_df
+
+        return self.earned_premium_engine.earned_by_period(
+            group_cols, start_period, end_period, segment_filters
+        )
 
     def calculate_kpis_by_segment(
         self,
         segment_by: str,
-        min_premium: float = 0
+        min_premium: float = 0,
+        include_credibility: bool = False,
+        start_period: Optional[str] = None,
+        end_period: Optional[str] = None,
+        segment_filters: Optional[Dict[str, List]] = None
     ) -> pd.DataFrame:
         """
         Calculate comprehensive KPIs for each segment.
@@ -50,37 +329,50 @@ class SegmentKPICalculator:
         Args:
             segment_by: Dimension to segment by ('Geography', 'Industry', 'PolicySize', 'RiskRating')
             min_premium: Minimum earned premium to include segment
+            include_credibility: Add Buhlmann-Straub CredibilityFactor and
+                CredibilityLossRatio columns
+            start_period: First period to include ('YYYY-MM'), inclusive
+            end_period: Last period to include ('YYYY-MM'), inclusive
+            segment_filters: Mapping of segment dimension to allowed values
 
         Returns:
             DataFrame with KPIs by segment
         """
-        if segment_by not in ['Geography', 'Industry', 'PolicySize', 'RiskRating']:
+        if segment_by not in SEGMENT_DIMENSIONS:
             raise ValueError(f"Invalid segment_by value: {segment_by}")
 
-        # Aggregate exposure and premium by segment
-        exposure_agg = self.exposure_df.groupby(segment_by).agg({
-            'EarnedPremium': 'sum',
-            'ExposureUnits': 'sum',
-            'PolicyID': 'nunique'
-        }).reset_index()
+        if self.sql_engine is not None:
+            # Aggregate exposure, premium and claims by segment in SQL
+            kpis = self.sql_engine.segment_totals(
+                [segment_by], *self._period_bounds(start_period, end_period), segment_filters
+            )
+        else:
+            exposure_df, claims_df = self._select(start_period, end_period, segment_filters)
 
-        exposure_agg.columns = [segment_by, 'EarnedPremium', 'TotalExposure', 'PolicyCount']
+            # Aggregate exposure and premium by segment
+            exposure_agg = exposure_df.groupby(segment_by, observed=True).agg({
+                'EarnedPremium': 'sum',
+                'ExposureUnits': 'sum',
+                'PolicyID': 'nunique'
+            }).reset_index()
 
-        # Aggregate claims by segment
-        claims_agg = self.claims_df.groupby(segment_by).agg({
-            'IncurredAmount': 'sum',
-            'PaidAmount': 'sum',
-            'ClaimID': 'count'
-        }).reset_index()
+            exposure_agg.columns = [segment_by, 'EarnedPremium', 'TotalExposure', 'PolicyCount']
 
-        claims_agg.columns = [segment_by, 'IncurredLoss', 'PaidLoss', 'ClaimCount']
+            # Aggregate claims by segment
+            claims_agg = claims_df.groupby(segment_by, observed=True).agg({
+                'IncurredAmount': 'sum',
+                'PaidAmount': 'sum',
+                'ClaimID': 'count'
+            }).reset_index()
 
-        # Merge exposure and claims
-        kpis = exposure_agg.merge(claims_agg, on=segment_by, how='left')
+            claims_agg.columns = [segment_by, 'IncurredLoss', 'PaidLoss', 'ClaimCount']
 
-        # Fill NaN values (segments with no claims)
-        kpis[['IncurredLoss', 'PaidLoss', 'ClaimCount']] = \
-            kpis[['IncurredLoss', 'PaidLoss', 'ClaimCount']].fillna(0)
+            # Merge exposure and claims
+            kpis = exposure_agg.merge(claims_agg, on=segment_by, how='left')
+
+            # Fill NaN values (segments with no claims)
+            kpis[['IncurredLoss', 'PaidLoss', 'ClaimCount']] = \
+                kpis[['IncurredLoss', 'PaidLoss', 'ClaimCount']].fillna(0)
 
         # Calculate KPIs
         kpis['LossRatio'] = (kpis['IncurredLoss'] / kpis['EarnedPremium'] * 100).round(2)
@@ -98,6 +390,20 @@ class SegmentKPICalculator:
         # Average Premium per Policy
         kpis['AvgPremium'] = (kpis['EarnedPremium'] / kpis['PolicyCount']).round(2)
 
+        if include_credibility:
+            if self.sql_engine is not None:
+                exposure_df, claims_df = self._select(start_period, end_period, segment_filters)
+            period_exposure = self._period_exposure(
+                exposure_df, [segment_by], start_period, end_period, segment_filters
+            )
+            credibility = BuhlmannStraubCredibility(claims_df, period_exposure).calculate(segment_by)
+            kpis = kpis.merge(
+                credibility[[segment_by, 'CredibilityFactor', 'CredibilityLossRatio']],
+                on=segment_by,
+                how='left'
+            )
+            kpis.attrs['credibility'] = credibility.attrs['structural_parameters']
+
         # Filter by minimum premium
         kpis = kpis[kpis['EarnedPremium'] >= min_premium]
 
@@ -106,46 +412,120 @@ class SegmentKPICalculator:
 
         return kpis
 
-    def calculate_overall_kpis(self) -> Dict:
+    def calculate_credibility(
+        self,
+        segment_by: str,
+        start_period: Optional[str] = None,
+        end_period: Optional[str] = None,
+        segment_filters: Optional[Dict[str, List]] = None
+    ) -> pd.DataFrame:
+        """
+        Calculate Buhlmann-Straub credibility-weighted loss ratios by segment.
+
+        Args:
+            segment_by: Dimension to segment by
+            start_period: First period to include ('YYYY-MM'), inclusive
+            end_period: Last period to include ('YYYY-MM'), inclusive
+            segment_filters: Mapping of segment dimension to allowed values
+
+        Returns:
+            DataFrame with credibility columns; structural parameters are
+            available in the DataFrame's attrs
+        """
+        exposure_df, claims_df = self._select(start_period, end_period, segment_filters)
+        period_exposure = self._period_exposure(
+            exposure_df, [segment_by], start_period, end_period, segment_filters
+        )
+        return BuhlmannStraubCredibility(claims_df, period_exposure).calculate(segment_by)
+
+    def calculate_bootstrap_intervals(
+        self,
+        segment_by: str,
+        n_replicates: int = 2000,
+        seed: Optional[int] = None,
+        confidence: float = 0.95,
+        start_period: Optional[str] = None,
+        end_period: Optional[str] = None,
+        segment_filters: Optional[Dict[str, List]] = None
+    ) -> pd.DataFrame:
+        """
+        Calculate bootstrap confidence intervals for segment KPIs.
+
+        Args:
+            segment_by: Dimension to segment by
+            n_replicates: Number of bootstrap replicates
+            seed: Random seed for reproducible intervals
+            confidence: Two-sided confidence level
+            start_period: First period to include ('YYYY-MM'), inclusive
+            end_period: Last period to include ('YYYY-MM'), inclusive
+            segment_filters: Mapping of segment dimension to allowed values
+
+        Returns:
+            DataFrame with lower/upper bounds for LossRatio, Frequency and Severity
+        """
+        exposure_df, claims_df = self._select(start_period, end_period, segment_filters)
+        return SegmentBootstrap(claims_df, exposure_df).calculate(
+            segment_by,
+            n_replicates=n_replicates,
+            seed=seed,
+            confidence=confidence
+        )
+
+    def calculate_overall_kpis(
+        self,
+        start_period: Optional[str] = None,
+        end_period: Optional[str] = None,
+        segment_filters: Optional[Dict[str, List]] = None
+    ) -> Dict:
         """
         Calculate portfolio-level KPIs (all segments combined).
 
+        Args:
+            start_period: First period to include ('YYYY-MM'), inclusive
+            end_period: Last period to include ('YYYY-MM'), inclusive
+            segment_filters: Mapping of segment dimension to allowed values
+
         Returns:
             Dictionary containing overall portfolio metrics
         """
-        total_earned_premium = self.exposure_df['EarnedPremium'].sum()
-        total_exposure = self.exposure_df['ExposureUnits'].sum()
-        total_policies = self.policies_df['PolicyID'].nunique()
-
-        total_incurred = self.claims_df['IncurredAmount'].sum()
-        total_paid = self.claims_df['PaidAmount'].sum()
-        total_claims = len(self.claims_df)
-
-        loss_ratio = (total_incurred / total_earned_premium * 100) if total_earned_premium > 0 else 0
-        paid_loss_ratio = (total_paid / total_earned_premium * 100) if total_earned_premium > 0 else 0
-        frequency = (total_claims / total_exposure * 100) if total_exposure > 0 else 0
-        severity = (total_incurred / total_claims) if total_claims > 0 else 0
-        pure_premium = (total_incurred / total_exposure) if total_exposure > 0 else 0
-
-        return {
-            'total_earned_premium': round(total_earned_premium, 2),
-            'total_incurred_loss': round(total_incurred, 2),
-            'total_paid_loss': round(total_paid, 2),
-            'total_exposure': round(total_exposure, 2),
-            'policy_count': int(total_policies),
-            'claim_count': int(total_claims),
-            'loss_ratio': round(loss_ratio, 2),
-            'paid_loss_ratio': round(paid_loss_ratio, 2),
-            'frequency': round(frequency, 4),
-            'severity': round(severity, 2),
-            'pure_premium': round(pure_premium, 2),
-            'avg_premium_per_policy': round(total_earned_premium / total_policies, 2) if total_policies > 0 else 0
-        }
+        filtered = start_period is not None or end_period is not None or bool(segment_filters)
+
+        if self.sql_engine is not None:
+            totals = self.sql_engine.overall_totals(
+                *self._period_bounds(start_period, end_period), segment_filters
+            )
+            total_earned_premium = totals['earned_premium']
+            total_exposure = totals['exposure']
+            total_incurred = totals['incurred']
+            total_paid = totals['paid']
+            total_claims = totals['claim_count']
+            segment_policies = totals['policy_count']
+        else:
+            exposure_df, claims_df = self._select(start_period, end_period, segment_filters)
+            total_earned_premium = exposure_df['EarnedPremium'].sum()
+            total_exposure = exposure_df['ExposureUnits'].sum()
+            total_incurred = claims_df['IncurredAmount'].sum()
+            total_paid = claims_df['PaidAmount'].sum()
+            total_claims = len(claims_df)
+            segment_policies = exposure_df['PolicyID'].nunique() if filtered else None
+
+        if filtered:
+            total_policies = segment_policies
+        else:
+            total_policies = self.policies_df['PolicyID'].nunique()
+
+        return portfolio_kpis(
+            total_earned_premium, total_exposure, total_incurred,
+            total_paid, total_claims, total_policies
+        )
 
     def calculate_trend_analysis(
         self,
         segment_by: str,
-        time_period: str = 'year'
+        time_period: str = 'year',
+        start_period: Optional[str] = None,
+        end_period: Optional[str] = None,
+        segment_filters: Optional[Dict[str, List]] = None
     ) -> pd.DataFrame:
         """
         Calculate KPI trends over time by segment.
@@ -153,12 +533,20 @@ class SegmentKPICalculator:
         Args:
             segment_by: Dimension to segment by
             time_period: 'year' or 'quarter'
+            start_period: First period to include ('YYYY-MM'), inclusive
+            end_period: Last period to include ('YYYY-MM'), inclusive
+            segment_filters: Mapping of segment dimension to allowed values
 
         Returns:
             DataFrame with KPIs by segment and time period
         """
+        exposure_df, claims_df = self._select(start_period, end_period, segment_filters)
+        exposure_df = self._period_exposure(
+            exposure_df, [segment_by], start_period, end_period, segment_filters
+        )
+
         # Add time period to exposure data
-        exposure_with_time = self.exposure_df.copy()
+        exposure_with_time = exposure_df.copy()
         exposure_with_time['Period'] = pd.to_datetime(exposure_with_time['Period'])
 
         if time_period == 'year':
@@ -167,13 +555,13 @@ class SegmentKPICalculator:
             exposure_with_time['TimePeriod'] = exposure_with_time['Period'].dt.to_period('Q').astype(str)
 
         # Aggregate by segment and time
-        trend_exposure = exposure_with_time.groupby([segment_by, 'TimePeriod']).agg({
+        trend_exposure = exposure_with_time.groupby([segment_by, 'TimePeriod'], observed=True).agg({
             'EarnedPremium': 'sum',
             'ExposureUnits': 'sum'
         }).reset_index()
 
         # Add time period to claims
-        claims_with_time = self.claims_df.copy()
+        claims_with_time = claims_df.copy()
         if time_period == 'year':
             claims_with_time['TimePeriod'] = claims_with_time['LossYear']
         else:
@@ -182,7 +570,7 @@ class SegmentKPICalculator:
             ).dt.to_period('Q').astype(str)
 
         # Aggregate claims by segment and time
-        trend_claims = claims_with_time.groupby([segment_by, 'TimePeriod']).agg({
+        trend_claims = claims_with_time.groupby([segment_by, 'TimePeriod'], observed=True).agg({
             'IncurredAmount': 'sum',
             'ClaimID': 'count'
         }).reset_index()
@@ -206,29 +594,97 @@ class SegmentKPICalculator:
 
         return trend_df
 
+    def get_segment_cube(
+        self,
+        dimensions: Union[str, List[str]],
+        start_period: Optional[str] = None,
+        end_period: Optional[str] = None,
+        segment_filters: Optional[Dict[str, List]] = None
+    ) -> SegmentCube:
+        """
+        Get cached segment aggregates for one or more dimensions.
+
+        Args:
+            dimensions: Segment dimension, or list of dimensions for a crosstab
+            start_period: First period to include ('YYYY-MM'), inclusive
+            end_period: Last period to include ('YYYY-MM'), inclusive
+            segment_filters: Mapping of segment dimension to allowed values
+
+        Returns:
+            SegmentCube for the requested dimensions and selection
+        """
+        dimensions = [dimensions] if isinstance(dimensions, str) else list(dimensions)
+
+        if not dimensions or len(set(dimensions)) != len(dimensions):
+            raise ValueError(f"Invalid dimensions: {dimensions}")
+        for dimension in dimensions:
+            if dimension not in SEGMENT_DIMENSIONS:
+                raise ValueError(f"Invalid segment_by value: {dimension}")
+
+        key = (
+            tuple(dimensions),
+            start_period,
+            end_period,
+            tuple(sorted((column, tuple(values)) for column, values in (segment_filters or {}).items()))
+        )
+
+        # Called from worker pool threads: the cache is only touched under the
+        # lock, while cubes are built outside it so misses do not serialize
+        with self._cube_lock:
+            cube = self._cube_cache.get(key)
+            if cube is not None:
+                self._cube_cache.move_to_end(key)
+                return cube
+
+        exposure_df, claims_df = self._select(start_period, end_period, segment_filters)
+        period_exposure = self._period_exposure(
+            exposure_df, dimensions, start_period, end_period, segment_filters
+        )
+        cube = SegmentCube.build(exposure_df, claims_df, dimensions, period_exposure_df=period_exposure)
+
+        with self._cube_lock:
+            # A concurrent miss may have stored the same cube meanwhile; keep the first
+            cube = self._cube_cache.setdefault(key, cube)
+            self._cube_cache.move_to_end(key)
+            while len(self._cube_cache) > CUBE_CACHE_SIZE:
+                self._cube_cache.popitem(last=False)
+
+        return cube
+
     def get_top_segments(
         self,
-        segment_by: str,
+        segment_by: Union[str, List[str]],
         metric: str = 'EarnedPremium',
-        top_n: int = 10
+        top_n: int = 10,
+        ascending: bool = False,
+        min_credibility: Optional[float] = None,
+        min_claims: int = 0,
+        **selection
     ) -> pd.DataFrame:
         """
         Get top N segments by specified metric.
 
         Args:
-            segment_by: Dimension to segment by
+            segment_by: Dimension, or list of dimensions for a crosstab
             metric: Metric to rank by ('EarnedPremium', 'LossRatio', 'ClaimCount', etc.)
             top_n: Number of top segments to return
+            ascending: Rank smallest values first
+            min_credibility: Minimum CredibilityFactor for a segment to qualify
+            min_claims: Minimum claim count for a segment to qualify
+            **selection: start_period, end_period and segment_filters
 
         Returns:
             DataFrame with top segments
         """
-        kpis = self.calculate_kpis_by_segment(segment_by)
-
-        if metric not in kpis.columns:
-            raise ValueError(f"Metric {metric} not found in KPIs")
-
-        return kpis.nlargest(top_n, metric)
+        cube = self.get_segment_cube(segment_by, **selection)
+
+        return cube.top(
+            metric,
+            top_n,
+            ascending=ascending,
+            min_credibility=min_credibility,
+            min_claims=min_claims
+        )
 
     def get_segment_comparison(self, segments: List[str]) -> Dict:
         """
@@ -243,7 +699,7 @@ class SegmentKPICalculator:
         comparison = {}
 
         for segment in segments:
-            if segment in ['Geography', 'Industry', 'PolicySize', 'RiskRating']:
+            if segment in SEGMENT_DIMENSIONS:
                 comparison[segment] = self.calculate_kpis_by_segment(segment).to_dict('records')
 
         comparison['overall'] = self.calculate_overall_kpis()
@@ -0,0 +1,202 @@
+"""
+Snapshot Cache Service
+Persists prepared data snapshots on disk, keyed by a content hash of the inputs.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import glob
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+# Bump when the pickled snapshot layout changes so old entries are ignored
+CACHE_FORMAT = 2
+
+# Service modules whose classes are pickled into snapshots; their sources are
+# part of every cache key (see code_version)
+SERVICES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Number of cache entries kept (newest first)
+CACHE_KEEP = 2
+
+CACHE_SUFFIX = '.pkl'
+
+# Read size for streaming file hashes
+HASH_BLOCK_SIZE = 1 << 20
+
+# File hashes memoized by path, keyed on (size, mtime_ns)
+_file_hashes: Dict[str, Tuple[int, int, str]] = {}
+_file_hashes_lock = threading.Lock()
+
+
+def file_hash(path: str) -> str:
+    """
+    Streaming SHA-256 of a file's contents.
+
+    The digest is remembered together with the file's size and mtime, so
+    asking again for an unchanged file costs only a stat.
+
+    Args:
+        path: File path
+
+    Returns:
+        Hex digest
+    """
+    stat = os.stat(path)
+    with _file_hashes_lock:
+        cached = _file_hashes.get(path)
+    if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+        return cached[2]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+
+    with _file_hashes_lock:
+        _file_hashes[path] = (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def content_hash(paths: Iterable[str], root: Optional[str] = None) -> str:
+    """
+    Fingerprint the contents of a set of files.
+
+    Each existing file contributes its path, size and content hash. Files
+    are only re-read when their size or mtime changed, and a file rewritten
+    with identical contents keeps the fingerprint.
+
+    Args:
+        paths: Files to fingerprint (missing files are skipped)
+        root: Directory paths are recorded relative to, so moving the data
+            directory keeps the fingerprint
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        if not os.path.isfile(path):
+            continue
+        name = os.path.relpath(path, root) if root else path
+        digest.update(f"{name}:{os.path.getsize(path)}:{file_hash(path)}\n".encode())
+
+    return digest.hexdigest()
+
+
+def code_version() -> str:
+    """
+    Fingerprint of the service sources.
+
+    Snapshots pickle calculator objects, so an entry written by other code
+    (an earlier deploy) may not match the current classes. Keying entries
+    on the sources makes any code change a cache miss.
+
+    Returns:
+        Hex digest
+    """
+    return content_hash(glob.glob(os.path.join(SERVICES_DIR, '*.py')), root=SERVICES_DIR)
+
+
+class SnapshotCache:
+    """
+    Directory of pickled snapshots, one file per cache key.
+
+    The key identifies the input contents, load options and service code,
+    so an entry is only ever read back for exactly the data and code it
+    was built from. Writes go to
+    a temporary file that is renamed into place, and unreadable entries are
+    treated as misses, so a crash mid-write never poisons a restart.
+    """
+
+    def __init__(self, cache_dir: str, keep: int = CACHE_KEEP):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the cache files (created on save)
+            keep: Number of most recent entries to keep
+        """
+        self.cache_dir = cache_dir
+        self.keep = keep
+
+    def key(self, *parts) -> str:
+        """
+        Build a cache key.
+
+        Args:
+            *parts: Data fingerprint and load options
+
+        Returns:
+            Short hex key
+        """
+        text = '|'.join(str(part) for part in (CACHE_FORMAT, code_version()) + parts)
+        return hashlib.sha256(text.encode()).hexdigest()[:24]
+
+    def path(self, key: str) -> str:
+        """File path of a cache entry."""
+        return os.path.join(self.cache_dir, f"snapshot-{key}{CACHE_SUFFIX}")
+
+    def load(self, key: str):
+        """
+        Read a cache entry.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached object, or None on a miss or an unreadable entry
+        """
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"⚠️  Ignoring unreadable snapshot cache {path}: {e}")
+            os.remove(path)
+            return None
+
+    def save(self, key: str, value) -> str:
+        """
+        Write a cache entry atomically and prune old entries.
+
+        Args:
+            key: Cache key
+            value: Picklable object
+
+        Returns:
+            Path of the written entry
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path(key)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self.prune()
+        return path
+
+    def prune(self):
+        """Remove all but the newest entries."""
+        entries = [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir)
+            if name.endswith(CACHE_SUFFIX)
+        ]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for path in entries[self.keep:]:
+            os.remove(path)
@@ -0,0 +1,280 @@
+"""
+SQL Engine Service
+Embedded in-process SQL engine (DuckDB or SQLite) for segment aggregates.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import sqlite3
+import threading
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import duckdb
+except ImportError:  # pragma: no cover - DuckDB is optional
+    duckdb = None
+
+SQL_ENGINES = ['duckdb', 'sqlite']
+
+# Segment dimensions that may appear in GROUP BY / WHERE clauses
+SQL_DIMENSIONS = ['Geography', 'Industry', 'PolicySize', 'RiskRating']
+
+EXPOSURE_COLUMNS = ['PolicyID', 'PeriodOrdinal', 'EarnedPremium', 'ExposureUnits'] + SQL_DIMENSIONS
+CLAIMS_COLUMNS = ['PeriodOrdinal', 'IncurredAmount', 'PaidAmount'] + SQL_DIMENSIONS
+
+
+def default_engine() -> str:
+    """DuckDB when installed, otherwise SQLite (always available)."""
+    return 'duckdb' if duckdb is not None else 'sqlite'
+
+
+class SQLSegmentEngine:
+    """
+    Runs segment aggregations as SQL over in-process copies of the tables.
+
+    DuckDB executes the GROUP BY queries vectorized and in parallel across
+    cores. SQLite is the dependency-free fallback; it gets one covering index
+    per segment dimension (dimension, period, measures) so filtered
+    aggregates are answered from the index without touching the table.
+
+    Both tables need a PeriodOrdinal column (year * 12 + month - 1), as
+    prepared by SegmentKPICalculator.
+    """
+
+    def __init__(
+        self,
+        claims_df: pd.DataFrame,
+        exposure_df: pd.DataFrame,
+        engine: Optional[str] = None
+    ):
+        """
+        Initialize the SQL engine and load the tables.
+
+        Args:
+            claims_df: DataFrame containing claims data (with PeriodOrdinal)
+            exposure_df: DataFrame containing exposure data (with PeriodOrdinal)
+            engine: 'duckdb' or 'sqlite' (default: duckdb when installed)
+        """
+        self.engine = engine or default_engine()
+        if self.engine not in SQL_ENGINES:
+            raise ValueError(f"Invalid SQL engine: {self.engine}")
+        if self.engine == 'duckdb' and duckdb is None:
+            raise ValueError("duckdb is not installed")
+
+        self._lock = threading.Lock()
+        self.dimensions = [c for c in SQL_DIMENSIONS if c in exposure_df.columns]
+
+        exposure = self._table_frame(exposure_df, EXPOSURE_COLUMNS)
+        claims = self._table_frame(claims_df, CLAIMS_COLUMNS)
+        self._dimension_dtypes = {d: exposure[d].dtype for d in self.dimensions}
+
+        if self.engine == 'duckdb':
+            self._connection = duckdb.connect(':memory:')
+            for name, df in [('exposure', exposure), ('claims', claims)]:
+                self._connection.register(f'{name}_source', df)
+                # Period-ordered storage lets zone maps skip row groups outside a window
+                self._connection.execute(
+                    f"CREATE TABLE {name} AS SELECT * FROM {name}_source ORDER BY PeriodOrdinal"
+                )
+                self._connection.unregister(f'{name}_source')
+        else:
+            self._connection = sqlite3.connect(':memory:', check_same_thread=False)
+            exposure.to_sql('exposure', self._connection, index=False)
+            claims.to_sql('claims', self._connection, index=False)
+            self._create_sqlite_indexes()
+
+    @staticmethod
+    def _table_frame(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        """Select the engine's columns, decoding categoricals to plain values."""
+        frame = df[[c for c in columns if c in df.columns]]
+        categorical = [c for c in frame.columns if isinstance(frame[c].dtype, pd.CategoricalDtype)]
+        if categorical:
+            frame = frame.astype({c: frame[c].cat.categories.dtype for c in categorical})
+        return frame
+
+    def _create_sqlite_indexes(self):
+        """Create covering indexes on segment and period columns."""
+        cursor = self._connection.cursor()
+        cursor.execute(
+            "CREATE INDEX idx_exposure_period ON exposure "
+            "(PeriodOrdinal, EarnedPremium, ExposureUnits, PolicyID)"
+        )
+        cursor.execute(
+            "CREATE INDEX idx_claims_period ON claims (PeriodOrdinal, IncurredAmount, PaidAmount)"
+        )
+        for dimension in self.dimensions:
+            cursor.execute(
+                f"CREATE INDEX idx_exposure_{dimension} ON exposure "
+                f"({dimension}, PeriodOrdinal, EarnedPremium, ExposureUnits, PolicyID)"
+            )
+            cursor.execute(
+                f"CREATE INDEX idx_claims_{dimension} ON claims "
+                f"({dimension}, PeriodOrdinal, IncurredAmount, PaidAmount)"
+            )
+        cursor.execute("ANALYZE")
+        self._connection.commit()
+
+    def _validate_dimensions(self, columns) -> None:
+        """Reject anything that is not a known segment column (they are SQL identifiers)."""
+        for column in columns:
+            if column not in self.dimensions:
+                raise ValueError(f"Invalid segment dimension: {column}")
+
+    def _where(
+        self,
+        start: Optional[int],
+        end: Optional[int],
+        segment_filters: Optional[Dict[str, List]]
+    ) -> Tuple[str, List]:
+        """
+        Build a parameterized WHERE clause.
+
+        Args:
+            start: First month ordinal, inclusive
+            end: Last month ordinal, inclusive
+            segment_filters: Mapping of segment dimension to allowed values
+
+        Returns:
+            Tuple of (SQL clause, parameters)
+        """
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("PeriodOrdinal >= ?")
+            params.append(int(start))
+        if end is not None:
+            clauses.append("PeriodOrdinal <= ?")
+            params.append(int(end))
+
+        for column, values in (segment_filters or {}).items():
+            values = list(values)
+            if not values:
+                clauses.append("1 = 0")
+                continue
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(v.item() if isinstance(v, np.generic) else v for v in values)
+
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _query(self, sql: str, params: List) -> pd.DataFrame:
+        """Run a query and return the result as a DataFrame."""
+        if self.engine == 'duckdb':
+            # A cursor per query lets concurrent requests run in parallel
+            return self._connection.cursor().execute(sql, params).df()
+
+        with self._lock:
+            return pd.read_sql_query(sql, self._connection, params=params)
+
+    def segment_totals(
+        self,
+        dimensions: List[str],
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        segment_filters: Optional[Dict[str, List]] = None
+    ) -> pd.DataFrame:
+        """
+        Aggregate premium, exposure and losses by one or more dimensions.
+
+        Args:
+            dimensions: Segment dimensions to group by
+            start: First month ordinal, inclusive
+            end: Last month ordinal, inclusive
+            segment_filters: Mapping of segment dimension to allowed values
+
+        Returns:
+            DataFrame with the dimensions, EarnedPremium, TotalExposure,
+            PolicyCount, IncurredLoss, PaidLoss and ClaimCount, sorted by the
+            dimensions
+        """
+        self._validate_dimensions(list(dimensions) + list(segment_filters or {}))
+
+        keys = ', '.join(dimensions)
+        where, params = self._where(start, end, segment_filters)
+        join = ' AND '.join(f"e.{d} = c.{d}" for d in dimensions)
+
+        sql = f"""
+            WITH e AS (
+                SELECT {keys},
+                       SUM(EarnedPremium) AS EarnedPremium,
+                       SUM(ExposureUnits) AS TotalExposure,
+                       COUNT(DISTINCT PolicyID) AS PolicyCount
+                FROM exposure{where}
+                GROUP BY {keys}
+            ),
+            c AS (
+                SELECT {keys},
+                       SUM(IncurredAmount) AS IncurredLoss,
+                       SUM(PaidAmount) AS PaidLoss,
+                       COUNT(*) AS ClaimCount
+                FROM claims{where}
+                GROUP BY {keys}
+            )
+            SELECT {', '.join(f'e.{d} AS {d}' for d in dimensions)},
+                   e.EarnedPremium, e.TotalExposure, e.PolicyCount,
+                   COALESCE(c.IncurredLoss, 0) AS IncurredLoss,
+                   COALESCE(c.PaidLoss, 0) AS PaidLoss,
+                   COALESCE(c.ClaimCount, 0) AS ClaimCount
+            FROM e LEFT JOIN c ON {join}
+            ORDER BY {', '.join(f'e.{d}' for d in dimensions)}
+        """
+
+        result = self._query(sql, params + params)
+        result = result.astype({d: self._dimension_dtypes[d] for d in dimensions})
+        for column in ['EarnedPremium', 'TotalExposure', 'IncurredLoss', 'PaidLoss']:
+            result[column] = result[column].astype(float)
+        for column in ['PolicyCount', 'ClaimCount']:
+            result[column] = result[column].astype(np.int64)
+
+        return result
+
+    def overall_totals(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        segment_filters: Optional[Dict[str, List]] = None
+    ) -> Dict:
+        """
+        Portfolio totals for a selection.
+
+        Args:
+            start: First month ordinal, inclusive
+            end: Last month ordinal, inclusive
+            segment_filters: Mapping of segment dimension to allowed values
+
+        Returns:
+            Dictionary with earned_premium, exposure, policy_count,
+            incurred, paid and claim_count
+        """
+        self._validate_dimensions(list(segment_filters or {}))
+        where, params = self._where(start, end, segment_filters)
+
+        sql = f"""
+            SELECT e.earned_premium, e.exposure, e.policy_count,
+                   c.incurred, c.paid, c.claim_count
+            FROM (
+                SELECT COALESCE(SUM(EarnedPremium), 0) AS earned_premium,
+                       COALESCE(SUM(ExposureUnits), 0) AS exposure,
+                       COUNT(DISTINCT PolicyID) AS policy_count
+                FROM exposure{where}
+            ) e, (
+                SELECT COALESCE(SUM(IncurredAmount), 0) AS incurred,
+                       COALESCE(SUM(PaidAmount), 0) AS paid,
+                       COUNT(*) AS claim_count
+                FROM claims{where}
+            ) c
+        """
+
+        row = self._query(sql, params + params).iloc[0]
+        return {
+            'earned_premium': float(row['earned_premium']),
+            'exposure': float(row['exposure']),
+            'policy_count': int(row['policy_count']),
+            'incurred': float(row['incurred']),
+            'paid': float(row['paid']),
+            'claim_count': int(row['claim_count'])
+        }
+
+    def close(self):
+        """Close the underlying connection."""
+        self._connection.close()
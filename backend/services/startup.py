@@ -0,0 +1,168 @@
+"""
+Startup Service
+Background initialization with per-stage timings and readiness state.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+# Seconds clients are asked to wait (Retry-After) while components load
+RETRY_AFTER_SECONDS = 5
+
+
+class StartupTracker:
+    """
+    Readiness of components that are initialized in the background.
+
+    The app starts serving immediately while each component (e.g. 'data',
+    'models') loads on its own thread. Every component ends up 'ready' or
+    'failed'; a failure is recorded instead of being printed and forgotten,
+    so readiness never reports a half-initialized service as usable.
+    """
+
+    def __init__(self, components: List[str]):
+        """
+        Initialize the tracker.
+
+        Args:
+            components: Names of the components that must load before the
+                service is ready
+        """
+        self.components = {name: 'pending' for name in components}
+        self.errors: Dict[str, str] = {}
+        self.timings: Dict[str, float] = {}
+        self._started = time.perf_counter()
+        self._finished: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Time a stage; the duration is recorded even if the stage fails.
+
+        Args:
+            name: Stage name (e.g. 'model_load')
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record({name: time.perf_counter() - start})
+
+    def record(self, timings: Dict[str, float]):
+        """
+        Record stage durations measured elsewhere.
+
+        Args:
+            timings: Seconds by stage name
+        """
+        with self._lock:
+            self.timings.update({name: round(seconds, 3) for name, seconds in timings.items()})
+
+    def _set(self, component: str, state: str, error: Optional[str] = None):
+        """Set a component's state and note when the last pending one finishes."""
+        with self._lock:
+            self.components[component] = state
+            if error is None:
+                self.errors.pop(component, None)
+            else:
+                self.errors[component] = error
+            if self._finished is None and 'pending' not in self.components.values():
+                self._finished = time.perf_counter()
+
+    def mark_ready(self, component: str):
+        """Mark a component as loaded."""
+        self._set(component, 'ready')
+
+    def mark_failed(self, component: str, error: str):
+        """Mark a component as failed with its error message."""
+        self._set(component, 'failed', error)
+
+    def run(self, component: str, load: Callable):
+        """
+        Load a component and record the outcome.
+
+        Args:
+            component: Component name
+            load: Zero-argument function performing the load
+
+        Returns:
+            The loaded object, or None if loading failed
+        """
+        try:
+            result = load()
+        except Exception as e:
+            self.mark_failed(component, str(e))
+            print(f"⚠️  Error loading {component}: {e}")
+            return None
+
+        self.mark_ready(component)
+        return result
+
+    def start(self, component: str, load: Callable, on_loaded: Optional[Callable] = None) -> threading.Thread:
+        """
+        Load a component on a background thread.
+
+        Args:
+            component: Component name
+            load: Zero-argument function performing the load
+            on_loaded: Called with the loaded object after a successful load
+
+        Returns:
+            The started thread
+        """
+        def worker():
+            result = self.run(component, load)
+            if result is not None and on_loaded is not None:
+                on_loaded(result)
+
+        thread = threading.Thread(target=worker, name=f"startup-{component}", daemon=True)
+        thread.start()
+        return thread
+
+    def is_ready(self, component: Optional[str] = None) -> bool:
+        """
+        Check readiness of one component, or of all of them.
+
+        Args:
+            component: Component name (default: all components)
+
+        Returns:
+            True if the component (or every component) is ready
+        """
+        if component is not None:
+            return self.components.get(component) == 'ready'
+        return all(state == 'ready' for state in self.components.values())
+
+    @property
+    def status(self) -> str:
+        """'ready', 'failed' (some component failed) or 'starting'."""
+        states = self.components.values()
+        if 'failed' in states:
+            return 'failed'
+        if all(state == 'ready' for state in states):
+            return 'ready'
+        return 'starting'
+
+    def info(self) -> Dict:
+        """
+        Describe the startup state.
+
+        Returns:
+            Dictionary with status, component states, stage timings, errors
+            and the seconds until all components finished (None while loading)
+        """
+        with self._lock:
+            return {
+                'status': self.status,
+                'components': dict(self.components),
+                'timings': dict(self.timings),
+                'errors': dict(self.errors),
+                'startup_seconds': (
+                    round(self._finished - self._started, 3) if self._finished is not None else None
+                )
+            }
@@ -0,0 +1,475 @@
+"""
+Storage Service
+Loads policies, claims and exposure from partitioned Parquet, with CSV fallback.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+from services.snapshot_cache import file_hash
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.dataset as ds
+except ImportError:  # pragma: no cover - Parquet support is optional
+    pa = None
+    pa_csv = None
+    ds = None
+
+PARQUET_DIR = 'parquet'
+
+# Written next to each Parquet dataset: the hash of the CSV it was converted from
+SOURCE_STAMP = '{name}.source.json'
+
+# Rows per Parquet row group; smaller groups give finer period pruning
+ROW_GROUP_SIZE = 131072
+
+# Table layout: partition column (derived on write) and the sort column whose
+# row-group statistics serve period predicates
+TABLE_LAYOUT = {
+    'policies': {'partition': None, 'sort': 'EffectiveDate'},
+    'claims': {'partition': 'AccidentYear', 'sort': 'LossDate'},
+    'exposure': {'partition': 'PeriodYear', 'sort': 'Period'},
+}
+
+# Explicit CSV column types for the pyarrow reader (no type inference pass);
+# dates are parsed while reading, columns not listed here are inferred
+CSV_SCHEMAS = {
+    'policies': {
+        'PolicyID': 'string', 'EffectiveDate': 'timestamp', 'Geography': 'string',
+        'Industry': 'string', 'PolicySize': 'string', 'RiskRating': 'float64',
+        'AnnualPremium': 'float64', 'ExposureUnits': 'float64',
+    },
+    'claims': {
+        'ClaimID': 'string', 'PolicyID': 'string', 'LossDate': 'timestamp',
+        'ReportDate': 'timestamp', 'Geography': 'string', 'Industry': 'string',
+        'PolicySize': 'string', 'RiskRating': 'float64', 'IncurredAmount': 'float64',
+        'PaidAmount': 'float64', 'ClaimStatus': 'string',
+    },
+    'exposure': {
+        'PolicyID': 'string', 'Period': 'string', 'EarnedPremium': 'float64',
+        'ExposureUnits': 'float64', 'Geography': 'string', 'Industry': 'string',
+        'PolicySize': 'string', 'RiskRating': 'float64',
+    },
+}
+
+# Columns each consumer needs; everything else is pruned at read time
+SERVICE_COLUMNS = {
+    'segment_kpis': {
+        'policies': ['PolicyID', 'EffectiveDate', 'Geography', 'Industry', 'PolicySize',
+                     'RiskRating', 'AnnualPremium', 'ExposureUnits'],
+        # Segment attributes come from the policy dimension, not the fact tables
+        'claims': ['ClaimID', 'PolicyID', 'LossDate', 'ReportDate', 'IncurredAmount', 'PaidAmount'],
+        'exposure': ['PolicyID', 'Period', 'EarnedPremium', 'ExposureUnits'],
+    },
+    'loss_triangle': {
+        'claims': ['LossDate', 'ReportDate', 'IncurredAmount', 'PaidAmount'],
+    },
+    'training': {
+        'policies': ['PolicyID', 'Geography', 'Industry', 'PolicySize', 'RiskRating',
+                     'AnnualPremium', 'ExposureUnits'],
+        'claims': ['PolicyID', 'IncurredAmount'],
+        'exposure': ['PolicyID', 'EarnedPremium', 'ExposureUnits'],
+    },
+}
+
+
+class StaleSourceError(RuntimeError):
+    """A source file changed after the Parquet dataset or compiled snapshot read in its place was written."""
+
+
+def parquet_available() -> bool:
+    """Whether pyarrow is installed."""
+    return ds is not None
+
+
+def _dataset_path(data_dir: str, name: str) -> str:
+    """Directory of a table's Parquet dataset."""
+    return os.path.join(data_dir, PARQUET_DIR, name)
+
+
+def _stamp_path(data_dir: str, name: str) -> str:
+    """Path of the record of the CSV a table's Parquet dataset was written from."""
+    return os.path.join(data_dir, PARQUET_DIR, SOURCE_STAMP.format(name=name))
+
+
+def has_parquet(data_dir: str, name: str) -> bool:
+    """
+    Check whether a Parquet dataset exists for a table.
+
+    Args:
+        data_dir: Data directory
+        name: Table name ('policies', 'claims' or 'exposure')
+
+    Returns:
+        True if pyarrow is available and the dataset directory is non-empty
+    """
+    path = _dataset_path(data_dir, name)
+    return parquet_available() and os.path.isdir(path) and len(os.listdir(path)) > 0
+
+
+def _partition_values(df: pd.DataFrame, name: str) -> Optional[pd.Series]:
+    """Derive the partition column for a table."""
+    partition = TABLE_LAYOUT[name]['partition']
+    if partition == 'AccidentYear':
+        return df['LossDate'].astype(str).str[:4].astype('int32')
+    if partition == 'PeriodYear':
+        return df['Period'].astype(str).str[:4].astype('int32')
+    return None
+
+
+def write_parquet_table(df: pd.DataFrame, data_dir: str, name: str) -> str:
+    """
+    Write a table as a hive-partitioned Parquet dataset.
+
+    Rows are sorted by the table's period column before writing so each
+    row group covers a narrow period range and can be skipped by filters.
+
+    Args:
+        df: Table to write
+        data_dir: Data directory
+        name: Table name ('policies', 'claims' or 'exposure')
+
+    Returns:
+        Path of the written dataset
+    """
+    if not parquet_available():
+        raise RuntimeError("pyarrow is required to write Parquet")
+
+    layout = TABLE_LAYOUT[name]
+    path = _dataset_path(data_dir, name)
+
+    # Replace the whole dataset so partitions that no longer exist don't linger
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+
+    df = df.sort_values(layout['sort'], kind='stable').reset_index(drop=True)
+    partition_values = _partition_values(df, name)
+
+    partitioning = None
+    if partition_values is not None:
+        df = df.assign(**{layout['partition']: partition_values})
+        partitioning = ds.partitioning(
+            pa.schema([(layout['partition'], pa.int32())]),
+            flavor='hive'
+        )
+
+    ds.write_dataset(
+        pa.Table.from_pandas(df, preserve_index=False),
+        path,
+        format='parquet',
+        partitioning=partitioning,
+        existing_data_behavior='overwrite_or_ignore',
+        max_rows_per_group=ROW_GROUP_SIZE,
+        min_rows_per_group=min(ROW_GROUP_SIZE, max(len(df), 1)),
+        basename_template='part-{i}.parquet'
+    )
+
+    # Record the CSV the dataset stands in for, so later edits to it are detected
+    csv_path = os.path.join(data_dir, f"{name}.csv")
+    stamp_path = _stamp_path(data_dir, name)
+    if os.path.exists(csv_path):
+        with open(stamp_path, 'w') as f:
+            json.dump({'source': f"{name}.csv", 'sha256': file_hash(csv_path)}, f)
+    elif os.path.exists(stamp_path):
+        os.remove(stamp_path)
+
+    return path
+
+
+def write_parquet_tables(data_dir: str, tables: Dict[str, pd.DataFrame]) -> Dict[str, str]:
+    """
+    Write several tables as Parquet datasets.
+
+    Args:
+        data_dir: Data directory
+        tables: Mapping of table name to DataFrame
+
+    Returns:
+        Mapping of table name to dataset path
+    """
+    return {name: write_parquet_table(df, data_dir, name) for name, df in tables.items()}
+
+
+def source_files(data_dir: str) -> List[str]:
+    """
+    Source files of a data directory.
+
+    Args:
+        data_dir: Data directory
+
+    Returns:
+        The table CSVs and every file in the Parquet datasets
+    """
+    paths = [os.path.join(data_dir, f"{name}.csv") for name in TABLE_LAYOUT]
+    for root, _, files in os.walk(os.path.join(data_dir, PARQUET_DIR)):
+        paths.extend(os.path.join(root, name) for name in files)
+    return paths
+
+
+def parquet_source_changed(data_dir: str, name: str) -> bool:
+    """
+    Check whether a table's CSV changed after its Parquet dataset was written.
+
+    The CSV's hash is compared with the one recorded in the dataset. A
+    dataset written without a record counts as stale when the CSV is newer
+    than every file in it.
+
+    Args:
+        data_dir: Data directory
+        name: Table name
+
+    Returns:
+        True if the CSV exists and differs from the dataset's source
+    """
+    csv_path = os.path.join(data_dir, f"{name}.csv")
+    if not os.path.exists(csv_path):
+        return False
+
+    stamp_path = _stamp_path(data_dir, name)
+    if os.path.exists(stamp_path):
+        with open(stamp_path) as f:
+            return json.load(f).get('sha256') != file_hash(csv_path)
+
+    written = max(
+        os.path.getmtime(os.path.join(root, filename))
+        for root, _, files in os.walk(_dataset_path(data_dir, name)) for filename in files
+    )
+    return os.path.getmtime(csv_path) > written
+
+
+def check_parquet_source(data_dir: str, name: str):
+    """
+    Refuse to read a Parquet dataset whose CSV changed after it was written.
+
+    Parquet is preferred over CSV, so an edited or re-imported CSV would
+    otherwise be silently ignored.
+
+    Args:
+        data_dir: Data directory
+        name: Table name
+
+    Raises:
+        StaleSourceError: If the dataset exists and its CSV changed
+    """
+    if has_parquet(data_dir, name) and parquet_source_changed(data_dir, name):
+        raise StaleSourceError(
+            f"{name}.csv changed after {PARQUET_DIR}/{name} was written from it; re-run "
+            f"scripts/import_data.py (or remove {PARQUET_DIR}/{name}) to load the CSV"
+        )
+
+
+def _next_period(period: str) -> str:
+    """The 'YYYY-MM' period after the given one."""
+    return (pd.Period(period, freq='M') + 1).strftime('%Y-%m')
+
+
+def _period_bound(period: str, field_type):
+    """A period's first instant as a scalar comparable with a column of the given type."""
+    if pa.types.is_timestamp(field_type):
+        return pa.scalar(pd.Timestamp(period), type=field_type)
+    if pa.types.is_date(field_type):
+        return pa.scalar(pd.Timestamp(period).date(), type=field_type)
+    # 'YYYY-MM' periods and ISO date strings compare as strings
+    return period
+
+
+def _period_filter(name: str, start_period: Optional[str], end_period: Optional[str], schema):
+    """
+    Build a dataset filter expression for a period window.
+
+    Partition pruning comes from the year bounds; row-group pruning from the
+    sort column's min/max statistics. Bounds take the sort column's type in
+    the dataset schema (timestamp, date or string).
+    """
+    layout = TABLE_LAYOUT[name]
+    partition = layout['partition']
+    column = ds.field(layout['sort'])
+    field_type = schema.field(layout['sort']).type
+    expression = None
+
+    def combine(current, clause):
+        return clause if current is None else current & clause
+
+    if start_period is not None:
+        expression = combine(expression, column >= _period_bound(start_period, field_type))
+        if partition:
+            expression = combine(expression, ds.field(partition) >= int(start_period[:4]))
+    if end_period is not None:
+        # Anything before the start of the next month is in range
+        expression = combine(expression, column < _period_bound(_next_period(end_period), field_type))
+        if partition:
+            expression = combine(expression, ds.field(partition) <= int(end_period[:4]))
+
+    return expression
+
+
+def _arrow_type(type_name: str):
+    """pyarrow type for a CSV_SCHEMAS type name."""
+    if type_name == 'timestamp':
+        return pa.timestamp('ns')
+    return pa.type_for_alias(type_name)
+
+
+def read_csv_table(path: str, name: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read a CSV file with pyarrow's multithreaded parser.
+
+    Columns listed in CSV_SCHEMAS are parsed with their declared types (date
+    columns become datetime64), and the Arrow table is handed to pandas
+    without consolidating blocks, so numeric columns without nulls are not
+    copied. Falls back to pandas.read_csv when pyarrow is not installed.
+
+    Args:
+        path: CSV file path
+        name: Table name ('policies', 'claims' or 'exposure')
+        columns: Columns to read (default: all)
+
+    Returns:
+        DataFrame with the requested columns
+    """
+    if pa_csv is None:
+        return pd.read_csv(path, usecols=columns)
+
+    schema = CSV_SCHEMAS.get(name, {})
+    if columns is not None:
+        schema = {column: schema[column] for column in columns if column in schema}
+
+    table = pa_csv.read_csv(
+        path,
+        read_options=pa_csv.ReadOptions(use_threads=True),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={column: _arrow_type(type_name) for column, type_name in schema.items()},
+            include_columns=list(columns) if columns is not None else None,
+            strings_can_be_null=True
+        )
+    )
+
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def load_table(
+    data_dir: str,
+    name: str,
+    columns: Optional[List[str]] = None,
+    start_period: Optional[str] = None,
+    end_period: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Load a table, preferring Parquet and falling back to CSV.
+
+    Args:
+        data_dir: Data directory
+        name: Table name ('policies', 'claims' or 'exposure')
+        columns: Columns to read (default: all)
+        start_period: First period to include ('YYYY-MM'), inclusive
+        end_period: Last period to include ('YYYY-MM'), inclusive
+
+    Returns:
+        DataFrame with the requested columns and rows
+
+    Raises:
+        StaleSourceError: If the table's CSV changed after its Parquet dataset was written
+    """
+    if name not in TABLE_LAYOUT:
+        raise ValueError(f"Unknown table: {name}")
+
+    period_window = start_period is not None or end_period is not None
+    if period_window and TABLE_LAYOUT[name]['partition'] is None:
+        raise ValueError(f"Table {name} does not support period filters")
+
+    if has_parquet(data_dir, name):
+        check_parquet_source(data_dir, name)
+        dataset = ds.dataset(_dataset_path(data_dir, name), format='parquet', partitioning='hive')
+        partition = TABLE_LAYOUT[name]['partition']
+        if columns is None:
+            columns = [field for field in dataset.schema.names if field != partition]
+
+        expression = _period_filter(name, start_period, end_period, dataset.schema)
+        table = dataset.to_table(columns=columns, filter=expression)
+        return table.to_pandas()
+
+    # CSV fallback: prune columns while parsing, filter rows afterwards
+    sort_column = TABLE_LAYOUT[name]['sort']
+    read_columns = columns
+    if columns is not None and period_window and sort_column not in columns:
+        read_columns = list(columns) + [sort_column]
+
+    df = read_csv_table(os.path.join(data_dir, f"{name}.csv"), name, read_columns)
+
+    if period_window:
+        values = df[sort_column].astype(str)
+        mask = pd.Series(True, index=df.index)
+        if start_period is not None:
+            mask &= values >= start_period
+        if end_period is not None:
+            mask &= values < _next_period(end_period)
+        df = df[mask].reset_index(drop=True)
+
+    if columns is not None:
+        df = df[list(columns)]
+
+    return df
+
+
+def load_tables(
+    data_dir: str,
+    columns: Dict[str, Optional[List[str]]],
+    **period_window
+) -> Tuple[Dict[str, pd.DataFrame], Dict[str, float]]:
+    """
+    Load several tables concurrently.
+
+    Each table is read on its own thread; the pyarrow CSV and Parquet
+    readers release the GIL, so the reads overlap.
+
+    Args:
+        data_dir: Data directory
+        columns: Mapping of table name to the columns to read (None for all)
+        **period_window: Optional start_period / end_period, applied to
+            tables partitioned by period
+
+    Returns:
+        Tuple of (mapping of table name to DataFrame, read seconds by table)
+    """
+    def read(name: str):
+        start = time.perf_counter()
+        window = period_window if TABLE_LAYOUT[name]['partition'] else {}
+        df = load_table(data_dir, name, columns=columns[name], **window)
+        return df, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=max(len(columns), 1)) as executor:
+        futures = {name: executor.submit(read, name) for name in columns}
+        results = {name: future.result() for name, future in futures.items()}
+
+    tables = {name: df for name, (df, _) in results.items()}
+    timings = {name: seconds for name, (_, seconds) in results.items()}
+    return tables, timings
+
+
+def load_service_tables(
+    data_dir: str,
+    service: str,
+    **period_window
+) -> Dict[str, pd.DataFrame]:
+    """
+    Load the tables (and only the columns) a service needs.
+
+    Args:
+        data_dir: Data directory
+        service: Key of SERVICE_COLUMNS ('segment_kpis', 'loss_triangle', 'training')
+        **period_window: Optional start_period / end_period
+
+    Returns:
+        Mapping of table name to DataFrame
+    """
+    tables, _ = load_tables(data_dir, SERVICE_COLUMNS[service], **period_window)
+    return tables
@@ -0,0 +1,473 @@
+"""
+Streaming Ingestion Service
+Out-of-core portfolio aggregation over chunked reads of claims and exposure.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import os
+import pandas as pd
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    import pyarrow.dataset as ds
+except ImportError:  # pragma: no cover - Parquet support is optional
+    ds = None
+
+from services.storage import (
+    PARQUET_DIR, SERVICE_COLUMNS, TABLE_LAYOUT, check_parquet_source, has_parquet, load_table
+)
+from services.column_store import ORDINAL_SOURCE, has_snapshot, load_snapshot
+from services.credibility import buhlmann_straub
+from services.loss_triangle import AggregatedLossTriangle, _month_ordinals
+from services.segment_cube import SegmentCube
+from services.segment_kpis import SEGMENT_DIMENSIONS, period_ordinal, portfolio_kpis
+from services.portfolio_model import PolicyDimension
+
+# Rows per chunk; bounds peak memory independently of table size
+STREAM_CHUNK_ROWS = 250_000
+
+# Development months kept by the triangle accumulator; requests may use any
+# max_dev_months up to this
+STREAM_MAX_DEV_MONTHS = 120
+
+STREAM_COLUMNS = {
+    'exposure': ['PolicyID', 'Period', 'EarnedPremium', 'ExposureUnits'],
+    'claims': ['PolicyID', 'LossDate', 'ReportDate', 'IncurredAmount', 'PaidAmount'],
+}
+
+TRIANGLE_VALUES = ['IncurredAmount', 'PaidAmount']
+
+
+def iter_table_chunks(
+    data_dir: str,
+    name: str,
+    columns: Optional[List[str]] = None,
+    chunk_rows: int = STREAM_CHUNK_ROWS
+) -> Iterator[pd.DataFrame]:
+    """
+    Read a table in bounded chunks with a PeriodOrdinal column.
+
+    A compiled snapshot is sliced (the columns are memory-mapped), Parquet is
+    read record batch by record batch, and CSV with read_csv(chunksize=...).
+    Only one chunk is materialized at a time.
+
+    Args:
+        data_dir: Data directory
+        name: Table name ('claims' or 'exposure')
+        columns: Columns to read (default: all)
+        chunk_rows: Maximum rows per chunk
+
+    Yields:
+        DataFrame chunks
+    """
+    if name not in ORDINAL_SOURCE:
+        raise ValueError(f"Table {name} cannot be streamed")
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be at least 1")
+
+    if has_snapshot(data_dir):
+        table = load_snapshot(data_dir).table(name)
+        frame = table.to_frame(columns)
+        for start in range(0, len(frame), chunk_rows):
+            chunk = frame.iloc[start:start + chunk_rows]
+            # Decode categoricals so keys from different chunks align
+            categorical = [c for c in chunk.columns if isinstance(chunk[c].dtype, pd.CategoricalDtype)]
+            yield chunk.astype({c: chunk[c].cat.categories.dtype for c in categorical})
+        return
+
+    if has_parquet(data_dir, name):
+        check_parquet_source(data_dir, name)
+        dataset = ds.dataset(
+            os.path.join(data_dir, PARQUET_DIR, name), format='parquet', partitioning='hive'
+        )
+        if columns is None:
+            partition = TABLE_LAYOUT[name]['partition']
+            columns = [field for field in dataset.schema.names if field != partition]
+        batches = (
+            batch.to_pandas()
+            for batch in dataset.to_batches(columns=columns, batch_size=chunk_rows)
+        )
+    else:
+        batches = pd.read_csv(
+            os.path.join(data_dir, f"{name}.csv"), usecols=columns, chunksize=chunk_rows
+        )
+
+    for chunk in batches:
+        if len(chunk) == 0:
+            continue
+        chunk['PeriodOrdinal'] = period_ordinal(chunk[ORDINAL_SOURCE[name]])
+        yield chunk
+
+
+class SegmentAccumulator:
+    """
+    Additive segment x period sums for one set of dimensions.
+
+    Every chunk is reduced to per-(segment, period) sums, which are added to
+    the running totals, so memory grows with the number of cells rather than
+    rows. Distinct policies are kept as (segment, PolicyID) pairs, bounded by
+    the size of the policy book. The period grain is what Buhlmann-Straub
+    credibility needs, so credibility comes out of the same pass.
+    """
+
+    def __init__(self, dimensions: Union[str, List[str]]):
+        """
+        Initialize an empty accumulator.
+
+        Args:
+            dimensions: Segment dimension, or list of dimensions for a crosstab
+        """
+        self.dimensions = [dimensions] if isinstance(dimensions, str) else list(dimensions)
+        self._exposure: Optional[pd.DataFrame] = None
+        self._claims: Optional[pd.DataFrame] = None
+        self._policies: Optional[pd.DataFrame] = None
+
+    @staticmethod
+    def _add(total: Optional[pd.DataFrame], sums: pd.DataFrame) -> pd.DataFrame:
+        """Add chunk sums to the running totals, aligning on the cell index."""
+        return sums if total is None else total.add(sums, fill_value=0)
+
+    def add_exposure(self, chunk: pd.DataFrame):
+        """
+        Add an exposure chunk.
+
+        Args:
+            chunk: Exposure rows with the dimensions, PolicyID, PeriodOrdinal,
+                EarnedPremium and ExposureUnits
+        """
+        keys = self.dimensions + ['PeriodOrdinal']
+        sums = chunk.groupby(keys, observed=True)[['EarnedPremium', 'ExposureUnits']].sum()
+        self._exposure = self._add(self._exposure, sums.astype(float))
+
+        pairs = chunk[self.dimensions + ['PolicyID']].drop_duplicates()
+        if self._policies is not None:
+            pairs = pd.concat([self._policies, pairs], ignore_index=True).drop_duplicates()
+        self._policies = pairs
+
+    def add_claims(self, chunk: pd.DataFrame):
+        """
+        Add a claims chunk.
+
+        Args:
+            chunk: Claim rows with the dimensions, PeriodOrdinal,
+                IncurredAmount and PaidAmount
+        """
+        keys = self.dimensions + ['PeriodOrdinal']
+        sums = chunk.groupby(keys, observed=True).agg(
+            IncurredAmount=('IncurredAmount', 'sum'),
+            PaidAmount=('PaidAmount', 'sum'),
+            ClaimCount=('IncurredAmount', 'size')
+        )
+        self._claims = self._add(self._claims, sums.astype(float))
+
+    def cube(self) -> Tuple[SegmentCube, Dict]:
+        """
+        Build the segment cube from the accumulated sums.
+
+        Returns:
+            Tuple of (SegmentCube with credibility, credibility structural parameters)
+        """
+        if self._exposure is None:
+            raise ValueError("No exposure rows were accumulated")
+
+        # Segment x period weights; segments are defined by exposure
+        weights = self._exposure['EarnedPremium'].unstack('PeriodOrdinal', fill_value=0).sort_index()
+        segments = weights.index
+
+        exposure = self._exposure.groupby(level=self.dimensions, observed=True).sum().reindex(segments)
+        policy_counts = self._policies.groupby(self.dimensions, observed=True).size()
+
+        if self._claims is not None:
+            claims = self._claims.groupby(level=self.dimensions, observed=True).sum().reindex(segments, fill_value=0)
+            losses = self._claims['IncurredAmount'].unstack('PeriodOrdinal', fill_value=0).reindex(
+                index=segments, columns=weights.columns, fill_value=0
+            )
+        else:
+            claims = pd.DataFrame(0.0, index=segments, columns=['IncurredAmount', 'PaidAmount', 'ClaimCount'])
+            losses = pd.DataFrame(0.0, index=segments, columns=weights.columns)
+
+        credibility = buhlmann_straub(losses.to_numpy(dtype=float), weights.to_numpy(dtype=float))
+
+        measures = {
+            'EarnedPremium': exposure['EarnedPremium'].to_numpy(dtype=float),
+            'TotalExposure': exposure['ExposureUnits'].to_numpy(dtype=float),
+            'PolicyCount': policy_counts.reindex(segments, fill_value=0).to_numpy(dtype=float),
+            'IncurredLoss': claims['IncurredAmount'].to_numpy(dtype=float),
+            'PaidLoss': claims['PaidAmount'].to_numpy(dtype=float),
+            'ClaimCount': claims['ClaimCount'].to_numpy(dtype=float),
+            'CredibilityFactor': credibility['credibility_factors'].round(4),
+            'CredibilityLossRatio': (credibility['credibility_estimates'] * 100).round(2),
+        }
+        keys = segments.to_frame(index=False)
+
+        return SegmentCube(self.dimensions, keys, measures), credibility['structural_parameters']
+
+
+class TriangleAccumulator:
+    """
+    Additive accident month x development month sums of claim amounts.
+
+    Development months beyond STREAM_MAX_DEV_MONTHS are dropped on the way
+    in; any triangle up to that depth can be produced afterwards.
+    """
+
+    def __init__(self, max_dev_months: int = STREAM_MAX_DEV_MONTHS):
+        """
+        Initialize an empty accumulator.
+
+        Args:
+            max_dev_months: Deepest development month kept
+        """
+        self.max_dev_months = max_dev_months
+        self._grids: Dict[int, np.ndarray] = {}
+
+    def add_claims(self, chunk: pd.DataFrame):
+        """
+        Add a claims chunk.
+
+        Args:
+            chunk: Claim rows with LossDate, ReportDate, IncurredAmount and PaidAmount
+        """
+        loss_dates = pd.to_datetime(chunk['LossDate'])
+        report_dates = pd.to_datetime(chunk['ReportDate'])
+
+        # Claims missing either date cannot be placed in the triangle
+        dated = (loss_dates.notna() & report_dates.notna()).to_numpy()
+        if not dated.all():
+            chunk = chunk[dated]
+            loss_dates, report_dates = loss_dates[dated], report_dates[dated]
+
+        loss_months = _month_ordinals(loss_dates)
+        dev_months = np.clip(_month_ordinals(report_dates) - loss_months, 0, None)
+        mask = dev_months <= self.max_dev_months
+
+        months, codes = np.unique(loss_months[mask], return_inverse=True)
+        n_dev = self.max_dev_months + 1
+        cells = codes * n_dev + dev_months[mask]
+        size = len(months) * n_dev
+
+        # One grid per measure: claim count, then the value columns
+        layers = [np.bincount(cells, minlength=size)]
+        for column in TRIANGLE_VALUES:
+            values = chunk[column].to_numpy(dtype=float)[mask]
+            layers.append(np.bincount(cells, weights=values, minlength=size))
+        stacked = np.stack(layers).reshape(len(layers), len(months), n_dev)
+
+        for position, month in enumerate(months):
+            grid = self._grids.get(int(month))
+            if grid is None:
+                self._grids[int(month)] = stacked[:, position].astype(float)
+            else:
+                grid += stacked[:, position]
+
+    def calculator(self, max_dev_months: int = 36) -> AggregatedLossTriangle:
+        """
+        Get a loss triangle calculator over the accumulated sums.
+
+        Args:
+            max_dev_months: Maximum development months to include
+
+        Returns:
+            AggregatedLossTriangle instance
+        """
+        months = sorted(self._grids)
+        n_dev = self.max_dev_months + 1
+        stacked = (
+            np.stack([self._grids[month] for month in months], axis=1)
+            if months else np.zeros((len(TRIANGLE_VALUES) + 1, 0, n_dev))
+        )
+
+        grids = {'ClaimCount': stacked[0]}
+        grids.update({column: stacked[i + 1] for i, column in enumerate(TRIANGLE_VALUES)})
+
+        return AggregatedLossTriangle(np.array(months, dtype=np.int64), grids, max_dev_months)
+
+
+class StreamingKPICalculator:
+    """
+    Full-portfolio segment KPIs from streamed aggregates.
+
+    Serves the unfiltered segment KPI, top-N and overall queries of
+    SegmentKPICalculator from per-dimension cubes built in one streaming
+    pass. Queries that need claim rows (period windows, segment filters,
+    bootstrap, trends, crosstabs) raise ValueError.
+    """
+
+    sql_engine = None
+
+    def __init__(
+        self,
+        policies_df: pd.DataFrame,
+        cubes: Dict[str, Tuple[SegmentCube, Dict]],
+        totals: Dict
+    ):
+        """
+        Initialize the calculator.
+
+        Args:
+            policies_df: Policies DataFrame (dimension table, kept in memory)
+            cubes: Cube and credibility parameters by segment dimension
+            totals: Portfolio sums (see stream_portfolio)
+        """
+        self.policies_df = policies_df
+        self.cubes = cubes
+        self.totals = totals
+
+    @staticmethod
+    def _full_portfolio_only(start_period=None, end_period=None, segment_filters=None):
+        """Reject selections that the streamed aggregates cannot answer."""
+        if start_period is not None or end_period is not None or segment_filters:
+            raise ValueError("Period and segment filters need in-memory data (DATA_LOAD_MODE=memory)")
+
+    def _cube(self, segment_by: Union[str, List[str]]) -> Tuple[SegmentCube, Dict]:
+        """Cube and credibility parameters of one streamed dimension."""
+        dimensions = [segment_by] if isinstance(segment_by, str) else list(segment_by)
+        if len(dimensions) != 1 or dimensions[0] not in SEGMENT_DIMENSIONS:
+            raise ValueError(f"Invalid segment_by value for streamed data: {segment_by}")
+        return self.cubes[dimensions[0]]
+
+    def calculate_kpis_by_segment(
+        self,
+        segment_by: str,
+        min_premium: float = 0,
+        include_credibility: bool = False,
+        start_period: Optional[str] = None,
+        end_period: Optional[str] = None,
+        segment_filters: Optional[Dict[str, List]] = None
+    ) -> pd.DataFrame:
+        """
+        Calculate comprehensive KPIs for each segment.
+
+        Args:
+            segment_by: Dimension to segment by
+            min_premium: Minimum earned premium to include segment
+            include_credibility: Keep the CredibilityFactor and
+                CredibilityLossRatio columns
+            start_period: Not supported (must be None)
+            end_period: Not supported (must be None)
+            segment_filters: Not supported (must be empty)
+
+        Returns:
+            DataFrame with KPIs by segment
+        """
+        self._full_portfolio_only(start_period, end_period, segment_filters)
+        cube, parameters = self._cube(segment_by)
+
+        kpis = cube.to_frame()
+        if include_credibility:
+            kpis.attrs['credibility'] = parameters
+        else:
+            kpis = kpis.drop(columns=['CredibilityFactor', 'CredibilityLossRatio'])
+
+        kpis = kpis[kpis['EarnedPremium'] >= min_premium]
+        return kpis.sort_values('EarnedPremium', ascending=False)
+
+    def calculate_overall_kpis(
+        self,
+        start_period: Optional[str] = None,
+        end_period: Optional[str] = None,
+        segment_filters: Optional[Dict[str, List]] = None
+    ) -> Dict:
+        """
+        Calculate portfolio-level KPIs (all segments combined).
+
+        Returns:
+            Dictionary containing overall portfolio metrics
+        """
+        self._full_portfolio_only(start_period, end_period, segment_filters)
+        totals = self.totals
+        return portfolio_kpis(
+            totals['earned_premium'], totals['exposure'], totals['incurred'],
+            totals['paid'], totals['claim_count'], self.policies_df['PolicyID'].nunique()
+        )
+
+    def get_top_segments(
+        self,
+        segment_by: Union[str, List[str]],
+        metric: str = 'EarnedPremium',
+        top_n: int = 10,
+        ascending: bool = False,
+        min_credibility: Optional[float] = None,
+        min_claims: int = 0,
+        **selection
+    ) -> pd.DataFrame:
+        """
+        Get top N segments by specified metric.
+
+        Returns:
+            DataFrame with top segments
+        """
+        self._full_portfolio_only(**selection)
+        cube, _ = self._cube(segment_by)
+        return cube.top(
+            metric,
+            top_n,
+            ascending=ascending,
+            min_credibility=min_credibility,
+            min_claims=min_claims
+        )
+
+    def calculate_bootstrap_intervals(self, *args, **kwargs):
+        """Bootstrap resamples claims, which are not kept in streaming mode."""
+        raise ValueError("Bootstrap intervals need in-memory data (DATA_LOAD_MODE=memory)")
+
+    def calculate_trend_analysis(self, *args, **kwargs):
+        """Trends are not accumulated in streaming mode."""
+        raise ValueError("Segment trends need in-memory data (DATA_LOAD_MODE=memory)")
+
+
+def stream_portfolio(
+    data_dir: str,
+    chunk_rows: int = STREAM_CHUNK_ROWS,
+    max_dev_months: int = STREAM_MAX_DEV_MONTHS
+) -> Tuple[StreamingKPICalculator, TriangleAccumulator]:
+    """
+    Aggregate the portfolio in one chunked pass over exposure and claims.
+
+    Chunks carry only PolicyID and measures; segments are gathered from the
+    policy dimension, so facts of policies missing from the policies table
+    count in the totals but in no segment.
+
+    Args:
+        data_dir: Data directory
+        chunk_rows: Maximum rows per chunk
+        max_dev_months: Deepest development month kept for triangles
+
+    Returns:
+        Tuple of (StreamingKPICalculator, TriangleAccumulator)
+    """
+    policy_columns = SERVICE_COLUMNS['segment_kpis']['policies']
+    if has_snapshot(data_dir):
+        policies_df = load_snapshot(data_dir).frame('policies', policy_columns)
+    else:
+        policies_df = load_table(data_dir, 'policies', policy_columns)
+    # Segments of each chunk are gathered from the policy dimension by key
+    policy_dimension = PolicyDimension.from_frames(policies_df)
+    accumulators = {dimension: SegmentAccumulator(dimension) for dimension in SEGMENT_DIMENSIONS}
+    triangles = TriangleAccumulator(max_dev_months)
+    totals = {
+        'exposure_rows': 0, 'earned_premium': 0.0, 'exposure': 0.0,
+        'claim_count': 0, 'incurred': 0.0, 'paid': 0.0
+    }
+
+    for chunk in iter_table_chunks(data_dir, 'exposure', STREAM_COLUMNS['exposure'], chunk_rows):
+        chunk = policy_dimension.view(policy_dimension.to_fact(chunk))
+        for accumulator in accumulators.values():
+            accumulator.add_exposure(chunk)
+        totals['exposure_rows'] += len(chunk)
+        totals['earned_premium'] += float(chunk['EarnedPremium'].sum())
+        totals['exposure'] += float(chunk['ExposureUnits'].sum())
+
+    for chunk in iter_table_chunks(data_dir, 'claims', STREAM_COLUMNS['claims'], chunk_rows):
+        chunk = policy_dimension.view(policy_dimension.to_fact(chunk))
+        for accumulator in accumulators.values():
+            accumulator.add_claims(chunk)
+        triangles.add_claims(chunk)
+        totals['claim_count'] += len(chunk)
+        totals['incurred'] += float(chunk['IncurredAmount'].sum())
+        totals['paid'] += float(chunk['PaidAmount'].sum())
+
+    cubes = {dimension: accumulator.cube() for dimension, accumulator in accumulators.items()}
+    return StreamingKPICalculator(policies_df, cubes, totals), triangles
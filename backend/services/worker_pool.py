@@ -0,0 +1,107 @@
+"""
+Worker Pool Service
+Runs blocking work off the asyncio event loop on bounded thread pools.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+
+class WorkerPool:
+    """
+    Bounded thread pool for blocking calls made from async endpoints.
+
+    Awaiting run() keeps the event loop free while pandas, LightGBM or a
+    network client works, so cheap requests (health checks, cached
+    results) are not queued behind a slow aggregation. Threads rather than
+    processes: the data snapshot and models are in-process state shared by
+    every request, and the numeric kernels release the GIL while they run.
+
+    With max_workers=0 calls run inline on the event loop, which is the
+    behaviour of a plain async endpoint (useful as a benchmark baseline).
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        """
+        Initialize the pool.
+
+        Args:
+            name: Pool name (thread name prefix and metrics label)
+            max_workers: Number of threads (0 runs calls inline)
+        """
+        if max_workers < 0:
+            raise ValueError("max_workers must be non-negative")
+
+        self.name = name
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._running = 0
+        self._completed = 0
+
+    def _call(self, func: Callable, *args, **kwargs):
+        """Run func and keep the running / completed counters."""
+        with self._lock:
+            self._running += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """
+        Run a blocking function on the pool and await its result.
+
+        Args:
+            func: Function to call
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            The function's return value (its exceptions propagate)
+        """
+        with self._lock:
+            self._submitted += 1
+            # Threads start on first use (and again after a shutdown)
+            if self._executor is None and self.max_workers > 0:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+            executor = self._executor
+
+        if executor is None:
+            return self._call(func, *args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, functools.partial(self._call, func, *args, **kwargs)
+        )
+
+    def info(self) -> Dict:
+        """
+        Pool size and load.
+
+        Returns:
+            Dictionary with workers, running, queued and completed counts
+        """
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'running': self._running,
+                'queued': self._submitted - self._completed - self._running,
+                'completed': self._completed,
+            }
+
+    def shutdown(self):
+        """Wait for running calls and stop the threads (a later run() starts new ones)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
@@ -0,0 +1,59 @@
+"""
+Shared test fixtures: a small policies, claims and exposure data directory.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import os
+
+
+def write_data(data_dir, n_claims=10):
+    """Write small policies, claims and exposure CSVs."""
+    np.random.seed(42)
+
+    pd.DataFrame({
+        'PolicyID': [f'POL{i:04d}' for i in range(5)],
+        'EffectiveDate': ['2023-01-01'] * 5,
+        'Geography': ['Northeast', 'West', 'Northeast', 'West', 'Midwest'],
+        'Industry': ['Retail'] * 5,
+        'PolicySize': ['Small'] * 5,
+        'RiskRating': [5.0] * 5,
+        'AnnualPremium': [1200.0] * 5,
+        'ExposureUnits': [1.0] * 5
+    }).to_csv(os.path.join(data_dir, 'policies.csv'), index=False)
+
+    pd.DataFrame({
+        'PolicyID': [f'POL{i % 5:04d}' for i in range(60)],
+        'Period': [f'2023-{i // 5 + 1:02d}' for i in range(60)],
+        'EarnedPremium': [100.0] * 60,
+        'ExposureUnits': [1 / 12] * 60,
+        'Geography': [['Northeast', 'West', 'Northeast', 'West', 'Midwest'][i % 5] for i in range(60)],
+        'Industry': ['Retail'] * 60,
+        'PolicySize': ['Small'] * 60,
+        'RiskRating': [5.0] * 60
+    }).to_csv(os.path.join(data_dir, 'exposure.csv'), index=False)
+
+    pd.DataFrame({
+        'ClaimID': [f'CLM{i:04d}' for i in range(n_claims)],
+        'PolicyID': [f'POL{i % 5:04d}' for i in range(n_claims)],
+        'LossDate': ['2023-03-15'] * n_claims,
+        'ReportDate': ['2023-05-01'] * n_claims,
+        'Geography': [['Northeast', 'West', 'Northeast', 'West', 'Midwest'][i % 5] for i in range(n_claims)],
+        'Industry': ['Retail'] * n_claims,
+        'PolicySize': ['Small'] * n_claims,
+        'RiskRating': [5.0] * n_claims,
+        'IncurredAmount': np.random.uniform(100, 1000, n_claims),
+        'PaidAmount': np.random.uniform(50, 500, n_claims)
+    }).to_csv(os.path.join(data_dir, 'claims.csv'), index=False)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Data directory with sample CSVs (modules with their own data override it)."""
+    path = tmp_path / 'data'
+    path.mkdir()
+    write_data(str(path))
+    return str(path)
@@ -0,0 +1,110 @@
+"""
+Unit tests for bootstrap confidence interval service.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.bootstrap import SegmentBootstrap, bootstrap_segment_kpis, _multinomial_weights
+
+
+@pytest.fixture
+def sample_data():
+    """Create claims and exposure data across three geographies."""
+    np.random.seed(42)
+
+    exposure = []
+    for geography in ['Northeast', 'Midwest', 'West']:
+        for month in range(12):
+            exposure.append({
+                'PolicyID': f'POL-{geography}',
+                'Period': f'2023-{month + 1:02d}',
+                'EarnedPremium': 50000.0,
+                'ExposureUnits': 20.0,
+                'Geography': geography
+            })
+
+    claims = []
+    for i in range(40):
+        geography = ['Northeast', 'Midwest'][i % 2]
+        claims.append({
+            'ClaimID': f'CLM{i:04d}',
+            'LossDate': '2023-06-01',
+            'Geography': geography,
+            'IncurredAmount': np.random.uniform(5000, 50000),
+            'PaidAmount': 0.0
+        })
+
+    return pd.DataFrame(claims), pd.DataFrame(exposure)
+
+
+def test_intervals_bracket_point_estimates(sample_data):
+    """Test that intervals contain the point estimates."""
+    claims_df, exposure_df = sample_data
+
+    result = SegmentBootstrap(claims_df, exposure_df).calculate('Geography', n_replicates=2000, seed=7)
+    result = result.set_index('Geography')
+
+    for geography in ['Northeast', 'Midwest']:
+        segment_claims = claims_df[claims_df['Geography'] == geography]
+        severity = segment_claims['IncurredAmount'].mean()
+        loss_ratio = segment_claims['IncurredAmount'].sum() / (50000.0 * 12) * 100
+
+        assert result.loc[geography, 'SeverityLower'] <= severity <= result.loc[geography, 'SeverityUpper']
+        assert result.loc[geography, 'LossRatioLower'] <= loss_ratio <= result.loc[geography, 'LossRatioUpper']
+
+
+def test_segment_without_claims(sample_data):
+    """Test that a segment with no claims gets zero-width intervals."""
+    claims_df, exposure_df = sample_data
+
+    result = SegmentBootstrap(claims_df, exposure_df).calculate('Geography', n_replicates=200, seed=1)
+    west = result.set_index('Geography').loc['West']
+
+    assert west['LossRatioLower'] == west['LossRatioUpper'] == 0
+    assert west['SeverityUpper'] == 0
+
+
+def test_seed_reproducibility(sample_data):
+    """Test that the same seed gives the same intervals."""
+    claims_df, exposure_df = sample_data
+    bootstrap = SegmentBootstrap(claims_df, exposure_df)
+
+    first = bootstrap.calculate('Geography', n_replicates=500, seed=123)
+    second = bootstrap.calculate('Geography', n_replicates=500, seed=123)
+
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_multinomial_weights_preserve_segment_counts():
+    """Test that resampling weights stay within each segment."""
+    rng = np.random.default_rng(0)
+    codes = np.array([0, 0, 0, 2, 2])
+    counts = np.bincount(codes, minlength=3)
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    weights = _multinomial_weights(rng, codes, offsets, counts, 100)
+
+    np.testing.assert_array_equal(weights[:, :3].sum(axis=1), 3)
+    np.testing.assert_array_equal(weights[:, 3:].sum(axis=1), 2)
+
+
+def test_invalid_parameters():
+    """Test parameter validation."""
+    with pytest.raises(ValueError):
+        bootstrap_segment_kpis(np.array([0]), np.array([1.0]), np.array([1.0]), np.array([1.0]), n_replicates=0)
+
+    with pytest.raises(ValueError):
+        bootstrap_segment_kpis(np.array([0]), np.array([1.0]), np.array([1.0]), np.array([1.0]), confidence=1.5)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
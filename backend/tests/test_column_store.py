@@ -0,0 +1,191 @@
+"""
+Unit tests for column store service.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.column_store import changed_sources, compile_snapshot, has_snapshot, load_snapshot
+from services.storage import StaleSourceError
+from services.segment_kpis import SegmentKPICalculator
+from services.loss_triangle import calculate_loss_triangle
+
+
+@pytest.fixture
+def sample_tables():
+    """Create sample policies, claims and exposure tables."""
+    np.random.seed(42)
+    geographies = ['Northeast', 'Southeast', 'West']
+
+    policies = pd.DataFrame({
+        'PolicyID': [f'POL{i:04d}' for i in range(30)],
+        'EffectiveDate': [f'2023-{(i % 12) + 1:02d}-01' for i in range(30)],
+        'Geography': [geographies[i % 3] for i in range(30)],
+        'AnnualPremium': np.random.uniform(1000, 5000, 30),
+        'ExposureUnits': np.random.uniform(1, 10, 30)
+    })
+
+    exposure = pd.DataFrame({
+        'PolicyID': [f'POL{i % 30:04d}' for i in range(240)],
+        'Period': [f'2023-{(i * 7) % 12 + 1:02d}' for i in range(240)],
+        'EarnedPremium': np.random.uniform(100, 500, 240),
+        'ExposureUnits': np.random.uniform(0.1, 1, 240),
+        'Geography': [geographies[i % 3] for i in range(240)]
+    })
+
+    claims = pd.DataFrame({
+        'ClaimID': [f'CLM{i:04d}' for i in range(40)],
+        'PolicyID': [f'POL{i % 30:04d}' for i in range(40)],
+        'LossDate': [f'2023-{(i * 5) % 12 + 1:02d}-15' for i in range(40)],
+        'ReportDate': [f'2024-{(i * 5) % 12 + 1:02d}-20' for i in range(40)],
+        'Geography': [['Northeast', 'West'][i % 2] for i in range(40)],
+        'IncurredAmount': np.random.uniform(1000, 20000, 40),
+        'PaidAmount': np.random.uniform(500, 10000, 40)
+    })
+
+    return {'policies': policies, 'claims': claims, 'exposure': exposure}
+
+
+def test_snapshot_round_trip(sample_tables, tmp_path):
+    """Test that compiled columns load back memory-mapped and unchanged."""
+    compile_snapshot(str(tmp_path), sample_tables)
+    assert has_snapshot(str(tmp_path))
+
+    store = load_snapshot(str(tmp_path))
+    claims = store.table('claims')
+
+    assert len(claims) == 40
+    assert isinstance(claims.array('IncurredAmount'), np.memmap)
+    assert claims['LossDate'].is_monotonic_increasing
+    assert claims['PeriodOrdinal'].iloc[0] == 2023 * 12
+
+    original = sample_tables['claims'].sort_values('LossDate', kind='stable')
+    np.testing.assert_allclose(claims['IncurredAmount'], original['IncurredAmount'])
+    assert list(claims['ClaimID'].astype(str)) == list(original['ClaimID'])
+
+
+def test_dictionaries_shared_across_tables(sample_tables, tmp_path):
+    """Test that categoricals use one dictionary per column name."""
+    compile_snapshot(str(tmp_path), sample_tables)
+    store = load_snapshot(str(tmp_path))
+
+    assert list(store.dictionaries['Geography']) == ['Northeast', 'Southeast', 'West']
+    assert store.table('claims').array('Geography').dtype == np.int8
+
+    west = store.dictionaries['Geography'].get_loc('West')
+    claims_geo = store.table('claims')['Geography']
+    assert (claims_geo[store.table('claims').array('Geography') == west] == 'West').all()
+
+
+def test_frame_is_zero_copy(sample_tables, tmp_path):
+    """Test that frames and the KPI calculator share the mapped arrays."""
+    compile_snapshot(str(tmp_path), sample_tables)
+    exposure = load_snapshot(str(tmp_path)).table('exposure')
+
+    frame = exposure.to_frame(['PolicyID', 'Period', 'EarnedPremium', 'ExposureUnits', 'Geography'])
+    assert 'PeriodOrdinal' in frame.columns
+
+    calculator = SegmentKPICalculator(sample_tables['policies'], sample_tables['claims'], frame)
+    assert np.shares_memory(
+        calculator.exposure_df['EarnedPremium'].to_numpy(),
+        exposure.array('EarnedPremium')
+    )
+
+
+def test_facts_use_snapshot_codes(sample_tables, tmp_path):
+    """Test that policy keys and consistent segment columns are the mapped codes, not gathers."""
+    compile_snapshot(str(tmp_path), sample_tables)
+    store = load_snapshot(str(tmp_path))
+    exposure = store.table('exposure')
+
+    calculator = SegmentKPICalculator(store.frame('policies'), store.frame('claims'), store.frame('exposure'))
+    facts = calculator.exposure_df
+    assert np.shares_memory(facts['PolicyKey'].to_numpy(), exposure.array('PolicyID'))
+    assert np.shares_memory(facts['Geography'].cat.codes.to_numpy(), exposure.array('Geography'))
+
+    # Claims carry a Geography that disagrees with their policies: the dimension wins
+    assert 'Geography' not in calculator.claims_df.columns
+
+    exposure_view, _ = calculator._select()
+    assert np.shares_memory(exposure_view['Geography'].cat.codes.to_numpy(), exposure.array('Geography'))
+    assert exposure_view['PolicyID'].astype(str).tolist() == exposure['PolicyID'].astype(str).tolist()
+
+
+def test_kpis_match_pandas_path(sample_tables, tmp_path):
+    """Test that KPIs from the snapshot equal KPIs from the source tables."""
+    compile_snapshot(str(tmp_path), sample_tables)
+    store = load_snapshot(str(tmp_path))
+
+    expected = SegmentKPICalculator(
+        sample_tables['policies'], sample_tables['claims'], sample_tables['exposure']
+    )
+    actual = SegmentKPICalculator(store.frame('policies'), store.frame('claims'), store.frame('exposure'))
+
+    selection = {'start_period': '2023-03', 'end_period': '2023-10', 'segment_filters': {'Geography': ['West', 'Northeast']}}
+    for kwargs in [{}, selection]:
+        left = expected.calculate_kpis_by_segment('Geography', include_credibility=True, **kwargs)
+        right = actual.calculate_kpis_by_segment('Geography', include_credibility=True, **kwargs)
+        left['Geography'] = left['Geography'].astype(object)
+        right['Geography'] = right['Geography'].astype(object)
+
+        pd.testing.assert_frame_equal(left.reset_index(drop=True), right.reset_index(drop=True), check_dtype=False)
+        assert expected.calculate_overall_kpis(**kwargs) == actual.calculate_overall_kpis(**kwargs)
+
+
+def test_triangle_from_snapshot(sample_tables, tmp_path):
+    """Test the loss triangle over snapshot columns."""
+    compile_snapshot(str(tmp_path), sample_tables)
+    claims = load_snapshot(str(tmp_path)).frame('claims')
+
+    expected = calculate_loss_triangle(sample_tables['claims'], max_dev_months=24)
+    actual = calculate_loss_triangle(claims, max_dev_months=24)
+
+    pd.testing.assert_frame_equal(
+        pd.DataFrame(expected['cumulative_triangle']),
+        pd.DataFrame(actual['cumulative_triangle'])
+    )
+    assert actual['summary_stats']['total_reported'] == pytest.approx(
+        expected['summary_stats']['total_reported']
+    )
+
+
+def test_recompile_replaces_snapshot(sample_tables, tmp_path):
+    """Test that compiling again swaps in the new snapshot."""
+    compile_snapshot(str(tmp_path), sample_tables)
+
+    tables = dict(sample_tables, claims=sample_tables['claims'].head(10))
+    compile_snapshot(str(tmp_path), tables)
+
+    assert len(load_snapshot(str(tmp_path)).table('claims')) == 10
+    assert not os.path.exists(os.path.join(str(tmp_path), 'snapshot.tmp'))
+
+
+
+def test_changed_source_refuses_snapshot(sample_tables, tmp_path):
+    """Test that a source edited after compiling is not shadowed by the snapshot."""
+    data_dir = str(tmp_path)
+    sample_tables['claims'].to_csv(tmp_path / 'claims.csv', index=False)
+    compile_snapshot(data_dir, sample_tables)
+    assert changed_sources(data_dir) == []
+
+    sample_tables['claims'].head(10).to_csv(tmp_path / 'claims.csv', index=False)
+    sample_tables['policies'].to_csv(tmp_path / 'policies.csv', index=False)
+    assert changed_sources(data_dir) == ['claims.csv', 'policies.csv']
+
+    with pytest.raises(StaleSourceError, match='compile_snapshot.py'):
+        load_snapshot(data_dir)
+
+    compile_snapshot(data_dir, sample_tables)
+    assert len(load_snapshot(data_dir).table('claims')) == 40
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,131 @@
+"""
+Unit tests for compiled trees service.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from lightgbm import LGBMRegressor
+
+from services.compiled_trees import CompiledTreeModel, compile_model
+from services.prediction import PredictionService, batch_frame, encode_features
+
+
+def training_data(n: int = 2000, seed: int = 0):
+    """Random regression data with zeros and missing values."""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 4))
+    X[:, 1] = rng.integers(0, 6, size=n)
+    X[rng.random(n) < 0.2, 2] = 0.0
+    y = 3 * X[:, 0] + X[:, 1] ** 2 + np.abs(X[:, 2]) + rng.normal(size=n)
+    X[rng.random(n) < 0.1, 3] = np.nan
+    return X, y
+
+
+def fit(X, y, **params):
+    """Small LightGBM regressor."""
+    params = {'n_estimators': 40, 'num_leaves': 15, 'random_state': 0, 'verbose': -1, **params}
+    return LGBMRegressor(**params).fit(X, y)
+
+
+def test_bit_for_bit_parity():
+    """Test that compiled predictions equal LightGBM's exactly."""
+    X, y = training_data()
+    model = fit(X, y)
+    compiled = CompiledTreeModel(model)
+
+    assert compiled.num_trees == 40
+    for rows in (X[:1], X[:17], X[:1000]):
+        np.testing.assert_array_equal(compiled.predict(rows), model.predict(rows))
+
+
+def test_missing_value_handling():
+    """Test NaN and zero handling for each missing value mode."""
+    X, y = training_data(seed=1)
+    probe = X[:500].copy()
+    probe[::3, 0] = np.nan
+    probe[1::4, 2] = 0.0
+
+    for params in ({}, {'zero_as_missing': True}, {'use_missing': False}):
+        model = fit(X, y, **params)
+        np.testing.assert_array_equal(CompiledTreeModel(model).predict(probe), model.predict(probe))
+
+
+def test_exp_objective():
+    """Test that log-link objectives are transformed like LightGBM's output."""
+    X, y = training_data(seed=2)
+    model = fit(X, np.exp(y / 10), objective='poisson')
+
+    np.testing.assert_allclose(CompiledTreeModel(model).predict(X[:200]), model.predict(X[:200]), rtol=1e-12)
+
+
+def test_models_compiled_together():
+    """Test that models compiled together give one exact column per model."""
+    X, y = training_data(seed=3)
+    models = [fit(X, y, objective='quantile', alpha=alpha) for alpha in (0.1, 0.5, 0.9)]
+    compiled = CompiledTreeModel(models)
+
+    assert compiled.info()['models'] == 3
+    assert compiled.num_trees == 120
+    expected = np.column_stack([model.predict(X) for model in models])
+    np.testing.assert_array_equal(compiled.predict(X[:300]), expected[:300])
+    np.testing.assert_array_equal(CompiledTreeModel(models, max_rows=10).predict(X), expected)
+
+    with pytest.raises(ValueError, match='share'):
+        CompiledTreeModel([models[0], fit(X[:, :3], y)])
+
+
+def test_large_batches_use_lightgbm():
+    """Test that batches above max_rows are delegated to the original model."""
+    X, y = training_data()
+    model = fit(X, y)
+    compiled = CompiledTreeModel(model, max_rows=10)
+
+    np.testing.assert_array_equal(compiled.predict(X), model.predict(X))
+    with pytest.raises(ValueError, match='features'):
+        compiled.predict(X[:, :3])
+
+
+def test_unsupported_models_are_not_compiled():
+    """Test that categorical splits fall back to LightGBM predict."""
+    X, y = training_data()
+    frame = pd.DataFrame(X, columns=['a', 'b', 'c', 'd'])
+    frame['b'] = frame['b'].astype('category')
+    model = fit(frame, y)
+
+    with pytest.raises(ValueError, match='Categorical'):
+        CompiledTreeModel(model)
+    assert compile_model(model) is None
+    assert compile_model(object()) is None
+
+
+def test_trained_models_parity():
+    """Test compiled trained models against LightGBM on the policy data."""
+    service = PredictionService(models_dir="models", compile_models=True)
+    if not service.compiled:
+        pytest.skip("Needs trained models")
+
+    policies_path = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'policies.csv')
+    if not os.path.exists(policies_path):
+        pytest.skip("Needs generated data")
+    features = encode_features(batch_frame(pd.read_csv(policies_path)))
+
+    models = [('loss_ratio', service.lr_model), ('severity', service.severity_model)]
+    models += list(service.interval_models.items())
+    for name, model in models:
+        compiled = service.compiled[name]
+        compiled.max_rows = len(features)
+        np.testing.assert_array_equal(compiled.predict(features), model.predict(features))
+        np.testing.assert_array_equal(compiled.predict(features[:1]), model.predict(features[:1]))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,133 @@
+"""
+Unit tests for credibility service.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.credibility import (
+    BuhlmannStraubCredibility,
+    buhlmann_straub,
+    calculate_credibility_loss_ratios
+)
+from services.segment_kpis import SegmentKPICalculator
+
+
+@pytest.fixture
+def sample_data():
+    """Create claims and exposure data with one large and one thin segment."""
+    np.random.seed(42)
+
+    exposure = []
+    for geography, premium in [('Northeast', 100000.0), ('Midwest', 80000.0), ('West', 2000.0)]:
+        for month in range(12):
+            exposure.append({
+                'PolicyID': f'POL-{geography}',
+                'Period': f'2023-{month + 1:02d}',
+                'EarnedPremium': premium,
+                'ExposureUnits': 10.0,
+                'Geography': geography
+            })
+
+    claims = []
+    for i in range(60):
+        geography = ['Northeast', 'Midwest', 'West'][i % 3]
+        claims.append({
+            'ClaimID': f'CLM{i:04d}',
+            'PolicyID': f'POL-{geography}',
+            'LossDate': f'2023-{(i % 12) + 1:02d}-15',
+            'Geography': geography,
+            'IncurredAmount': np.random.uniform(5000, 50000) * (0.2 if geography == 'West' else 1.0),
+            'PaidAmount': 0.0
+        })
+
+    return pd.DataFrame(claims), pd.DataFrame(exposure)
+
+
+def test_credibility_factors_bounded(sample_data):
+    """Test that credibility factors lie in [0, 1]."""
+    claims_df, exposure_df = sample_data
+
+    result = BuhlmannStraubCredibility(claims_df, exposure_df).calculate('Geography')
+
+    assert len(result) == 3
+    assert all(result['CredibilityFactor'] >= 0)
+    assert all(result['CredibilityFactor'] <= 1)
+
+
+def test_thin_segment_gets_less_credibility(sample_data):
+    """Test that the low-premium segment is shrunk the most."""
+    claims_df, exposure_df = sample_data
+
+    result = BuhlmannStraubCredibility(claims_df, exposure_df).calculate('Geography')
+    factors = result.set_index('Geography')['CredibilityFactor']
+
+    assert factors['West'] <= factors['Midwest'] <= factors['Northeast']
+
+
+def test_estimate_between_raw_and_collective(sample_data):
+    """Test that credibility estimates lie between raw and collective loss ratios."""
+    claims_df, exposure_df = sample_data
+
+    result = calculate_credibility_loss_ratios(claims_df, exposure_df, 'Geography')
+    collective = result.attrs['structural_parameters']['collective_mean'] * 100
+
+    raw = (
+        claims_df.groupby('Geography')['IncurredAmount'].sum()
+        / exposure_df.groupby('Geography')['EarnedPremium'].sum() * 100
+    )
+
+    for _, row in result.iterrows():
+        low, high = sorted([raw[row['Geography']], collective])
+        assert low - 0.01 <= row['CredibilityLossRatio'] <= high + 0.01
+
+
+def test_buhlmann_straub_known_values():
+    """Test the estimator against a hand-computed example."""
+    weights = np.array([[1.0, 1.0], [1.0, 1.0]])
+    losses = np.array([[1.0, 3.0], [5.0, 7.0]])
+
+    result = buhlmann_straub(losses, weights)
+    params = result['structural_parameters']
+
+    # Segment means 2 and 6; within variance (1 + 1 + 1 + 1) / 2 = 2
+    assert params['within_variance'] == pytest.approx(2.0)
+    # Between: (2 * 4 + 2 * 4 - 2) / (4 - 8 / 4) = 7
+    assert params['between_variance'] == pytest.approx(7.0)
+    np.testing.assert_allclose(result['credibility_factors'], [2 / (2 + 2 / 7)] * 2)
+
+
+def test_no_between_variance_gives_collective_mean():
+    """Test that identical segments are fully pooled."""
+    weights = np.ones((3, 4))
+    losses = np.tile([1.0, 2.0, 1.0, 2.0], (3, 1))
+
+    result = buhlmann_straub(losses, weights)
+
+    np.testing.assert_allclose(result['credibility_factors'], 0.0)
+    np.testing.assert_allclose(result['credibility_estimates'], 1.5)
+
+
+def test_kpis_include_credibility_columns(sample_data):
+    """Test credibility columns on segment KPIs."""
+    claims_df, exposure_df = sample_data
+    policies_df = pd.DataFrame({'PolicyID': exposure_df['PolicyID'].unique()})
+
+    calculator = SegmentKPICalculator(policies_df, claims_df, exposure_df)
+    kpis = calculator.calculate_kpis_by_segment('Geography', include_credibility=True)
+
+    assert 'CredibilityFactor' in kpis.columns
+    assert 'CredibilityLossRatio' in kpis.columns
+    assert 'credibility' in kpis.attrs
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
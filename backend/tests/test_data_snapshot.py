@@ -0,0 +1,208 @@
+"""
+Unit tests for data snapshot service.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.data_snapshot import DataSnapshot, SnapshotManager, data_version
+from services.storage import StaleSourceError, write_parquet_table
+from tests.conftest import write_data
+
+
+def test_data_version_changes_with_files(data_dir):
+    """Test that rewriting an input file changes the version."""
+    before = data_version(data_dir)
+    assert data_version(data_dir) == before
+
+    write_data(data_dir, n_claims=12)
+
+    assert data_version(data_dir) != before
+
+
+def test_data_version_ignores_touch(data_dir):
+    """Test that the version follows contents, not modification times."""
+    before = data_version(data_dir)
+
+    os.utime(os.path.join(data_dir, 'claims.csv'), (0, 0))
+
+    assert data_version(data_dir) == before
+
+
+def import_claims(data_dir):
+    """Convert claims.csv to Parquet, as scripts/import_data.py does."""
+    write_parquet_table(pd.read_csv(os.path.join(data_dir, 'claims.csv')), data_dir, 'claims')
+
+
+def test_data_version_covers_only_files_read(data_dir):
+    """Test that a CSV shadowed by Parquet is checked rather than fingerprinted."""
+    pytest.importorskip('pyarrow')
+    import_claims(data_dir)
+    before = data_version(data_dir)
+    assert DataSnapshot.load(data_dir).source == 'parquet'
+
+    write_data(data_dir, n_claims=12)
+
+    assert data_version(data_dir) == before
+    with pytest.raises(StaleSourceError, match='claims.csv'):
+        DataSnapshot.load(data_dir)
+
+
+def test_snapshot_load(data_dir):
+    """Test loading a snapshot from CSV."""
+    snapshot = DataSnapshot.load(data_dir)
+
+    assert snapshot.source == 'csv'
+    assert snapshot.version == data_version(data_dir)
+    assert len(snapshot.claims_df) == 10
+    assert snapshot.kpi_calculator.calculate_overall_kpis()['claim_count'] == 10
+
+
+def test_snapshot_load_timings_and_warm_cache(data_dir):
+    """Test that load records stage timings and precomputes the default triangle."""
+    snapshot = DataSnapshot.load(data_dir)
+
+    assert set(snapshot.timings) == {
+        'fingerprint', 'parse', 'read_policies', 'read_claims', 'read_exposure', 'prepare', 'cache_warm'
+    }
+    assert ('loss_triangle', 'IncurredAmount', 36) in snapshot._results
+    assert snapshot.loss_triangle() is snapshot.loss_triangle()
+
+
+def test_cached_results_are_per_snapshot(data_dir):
+    """Test that cached results are computed once per snapshot."""
+    snapshot = DataSnapshot.load(data_dir)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert snapshot.cached('key', compute) == 1
+    assert snapshot.cached('key', compute) == 1
+    assert DataSnapshot.load(data_dir).cached('key', compute) == 2
+
+
+def test_background_reload_swaps_snapshot(data_dir):
+    """Test that a reload swaps in new data while old references stay valid."""
+    manager = SnapshotManager(data_dir)
+    old = manager.load()
+
+    write_data(data_dir, n_claims=20)
+    assert manager.is_stale()
+    assert manager.reload()
+    manager.wait(30)
+
+    assert manager.current is not old
+    assert len(manager.current.claims_df) == 20
+    assert len(old.claims_df) == 10
+    assert manager.info()['reload_status'] == 'idle'
+    assert not manager.is_stale()
+
+
+def test_failed_reload_keeps_current_snapshot(data_dir):
+    """Test that a broken input leaves the old snapshot serving."""
+    manager = SnapshotManager(data_dir)
+    old = manager.load()
+
+    os.remove(os.path.join(data_dir, 'claims.csv'))
+    manager.reload()
+    manager.wait(30)
+
+    assert manager.current is old
+    assert manager.info()['reload_status'] == 'failed'
+    assert manager.info()['last_error']
+
+
+def test_watcher_reloads_on_change(data_dir):
+    """Test that the watcher picks up changed files."""
+    manager = SnapshotManager(data_dir)
+    manager.load()
+    manager.watch(0.05)
+
+    try:
+        write_data(data_dir, n_claims=15)
+        deadline = time.time() + 30
+        while len(manager.current.claims_df) != 15 and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        manager.stop()
+
+    assert len(manager.current.claims_df) == 15
+
+
+def test_watcher_skips_failed_version(data_dir, monkeypatch):
+    """Test that the watcher does not retry a failed version until the inputs change."""
+    manager = SnapshotManager(data_dir)
+    manager.load()
+    reloads = []
+    reload = manager.reload
+    monkeypatch.setattr(manager, 'reload', lambda: reloads.append(1) or reload())
+
+    os.remove(os.path.join(data_dir, 'claims.csv'))
+    manager.watch(0.05)
+    try:
+        deadline = time.time() + 30
+        while manager.status != 'failed' and time.time() < deadline:
+            time.sleep(0.05)
+        failed = manager.info()['failed_version']
+        time.sleep(0.5)
+        assert len(reloads) == 1
+        assert failed is not None
+
+        # Restore claims in one atomic step so the watcher never sees a half-written file
+        staging = os.path.join(data_dir, 'staging')
+        os.makedirs(staging)
+        write_data(staging, n_claims=12)
+        os.replace(os.path.join(staging, 'claims.csv'), os.path.join(data_dir, 'claims.csv'))
+        deadline = time.time() + 30
+        while len(manager.current.claims_df) != 12 and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        manager.stop()
+
+    assert len(manager.current.claims_df) == 12
+    assert len(reloads) == 2
+    assert manager.info()['failed_version'] is None
+
+
+
+def test_watcher_reports_changed_shadowed_source(data_dir):
+    """Test that the watcher reports an edit hidden by Parquet and reloads once it is imported."""
+    pytest.importorskip('pyarrow')
+    import_claims(data_dir)
+    manager = SnapshotManager(data_dir)
+    old = manager.load()
+    manager.watch(0.05)
+
+    try:
+        write_data(data_dir, n_claims=12)
+        deadline = time.time() + 30
+        while manager.status != 'failed' and time.time() < deadline:
+            time.sleep(0.05)
+        assert 'import_data.py' in manager.info()['last_error']
+        assert manager.current is old
+
+        import_claims(data_dir)
+        deadline = time.time() + 30
+        while len(manager.current.claims_df) != 12 and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        manager.stop()
+
+    assert len(manager.current.claims_df) == 12
+    assert manager.info()['reload_status'] == 'idle'
+    assert manager.info()['last_error'] is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
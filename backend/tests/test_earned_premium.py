@@ -0,0 +1,109 @@
+"""
+Unit tests for earned premium service.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.earned_premium import EarnedPremiumEngine
+from services.segment_kpis import SegmentKPICalculator
+
+
+@pytest.fixture
+def sample_policies():
+    """Create policies with mid-month effective dates."""
+    return pd.DataFrame([
+        {'PolicyID': 'POL0001', 'EffectiveDate': '2023-01-01', 'Geography': 'Northeast',
+         'Industry': 'Retail', 'PolicySize': 'Small', 'RiskRating': 5.0,
+         'AnnualPremium': 36500.0, 'ExposureUnits': 10.0},
+        {'PolicyID': 'POL0002', 'EffectiveDate': '2023-03-16', 'Geography': 'West',
+         'Industry': 'Office', 'PolicySize': 'Large', 'RiskRating': 7.0,
+         'AnnualPremium': 73000.0, 'ExposureUnits': 50.0},
+        {'PolicyID': 'POL0003', 'EffectiveDate': '2024-06-10', 'Geography': 'West',
+         'Industry': 'Retail', 'PolicySize': 'Medium', 'RiskRating': 4.0,
+         'AnnualPremium': 20000.0, 'ExposureUnits': 20.0},
+    ])
+
+
+def test_full_term_earns_annual_premium(sample_policies):
+    """Test that a complete 12-month term earns exactly the annual premium."""
+    engine = EarnedPremiumEngine(sample_policies, term_months=12, as_of='2025-12-31')
+
+    earned = engine.earned().set_index('PolicyID')
+
+    np.testing.assert_allclose(earned['EarnedPremium'], sample_policies['AnnualPremium'].values)
+    np.testing.assert_allclose(earned['ExposureUnits'], sample_policies['ExposureUnits'].values * 12)
+
+
+def test_mid_month_effective_date_is_pro_rata(sample_policies):
+    """Test daily pro-rata earning for a partial first month."""
+    engine = EarnedPremiumEngine(sample_policies, term_months=12, as_of='2025-12-31')
+
+    march = engine.earned('2023-03', '2023-03').set_index('PolicyID')
+
+    # POL0002's term spans 29 Feb 2024 (366 days); in force 16 days of March
+    assert march.loc['POL0002', 'EarnedPremium'] == pytest.approx(73000.0 * 16 / 366)
+    assert march.loc['POL0001', 'EarnedPremium'] == pytest.approx(36500.0 * 31 / 365)
+    assert 'POL0003' not in march.index
+
+
+def test_valuation_date_caps_earning(sample_policies):
+    """Test that nothing is earned after the valuation date."""
+    engine = EarnedPremiumEngine(sample_policies, term_months=12, as_of='2023-01-31')
+
+    earned = engine.earned().set_index('PolicyID')
+
+    assert list(earned.index) == ['POL0001']
+    assert earned.loc['POL0001', 'EarnedPremium'] == pytest.approx(36500.0 * 31 / 365)
+
+
+def test_monthly_breakdown_adds_up(sample_policies):
+    """Test that monthly earned premium sums to the window total."""
+    engine = EarnedPremiumEngine(sample_policies)
+
+    total = engine.earned('2023-01', '2024-12')
+    monthly = engine.earned_by_period(['Geography'], '2023-01', '2024-12')
+
+    assert monthly['EarnedPremium'].sum() == pytest.approx(total['EarnedPremium'].sum())
+    assert monthly['ExposureUnits'].sum() == pytest.approx(total['ExposureUnits'].sum())
+    assert set(monthly['Geography']) == {'Northeast', 'West'}
+
+
+def test_segment_filters(sample_policies):
+    """Test segment filters restrict the earning policies."""
+    engine = EarnedPremiumEngine(sample_policies)
+
+    earned = engine.earned(segment_filters={'Geography': ['West']})
+
+    assert set(earned['PolicyID']) == {'POL0002', 'POL0003'}
+
+
+def test_calculator_without_exposure_table(sample_policies):
+    """Test segment KPIs computed from policy terms only."""
+    claims_df = pd.DataFrame([
+        {'ClaimID': 'CLM0001', 'PolicyID': 'POL0002', 'LossDate': '2023-05-01',
+         'Geography': 'West', 'Industry': 'Office', 'PolicySize': 'Large', 'RiskRating': 7.0,
+         'IncurredAmount': 10000.0, 'PaidAmount': 5000.0}
+    ])
+
+    calculator = SegmentKPICalculator(sample_policies, claims_df)
+    kpis = calculator.calculate_kpis_by_segment('Geography', include_credibility=True)
+
+    assert calculator.exposure_df is None
+    assert set(kpis['Geography']) == {'Northeast', 'West'}
+    assert kpis.loc[kpis['Geography'] == 'West', 'ClaimCount'].iloc[0] == 1
+
+    trends = calculator.calculate_trend_analysis('Geography')
+    assert set(trends['TimePeriod']) >= {2023, 2024}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
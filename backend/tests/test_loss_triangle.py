@@ -144,6 +144,23 @@ def test_empty_claims():
     assert len(triangle) == 0
 
 
+def test_claims_missing_dates_are_left_out(sample_claims_data):
+    """Test that claims without a loss or report date do not create accident years."""
+    claims = sample_claims_data.copy()
+    claims.loc[0, 'LossDate'] = None
+    claims.loc[1, 'ReportDate'] = None
+
+    triangle = LossTriangleCalculator(claims, max_dev_months=12).get_triangle_by_accident_year(
+        triangle_type='incremental'
+    )
+    expected = LossTriangleCalculator(
+        sample_claims_data.iloc[2:], max_dev_months=12
+    ).get_triangle_by_accident_year(triangle_type='incremental')
+
+    assert list(triangle.index) == [2023]
+    pd.testing.assert_frame_equal(triangle, expected)
+
+
 def test_paid_vs_incurred(sample_claims_data):
     """Test triangle for paid vs incurred amounts."""
     calculator = LossTriangleCalculator(sample_claims_data, max_dev_months=12)
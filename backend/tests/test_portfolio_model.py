@@ -0,0 +1,123 @@
+"""
+Unit tests for portfolio model service.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.portfolio_model import POLICY_KEY, PolicyDimension
+from services.segment_kpis import SegmentKPICalculator
+
+
+@pytest.fixture
+def policies():
+    """Create sample policies."""
+    return pd.DataFrame({
+        'PolicyID': ['POL003', 'POL001', 'POL002'],
+        'Geography': ['West', 'Northeast', 'West'],
+        'Industry': ['Retail', 'Office', 'Office'],
+        'RiskRating': [5.0, 3.5, 7.0]
+    })
+
+
+@pytest.fixture
+def exposure():
+    """Create sample exposure rows with segment columns repeated per row."""
+    return pd.DataFrame({
+        'PolicyID': ['POL001', 'POL002', 'POL003', 'POL001', 'POL009'],
+        'Period': ['2023-01', '2023-01', '2023-02', '2023-02', '2023-02'],
+        'EarnedPremium': [100.0, 200.0, 300.0, 400.0, 500.0],
+        'ExposureUnits': [1.0, 1.0, 1.0, 1.0, 1.0],
+        'Geography': ['Northeast', 'West', 'West', 'Northeast', 'Midwest'],
+        'Industry': ['Office', 'Office', 'Retail', 'Office', 'Retail'],
+        'PolicySize': ['Small', 'Large', 'Small', 'Small', 'Large']
+    })
+
+
+def test_fact_keeps_only_key_and_measures(policies, exposure):
+    """Test that facts drop PolicyID and segment columns for an int32 key."""
+    dimension = PolicyDimension.from_frames(policies, exposure)
+    fact = dimension.to_fact(exposure)
+
+    assert list(fact.columns) == [POLICY_KEY, 'Period', 'EarnedPremium', 'ExposureUnits']
+    assert fact[POLICY_KEY].dtype == np.int32
+    assert isinstance(fact['Period'].dtype, pd.CategoricalDtype)
+    assert np.shares_memory(fact['EarnedPremium'].to_numpy(), exposure['EarnedPremium'].to_numpy())
+
+
+def test_gather_restores_segments(policies, exposure):
+    """Test that gathered attributes equal the denormalized columns."""
+    dimension = PolicyDimension.from_frames(policies, exposure)
+    view = dimension.view(dimension.to_fact(exposure))
+
+    for column in ['PolicyID', 'Geography', 'Industry', 'PolicySize']:
+        assert list(view[column].astype(object)) == list(exposure[column])
+    assert list(view['RiskRating'][:4]) == [3.5, 7.0, 5.0, 3.5]
+    assert np.isnan(view['RiskRating'].iloc[4])
+
+
+def test_unknown_policies_and_categorical_ids(policies):
+    """Test key lookup for unknown and dictionary-encoded policy IDs."""
+    dimension = PolicyDimension.from_frames(policies)
+    ids = pd.Series(pd.Categorical(['POL002', 'POL404', 'POL003', None]))
+
+    keys = dimension.keys(ids)
+
+    assert list(keys) == [2, -1, 0, -1]
+    assert dimension.gather('Geography', keys).isna().tolist() == [False, True, False, True]
+
+
+def test_select_is_evaluated_per_policy(policies):
+    """Test that filters produce a key mask that excludes unknown policies."""
+    dimension = PolicyDimension.from_frames(policies)
+
+    mask = dimension.select({'Geography': ['West'], 'Industry': ['Office']})
+
+    assert dimension.select(None) is None
+    assert list(mask) == [False, False, True, False]
+    with pytest.raises(ValueError):
+        dimension.select({'PolicySize': ['Small']})
+
+
+def test_totals_per_policy(policies, exposure):
+    """Test per-policy sums by key."""
+    dimension = PolicyDimension.from_frames(policies)
+    keys = dimension.keys(exposure['PolicyID'])
+
+    np.testing.assert_allclose(dimension.totals(keys, exposure['EarnedPremium']), [300.0, 500.0, 200.0])
+    np.testing.assert_allclose(dimension.totals(keys), [1.0, 2.0, 1.0])
+
+
+def test_calculator_reads_through_dimension(policies, exposure):
+    """Test that segment KPIs from the normalized facts match the inputs."""
+    claims = pd.DataFrame({
+        'ClaimID': ['CLM1', 'CLM2'],
+        'PolicyID': ['POL001', 'POL003'],
+        'LossDate': ['2023-01-10', '2023-02-10'],
+        'IncurredAmount': [50.0, 90.0],
+        'PaidAmount': [20.0, 30.0]
+    })
+    calculator = SegmentKPICalculator(policies, claims, exposure)
+
+    assert 'Geography' not in calculator.exposure_df.columns
+    kpis = calculator.calculate_kpis_by_segment('Geography').set_index('Geography')
+
+    expected = exposure.groupby('Geography')['EarnedPremium'].sum()
+    assert kpis['EarnedPremium'].to_dict() == expected.to_dict()
+    assert kpis.loc['West', 'IncurredLoss'] == 90.0
+
+    filtered = calculator.calculate_overall_kpis(segment_filters={'Industry': ['Office']})
+    assert filtered['total_earned_premium'] == 700.0
+    assert filtered['claim_count'] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -5,13 +5,21 @@ Author: Actuarial Insights Workbench Team
 """
 
 import pytest
+import pandas as pd
+import numpy as np
 import sys
 import os
+import joblib
+import threading
 
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from services.prediction import PredictionService
+from services import prediction
+from services.prediction import QUANTILE_MODEL_FILES
+from services.prediction import (
+    MicroBatcher, PredictionCache, PredictionService, batch_frame, encode_features, encode_row, parse_rounding
+)
 
 
 @pytest.fixture
@@ -148,15 +156,394 @@ def test_confidence_intervals(prediction_service, sample_input):
     lr_result = prediction_service.predict_loss_ratio(sample_input)
     sev_result = prediction_service.predict_severity(sample_input)
 
-    # Check LR confidence interval
+    # Check LR confidence interval (quantile intervals may end at the
+    # prediction, e.g. when most policies have no claims)
     lr_ci = lr_result['confidence_interval']
-    assert lr_ci[0] < lr_result['predicted_loss_ratio']
-    assert lr_ci[1] > lr_result['predicted_loss_ratio']
+    assert lr_ci[0] <= lr_result['predicted_loss_ratio'] <= lr_ci[1]
+    assert lr_ci[0] < lr_ci[1]
 
     # Check severity confidence interval
     sev_ci = sev_result['confidence_interval']
-    assert sev_ci[0] < sev_result['predicted_severity']
-    assert sev_ci[1] > sev_result['predicted_severity']
+    assert sev_ci[0] <= sev_result['predicted_severity'] <= sev_ci[1]
+    assert sev_ci[0] < sev_ci[1]
+
+
+def test_encode_features_matches_single_rows(prediction_service, sample_input):
+    """Test that the vectorized encoder matches per-row preparation."""
+    rows = [
+        sample_input,
+        dict(sample_input, geography='West', industry='Technology', policy_size='Enterprise'),
+        dict(sample_input, geography='Atlantis', industry='Mining', policy_size='Huge')
+    ]
+
+    matrix = encode_features(batch_frame(rows))
+
+    expected = pd.concat([prediction_service.prepare_features(row) for row in rows])
+    np.testing.assert_array_equal(matrix, expected.to_numpy(dtype=float))
+
+
+def test_predict_batch_matches_single_predictions(prediction_service, sample_input):
+    """Test batch predictions, column aliases and metrics."""
+    rows = pd.DataFrame([
+        sample_input,
+        dict(sample_input, risk_rating=9.0, policy_size='Large'),
+        dict(sample_input, geography='Southwest', annual_premium=125000.37)
+    ]).rename(columns={'geography': 'Geography', 'annual_premium': 'AnnualPremium'})
+    rows['PolicyID'] = ['POL1', 'POL2', 'POL3']
+
+    result = prediction_service.predict_batch(rows)
+
+    assert result['metrics']['rows'] == 3
+    assert result['metrics']['total_ms'] >= result['metrics']['predict_ms']
+    for prediction, (_, row) in zip(result['predictions'], rows.iterrows()):
+        single = prediction_service.predict_both({
+            'geography': row['Geography'], 'industry': row['industry'],
+            'policy_size': row['policy_size'], 'risk_rating': row['risk_rating'],
+            'exposure_units': row['exposure_units'], 'annual_premium': row['AnnualPremium']
+        })
+        assert prediction['policy_id'] == row['PolicyID']
+        assert prediction['predicted_loss_ratio'] == single['loss_ratio']['predicted_loss_ratio']
+        assert [prediction['loss_ratio_lower'], prediction['loss_ratio_upper']] == \
+            single['loss_ratio']['confidence_interval']
+        assert prediction['predicted_severity'] == single['severity']['predicted_severity']
+        assert [prediction['severity_lower'], prediction['severity_upper']] == \
+            single['severity']['confidence_interval']
+
+
+def test_batch_frame_validation(sample_input):
+    """Test that malformed batches are rejected."""
+    with pytest.raises(ValueError):
+        batch_frame([])
+    with pytest.raises(ValueError, match='annual_premium'):
+        batch_frame([{k: v for k, v in sample_input.items() if k != 'annual_premium'}])
+    with pytest.raises(ValueError, match='risk_rating'):
+        batch_frame([dict(sample_input, risk_rating=12.0)])
+    with pytest.raises(ValueError, match='exposure_units'):
+        batch_frame([dict(sample_input, exposure_units='many')])
+
+
+class CountingModel:
+    """Stand-in model that records the batch sizes it is called with."""
+
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.fail = fail
+
+    def predict(self, features):
+        self.calls.append(len(features))
+        if self.fail:
+            raise RuntimeError("model failed")
+        return np.asarray(features)[:, 0] * 10
+
+
+class ScaledModel(CountingModel):
+    """Stand-in quantile model: the first feature times a factor."""
+
+    def __init__(self, factor: float):
+        super().__init__()
+        self.factor = factor
+
+    def predict(self, features):
+        return super().predict(features) * self.factor
+
+
+def test_quantile_intervals(tmp_path, sample_input):
+    """Test that trained quantile models replace the fixed intervals."""
+    joblib.dump(CountingModel(), tmp_path / 'lr_model.pkl')
+    joblib.dump(
+        {'quantiles': [0.1, 0.5, 0.9], 'models': [ScaledModel(0.5), ScaledModel(1.2), ScaledModel(0.9)]},
+        tmp_path / QUANTILE_MODEL_FILES['loss_ratio_interval']
+    )
+    service = PredictionService(models_dir=str(tmp_path))
+    point = sample_input['risk_rating'] * 10
+
+    result = service.predict_loss_ratio(sample_input)
+    assert result['predicted_loss_ratio'] == point
+    # Crossing quantiles are sorted; the interval covers the point prediction
+    assert result['quantiles'] == {'p10': point * 0.5, 'p50': point * 0.9, 'p90': point * 1.2}
+    assert result['confidence_interval'] == [point * 0.5, point * 1.2]
+
+    # One quantile bundle evaluation per request, shared by predict_both
+    bundle = service.interval_models['loss_ratio_interval']
+    both = service.predict_both(sample_input)
+    assert both['loss_ratio'] == result
+    assert [model.calls for model in bundle.models] == [[1, 1]] * 3
+    assert 'quantiles' not in both['severity']
+
+    scores = service.predict_batch([sample_input, dict(sample_input, risk_rating=2.0)])['predictions']
+    assert [scores[0]['loss_ratio_lower'], scores[0]['loss_ratio_upper']] == result['confidence_interval']
+    assert scores[1]['loss_ratio_upper'] == 24.0
+
+
+class RecordingModel(CountingModel):
+    """Stand-in model that records the matrix and thread of each call."""
+
+    def __init__(self):
+        super().__init__()
+        self.seen = []
+
+    def predict(self, features):
+        self.seen.append((features, threading.current_thread().name))
+        return super().predict(features)
+
+
+def test_evaluate_shares_matrix_across_models(sample_input):
+    """Test that both models see one matrix, concurrently for large batches."""
+    service = PredictionService(models_dir="missing", parallel_min_rows=8)
+    service.lr_model, service.severity_model = RecordingModel(), RecordingModel()
+
+    small = encode_features(batch_frame([sample_input] * 3))
+    large = encode_features(batch_frame([sample_input] * 8))
+    for features in (small, large):
+        predictions = service.evaluate(features, ('loss_ratio', 'severity'))
+        np.testing.assert_array_equal(predictions['loss_ratio'], features[:, 0] * 10)
+        np.testing.assert_array_equal(predictions['severity'], features[:, 0] * 10)
+
+    for model in (service.lr_model, service.severity_model):
+        (small_seen, small_thread), (large_seen, large_thread) = model.seen
+        assert small_seen is small and large_seen is large
+        assert small_thread == threading.current_thread().name
+        assert large_thread.startswith('models')
+
+    assert service.evaluate(small, ('severity',)).keys() == {'severity'}
+
+
+def test_micro_batcher_coalesces_rows(sample_input):
+    """Test that queued rows share one model call and results fan back out."""
+    loss_model, severity_model = CountingModel(), CountingModel()
+    batcher = MicroBatcher({'loss_ratio': loss_model, 'severity': severity_model}, window_ms=50, max_batch_size=8)
+
+    futures = [
+        batcher.submit(encode_row(dict(sample_input, risk_rating=float(i + 1))), models, dict)
+        for i, models in enumerate([('loss_ratio',), ('severity',), ('loss_ratio', 'severity')] * 3)
+    ]
+    results = [future.result(timeout=5) for future in futures]
+    batcher.close()
+
+    assert results[0] == {'loss_ratio': 10.0}
+    assert results[1] == {'severity': 20.0}
+    assert results[2] == {'loss_ratio': 30.0, 'severity': 30.0}
+    # Nine rows with max_batch_size=8: one full batch, then one row
+    assert loss_model.calls == [5, 1]
+    assert severity_model.calls == [5, 1]
+
+    info = batcher.info()
+    assert info['batches'] == 2
+    assert info['rows'] == 9
+    assert info['largest_batch'] == 8
+    assert info['batch_size_histogram'] == {'1': 1, '8-15': 1}
+
+
+def test_micro_batcher_propagates_model_errors(sample_input):
+    """Test that a failing model call fails the waiting futures."""
+    batcher = MicroBatcher({'loss_ratio': CountingModel(fail=True)}, window_ms=1)
+
+    future = batcher.submit(encode_row(sample_input), ('loss_ratio',), dict)
+    with pytest.raises(RuntimeError, match="model failed"):
+        future.result(timeout=5)
+    batcher.close()
+
+
+def test_micro_batched_service_matches_direct(prediction_service, sample_input):
+    """Test that micro-batched predictions equal the direct per-call results."""
+    batched = PredictionService(models_dir="models", batch_window_ms=5)
+    if batched.batcher is None:
+        pytest.skip("Micro-batching needs trained models")
+
+    inputs = [
+        sample_input,
+        dict(sample_input, risk_rating=9.0, policy_size='Large'),
+        dict(sample_input, geography='Southwest', annual_premium=125000.37)
+    ]
+
+    futures = [batched.submit('both', row) for row in inputs]
+    assert [future.result(timeout=5) for future in futures] == \
+        [prediction_service.predict_both(row) for row in inputs]
+    assert batched.predict_loss_ratio(sample_input) == prediction_service.predict_loss_ratio(sample_input)
+    assert batched.predict_severity(sample_input) == prediction_service.predict_severity(sample_input)
+    assert batched.batcher.info()['rows'] == 5
+    batched.batcher.close()
+
+
+def test_prediction_cache_lru():
+    """Test cache hits, partial entries and least-recently-used eviction."""
+    cache = PredictionCache(2)
+
+    assert cache.get((1,), ('loss_ratio',)) is None
+    cache.put((1,), {'loss_ratio': 10.0})
+    assert cache.get((1,), ('loss_ratio', 'severity')) is None
+    cache.put((1,), {'severity': 20.0})
+    assert cache.get((1,), ('loss_ratio', 'severity')) == {'loss_ratio': 10.0, 'severity': 20.0}
+
+    cache.put((2,), {'loss_ratio': 1.0})
+    cache.get((1,), ('loss_ratio',))
+    cache.put((3,), {'loss_ratio': 2.0})
+    assert cache.get((2,), ('loss_ratio',)) is None
+    assert cache.get((1,), ('severity',)) == {'severity': 20.0}
+
+    info = cache.info()
+    assert info['size'] == 2
+    assert (info['hits'], info['misses']) == (3, 3)
+    assert info['hit_rate'] == 0.5
+
+
+def cached_service(models_dir, **options):
+    """Prediction service over joblib-dumped CountingModels."""
+    joblib.dump(CountingModel(), models_dir / 'lr_model.pkl')
+    joblib.dump(CountingModel(), models_dir / 'severity_model.pkl')
+    return PredictionService(models_dir=str(models_dir), cache_size=16, **options)
+
+
+def test_cached_predictions_share_one_lookup(tmp_path, sample_input):
+    """Test that repeated and combined predictions reuse cached model values."""
+    service = cached_service(tmp_path)
+
+    first = service.predict_both(sample_input)
+    assert service.predict_both(dict(sample_input)) == first
+    assert service.predict_loss_ratio(sample_input) == first['loss_ratio']
+    assert service.predict_severity(sample_input) == first['severity']
+
+    # One model call each for the first request, everything else from the cache
+    assert service.lr_model.calls == [1]
+    assert service.severity_model.calls == [1]
+    assert service.cache.info()['hits'] == 3
+    assert service.cache.info()['misses'] == 1
+
+
+def test_cache_rounding(tmp_path, sample_input):
+    """Test that rounded continuous features share a cache entry."""
+    service = cached_service(tmp_path, cache_rounding={'AnnualPremium': -2, 'RiskRating': 0})
+
+    service.predict_loss_ratio(dict(sample_input, annual_premium=25010.0, risk_rating=6.6))
+    service.predict_loss_ratio(dict(sample_input, annual_premium=24990.0, risk_rating=7.4))
+    service.predict_loss_ratio(dict(sample_input, annual_premium=25100.0, risk_rating=7.0))
+
+    assert service.lr_model.calls == [1, 1]
+    assert service.cache.info()['rounding'] == {'AnnualPremium': -2, 'RiskRating': 0}
+
+    with pytest.raises(ValueError, match='Geography'):
+        cached_service(tmp_path, cache_rounding={'Geography': 0})
+    assert parse_rounding(' AnnualPremium=-2, ExposureUnits=0 ') == {'AnnualPremium': -2, 'ExposureUnits': 0}
+    with pytest.raises(ValueError):
+        parse_rounding('AnnualPremium')
+
+
+def test_cache_invalidated_when_models_change(tmp_path, sample_input, monkeypatch):
+    """Test that replacing a model file reloads the models and clears the cache."""
+    monkeypatch.setattr(prediction, 'MODEL_CHECK_INTERVAL', 0.0)
+    service = cached_service(tmp_path)
+    service.predict_both(sample_input)
+    old_model = service.lr_model
+
+    joblib.dump(CountingModel(), tmp_path / 'lr_model.pkl')
+    os.utime(tmp_path / 'lr_model.pkl', ns=(0, 0))
+    service.predict_both(sample_input)
+
+    assert service.lr_model is not old_model
+    assert service.lr_model.calls == [1]
+    assert service.cache.info()['invalidations'] == 1
+    assert service.cache.info()['size'] == 1
+
+
+def test_predictions_from_replaced_models_are_not_cached(tmp_path, sample_input):
+    """Test that a prediction scored while the models were reloaded is not stored."""
+    service = cached_service(tmp_path)
+    evaluate = service.evaluate
+
+    def evaluate_during_reload(features, models):
+        # Another request reloads the models and clears the cache mid-scoring
+        service.cache.clear()
+        return evaluate(features, models)
+
+    service.evaluate = evaluate_during_reload
+    service.predict_both(sample_input)
+    assert service.cache.info()['size'] == 0
+
+    service.evaluate = evaluate
+    service.predict_both(sample_input)
+    assert service.cache.info()['size'] == 1
+
+    generation = service.cache.generation
+    service.cache.clear()
+    service.cache.put((1,), {'loss_ratio': 1.0}, generation)
+    assert service.cache.get((1,), ('loss_ratio',)) is None
+
+
+def test_micro_batched_cache_hits_skip_the_queue(tmp_path, sample_input):
+    """Test that cache hits resolve without queueing on the micro-batcher."""
+    service = cached_service(tmp_path, batch_window_ms=1)
+
+    first = service.submit('both', sample_input).result(timeout=5)
+    future = service.submit('severity', sample_input)
+    assert future.done()
+    assert future.result() == first['severity']
+    assert service.batcher.info()['rows'] == 1
+    service.batcher.close()
+
+
+def lightgbm_service(models_dir, **options):
+    """Prediction service over small LightGBM models fitted on random policies."""
+    from lightgbm import LGBMRegressor
+
+    rng = np.random.default_rng(0)
+    features = encode_features(batch_frame({
+        'geography': rng.choice(list(prediction.GEOGRAPHY_CODES), 500),
+        'industry': rng.choice(list(prediction.INDUSTRY_CODES), 500),
+        'policy_size': rng.choice(list(prediction.POLICY_SIZE_CODES), 500),
+        'risk_rating': rng.uniform(1, 10, 500),
+        'exposure_units': rng.uniform(1, 100, 500),
+        'annual_premium': rng.uniform(1000, 200000, 500),
+    }))
+    features = pd.DataFrame(features, columns=prediction.FEATURE_NAMES)
+    target = 5 * features['RiskRating'] + 3 * features['Geography'] + rng.normal(size=500)
+    for filename, scale in [('lr_model.pkl', 1), ('severity_model.pkl', 1000)]:
+        model = LGBMRegressor(n_estimators=20, num_leaves=7, verbose=-1).fit(features, target * scale)
+        joblib.dump(model, models_dir / filename)
+    return PredictionService(models_dir=str(models_dir), **options)
+
+
+def test_contributions_add_up_to_predictions(tmp_path, sample_input):
+    """Test that contributions plus the base value reproduce each prediction."""
+    service = lightgbm_service(tmp_path)
+    records = [dict(sample_input, risk_rating=r, geography=g) for r, g in [(2.0, 'West'), (9.5, 'Midwest')]]
+    features = encode_features(batch_frame(records))
+
+    contributions = service.contributions(features)
+    for name, model in [('loss_ratio', service.lr_model), ('severity', service.severity_model)]:
+        assert contributions[name].shape == (2, len(prediction.FEATURE_NAMES) + 1)
+        np.testing.assert_allclose(contributions[name].sum(axis=1), model.predict(features), rtol=1e-9)
+
+    explanation = service.explain(sample_input)
+    both = service.predict_both(sample_input)
+    assert explanation['loss_ratio']['prediction'] == both['loss_ratio']['predicted_loss_ratio']
+    assert explanation['severity']['prediction'] == both['severity']['predicted_severity']
+    drivers = explanation['loss_ratio']['drivers']
+    assert [abs(d['contribution']) for d in drivers] == sorted((abs(d['contribution']) for d in drivers), reverse=True)
+    assert next(d for d in drivers if d['feature'] == 'Geography')['value'] == 'Northeast'
+
+    batch = service.predict_batch(records, contributions=True)
+    row = batch['predictions'][1]
+    assert sum(row['loss_ratio_contributions'].values()) == pytest.approx(row['predicted_loss_ratio'], abs=0.01)
+    assert 'severity_contributions' in row
+    assert 'loss_ratio_contributions' not in service.predict_batch(records)['predictions'][0]
+
+
+def test_explanations_are_cached(tmp_path, sample_input):
+    """Test that explanations are cached by encoded row and need LightGBM models."""
+    service = lightgbm_service(tmp_path, explain_cache_size=4)
+    calls = []
+    contributions = service.contributions
+    service.contributions = lambda features, models: calls.append(models) or contributions(features, models)
+
+    first = service.explain(sample_input)
+    assert service.explain(dict(sample_input, unused='field'))['loss_ratio'] == first['loss_ratio']
+    assert service.explain(sample_input, 'severity')['severity'] == first['severity']
+    assert calls == [('loss_ratio', 'severity')]
+    assert service.explain_cache.info()['hits'] == 2
+
+    with pytest.raises(ValueError, match='kind'):
+        service.explain(sample_input, 'frequency')
+    assert cached_service(tmp_path).explain(sample_input)['model_loaded'] is False
 
 
 if __name__ == "__main__":
@@ -0,0 +1,213 @@
+"""
+Unit tests for prediction grid service.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import pytest
+import numpy as np
+import sys
+import os
+import joblib
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.prediction import GRID_AXES, PredictionService, parse_grid
+from services.prediction_grid import CATEGORY, LINEAR, LOG, PredictionGrid
+
+
+class MultilinearModel:
+    """Model linear in each continuous coordinate (log for the last feature), plus category effects."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, features):
+        X = np.asarray(features, dtype=float)
+        self.calls.append(len(X))
+        return 10 * X[:, 0] + 3 * X[:, 1] + X[:, 0] * np.log(X[:, 2]) + 0.5 * X[:, 1] * X[:, 0]
+
+
+class StepModel:
+    """Piecewise constant model, like a tree."""
+
+    def predict(self, features):
+        X = np.asarray(features, dtype=float)
+        return np.where(X[:, 0] > 2.5, 100.0, 0.0) + X[:, 1]
+
+
+class QuantileStub:
+    """Model predicting two columns per row."""
+
+    def predict(self, features):
+        X = np.asarray(features, dtype=float)
+        return np.column_stack([X[:, 0], 2 * X[:, 0]])
+
+
+def axes():
+    """Small test grid: one linear axis, one category axis, one log axis."""
+    return {
+        'rating': (np.linspace(1, 5, 5), LINEAR),
+        'kind': (np.arange(3, dtype=float), CATEGORY),
+        'premium': (np.geomspace(100, 10000, 4), LOG),
+    }
+
+
+def test_multilinear_functions_are_exact():
+    """Test that functions linear per axis interpolate exactly and report no error."""
+    model = MultilinearModel()
+    grid = PredictionGrid({'value': model}, axes())
+
+    rng = np.random.default_rng(0)
+    rows = np.column_stack([rng.uniform(1, 5, 200), rng.integers(0, 3, 200), np.exp(rng.uniform(np.log(100), np.log(10000), 200))])
+    predictions, inside = grid.predict(rows)
+
+    assert inside.all()
+    np.testing.assert_allclose(predictions[:, 0], model.predict(rows), rtol=1e-9)
+    np.testing.assert_allclose(grid.predict_row(list(rows[0])), predictions[0], rtol=1e-12)
+    assert grid.info()['interpolation_error']['value']['max_abs_error'] < 1e-6
+    assert grid.info()['grid_points'] == 5 * 3 * 4
+
+
+def test_step_models_report_interpolation_error():
+    """Test that grid points are exact and errors between them are reported."""
+    grid = PredictionGrid({'value': StepModel(), 'quantiles': QuantileStub()}, axes())
+
+    nodes = np.array([[2.0, 1, 100.0], [3.0, 2, 1000.0]])
+    predictions, _ = grid.predict(nodes)
+    np.testing.assert_allclose(predictions[:, grid.columns['value']], StepModel().predict(nodes))
+    np.testing.assert_allclose(predictions[:, grid.columns['quantiles']], QuantileStub().predict(nodes))
+
+    # Halfway between 2 and 3 the step is blended, not reproduced
+    assert grid.predict_row([2.4, 0, 500.0])[0] == pytest.approx(40.0)
+    errors = grid.info()['interpolation_error']
+    assert errors['value']['max_abs_error'] > 40
+    assert errors['value']['p99_relative_error'] > 0.5
+    assert errors['quantiles']['max_abs_error'] < 1e-9
+    assert grid.enabled == {'value', 'quantiles'}
+
+
+def test_models_over_tolerance_are_disabled():
+    """Test that the error tolerance disables inexact models only."""
+    grid = PredictionGrid({'value': StepModel(), 'quantiles': QuantileStub()}, axes(), max_error=0.05)
+
+    info = grid.info()
+    assert grid.enabled == {'quantiles'}
+    assert (info['max_error'], info['enabled_models'], info['disabled_models']) == (0.05, ['quantiles'], ['value'])
+
+
+def test_rows_outside_the_grid():
+    """Test that rows outside the grid are flagged and counted."""
+    grid = PredictionGrid({'value': StepModel()}, axes(), validation_rows=0)
+
+    rows = np.array([[3.0, 1, 500.0], [6.0, 1, 500.0], [3.0, 3, 500.0], [3.0, 1.5, 500.0], [3.0, 1, 0.0]])
+    _, inside = grid.predict(rows)
+    assert inside.tolist() == [True, False, False, False, False]
+    assert grid.predict_row([3.0, 1, 500.0]) is not None
+    assert grid.predict_row([3.0, 1, 20000.0]) is None
+
+    info = grid.info()
+    assert (info['rows'], info['outside_grid']) == (7, 5)
+    assert info['interpolation_error'] == {}
+
+
+def test_invalid_axes():
+    """Test axis validation."""
+    with pytest.raises(ValueError, match='increasing'):
+        PredictionGrid({'value': StepModel()}, dict(axes(), rating=(np.array([2.0, 1.0]), LINEAR)))
+    with pytest.raises(ValueError, match='codes'):
+        PredictionGrid({'value': StepModel()}, dict(axes(), kind=(np.array([1.0, 2.0]), CATEGORY)))
+    with pytest.raises(ValueError, match='positive'):
+        PredictionGrid({'value': StepModel()}, dict(axes(), premium=(np.array([0.0, 1.0]), LOG)))
+    with pytest.raises(ValueError, match='model'):
+        PredictionGrid({}, axes())
+
+
+class PolicyModel:
+    """Policy-level model: linear in RiskRating, log ExposureUnits and log AnnualPremium."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, features):
+        X = np.asarray(features, dtype=float)
+        self.calls.append(len(X))
+        return 20 + 2 * X[:, 0] + X[:, 1] + 0.5 * X[:, 3] + np.log(X[:, 4]) + 3 * np.log(X[:, 5])
+
+
+def test_service_grid_mode(tmp_path):
+    """Test that grid mode answers in-grid policies without a model call and falls back outside."""
+    joblib.dump(PolicyModel(), tmp_path / 'lr_model.pkl')
+    joblib.dump(PolicyModel(), tmp_path / 'severity_model.pkl')
+    exact = PredictionService(models_dir=str(tmp_path))
+    service = PredictionService(models_dir=str(tmp_path), grid_axes=parse_grid(
+        'RiskRating=1:10:4,ExposureUnits=1:2000:3:log,AnnualPremium=1000:2000000:3:log'
+    ))
+    policy = {
+        'geography': 'West', 'industry': 'Retail', 'policy_size': 'Large',
+        'risk_rating': 6.5, 'exposure_units': 50.0, 'annual_premium': 25000.0
+    }
+
+    calls = list(service.lr_model.calls)
+    result = service.predict_both(policy)
+    assert service.lr_model.calls == calls
+    assert result == exact.predict_both(policy)
+
+    service.predict_loss_ratio(dict(policy, annual_premium=5_000_000.0))
+    assert service.lr_model.calls == calls + [1]
+    assert service.grid.info()['outside_grid'] == 1
+    assert service.grid.info()['axes']['Geography'] == {'points': 6, 'min': 0.0, 'max': 5.0, 'spacing': CATEGORY}
+
+    with pytest.raises(ValueError, match='continuous'):
+        PredictionService(models_dir=str(tmp_path), grid_axes={'Geography': (0, 5, 6, LINEAR)})
+
+
+class StepPolicyModel(PolicyModel):
+    """Policy-level model with a step in RiskRating, like a tree split."""
+
+    def predict(self, features):
+        X = np.asarray(features, dtype=float)
+        return super().predict(features) + np.where(X[:, 0] > 5.5, 50.0, 0.0)
+
+
+def test_service_scores_disabled_models_exactly(tmp_path):
+    """Test that a model over the error tolerance falls back to exact scoring in grid mode."""
+    joblib.dump(PolicyModel(), tmp_path / 'lr_model.pkl')
+    joblib.dump(StepPolicyModel(), tmp_path / 'severity_model.pkl')
+    service = PredictionService(models_dir=str(tmp_path), grid_axes=parse_grid(
+        'RiskRating=1:10:4,ExposureUnits=1:2000:3:log,AnnualPremium=1000:2000000:3:log'
+    ), grid_max_error=0.01)
+    policy = {
+        'geography': 'West', 'industry': 'Retail', 'policy_size': 'Large',
+        'risk_rating': 4.5, 'exposure_units': 50.0, 'annual_premium': 25000.0
+    }
+
+    assert service.grid.info()['disabled_models'] == ['severity']
+    lr_calls, severity_calls = list(service.lr_model.calls), list(service.severity_model.calls)
+
+    service.predict_loss_ratio(policy)
+    assert service.lr_model.calls == lr_calls
+    result = service.predict_severity(policy)
+    assert service.severity_model.calls == severity_calls + [1]
+    expected = StepPolicyModel().predict([service.encode(policy)])[0]
+    assert result['predicted_severity'] == pytest.approx(expected, abs=0.01)
+
+
+def test_parse_grid():
+    """Test grid mode settings."""
+    assert parse_grid('') is None
+    assert parse_grid('0') is None
+    assert parse_grid('1') == GRID_AXES
+    axes = parse_grid('RiskRating=2:8:13, AnnualPremium=500:5000000:24:log')
+    assert axes['RiskRating'] == (2.0, 8.0, 13, LINEAR)
+    assert axes['AnnualPremium'] == (500.0, 5000000.0, 24, LOG)
+    assert axes['ExposureUnits'] == GRID_AXES['ExposureUnits']
+
+    for text in ['Geography=0:5:6', 'RiskRating=1:10', 'RiskRating=a:10:5']:
+        with pytest.raises(ValueError):
+            parse_grid(text)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,200 @@
+"""
+Unit tests for segment cube service.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.segment_cube import SegmentCube
+from services.segment_kpis import SegmentKPICalculator
+
+
+@pytest.fixture
+def sample_data():
+    """Create exposure and claims data over three dimensions."""
+    np.random.seed(42)
+
+    geographies = ['Northeast', 'Southeast', 'Midwest', 'West']
+    industries = ['Manufacturing', 'Retail', 'Office']
+    sizes = ['Small', 'Medium', 'Large']
+
+    policies = []
+    for i in range(120):
+        policies.append({
+            'PolicyID': f'POL{i:04d}',
+            'Geography': geographies[i % 4],
+            'Industry': industries[i % 3],
+            'PolicySize': sizes[(i // 12) % 3],
+            'RiskRating': 5.0,
+            'AnnualPremium': np.random.uniform(10000, 100000),
+            'ExposureUnits': np.random.uniform(10, 100)
+        })
+
+    exposure = []
+    for policy in policies:
+        for month in range(6):
+            exposure.append({
+                'PolicyID': policy['PolicyID'],
+                'Period': f'2023-{month + 1:02d}',
+                'EarnedPremium': policy['AnnualPremium'] / 12,
+                'ExposureUnits': policy['ExposureUnits'],
+                'Geography': policy['Geography'],
+                'Industry': policy['Industry'],
+                'PolicySize': policy['PolicySize'],
+                'RiskRating': policy['RiskRating']
+            })
+
+    claims = []
+    for i in range(80):
+        policy = policies[np.random.randint(0, len(policies))]
+        claims.append({
+            'ClaimID': f'CLM{i:04d}',
+            'PolicyID': policy['PolicyID'],
+            'LossDate': f'2023-{np.random.randint(1, 7):02d}-10',
+            'Geography': policy['Geography'],
+            'Industry': policy['Industry'],
+            'PolicySize': policy['PolicySize'],
+            'RiskRating': policy['RiskRating'],
+            'IncurredAmount': np.random.lognormal(10, 1),
+            'PaidAmount': 0.0
+        })
+
+    return pd.DataFrame(policies), pd.DataFrame(claims), pd.DataFrame(exposure)
+
+
+def test_cube_matches_groupby(sample_data):
+    """Test cube measures against a direct groupby."""
+    _, claims_df, exposure_df = sample_data
+
+    cube = SegmentCube.build(exposure_df, claims_df, ['Geography', 'Industry'])
+    frame = cube.to_frame().set_index(['Geography', 'Industry'])
+
+    expected = exposure_df.groupby(['Geography', 'Industry'])['EarnedPremium'].sum()
+    pd.testing.assert_series_equal(
+        frame['EarnedPremium'].sort_index(),
+        expected.sort_index(),
+        check_names=False
+    )
+    assert frame['ClaimCount'].sum() == len(claims_df)
+
+
+def test_top_matches_full_sort(sample_data):
+    """Test partial-sort ranking against a full sort."""
+    _, claims_df, exposure_df = sample_data
+
+    cube = SegmentCube.build(exposure_df, claims_df, ['Geography', 'Industry', 'PolicySize'])
+    full = cube.to_frame().sort_values('LossRatio', ascending=False, kind='stable')
+
+    top = cube.top('LossRatio', top_n=5)
+
+    assert len(top) == 5
+    np.testing.assert_allclose(top['LossRatio'].values, full['LossRatio'].values[:5])
+
+
+def test_top_ascending_and_larger_than_cube(sample_data):
+    """Test ascending ranking and top_n above the number of cells."""
+    _, claims_df, exposure_df = sample_data
+
+    cube = SegmentCube.build(exposure_df, claims_df, 'Geography')
+    top = cube.top('EarnedPremium', top_n=100, ascending=True)
+
+    assert len(top) == 4
+    assert list(top['EarnedPremium']) == sorted(top['EarnedPremium'])
+
+
+def test_top_credibility_and_claim_thresholds(sample_data):
+    """Test minimum credibility and claim count thresholds."""
+    _, claims_df, exposure_df = sample_data
+
+    cube = SegmentCube.build(exposure_df, claims_df, ['Geography', 'Industry', 'PolicySize'])
+
+    top = cube.top('LossRatio', top_n=50, min_claims=2)
+    assert all(top['ClaimCount'] >= 2)
+
+    threshold = float(np.median(cube.metrics['CredibilityFactor']))
+    top = cube.top('LossRatio', top_n=50, min_credibility=threshold)
+    assert all(top['CredibilityFactor'] >= threshold)
+
+
+def test_top_invalid_metric(sample_data):
+    """Test ranking by an unknown metric."""
+    _, claims_df, exposure_df = sample_data
+
+    cube = SegmentCube.build(exposure_df, claims_df, 'Geography')
+
+    with pytest.raises(ValueError):
+        cube.top('NotAMetric')
+
+
+def test_calculator_caches_cubes(sample_data):
+    """Test that the calculator reuses cubes for the same selection."""
+    policies_df, claims_df, exposure_df = sample_data
+
+    calculator = SegmentKPICalculator(policies_df, claims_df, exposure_df)
+
+    first = calculator.get_segment_cube(['Geography', 'Industry'])
+    second = calculator.get_segment_cube(['Geography', 'Industry'])
+    windowed = calculator.get_segment_cube(['Geography', 'Industry'], start_period='2023-03')
+
+    assert first is second
+    assert windowed is not first
+    assert windowed.metrics['EarnedPremium'].sum() < first.metrics['EarnedPremium'].sum()
+
+
+def test_cube_cache_is_lru_and_thread_safe(sample_data, monkeypatch):
+    """Test least-recently-used eviction and concurrent misses on the cube cache."""
+    from concurrent.futures import ThreadPoolExecutor
+    from services import segment_kpis
+
+    policies_df, claims_df, exposure_df = sample_data
+    monkeypatch.setattr(segment_kpis, 'CUBE_CACHE_SIZE', 2)
+    calculator = SegmentKPICalculator(policies_df, claims_df, exposure_df)
+
+    geography = calculator.get_segment_cube('Geography')
+    calculator.get_segment_cube('Industry')
+    assert calculator.get_segment_cube('Geography') is geography
+    calculator.get_segment_cube('PolicySize')
+    # Industry was least recently used, so it was evicted instead of Geography
+    assert calculator.get_segment_cube('Geography') is geography
+    assert [key[0] for key in calculator._cube_cache] == [('PolicySize',), ('Geography',)]
+
+    selections = [(dimension, f'2023-0{month}') for dimension in segment_kpis.SEGMENT_DIMENSIONS for month in range(1, 4)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        cubes = list(pool.map(lambda args: calculator.get_segment_cube(args[0], start_period=args[1]), selections * 4))
+    assert len(calculator._cube_cache) == 2
+    assert all(cube is not None for cube in cubes)
+
+
+
+def test_unpickled_cube_cache_is_lru(sample_data):
+    """Test that a restored calculator keeps its cubes in an LRU, even from a plain-dict pickle."""
+    import pickle
+    from collections import OrderedDict
+
+    policies_df, claims_df, exposure_df = sample_data
+    calculator = SegmentKPICalculator(policies_df, claims_df, exposure_df)
+    geography = calculator.get_segment_cube('Geography')
+
+    state = calculator.__getstate__()
+    state['_cube_cache'] = dict(state['_cube_cache'])
+    restored = SegmentKPICalculator.__new__(SegmentKPICalculator)
+    restored.__setstate__(state)
+    assert isinstance(restored._cube_cache, OrderedDict)
+    assert len(restored._cube_cache) == 1
+
+    restored = pickle.loads(pickle.dumps(restored))
+    assert isinstance(restored._cube_cache, OrderedDict)
+    assert restored.get_segment_cube('Industry') is not None
+    assert restored.get_segment_cube('Geography').metrics.keys() == geography.metrics.keys()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
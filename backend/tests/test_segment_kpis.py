@@ -14,7 +14,7 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from services.segment_kpis import SegmentKPICalculator, calculate_segment_kpis
+from services.segment_kpis import SegmentKPICalculator, calculate_segment_kpis, period_ordinal
 
 
 @pytest.fixture
@@ -200,6 +200,80 @@ def test_convenience_function(sample_data):
     assert 'overall_kpis' in result
 
 
+def test_period_window_pushdown(sample_data):
+    """Test that period filters match a manual pre-aggregation filter."""
+    policies_df, claims_df, exposure_df = sample_data
+
+    calculator = SegmentKPICalculator(policies_df, claims_df, exposure_df)
+    kpis = calculator.calculate_kpis_by_segment(
+        'Geography',
+        start_period='2023-03',
+        end_period='2023-05'
+    )
+
+    window = exposure_df[exposure_df['Period'].between('2023-03', '2023-05')]
+    expected = window.groupby('Geography')['EarnedPremium'].sum()
+
+    for _, row in kpis.iterrows():
+        assert row['EarnedPremium'] == pytest.approx(expected[row['Geography']])
+
+    # All sample claims occur in June, outside the window
+    assert all(kpis['ClaimCount'] == 0)
+
+
+def test_period_ordinal():
+    """Test month ordinal conversion for periods and dates."""
+    assert period_ordinal('2023-07') == 2023 * 12 + 6
+    np.testing.assert_array_equal(
+        period_ordinal(pd.Series(['2023-01', '2023-12'])),
+        [2023 * 12, 2023 * 12 + 11]
+    )
+
+
+def test_segment_filters(sample_data):
+    """Test segment value filters on KPIs and overall metrics."""
+    policies_df, claims_df, exposure_df = sample_data
+
+    calculator = SegmentKPICalculator(policies_df, claims_df, exposure_df)
+    filters = {'Geography': ['Northeast']}
+
+    kpis = calculator.calculate_kpis_by_segment('Industry', segment_filters=filters)
+    overall = calculator.calculate_overall_kpis(segment_filters=filters)
+
+    expected_premium = exposure_df.loc[exposure_df['Geography'] == 'Northeast', 'EarnedPremium'].sum()
+    assert kpis['EarnedPremium'].sum() == pytest.approx(expected_premium)
+    assert overall['total_earned_premium'] == pytest.approx(expected_premium, abs=0.01)
+    assert overall['claim_count'] == (claims_df['Geography'] == 'Northeast').sum()
+
+
+def test_invalid_filters(sample_data):
+    """Test validation of filters."""
+    policies_df, claims_df, exposure_df = sample_data
+
+    calculator = SegmentKPICalculator(policies_df, claims_df, exposure_df)
+
+    with pytest.raises(ValueError):
+        calculator.calculate_kpis_by_segment('Geography', segment_filters={'PolicyID': ['POL0001']})
+
+    with pytest.raises(ValueError):
+        calculator.calculate_kpis_by_segment('Geography', start_period='2023-09', end_period='2023-01')
+
+
+def test_trend_analysis_window(sample_data):
+    """Test trend analysis restricted to a period window."""
+    policies_df, claims_df, exposure_df = sample_data
+
+    calculator = SegmentKPICalculator(policies_df, claims_df, exposure_df)
+    trends = calculator.calculate_trend_analysis(
+        'Geography',
+        time_period='quarter',
+        start_period='2023-04',
+        end_period='2023-09'
+    )
+
+    assert set(trends['TimePeriod']) == {'2023Q2', '2023Q3'}
+
+
 def test_empty_claims_handling(sample_data):
     """Test handling of segments with no claims."""
     policies_df, _, exposure_df = sample_data
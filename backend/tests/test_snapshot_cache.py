@@ -0,0 +1,148 @@
+"""
+Unit tests for snapshot cache service.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.snapshot_cache import SnapshotCache, content_hash, file_hash
+from services.data_snapshot import DataSnapshot
+from tests.conftest import write_data
+
+def test_content_hash_follows_contents(tmp_path):
+    """Test that the hash changes with contents, not with timestamps."""
+    path = tmp_path / 'a.csv'
+    path.write_text('x,y\n1,2\n')
+    before = content_hash([str(path)], root=str(tmp_path))
+
+    os.utime(path, (0, 0))
+    assert content_hash([str(path)], root=str(tmp_path)) == before
+
+    path.write_text('x,y\n1,3\n')
+    assert content_hash([str(path)], root=str(tmp_path)) != before
+
+
+def test_file_hash_reused_until_file_changes(tmp_path, monkeypatch):
+    """Test that unchanged files are not read again."""
+    path = tmp_path / 'a.csv'
+    path.write_text('x\n1\n')
+    digest = file_hash(str(path))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("file was read again")
+
+    monkeypatch.setattr('builtins.open', fail)
+    assert file_hash(str(path)) == digest
+    monkeypatch.undo()
+
+    path.write_text('x\n2\n')
+    assert file_hash(str(path)) != digest
+
+
+def test_cache_round_trip_and_prune(tmp_path):
+    """Test saving, loading and keeping only the newest entries."""
+    cache = SnapshotCache(str(tmp_path / 'cache'), keep=2)
+    keys = [cache.key('hash', i) for i in range(3)]
+
+    for i, key in enumerate(keys):
+        cache.save(key, {'value': i})
+        os.utime(cache.path(key), (i, i))
+    cache.prune()
+
+    assert cache.load(keys[0]) is None
+    assert cache.load(keys[2]) == {'value': 2}
+    assert len(os.listdir(cache.cache_dir)) == 2
+
+
+def test_unreadable_entry_is_a_miss(tmp_path):
+    """Test that a corrupt entry is dropped instead of failing the load."""
+    cache = SnapshotCache(str(tmp_path))
+    key = cache.key('hash')
+    with open(cache.path(key), 'wb') as f:
+        f.write(b'not a pickle')
+
+    assert cache.load(key) is None
+    assert not os.path.exists(cache.path(key))
+
+
+def test_snapshot_restored_from_cache(data_dir, tmp_path):
+    """Test that a second load with unchanged inputs restores the prepared state."""
+    cache_dir = str(tmp_path / 'cache')
+    built = DataSnapshot.load(data_dir, cache_dir=cache_dir)
+    restored = DataSnapshot.load(data_dir, cache_dir=cache_dir)
+
+    assert built.source == 'csv'
+    assert 'cache_save' in built.timings
+    assert restored.source == 'cache'
+    assert set(restored.timings) == {'fingerprint', 'cache_load'}
+
+    # Warmed results and segment cubes come back without recomputation
+    assert ('loss_triangle', 'IncurredAmount', 36) in restored._results
+    assert restored.loss_triangle() == built.loss_triangle()
+    assert len(restored.kpi_calculator._cube_cache) == len(built.kpi_calculator._cube_cache)
+    pd.testing.assert_frame_equal(
+        restored.kpi_calculator.calculate_kpis_by_segment('Geography'),
+        built.kpi_calculator.calculate_kpis_by_segment('Geography')
+    )
+
+
+def test_changed_inputs_miss_the_cache(data_dir, tmp_path):
+    """Test that new input contents rebuild instead of restoring."""
+    cache_dir = str(tmp_path / 'cache')
+    DataSnapshot.load(data_dir, cache_dir=cache_dir)
+
+    write_data(data_dir, n_claims=14)
+    snapshot = DataSnapshot.load(data_dir, cache_dir=cache_dir)
+
+    assert snapshot.source == 'csv'
+    assert len(snapshot.claims_df) == 14
+
+
+def test_code_change_misses_the_cache(data_dir, tmp_path, monkeypatch):
+    """Test that snapshots pickled by other service code are not restored."""
+    from services import snapshot_cache
+
+    cache_dir = str(tmp_path / 'cache')
+    DataSnapshot.load(data_dir, cache_dir=cache_dir)
+    assert DataSnapshot.load(data_dir, cache_dir=cache_dir).source == 'cache'
+
+    monkeypatch.setattr(snapshot_cache, 'code_version', lambda: 'deployed')
+    assert DataSnapshot.load(data_dir, cache_dir=cache_dir).source == 'csv'
+
+
+def test_cache_key_includes_load_options(data_dir, tmp_path):
+    """Test that snapshots built with other options are not reused."""
+    cache_dir = str(tmp_path / 'cache')
+    DataSnapshot.load(data_dir, cache_dir=cache_dir)
+
+    streamed = DataSnapshot.load(data_dir, cache_dir=cache_dir, load_mode='streaming')
+    assert streamed.mode == 'streaming'
+    assert streamed.source == 'csv'
+
+    restored = DataSnapshot.load(data_dir, cache_dir=cache_dir, load_mode='streaming')
+    assert restored.source == 'cache'
+    assert restored.mode == 'streaming'
+    assert restored.loss_triangle() == streamed.loss_triangle()
+
+
+def test_sql_engine_rebuilt_after_restore(data_dir, tmp_path):
+    """Test that the embedded SQL engine is reconnected on restore."""
+    cache_dir = str(tmp_path / 'cache')
+    built = DataSnapshot.load(data_dir, cache_dir=cache_dir, query_engine='sqlite')
+    restored = DataSnapshot.load(data_dir, cache_dir=cache_dir, query_engine='sqlite')
+
+    assert restored.source == 'cache'
+    assert restored.kpi_calculator.sql_engine is not None
+    assert restored.kpi_calculator.calculate_overall_kpis() == built.kpi_calculator.calculate_overall_kpis()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,82 @@
+"""
+Unit tests for startup service.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import pytest
+import sys
+import os
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.startup import StartupTracker
+
+
+def test_starting_until_all_components_ready():
+    """Test that the tracker is ready only when every component is."""
+    tracker = StartupTracker(['data', 'models'])
+    assert tracker.status == 'starting'
+    assert tracker.info()['startup_seconds'] is None
+
+    tracker.mark_ready('data')
+    assert tracker.is_ready('data')
+    assert not tracker.is_ready()
+    assert tracker.status == 'starting'
+
+    tracker.mark_ready('models')
+    assert tracker.status == 'ready'
+    assert tracker.info()['startup_seconds'] is not None
+
+
+def test_run_records_failure():
+    """Test that a failing load is recorded instead of reported as ready."""
+    tracker = StartupTracker(['data'])
+
+    def fail():
+        raise FileNotFoundError("claims.csv not found")
+
+    assert tracker.run('data', fail) is None
+    assert tracker.status == 'failed'
+    assert 'claims.csv' in tracker.info()['errors']['data']
+
+    # A later successful load clears the error
+    tracker.mark_ready('data')
+    assert tracker.status == 'ready'
+    assert tracker.info()['errors'] == {}
+
+
+def test_stage_timing_recorded_on_error():
+    """Test that a stage is timed even when it raises."""
+    tracker = StartupTracker(['models'])
+
+    with pytest.raises(RuntimeError):
+        with tracker.stage('model_load'):
+            raise RuntimeError("bad model file")
+
+    assert tracker.timings['model_load'] >= 0
+
+
+def test_start_loads_in_background():
+    """Test that start returns before the load finishes."""
+    tracker = StartupTracker(['data'])
+    release = threading.Event()
+    loaded = []
+
+    def load():
+        release.wait(5)
+        return 'snapshot'
+
+    thread = tracker.start('data', load, on_loaded=loaded.append)
+    assert tracker.status == 'starting'
+
+    release.set()
+    thread.join(5)
+    assert tracker.status == 'ready'
+    assert loaded == ['snapshot']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
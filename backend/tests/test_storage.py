@@ -0,0 +1,195 @@
+"""
+Unit tests for storage service.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services import storage
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Write small policies, claims and exposure CSVs."""
+    np.random.seed(42)
+
+    policies = pd.DataFrame({
+        'PolicyID': [f'POL{i:04d}' for i in range(10)],
+        'EffectiveDate': ['2022-03-01'] * 5 + ['2023-06-15'] * 5,
+        'Geography': ['Northeast', 'West'] * 5,
+        'AnnualPremium': np.random.uniform(1000, 5000, 10)
+    })
+
+    exposure = pd.DataFrame({
+        'PolicyID': [f'POL{i % 10:04d}' for i in range(36)],
+        'Period': [f'{2022 + m // 12}-{m % 12 + 1:02d}' for m in range(36)],
+        'EarnedPremium': np.random.uniform(100, 500, 36),
+        'Geography': ['Northeast', 'West'] * 18
+    })
+
+    claims = pd.DataFrame({
+        'ClaimID': [f'CLM{i:04d}' for i in range(6)],
+        'LossDate': ['2022-02-10', '2022-12-31', '2023-01-01', '2023-07-20', '2024-03-05', '2024-11-30'],
+        'ReportDate': ['2022-03-01', '2023-01-15', '2023-02-01', '2023-08-01', '2024-04-01', '2024-12-15'],
+        'IncurredAmount': [100.0, 200.0, 300.0, 400.0, 500.0, 600.0],
+        'PaidAmount': [50.0, 100.0, 150.0, 200.0, 250.0, 300.0],
+        'ClaimStatus': ['Closed'] * 6
+    })
+
+    policies.to_csv(tmp_path / 'policies.csv', index=False)
+    exposure.to_csv(tmp_path / 'exposure.csv', index=False)
+    claims.to_csv(tmp_path / 'claims.csv', index=False)
+
+    return str(tmp_path)
+
+
+def test_csv_fallback_prunes_columns(data_dir):
+    """Test CSV loading with column pruning."""
+    claims = storage.load_table(data_dir, 'claims', columns=['ClaimID', 'IncurredAmount'])
+
+    assert list(claims.columns) == ['ClaimID', 'IncurredAmount']
+    assert len(claims) == 6
+
+
+def test_csv_fallback_period_filter(data_dir):
+    """Test CSV period filtering on dates and periods."""
+    claims = storage.load_table(data_dir, 'claims', start_period='2022-12', end_period='2023-07')
+    exposure = storage.load_table(data_dir, 'exposure', ['Period'], start_period='2023-07', end_period='2024-06')
+
+    assert list(claims['ClaimID']) == ['CLM0001', 'CLM0002', 'CLM0003']
+    assert exposure['Period'].min() == '2023-07'
+    assert exposure['Period'].max() == '2024-06'
+    assert len(exposure) == 12
+
+
+def test_period_filter_unsupported_for_policies(data_dir):
+    """Test that unpartitioned tables reject period filters."""
+    with pytest.raises(ValueError):
+        storage.load_table(data_dir, 'policies', start_period='2023-01')
+
+
+def test_parquet_round_trip_and_pushdown(data_dir):
+    """Test Parquet writing, partitioning and filtered reads."""
+    pytest.importorskip('pyarrow')
+
+    tables = {name: pd.read_csv(os.path.join(data_dir, f'{name}.csv')) for name in storage.TABLE_LAYOUT}
+    storage.write_parquet_tables(data_dir, tables)
+
+    assert storage.has_parquet(data_dir, 'exposure')
+    assert sorted(os.listdir(os.path.join(data_dir, 'parquet', 'claims'))) == [
+        'AccidentYear=2022', 'AccidentYear=2023', 'AccidentYear=2024'
+    ]
+
+    # Remove the CSV to prove the Parquet path is used
+    os.remove(os.path.join(data_dir, 'claims.csv'))
+
+    claims = storage.load_table(data_dir, 'claims', ['ClaimID', 'LossDate'], '2022-12', '2023-07')
+    assert sorted(claims['ClaimID']) == ['CLM0001', 'CLM0002', 'CLM0003']
+    assert list(claims.columns) == ['ClaimID', 'LossDate']
+
+    exposure = storage.load_table(data_dir, 'exposure')
+    assert 'PeriodYear' not in exposure.columns
+    assert np.isclose(exposure['EarnedPremium'].sum(), tables['exposure']['EarnedPremium'].sum())
+
+
+def test_parquet_period_filter_on_parsed_dates(data_dir):
+    """Test period filters on Parquet written from typed CSV reads (timestamp columns)."""
+    pytest.importorskip('pyarrow')
+
+    for name in ['claims', 'exposure']:
+        table = storage.read_csv_table(os.path.join(data_dir, f'{name}.csv'), name)
+        storage.write_parquet_table(table, data_dir, name)
+        os.remove(os.path.join(data_dir, f'{name}.csv'))
+
+    claims = storage.load_table(data_dir, 'claims', ['ClaimID', 'LossDate'], '2022-12', '2023-07')
+    assert pd.api.types.is_datetime64_any_dtype(claims['LossDate'])
+    assert sorted(claims['ClaimID']) == ['CLM0001', 'CLM0002', 'CLM0003']
+
+    claims = storage.load_table(data_dir, 'claims', ['ClaimID'], end_period='2022-12')
+    assert sorted(claims['ClaimID']) == ['CLM0000', 'CLM0001']
+
+    exposure = storage.load_table(data_dir, 'exposure', ['Period'], '2023-07', '2024-06')
+    assert (exposure['Period'].min(), exposure['Period'].max(), len(exposure)) == ('2023-07', '2024-06', 12)
+
+
+def test_edited_csv_shadowed_by_parquet_is_refused(data_dir):
+    """Test that a CSV changed after its Parquet dataset was written is not ignored."""
+    pytest.importorskip('pyarrow')
+
+    claims_csv = os.path.join(data_dir, 'claims.csv')
+    storage.write_parquet_table(pd.read_csv(claims_csv), data_dir, 'claims')
+    assert not storage.parquet_source_changed(data_dir, 'claims')
+
+    claims = pd.read_csv(claims_csv)
+    claims.loc[0, 'IncurredAmount'] = 999999.0
+    claims.to_csv(claims_csv, index=False)
+
+    with pytest.raises(storage.StaleSourceError, match='import_data.py'):
+        storage.load_table(data_dir, 'claims')
+
+    # Re-importing brings the dataset up to date
+    storage.write_parquet_table(pd.read_csv(claims_csv), data_dir, 'claims')
+    assert storage.load_table(data_dir, 'claims')['IncurredAmount'].max() == 999999.0
+
+
+def test_unstamped_parquet_is_stale_when_csv_is_newer(data_dir):
+    """Test the modification-time check for datasets written without a source record."""
+    pytest.importorskip('pyarrow')
+
+    claims_csv = os.path.join(data_dir, 'claims.csv')
+    storage.write_parquet_table(pd.read_csv(claims_csv), data_dir, 'claims')
+    os.remove(os.path.join(data_dir, 'parquet', 'claims.source.json'))
+    assert not storage.parquet_source_changed(data_dir, 'claims')
+
+    newer = os.path.getmtime(claims_csv) + 60
+    os.utime(claims_csv, (newer, newer))
+    assert storage.parquet_source_changed(data_dir, 'claims')
+
+
+def test_csv_schema_parses_dates_and_types(data_dir):
+    """Test that CSV columns get their declared types while parsing."""
+    pytest.importorskip('pyarrow')
+
+    claims = storage.load_table(data_dir, 'claims')
+    exposure = storage.load_table(data_dir, 'exposure', ['PolicyID', 'Period', 'EarnedPremium'])
+
+    assert pd.api.types.is_datetime64_any_dtype(claims['LossDate'])
+    assert claims['LossDate'].iloc[0] == pd.Timestamp('2022-02-10')
+    assert pd.api.types.is_float_dtype(claims['IncurredAmount'])
+    assert exposure['Period'].iloc[0] == '2022-01'
+    assert list(exposure.columns) == ['PolicyID', 'Period', 'EarnedPremium']
+
+
+def test_load_tables_concurrently(data_dir):
+    """Test loading several tables at once with per-table timings."""
+    tables, timings = storage.load_tables(
+        data_dir, {'policies': None, 'claims': ['ClaimID', 'LossDate'], 'exposure': ['Period']},
+        start_period='2023-01'
+    )
+
+    assert set(tables) == set(timings) == {'policies', 'claims', 'exposure'}
+    assert len(tables['policies']) == 10
+    assert len(tables['claims']) == 4
+    assert tables['exposure']['Period'].min() == '2023-01'
+    assert all(seconds >= 0 for seconds in timings.values())
+
+
+def test_load_service_tables(data_dir):
+    """Test loading the column subsets for a service."""
+    tables = storage.load_service_tables(data_dir, 'loss_triangle', start_period='2023-01')
+
+    assert list(tables) == ['claims']
+    assert list(tables['claims'].columns) == storage.SERVICE_COLUMNS['loss_triangle']['claims']
+    assert len(tables['claims']) == 4
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
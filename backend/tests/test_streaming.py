@@ -0,0 +1,210 @@
+"""
+Unit tests for streaming ingestion service.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.streaming import (
+    SegmentAccumulator, TriangleAccumulator, iter_table_chunks, stream_portfolio
+)
+from services.segment_kpis import SegmentKPICalculator
+from services.loss_triangle import calculate_loss_triangle
+from services.storage import parquet_available, write_parquet_tables
+from services.data_snapshot import DataSnapshot
+
+DIMENSIONS = ['Geography', 'Industry', 'PolicySize', 'RiskRating']
+
+
+@pytest.fixture
+def tables():
+    """Sample policies, claims and exposure tables."""
+    np.random.seed(7)
+    n_policies = 40
+
+    policies = pd.DataFrame({
+        'PolicyID': [f'POL{i:04d}' for i in range(n_policies)],
+        'EffectiveDate': ['2022-01-01'] * n_policies,
+        'Geography': np.random.choice(['Northeast', 'West', 'South'], n_policies),
+        'Industry': np.random.choice(['Retail', 'Manufacturing'], n_policies),
+        'PolicySize': np.random.choice(['Small', 'Large'], n_policies),
+        'RiskRating': np.random.choice([3.0, 5.0, 7.5], n_policies),
+        'AnnualPremium': np.random.uniform(1000, 5000, n_policies),
+        'ExposureUnits': np.ones(n_policies)
+    })
+
+    periods = pd.period_range('2022-01', '2023-12', freq='M').strftime('%Y-%m')
+    exposure = policies[['PolicyID'] + DIMENSIONS].merge(pd.DataFrame({'Period': periods}), how='cross')
+    exposure['EarnedPremium'] = np.random.uniform(50, 400, len(exposure))
+    exposure['ExposureUnits'] = 1 / 12
+
+    n_claims = 150
+    claim_policies = policies.sample(n_claims, replace=True, random_state=1).reset_index(drop=True)
+    loss_dates = pd.to_datetime('2022-01-01') + pd.to_timedelta(np.random.randint(0, 700, n_claims), unit='D')
+    claims = claim_policies[['PolicyID'] + DIMENSIONS].copy()
+    claims.insert(0, 'ClaimID', [f'CLM{i:05d}' for i in range(n_claims)])
+    claims['LossDate'] = loss_dates.strftime('%Y-%m-%d')
+    claims['ReportDate'] = (loss_dates + pd.to_timedelta(np.random.randint(0, 400, n_claims), unit='D')).strftime('%Y-%m-%d')
+    claims['IncurredAmount'] = np.random.lognormal(8, 1, n_claims)
+    claims['PaidAmount'] = claims['IncurredAmount'] * np.random.uniform(0.3, 1.0, n_claims)
+
+    return {'policies': policies, 'claims': claims, 'exposure': exposure}
+
+
+@pytest.fixture
+def data_dir(tmp_path, tables):
+    """Data directory with the sample tables as CSV."""
+    for name, df in tables.items():
+        df.to_csv(tmp_path / f"{name}.csv", index=False)
+    return str(tmp_path)
+
+
+def assert_matches_in_memory(calculator, triangles, tables):
+    """Compare streamed results with the in-memory calculators."""
+    in_memory = SegmentKPICalculator(tables['policies'], tables['claims'], tables['exposure'])
+
+    for dimension in DIMENSIONS:
+        expected = in_memory.calculate_kpis_by_segment(dimension, include_credibility=True)
+        result = calculator.calculate_kpis_by_segment(dimension, include_credibility=True)
+        pd.testing.assert_frame_equal(
+            result.reset_index(drop=True),
+            expected.reset_index(drop=True),
+            check_dtype=False,
+            atol=0.011
+        )
+
+    expected_overall = in_memory.calculate_overall_kpis()
+    for key, value in calculator.calculate_overall_kpis().items():
+        assert value == pytest.approx(expected_overall[key], abs=0.011)
+
+    for max_dev_months in [12, 36]:
+        expected = calculate_loss_triangle(tables['claims'], max_dev_months=max_dev_months)
+        result = triangles.calculator(max_dev_months).get_triangle_summary()
+        pd.testing.assert_frame_equal(
+            pd.DataFrame(result['cumulative_triangle']),
+            pd.DataFrame(expected['cumulative_triangle'])
+        )
+        assert result['summary_stats'] == pytest.approx(expected['summary_stats'])
+
+
+def test_iter_table_chunks_bounds_rows(data_dir, tables):
+    """Test that chunks respect the size limit and cover every row."""
+    chunks = list(iter_table_chunks(data_dir, 'exposure', ['PolicyID', 'Period', 'EarnedPremium'], chunk_rows=100))
+
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert sum(len(chunk) for chunk in chunks) == len(tables['exposure'])
+    assert 'PeriodOrdinal' in chunks[0].columns
+
+
+def test_iter_table_chunks_rejects_policies(data_dir):
+    """Test that only period tables can be streamed."""
+    with pytest.raises(ValueError):
+        next(iter_table_chunks(data_dir, 'policies'))
+
+
+def test_stream_portfolio_matches_in_memory(data_dir, tables):
+    """Test that small CSV chunks give the same KPIs and triangles as full tables."""
+    calculator, triangles = stream_portfolio(data_dir, chunk_rows=37)
+
+    assert_matches_in_memory(calculator, triangles, tables)
+    assert calculator.totals['exposure_rows'] == len(tables['exposure'])
+    assert calculator.totals['claim_count'] == len(tables['claims'])
+
+
+@pytest.mark.skipif(not parquet_available(), reason="pyarrow not installed")
+def test_stream_portfolio_from_parquet(tmp_path, tables):
+    """Test streaming Parquet record batches."""
+    write_parquet_tables(str(tmp_path), tables)
+
+    calculator, triangles = stream_portfolio(str(tmp_path), chunk_rows=50)
+
+    assert_matches_in_memory(calculator, triangles, tables)
+
+
+def test_accumulator_counts_distinct_policies_across_chunks(tables):
+    """Test that a policy seen in several chunks is counted once per segment."""
+    exposure = tables['exposure'].assign(PeriodOrdinal=0)
+    accumulator = SegmentAccumulator('Geography')
+    for start in range(0, len(exposure), 25):
+        accumulator.add_exposure(exposure.iloc[start:start + 25])
+
+    cube, _ = accumulator.cube()
+    counts = dict(zip(cube.keys['Geography'], cube.measures['PolicyCount']))
+
+    expected = tables['policies'].groupby('Geography')['PolicyID'].nunique()
+    assert counts == expected.astype(float).to_dict()
+
+
+def test_streamed_selection_rejected(data_dir):
+    """Test that filtered queries are refused instead of answered wrongly."""
+    calculator, _ = stream_portfolio(data_dir)
+
+    with pytest.raises(ValueError):
+        calculator.calculate_kpis_by_segment('Geography', start_period='2023-01')
+    with pytest.raises(ValueError):
+        calculator.calculate_overall_kpis(segment_filters={'Geography': ['West']})
+    with pytest.raises(ValueError):
+        calculator.get_top_segments(['Geography', 'Industry'])
+
+
+def test_triangle_depth_limit(data_dir):
+    """Test that triangles deeper than the accumulated depth are rejected."""
+    _, triangles = stream_portfolio(data_dir, max_dev_months=24)
+
+    assert triangles.calculator(24).get_triangle_by_accident_year().shape[1] == 25
+    with pytest.raises(ValueError):
+        triangles.calculator(36)
+
+
+def test_triangle_accumulator_skips_missing_dates(tables):
+    """Test that claims without a loss or report date match the claim-level triangle."""
+    claims = tables['claims'].copy()
+    claims.loc[0, 'LossDate'] = None
+    claims.loc[1, 'ReportDate'] = None
+
+    accumulator = TriangleAccumulator()
+    for start in range(0, len(claims), 40):
+        accumulator.add_claims(claims.iloc[start:start + 40])
+
+    result = accumulator.calculator(36).get_triangle_summary()
+    expected = calculate_loss_triangle(claims, max_dev_months=36)
+    assert list(pd.DataFrame(result['cumulative_triangle']).index) == ['2022', '2023']
+    pd.testing.assert_frame_equal(
+        pd.DataFrame(result['cumulative_triangle']),
+        pd.DataFrame(expected['cumulative_triangle'])
+    )
+
+
+def test_empty_triangle_accumulator():
+    """Test an accumulator that never saw a claim."""
+    triangle = TriangleAccumulator().calculator(12).get_triangle_by_accident_year()
+
+    assert triangle.empty
+    assert list(triangle.columns) == list(range(13))
+
+
+def test_snapshot_streaming_mode(data_dir, tables):
+    """Test that a streaming snapshot keeps no claim or exposure tables."""
+    snapshot = DataSnapshot.load(data_dir, load_mode='streaming')
+
+    assert snapshot.mode == 'streaming'
+    assert snapshot.claims_df is None
+    assert snapshot.exposure_df is None
+    summary = snapshot.triangle_calculator(36).get_triangle_summary()
+    expected = calculate_loss_triangle(tables['claims'])
+    assert summary['summary_stats'] == pytest.approx(expected['summary_stats'])
+
+    with pytest.raises(ValueError):
+        DataSnapshot.load(data_dir, earned_premium_source='policies', load_mode='streaming')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,95 @@
+"""
+Unit tests for worker pool service.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import pytest
+import asyncio
+import threading
+import time
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.worker_pool import WorkerPool
+
+
+def test_run_returns_result_from_pool_thread():
+    """Test that work runs on a pool thread and returns its result."""
+    pool = WorkerPool('test', 2)
+
+    async def main():
+        return await pool.run(lambda x, y=0: (threading.current_thread().name, x + y), 2, y=3)
+
+    name, value = asyncio.run(main())
+    pool.shutdown()
+
+    assert value == 5
+    assert name.startswith('test')
+    assert pool.info() == {'workers': 2, 'running': 0, 'queued': 0, 'completed': 1}
+
+
+def test_exceptions_propagate():
+    """Test that errors raised by pooled work reach the awaiting caller."""
+    pool = WorkerPool('test', 1)
+
+    def fail():
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError, match="bad input"):
+        asyncio.run(pool.run(fail))
+    pool.shutdown()
+
+
+def test_pool_restarts_after_shutdown():
+    """Test that a shut down pool starts new threads on the next call."""
+    pool = WorkerPool('test', 1)
+    assert asyncio.run(pool.run(lambda: 1)) == 1
+    pool.shutdown()
+
+    assert asyncio.run(pool.run(lambda: 2)) == 2
+    assert pool.info()['completed'] == 2
+    pool.shutdown()
+
+
+def test_event_loop_stays_responsive():
+    """Test that the loop keeps running other tasks while pooled work blocks."""
+    pool = WorkerPool('test', 2)
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        start = time.perf_counter()
+        await asyncio.gather(pool.run(time.sleep, 0.3), ticker())
+        return start
+
+    start = asyncio.run(main())
+    pool.shutdown()
+
+    assert len(ticks) == 5
+    assert ticks[-1] - start < 0.25
+
+
+def test_zero_workers_runs_inline():
+    """Test that a pool of size zero runs work on the calling thread."""
+    pool = WorkerPool('test', 0)
+
+    async def main():
+        return await pool.run(lambda: threading.current_thread())
+
+    assert asyncio.run(main()) is threading.current_thread()
+    assert pool.info()['completed'] == 1
+
+    with pytest.raises(ValueError):
+        WorkerPool('test', -1)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
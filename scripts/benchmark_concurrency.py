@@ -0,0 +1,224 @@
+"""
+Concurrency Benchmark
+Measures latency of light requests (/health, /predict/*) while heavy
+analytics requests are in flight, to show whether the event loop stays
+responsive.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = '/app' if os.path.exists('/app/services') else os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'backend'
+)
+
+POLICY = {
+    'geography': 'Northeast', 'industry': 'Manufacturing', 'policy_size': 'Medium',
+    'risk_rating': 6.5, 'exposure_units': 50.0, 'annual_premium': 25000.0
+}
+
+# Light requests probed at a fixed rate: (label, method, path, JSON body)
+PROBES = [
+    ('GET /health', 'GET', '/health', None),
+    ('POST /predict/both', 'POST', '/predict/both', POLICY),
+    ('POST /predict/loss_ratio', 'POST', '/predict/loss_ratio', POLICY),
+]
+
+SEGMENTS = ['Geography', 'Industry', 'PolicySize', 'RiskRating']
+
+
+def heavy_requests(batch_csv: str):
+    """
+    Endless cycle of heavy requests: unseeded bootstrap intervals (never
+    cached), quarterly trends and a large /predict/batch upload.
+
+    Args:
+        batch_csv: CSV body for /predict/batch
+
+    Yields:
+        Tuples of (method, path, kwargs for httpx)
+    """
+    i = 0
+    while True:
+        segment = SEGMENTS[i % len(SEGMENTS)]
+        yield 'GET', f'/segment_insights?segment_by={segment}&bootstrap=true&n_replicates=20000', {}
+        yield 'GET', f'/segment_trends?segment_by={segment}&time_period=quarter', {}
+        yield 'POST', '/predict/batch', {'content': batch_csv, 'headers': {'content-type': 'text/csv'}}
+        i += 1
+
+
+def percentiles(latencies: List[float]) -> Dict[str, float]:
+    """p50 / p95 / p99 / max in milliseconds."""
+    values = np.array(latencies) * 1000
+    return {
+        'n': len(values),
+        'p50': float(np.percentile(values, 50)),
+        'p95': float(np.percentile(values, 95)),
+        'p99': float(np.percentile(values, 99)),
+        'max': float(values.max()),
+    }
+
+
+async def run_load(url: str, duration: float, heavy_clients: int, probe_interval: float, batch_csv: str) -> Dict:
+    """
+    Keep heavy requests in flight and probe light endpoints meanwhile.
+
+    Args:
+        url: Base URL of the running API
+        duration: Seconds to measure
+        heavy_clients: Concurrent clients issuing heavy requests back to back
+        probe_interval: Seconds between probes of each light endpoint
+        batch_csv: CSV body for the /predict/batch heavy request
+
+    Returns:
+        Latency percentiles per probe, plus the heavy request count
+    """
+    deadline = time.perf_counter() + duration
+    latencies = {label: [] for label, _, _, _ in PROBES}
+    heavy_done = [0]
+    errors = []
+
+    async with httpx.AsyncClient(base_url=url, timeout=120) as client:
+        async def heavy(offset: int):
+            requests = heavy_requests(batch_csv)
+            for _ in range(offset):
+                next(requests)
+            while time.perf_counter() < deadline:
+                method, path, kwargs = next(requests)
+                response = await client.request(method, path, **kwargs)
+                if response.status_code != 200:
+                    errors.append(f"{path}: {response.status_code}")
+                heavy_done[0] += 1
+
+        async def probe(label: str, method: str, path: str, body: Optional[Dict]):
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.request(method, path, json=body)
+                latencies[label].append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors.append(f"{path}: {response.status_code}")
+                await asyncio.sleep(probe_interval)
+
+        tasks = [heavy(i) for i in range(heavy_clients)]
+        tasks += [probe(*spec) for spec in PROBES]
+        await asyncio.gather(*tasks)
+
+    if errors:
+        print(f"⚠️  {len(errors)} failed requests, e.g. {errors[0]}")
+    return {
+        'heavy_requests': heavy_done[0],
+        'probes': {label: percentiles(values) for label, values in latencies.items() if values}
+    }
+
+
+def free_port() -> int:
+    """An unused local TCP port."""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(env: Dict[str, str]):
+    """
+    Start uvicorn on a free port and wait for /ready.
+
+    Args:
+        env: Extra environment variables
+
+    Returns:
+        Tuple of (process, base URL)
+    """
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--port', str(port), '--log-level', 'warning'],
+        cwd=BACKEND_DIR, env={**os.environ, **env},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f'http://127.0.0.1:{port}'
+
+    deadline = time.time() + 180
+    while time.time() < deadline:
+        try:
+            if httpx.get(f'{url}/ready', timeout=5).status_code == 200:
+                return process, url
+        except httpx.TransportError:
+            pass
+        if process.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        time.sleep(0.5)
+
+    process.terminate()
+    raise RuntimeError("API server did not become ready")
+
+
+def report(title: str, result: Dict):
+    """Print one run's latency table."""
+    print(f"\n{title} ({result['heavy_requests']} heavy requests completed)")
+    print(f"{'probe':<26}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for label, stats in result['probes'].items():
+        print(
+            f"{label:<26}{stats['n']:>6}{stats['p50']:>10.1f}{stats['p95']:>10.1f}"
+            f"{stats['p99']:>10.1f}{stats['max']:>10.1f}"
+        )
+
+
+def main():
+    """Main execution function."""
+    default_data_dir = '/app/data' if os.path.exists('/app/data') else '../data'
+
+    parser = argparse.ArgumentParser(description="Light-request latency under heavy analytics load")
+    parser.add_argument('--url', default=None, help="Benchmark a running API instead of starting servers")
+    parser.add_argument('--cpu-workers', type=int, nargs='+', default=[0, 4],
+                        help="CPU_POOL_WORKERS values to compare when starting servers "
+                             "(0 = all endpoint work inline on the event loop)")
+    parser.add_argument('--micro-batch-ms', type=float, default=0,
+                        help="MICRO_BATCH_WINDOW_MS for the started servers (0 = no micro-batching)")
+    parser.add_argument('--duration', type=float, default=15, help="Seconds to measure per run")
+    parser.add_argument('--heavy-clients', type=int, default=4, help="Concurrent heavy-request clients")
+    parser.add_argument('--probe-interval', type=float, default=0.02, help="Seconds between probes per endpoint")
+    parser.add_argument('--batch-rows', type=int, default=20000, help="Rows in the /predict/batch heavy request")
+    parser.add_argument('--data-dir', default=default_data_dir, help="Data directory (policies for the batch upload)")
+    args = parser.parse_args()
+
+    policies = pd.read_csv(os.path.join(args.data_dir, 'policies.csv'))
+    batch = policies.sample(args.batch_rows, replace=True, random_state=42)
+    batch_csv = batch.to_csv(index=False)
+
+    print("=" * 60)
+    print("Actuarial Insights Workbench - Concurrency Benchmark")
+    print("=" * 60)
+    print(f"{args.heavy_clients} heavy clients, probes every {args.probe_interval * 1000:.0f} ms, {args.duration:.0f}s per run")
+
+    if args.url:
+        result = asyncio.run(run_load(args.url, args.duration, args.heavy_clients, args.probe_interval, batch_csv))
+        report(args.url, result)
+        return
+
+    for workers in args.cpu_workers:
+        env = {'CPU_POOL_WORKERS': str(workers), 'MICRO_BATCH_WINDOW_MS': str(args.micro_batch_ms)}
+        if workers == 0:
+            env['PREDICT_POOL_WORKERS'] = '0'
+        process, url = start_server(env)
+        try:
+            result = asyncio.run(run_load(url, args.duration, args.heavy_clients, args.probe_interval, batch_csv))
+        finally:
+            process.terminate()
+            process.wait()
+        title = "CPU work inline on the event loop" if workers == 0 else f"CPU_POOL_WORKERS={workers}"
+        report(title, result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Model Inference Benchmark
+Compares LightGBM's predict with the NumPy-compiled tree evaluator and
+checks that both give identical predictions.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Backend services live in /app inside the container, ../backend locally
+BACKEND_DIR = '/app' if os.path.exists('/app/services') else os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'backend'
+)
+sys.path.insert(0, BACKEND_DIR)
+
+from services.compiled_trees import CompiledTreeModel
+from services.prediction import batch_frame, encode_features
+
+MODEL_FILES = {'loss_ratio': 'lr_model.pkl', 'severity': 'severity_model.pkl'}
+
+
+def timed(func, repeats: int) -> float:
+    """Median wall time of func in milliseconds."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.median(times))
+
+
+def main():
+    """Main execution function."""
+    default_data_dir = '/app/data' if os.path.exists('/app/data') else '../data'
+
+    parser = argparse.ArgumentParser(description="Benchmark LightGBM predict vs compiled trees")
+    parser.add_argument('--models-dir', default=os.path.join(BACKEND_DIR, 'models'), help="Trained model directory")
+    parser.add_argument('--data-dir', default=default_data_dir, help="Data directory (policies to score)")
+    parser.add_argument('--rows', nargs='+', type=int, default=[1, 16, 256, 1024, 10_000],
+                        help="Batch sizes to benchmark")
+    parser.add_argument('--repeats', type=int, default=50, help="Timed repetitions per batch size")
+    args = parser.parse_args()
+
+    policies = pd.read_csv(os.path.join(args.data_dir, 'policies.csv'))
+    sample = policies.sample(max(args.rows), replace=True, random_state=42)
+    features = encode_features(batch_frame(sample))
+
+    print("=" * 60)
+    print("Actuarial Insights Workbench - Model Inference Benchmark")
+    print("=" * 60)
+
+    for name, filename in MODEL_FILES.items():
+        path = os.path.join(args.models_dir, filename)
+        if not os.path.exists(path):
+            print(f"\n{name}: {path} not found, skipped (run scripts/train_models.py)")
+            continue
+
+        model = joblib.load(path)
+        start = time.perf_counter()
+        # No row limit, so every batch size measures the compiled evaluator itself
+        compiled = CompiledTreeModel(model, max_rows=max(args.rows))
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        identical = np.array_equal(compiled.predict(features), model.predict(features))
+        info = compiled.info()
+        print(f"\n{name}: {info['trees']} trees, {info['nodes']} nodes, depth {info['max_depth']}, "
+              f"compiled in {compile_ms:.1f}ms, predictions {'identical' if identical else 'DIFFER'}")
+        print(f"{'rows':>8}{'lightgbm':>12}{'compiled':>12}{'speedup':>10}")
+
+        for rows in args.rows:
+            batch = features[:rows]
+            repeats = max(3, args.repeats if rows <= 1024 else args.repeats // 10)
+            lightgbm_ms = timed(lambda: model.predict(batch), repeats)
+            compiled_ms = timed(lambda: compiled.predict(batch), repeats)
+            print(f"{rows:>8,}{lightgbm_ms:>10.3f}ms{compiled_ms:>10.3f}ms{lightgbm_ms / compiled_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Predict Both Benchmark
+Measures /predict/both latency and compares the shared-matrix predict_both
+with evaluating the two models independently.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Backend services live in /app inside the container, ../backend locally
+BACKEND_DIR = '/app' if os.path.exists('/app/services') else os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'backend'
+)
+
+GEOGRAPHIES = ['Northeast', 'Southeast', 'Midwest', 'Southwest', 'West', 'Northwest']
+INDUSTRIES = ['Manufacturing', 'Retail', 'Office', 'Warehouse', 'Healthcare', 'Education',
+              'Hospitality', 'Technology']
+POLICY_SIZES = ['Small', 'Medium', 'Large', 'Enterprise']
+
+
+def random_policies(n: int, seed: int = 42):
+    """
+    Distinct random prediction requests (so no request is a cache hit).
+
+    Args:
+        n: Number of requests
+        seed: Random seed
+
+    Returns:
+        List of request bodies
+    """
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            'geography': str(rng.choice(GEOGRAPHIES)),
+            'industry': str(rng.choice(INDUSTRIES)),
+            'policy_size': str(rng.choice(POLICY_SIZES)),
+            'risk_rating': round(float(rng.uniform(1, 10)), 2),
+            'exposure_units': round(float(rng.uniform(1, 100)), 2),
+            'annual_premium': round(float(rng.uniform(1000, 200000)), 2),
+        }
+        for _ in range(n)
+    ]
+
+
+def latency_ms(func, inputs) -> np.ndarray:
+    """Wall time of func(input) per input, in milliseconds."""
+    times = []
+    for input_data in inputs:
+        start = time.perf_counter()
+        func(input_data)
+        times.append((time.perf_counter() - start) * 1000)
+    return np.array(times)
+
+
+def report(label: str, times: np.ndarray):
+    """Print one latency row."""
+    print(
+        f"{label:<38}{np.percentile(times, 50):>9.3f}{np.percentile(times, 95):>9.3f}"
+        f"{np.percentile(times, 99):>9.3f}{1000 / times.mean():>12,.0f}"
+    )
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Benchmark /predict/both and shared-matrix predict_both")
+    parser.add_argument('--backend-dir', default=BACKEND_DIR,
+                        help="Backend to benchmark (e.g. an older checkout for a before/after comparison)")
+    parser.add_argument('--requests', type=int, default=2000, help="Timed requests per measurement")
+    args = parser.parse_args()
+
+    # Measure prediction work, not cache hits or batching windows
+    os.environ['PREDICTION_CACHE_SIZE'] = '0'
+    os.environ['MICRO_BATCH_WINDOW_MS'] = '0'
+    backend_dir = os.path.abspath(args.backend_dir)
+    sys.path.insert(0, backend_dir)
+    os.chdir(backend_dir)
+
+    from fastapi.testclient import TestClient
+    import main as api
+
+    inputs = random_policies(args.requests)
+    warmup = random_policies(100, seed=7)
+
+    print("=" * 60)
+    print("Actuarial Insights Workbench - Predict Both Benchmark")
+    print("=" * 60)
+    print(f"Backend: {backend_dir}, {args.requests} distinct requests, prediction cache off")
+    print(f"\n{'':<38}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'requests/s':>12}")
+
+    with TestClient(api.app) as client:
+        deadline = time.time() + 120
+        while client.get('/ready').status_code != 200:
+            if time.time() > deadline:
+                sys.exit("❌ API did not become ready")
+            time.sleep(0.2)
+
+        def post(body):
+            response = client.post('/predict/both', json=body)
+            response.raise_for_status()
+
+        latency_ms(post, warmup)
+        report("POST /predict/both", latency_ms(post, inputs))
+
+        service = api.prediction_service
+        if service.lr_model is None or service.severity_model is None:
+            print("\n⚠️  Models not trained; in-process comparison skipped")
+            return
+
+        def independent(body):
+            # predict_both as two unrelated calls: encode and evaluate per model
+            return {
+                'loss_ratio': service.predict_loss_ratio(body),
+                'severity': service.predict_severity(body),
+                'input_features': body
+            }
+
+        latency_ms(service.predict_both, warmup)
+        latency_ms(independent, warmup)
+        report("predict_both", latency_ms(service.predict_both, inputs))
+        report("predict_loss_ratio + predict_severity", latency_ms(independent, inputs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Prediction Grid Benchmark
+Compares grid mode (interpolated predictions) with exact scoring: build
+cost, interpolation error on the portfolio and single-policy latency.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Backend services live in /app inside the container, ../backend locally
+BACKEND_DIR = '/app' if os.path.exists('/app/services') else os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'backend'
+)
+sys.path.insert(0, BACKEND_DIR)
+
+from services.prediction import (
+    GRID_MAX_ERROR, PREDICTION_MODELS, PredictionService, batch_frame, encode_features, parse_grid
+)
+
+
+def latency_ms(func, inputs) -> np.ndarray:
+    """Wall time of func(input) per input, in milliseconds."""
+    times = []
+    for input_data in inputs:
+        start = time.perf_counter()
+        func(input_data)
+        times.append((time.perf_counter() - start) * 1000)
+    return np.array(times)
+
+
+def main():
+    """Main execution function."""
+    default_data_dir = '/app/data' if os.path.exists('/app/data') else '../data'
+
+    parser = argparse.ArgumentParser(description="Benchmark grid mode against exact scoring")
+    parser.add_argument('--models-dir', default=os.path.join(BACKEND_DIR, 'models'), help="Trained model directory")
+    parser.add_argument('--data-dir', default=default_data_dir, help="Data directory (policies to score)")
+    parser.add_argument('--grid', default='1', help="Grid axes, as for PREDICTION_GRID")
+    parser.add_argument('--max-error', type=float, default=GRID_MAX_ERROR,
+                        help="Error tolerance, as for PREDICTION_GRID_MAX_ERROR (0 serves every model)")
+    parser.add_argument('--requests', type=int, default=5000, help="Timed single-policy requests")
+    args = parser.parse_args()
+
+    exact = PredictionService(models_dir=args.models_dir)
+    if exact.lr_model is None and exact.severity_model is None:
+        sys.exit("❌ Models not trained (run scripts/train_models.py)")
+    gridded = PredictionService(
+        models_dir=args.models_dir, grid_axes=parse_grid(args.grid), grid_max_error=args.max_error or None
+    )
+    grid = gridded.grid
+    info = grid.info()
+
+    print("=" * 60)
+    print("Actuarial Insights Workbench - Prediction Grid Benchmark")
+    print("=" * 60)
+    axes = ', '.join(
+        f"{name} {axis['points']}" + (f" ({axis['min']:g}-{axis['max']:g} {axis['spacing']})"
+                                      if axis['spacing'] != 'category' else '')
+        for name, axis in info['axes'].items()
+    )
+    print(f"Axes: {axes}")
+    print(f"{info['grid_points']:,} grid points, {info['memory_mb']} MB, built in {info['build_ms'] / 1000:.1f}s")
+
+    # Interpolation error on the actual portfolio (the build reports it on random in-grid rows)
+    policies = pd.read_csv(os.path.join(args.data_dir, 'policies.csv'))
+    frame = batch_frame(policies)
+    features = encode_features(frame)
+    approximate, inside = grid.predict(features)
+    exact_values = exact.evaluate(features, PREDICTION_MODELS['both'])
+
+    print(f"\nInterpolation error ({inside.sum():,} of {len(features):,} policies inside the grid)")
+    print(f"{'model':<22}{'random p99':>12}{'max':>12}{'p99':>12}{'mean':>12}{'mean |exact|':>14}  grid")
+    for name, column in grid.columns.items():
+        error = np.abs(approximate[inside][:, column] - exact_values[name][inside])
+        print(
+            f"{name:<22}{info['interpolation_error'][name]['p99_relative_error']:>12.1%}{error.max():>12,.2f}"
+            f"{np.percentile(error, 99):>12,.2f}{error.mean():>12,.2f}{np.abs(exact_values[name]).mean():>14,.2f}"
+            f"  {'on' if name in grid.enabled else 'off'}"
+        )
+    if grid.disabled:
+        print(f"Over the {args.max_error:.1%} tolerance, scored exactly: {', '.join(grid.disabled)}")
+
+    inputs = frame[['geography', 'industry', 'policy_size', 'risk_rating', 'exposure_units', 'annual_premium']]
+    inputs = inputs.sample(args.requests, replace=True, random_state=42).to_dict('records')
+    print(f"\n{'predict_both':<22}{'p50 ms':>9}{'p99 ms':>9}{'requests/s':>12}")
+    services = [('exact', exact), ('grid', gridded)]
+    for _, service in services:
+        latency_ms(service.predict_both, inputs)
+    for label, service in services:
+        times = latency_ms(service.predict_both, inputs)
+        print(f"{label:<22}{np.percentile(times, 50):>9.3f}{np.percentile(times, 99):>9.3f}{1000 / times.mean():>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Segment Engine Benchmark
+Compares the pandas and embedded SQL paths of SegmentKPICalculator.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Backend services live in /app inside the container, ../backend locally
+BACKEND_DIR = '/app' if os.path.exists('/app/services') else os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'backend'
+)
+sys.path.insert(0, BACKEND_DIR)
+
+from services.segment_kpis import SegmentKPICalculator
+from services.sql_engine import SQL_ENGINES, default_engine
+
+GEOGRAPHIES = ['Northeast', 'Southeast', 'Midwest', 'Southwest', 'West']
+INDUSTRIES = ['Manufacturing', 'Retail', 'Healthcare', 'Technology', 'Construction',
+              'Hospitality', 'Transportation', 'Education']
+POLICY_SIZES = ['Small', 'Medium', 'Large']
+
+
+def synthetic_tables(n_rows: int, seed: int = 42):
+    """
+    Build policies, claims and exposure with n_rows policy-months of exposure.
+
+    Args:
+        n_rows: Number of exposure rows
+        seed: Random seed
+
+    Returns:
+        Tuple of (policies_df, claims_df, exposure_df)
+    """
+    rng = np.random.default_rng(seed)
+    n_policies = max(n_rows // 36, 1)
+
+    policies = pd.DataFrame({
+        'PolicyID': np.array([f'POL{i:08d}' for i in range(n_policies)], dtype=object),
+        'Geography': rng.choice(GEOGRAPHIES, n_policies),
+        'Industry': rng.choice(INDUSTRIES, n_policies),
+        'PolicySize': rng.choice(POLICY_SIZES, n_policies),
+        'RiskRating': rng.integers(10, 100, n_policies) / 10,
+        'AnnualPremium': rng.uniform(1000, 100000, n_policies),
+        'ExposureUnits': rng.uniform(1, 100, n_policies)
+    })
+
+    owner = rng.integers(0, n_policies, n_rows)
+    months = rng.integers(0, 36, n_rows)
+    exposure = policies.iloc[owner][['PolicyID', 'Geography', 'Industry', 'PolicySize', 'RiskRating']]
+    exposure = exposure.reset_index(drop=True)
+    labels = np.array([f'{2022 + m // 12}-{m % 12 + 1:02d}' for m in range(36)], dtype=object)
+    exposure['Period'] = labels[months]
+    exposure['EarnedPremium'] = policies['AnnualPremium'].to_numpy()[owner] / 12
+    exposure['ExposureUnits'] = policies['ExposureUnits'].to_numpy()[owner] / 12
+
+    n_claims = max(n_rows // 150, 1)
+    claimant = rng.integers(0, n_policies, n_claims)
+    claims = policies.iloc[claimant][['PolicyID', 'Geography', 'Industry', 'PolicySize', 'RiskRating']]
+    claims = claims.reset_index(drop=True)
+    claims['ClaimID'] = [f'CLM{i:08d}' for i in range(n_claims)]
+    claims['LossDate'] = pd.Timestamp('2022-01-01') + pd.to_timedelta(rng.integers(0, 1095, n_claims), unit='D')
+    claims['IncurredAmount'] = rng.lognormal(9, 1, n_claims)
+    claims['PaidAmount'] = claims['IncurredAmount'] * rng.uniform(0.3, 1, n_claims)
+
+    return policies, claims, exposure
+
+
+def timed(func, repeats: int) -> float:
+    """Median wall time of func in milliseconds."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.median(times))
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Benchmark pandas vs embedded SQL segment queries")
+    parser.add_argument('--rows', nargs='+', type=int, default=[1_000_000, 10_000_000],
+                        help="Exposure row counts to benchmark")
+    parser.add_argument('--engines', nargs='+', default=['pandas', default_engine()],
+                        choices=['pandas'] + SQL_ENGINES, help="Engines to compare")
+    parser.add_argument('--repeats', type=int, default=5, help="Timed repetitions per query")
+    args = parser.parse_args()
+
+    queries = {
+        'segment_kpis': lambda c: c.calculate_kpis_by_segment('Industry'),
+        'segment_kpis_window': lambda c: c.calculate_kpis_by_segment(
+            'Geography', start_period='2023-01', end_period='2023-06',
+            segment_filters={'PolicySize': ['Large']}
+        ),
+        'overall_kpis': lambda c: c.calculate_overall_kpis(),
+        'overall_kpis_filtered': lambda c: c.calculate_overall_kpis(
+            segment_filters={'Industry': ['Retail', 'Healthcare']}
+        ),
+    }
+
+    print("=" * 60)
+    print("Actuarial Insights Workbench - Segment Engine Benchmark")
+    print("=" * 60)
+
+    for n_rows in args.rows:
+        policies, claims, exposure = synthetic_tables(n_rows)
+        print(f"\n{n_rows:,} exposure rows, {len(claims):,} claims, {len(policies):,} policies")
+        print(f"{'query':<24}" + ''.join(f"{engine:>12}" for engine in args.engines))
+
+        results = {}
+        for engine in args.engines:
+            start = time.perf_counter()
+            calculator = SegmentKPICalculator(
+                policies, claims, exposure,
+                query_engine=None if engine == 'pandas' else engine
+            )
+            results[engine] = {'load': (time.perf_counter() - start) * 1000}
+            for name, query in queries.items():
+                results[engine][name] = timed(lambda: query(calculator), args.repeats)
+            del calculator
+
+        for name in ['load'] + list(queries):
+            print(f"{name:<24}" + ''.join(f"{results[e][name]:>10.1f}ms" for e in args.engines))
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,15 @@ import numpy as np
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 import os
+import sys
+
+# Backend services live in /app inside the container, ../backend locally
+BACKEND_DIR = '/app' if os.path.exists('/app/services') else os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'backend'
+)
+sys.path.insert(0, BACKEND_DIR)
+
+from services.storage import parquet_available, write_parquet_tables
 
 # Set random seed for reproducibility
 np.random.seed(42)
@@ -316,6 +325,17 @@ def main():
     claims_df.to_csv(f'{data_dir}/claims.csv', index=False)
     exposure_df.to_csv(f'{data_dir}/exposure.csv', index=False)
 
+    # Partitioned Parquet copy (claims by accident year, exposure by period year)
+    if parquet_available():
+        write_parquet_tables(data_dir, {
+            'policies': policies_df,
+            'claims': claims_df,
+            'exposure': exposure_df
+        })
+        print(f"Wrote Parquet datasets to {data_dir}/parquet/")
+    else:
+        print("pyarrow not installed - skipping Parquet output")
+
     # Print summary statistics
     print("\n" + "=" * 60)
     print("DATA GENERATION SUMMARY")
@@ -0,0 +1,65 @@
+"""
+Data Import Script
+Converts policies, claims and exposure CSVs into partitioned Parquet datasets.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+# Backend services live in /app inside the container, ../backend locally
+BACKEND_DIR = '/app' if os.path.exists('/app/services') else os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'backend'
+)
+sys.path.insert(0, BACKEND_DIR)
+
+from services.storage import TABLE_LAYOUT, parquet_available, write_parquet_table
+
+
+def main():
+    """Main execution function."""
+    default_dir = '/app/data' if os.path.exists('/app/data') else '../data'
+
+    parser = argparse.ArgumentParser(description="Import CSV data into partitioned Parquet")
+    parser.add_argument('--data-dir', default=default_dir, help="Directory containing the CSV files")
+    parser.add_argument(
+        '--tables',
+        nargs='+',
+        default=list(TABLE_LAYOUT),
+        choices=list(TABLE_LAYOUT),
+        help="Tables to import"
+    )
+    args = parser.parse_args()
+
+    if not parquet_available():
+        print("⚠️  pyarrow is not installed - cannot write Parquet")
+        sys.exit(1)
+
+    print("=" * 60)
+    print("Actuarial Insights Workbench - Parquet Import")
+    print("=" * 60)
+
+    for name in args.tables:
+        csv_path = os.path.join(args.data_dir, f"{name}.csv")
+        if not os.path.exists(csv_path):
+            print(f"⚠️  {csv_path} not found - skipping")
+            continue
+
+        start = time.perf_counter()
+        df = pd.read_csv(csv_path)
+        path = write_parquet_table(df, args.data_dir, name)
+        elapsed = time.perf_counter() - start
+
+        partition = TABLE_LAYOUT[name]['partition'] or 'none'
+        print(f"✅ {name}: {len(df):,} rows -> {path} (partitioned by {partition}, {elapsed:.2f}s)")
+
+    print("\nImport complete!")
+
+
+if __name__ == "__main__":
+    main()
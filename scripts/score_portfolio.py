@@ -0,0 +1,294 @@
+"""
+Portfolio Scoring Script
+Scores every policy with the loss ratio and severity models and writes the
+results to a Parquet dataset, chunk by chunk, on a pool of worker processes.
+
+Author: Actuarial Insights Workbench Team
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+# Backend services live in /app inside the container, ../backend locally
+BACKEND_DIR = '/app' if os.path.exists('/app/services') else os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'backend'
+)
+sys.path.insert(0, BACKEND_DIR)
+
+from services.prediction import QUANTILE_MODEL_FILES, PredictionService, batch_frame, encode_features
+from services.snapshot_cache import content_hash
+from services.storage import (
+    PARQUET_DIR, StaleSourceError, check_parquet_source, has_parquet, parquet_available
+)
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - checked in main()
+    pq = None
+
+# Policies per chunk (one task per chunk; also the output file granularity)
+SCORE_CHUNK_ROWS = 100_000
+
+# Job description stored with the output; a resume must match it
+JOB_FILE = '_job.json'
+
+MODEL_FILES = ['lr_model.pkl', 'severity_model.pkl']
+
+# Prediction service of a worker process, loaded once by init_worker
+_service = None
+
+
+def input_files(path: str):
+    """
+    Resolve the input to a sorted list of CSV or Parquet files.
+
+    Args:
+        path: A CSV file, a Parquet file or a directory of Parquet shards
+
+    Returns:
+        Sorted file paths
+    """
+    if os.path.isdir(path):
+        files = sorted(glob.glob(os.path.join(path, '**', '*.parquet'), recursive=True))
+        if not files:
+            raise ValueError(f"No Parquet files under {path}")
+        return files
+    if not os.path.isfile(path):
+        raise ValueError(f"Input not found: {path}")
+    return [path]
+
+
+def iter_chunks(files, chunk_rows: int):
+    """
+    Read the input in bounded chunks with stable chunk IDs.
+
+    Chunk boundaries depend only on the files and chunk_rows, so an
+    interrupted run sees the same chunks when it is resumed.
+
+    Args:
+        files: Input files from input_files
+        chunk_rows: Maximum rows per chunk
+
+    Yields:
+        Tuples of (chunk_id, DataFrame)
+    """
+    for file_index, path in enumerate(files):
+        if path.endswith('.parquet'):
+            batches = (
+                batch.to_pandas()
+                for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows)
+            )
+        else:
+            batches = pd.read_csv(path, dtype={'PolicyID': str}, chunksize=chunk_rows)
+
+        for batch_index, chunk in enumerate(batches):
+            if len(chunk):
+                yield f"{file_index:05d}-{batch_index:06d}", chunk
+
+
+def part_path(out_dir: str, chunk_id: str) -> str:
+    """Output file of a chunk."""
+    return os.path.join(out_dir, f"part-{chunk_id}.parquet")
+
+
+def init_worker(models_dir: str):
+    """
+    Load the models once per worker process.
+
+    Each worker predicts single-threaded, one model after the other;
+    parallelism comes from the pool.
+
+    Args:
+        models_dir: Directory with the joblib model files
+    """
+    global _service
+    _service = PredictionService(models_dir, parallel_min_rows=0)
+    models = [_service.lr_model, _service.severity_model]
+    for bundle in _service.interval_models.values():
+        models.extend(bundle.models)
+    for model in models:
+        if model is not None and hasattr(model, 'set_params'):
+            model.set_params(n_jobs=1)
+
+
+def score_chunk(chunk: pd.DataFrame, out_path: str) -> int:
+    """
+    Score one chunk and write it to Parquet.
+
+    The file is written under a hidden temporary name and renamed into
+    place, so a part file only exists once it is complete.
+
+    Args:
+        chunk: Policies with PolicyID and the model input columns
+        out_path: Output Parquet file
+
+    Returns:
+        Number of rows scored
+    """
+    frame = batch_frame(chunk)
+    if 'policy_id' not in frame.columns:
+        raise ValueError("Input has no PolicyID column")
+
+    scores = _service.score_features(encode_features(frame), frame['policy_size'].to_numpy())
+    scores.insert(0, 'PolicyID', frame['policy_id'].astype(str).to_numpy())
+
+    tmp_path = os.path.join(os.path.dirname(out_path), f".{os.path.basename(out_path)}.tmp")
+    scores.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, out_path)
+    return len(scores)
+
+
+def job_description(files, models_dir: str, chunk_rows: int) -> dict:
+    """
+    Describe a scoring job by its input contents, models and chunking.
+
+    Args:
+        files: Input files
+        models_dir: Model directory
+        chunk_rows: Rows per chunk
+
+    Returns:
+        JSON-serializable job description
+    """
+    return {
+        'input_version': content_hash(files)[:16],
+        'model_version': content_hash([
+            os.path.join(models_dir, name) for name in MODEL_FILES + list(QUANTILE_MODEL_FILES.values())
+        ])[:16],
+        'chunk_rows': chunk_rows,
+    }
+
+
+def prepare_output(out_dir: str, job: dict, restart: bool) -> set:
+    """
+    Create or resume the output directory.
+
+    Args:
+        out_dir: Output directory
+        job: Job description
+        restart: Discard existing output instead of resuming
+
+    Returns:
+        IDs of chunks already scored
+    """
+    job_path = os.path.join(out_dir, JOB_FILE)
+    if restart and os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+
+    if os.path.exists(job_path):
+        with open(job_path) as f:
+            previous = json.load(f)
+        if previous != job:
+            raise ValueError(
+                f"{out_dir} holds output of a different job (input, models or chunk size changed); "
+                "use --restart to discard it"
+            )
+    else:
+        os.makedirs(out_dir, exist_ok=True)
+        with open(job_path, 'w') as f:
+            json.dump(job, f, indent=2)
+
+    return {
+        os.path.basename(path)[len('part-'):-len('.parquet')]
+        for path in glob.glob(os.path.join(out_dir, 'part-*.parquet'))
+    }
+
+
+def main():
+    """Main execution function."""
+    default_data_dir = '/app/data' if os.path.exists('/app/data') else '../data'
+
+    parser = argparse.ArgumentParser(description="Score all policies with the loss ratio and severity models")
+    parser.add_argument('--data-dir', default=default_data_dir, help="Data directory with the policies table")
+    parser.add_argument('--input', default=None,
+                        help="policies CSV, Parquet file or directory of Parquet shards "
+                             "(default: the data directory's policies table)")
+    parser.add_argument('--models-dir', default=os.path.join(BACKEND_DIR, 'models'), help="Trained model directory")
+    parser.add_argument('--out-dir', default=None, help="Output Parquet directory (default: <data-dir>/scores)")
+    parser.add_argument('--chunk-rows', type=int, default=SCORE_CHUNK_ROWS, help="Policies per chunk")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument('--restart', action='store_true', help="Discard existing output instead of resuming")
+    args = parser.parse_args()
+
+    if not parquet_available() or pq is None:
+        sys.exit("❌ pyarrow is required to write the scored Parquet output")
+    if args.chunk_rows < 1 or args.workers < 1:
+        sys.exit("❌ --chunk-rows and --workers must be at least 1")
+    missing = [name for name in MODEL_FILES if not os.path.exists(os.path.join(args.models_dir, name))]
+    if missing:
+        sys.exit(f"❌ Missing models in {args.models_dir}: {', '.join(missing)}. Run scripts/train_models.py first.")
+
+    if args.input:
+        source = args.input
+    elif has_parquet(args.data_dir, 'policies'):
+        try:
+            check_parquet_source(args.data_dir, 'policies')
+        except StaleSourceError as e:
+            sys.exit(f"❌ {e}")
+        source = os.path.join(args.data_dir, PARQUET_DIR, 'policies')
+    else:
+        source = os.path.join(args.data_dir, 'policies.csv')
+    out_dir = args.out_dir or os.path.join(args.data_dir, 'scores')
+
+    print("=" * 60)
+    print("Actuarial Insights Workbench - Portfolio Scoring")
+    print("=" * 60)
+
+    try:
+        files = input_files(source)
+        job = job_description(files, args.models_dir, args.chunk_rows)
+        done = prepare_output(out_dir, job, args.restart)
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+
+    print(f"Input: {source} ({len(files)} file{'s' if len(files) != 1 else ''})")
+    print(f"Output: {out_dir}")
+    if done:
+        print(f"Resuming: {len(done)} chunks already scored")
+
+    start = time.perf_counter()
+    scored_rows = 0
+    skipped_rows = 0
+
+    def collect(futures):
+        nonlocal scored_rows
+        for future in futures:
+            scored_rows += future.result()
+        elapsed = time.perf_counter() - start
+        print(f"   {scored_rows:,} rows scored ({scored_rows / elapsed:,.0f} rows/s)")
+
+    with ProcessPoolExecutor(
+        max_workers=args.workers, initializer=init_worker, initargs=(args.models_dir,)
+    ) as pool:
+        # Keep a bounded number of chunks in flight so memory stays flat
+        pending = set()
+        for chunk_id, chunk in iter_chunks(files, args.chunk_rows):
+            if chunk_id in done:
+                skipped_rows += len(chunk)
+                continue
+
+            pending.add(pool.submit(score_chunk, chunk, part_path(out_dir, chunk_id)))
+            if len(pending) >= 2 * args.workers:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(finished)
+
+        if pending:
+            collect(wait(pending).done)
+
+    elapsed = time.perf_counter() - start
+    rate = scored_rows / elapsed if elapsed > 0 else 0.0
+    print(f"\n✅ Scored {scored_rows:,} policies in {elapsed:.2f}s ({rate:,.0f} rows/s, {args.workers} workers)")
+    if skipped_rows:
+        print(f"   {skipped_rows:,} policies were already scored by an earlier run")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,25 @@ Trains LightGBM models for Loss Ratio and Severity prediction.
 Author: Actuarial Insights Workbench Team
 """
 
-import pandas as pd
 import numpy as np
 from lightgbm import LGBMRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import joblib
 import os
+import sys
+
+# Backend services live in /app inside the container, ../backend locally
+BACKEND_DIR = '/app' if os.path.exists('/app/services') else os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'backend'
+)
+sys.path.insert(0, BACKEND_DIR)
+
+from services.storage import load_service_tables
+from services.portfolio_model import PolicyDimension
+
+# Quantiles of the prediction interval models: lower bound, median, upper bound
+QUANTILES = [0.1, 0.5, 0.9]
 
 
 def prepare_training_data():
@@ -23,38 +35,34 @@ def prepare_training_data():
     """
     print("Loading data...")
 
-    # Load datasets
-    policies_df = pd.read_csv('../data/policies.csv')
-    claims_df = pd.read_csv('../data/claims.csv')
-    exposure_df = pd.read_csv('../data/exposure.csv')
+    # Load datasets (Parquet if available, otherwise CSV; only the columns used here)
+    tables = load_service_tables('../data', 'training')
+    policies_df = tables['policies']
+    claims_df = tables['claims']
+    exposure_df = tables['exposure']
 
     print(f"Loaded {len(policies_df)} policies, {len(claims_df)} claims, {len(exposure_df)} exposure records")
 
-    # Aggregate exposure/premium by policy
-    exposure_agg = exposure_df.groupby('PolicyID').agg({
-        'EarnedPremium': 'sum',
-        'ExposureUnits': 'mean'
-    }).reset_index()
-
-    # Aggregate claims by policy
-    claims_agg = claims_df.groupby('PolicyID').agg({
-        'IncurredAmount': 'sum',
-        'ClaimID': 'count'
-    }).reset_index()
-
-    claims_agg.columns = ['PolicyID', 'TotalIncurred', 'ClaimCount']
-
-    # Drop ExposureUnits from policies to avoid column name conflict during merge
-    # We'll use the aggregated ExposureUnits from exposure data
-    policies_for_merge = policies_df.drop(columns=['ExposureUnits'])
-
-    # Merge policy data with exposure and claims
-    training_df = policies_for_merge.merge(exposure_agg, on='PolicyID', how='left')
-    training_df = training_df.merge(claims_agg, on='PolicyID', how='left')
+    # Aggregate exposure and claims per policy key of the policy dimension
+    dimension = PolicyDimension.from_frames(policies_df)
+    exposure_keys = dimension.keys(exposure_df['PolicyID'])
+    claim_keys = dimension.keys(claims_df['PolicyID'])
+    exposure_rows = dimension.totals(exposure_keys)
+    has_exposure = exposure_rows > 0
+
+    earned_premium = np.where(has_exposure, dimension.totals(exposure_keys, exposure_df['EarnedPremium']), np.nan)
+    exposure_units = np.divide(
+        dimension.totals(exposure_keys, exposure_df['ExposureUnits']), exposure_rows,
+        out=np.full(len(dimension), np.nan), where=has_exposure
+    )
 
-    # Fill NaN for policies with no claims
-    training_df['TotalIncurred'] = training_df['TotalIncurred'].fillna(0)
-    training_df['ClaimCount'] = training_df['ClaimCount'].fillna(0)
+    # Drop ExposureUnits from policies to avoid a clash with the average from exposure data
+    training_df = policies_df.drop(columns=['ExposureUnits'])
+    keys = dimension.keys(training_df['PolicyID'])
+    training_df['EarnedPremium'] = earned_premium[keys]
+    training_df['ExposureUnits'] = exposure_units[keys]
+    training_df['TotalIncurred'] = dimension.totals(claim_keys, claims_df['IncurredAmount'])[keys]
+    training_df['ClaimCount'] = dimension.totals(claim_keys)[keys]
 
     # Calculate loss ratio (target for first model)
     training_df['LossRatio'] = (training_df['TotalIncurred'] / training_df['EarnedPremium'] * 100).fillna(0)
@@ -100,6 +108,53 @@ def encode_features(df):
     return df
 
 
+def train_quantile_models(X_train, y_train, X_test, y_test, money: bool = False):
+    """
+    Train quantile-objective models for prediction intervals.
+
+    One booster per quantile in QUANTILES, with the point model's
+    hyperparameters. The service evaluates them together on one feature
+    matrix.
+
+    Args:
+        X_train: Encoded training features
+        y_train: Training target
+        X_test: Encoded test features
+        y_test: Test target
+        money: Format interval widths as currency
+
+    Returns:
+        Dictionary with 'quantiles' and the fitted 'models' in the same order
+    """
+    print(f"\nTraining quantile models ({', '.join(f'P{q * 100:.0f}' for q in QUANTILES)})...")
+    models = []
+    for alpha in QUANTILES:
+        model = LGBMRegressor(
+            objective='quantile',
+            alpha=alpha,
+            n_estimators=100,
+            learning_rate=0.05,
+            max_depth=5,
+            num_leaves=31,
+            random_state=42,
+            verbose=-1
+        )
+        model.fit(X_train, y_train)
+        models.append(model)
+
+    # Sort per row so crossing quantiles still give lower <= upper
+    predictions = np.sort(np.column_stack([model.predict(X_test) for model in models]), axis=1)
+    lower, upper = predictions[:, 0], predictions[:, -1]
+    coverage = np.mean((y_test >= lower) & (y_test <= upper))
+    width = np.mean(upper - lower)
+
+    print(f"\nPrediction Interval P{QUANTILES[0] * 100:.0f}-P{QUANTILES[-1] * 100:.0f} (test set):")
+    print(f"  Coverage:   {coverage:.1%} (nominal {QUANTILES[-1] - QUANTILES[0]:.0%})")
+    print(f"  Mean width: {f'${width:,.2f}' if money else f'{width:.2f}'}")
+
+    return {'quantiles': QUANTILES, 'models': models}
+
+
 def train_loss_ratio_model(training_df):
     """
     Train Loss Ratio prediction model.
@@ -108,7 +163,7 @@ def train_loss_ratio_model(training_df):
         training_df: Training data
 
     Returns:
-        Trained model
+        Tuple of (trained model, quantile models)
     """
     print("\n" + "="*60)
     print("TRAINING LOSS RATIO MODEL")
@@ -165,7 +220,9 @@ def train_loss_ratio_model(training_df):
     for feature, importance in zip(feature_cols, model.feature_importances_):
         print(f"  {feature:20s}: {importance:.4f}")
 
-    return model
+    quantile_models = train_quantile_models(X_train, y_train, X_test, y_test)
+
+    return model, quantile_models
 
 
 def train_severity_model(training_df):
@@ -176,7 +233,7 @@ def train_severity_model(training_df):
         training_df: Training data
 
     Returns:
-        Trained model
+        Tuple of (trained model, quantile models)
     """
     print("\n" + "="*60)
     print("TRAINING SEVERITY MODEL")
@@ -237,7 +294,9 @@ def train_severity_model(training_df):
     for feature, importance in zip(feature_cols, model.feature_importances_):
         print(f"  {feature:20s}: {importance:.4f}")
 
-    return model
+    quantile_models = train_quantile_models(X_train, y_train, X_test, y_test, money=True)
+
+    return model, quantile_models
 
 
 def main():
@@ -251,7 +310,7 @@ def main():
     training_df = prepare_training_data()
 
     # Train Loss Ratio model
-    lr_model = train_loss_ratio_model(training_df)
+    lr_model, lr_quantile_models = train_loss_ratio_model(training_df)
 
     # Save model (use /app/models when running in Docker, ../backend/models for local)
     models_dir = '/app/models' if os.path.exists('/app/models') else '../backend/models'
@@ -261,20 +320,29 @@ def main():
     joblib.dump(lr_model, lr_model_path)
     print(f"\n✅ Loss Ratio model saved to {lr_model_path}")
 
+    lr_quantile_path = os.path.join(models_dir, 'lr_quantile_models.pkl')
+    joblib.dump(lr_quantile_models, lr_quantile_path)
+    print(f"✅ Loss Ratio quantile models saved to {lr_quantile_path}")
+
     # Train Severity model
-    severity_model = train_severity_model(training_df)
+    severity_model, severity_quantile_models = train_severity_model(training_df)
 
     # Save model
     severity_model_path = os.path.join(models_dir, 'severity_model.pkl')
     joblib.dump(severity_model, severity_model_path)
     print(f"\n✅ Severity model saved to {severity_model_path}")
 
+    severity_quantile_path = os.path.join(models_dir, 'severity_quantile_models.pkl')
+    joblib.dump(severity_quantile_models, severity_quantile_path)
+    print(f"✅ Severity quantile models saved to {severity_quantile_path}")
+
     print("\n" + "="*60)
     print("MODEL TRAINING COMPLETE!")
     print("="*60)
     print(f"\nModels saved in: ../backend/models/")
     print("  - lr_model.pkl (Loss Ratio)")
     print("  - severity_model.pkl (Severity)")
+    print("  - lr_quantile_models.pkl, severity_quantile_models.pkl (P10/P50/P90 intervals)")
 
 
 if __name__ == "__main__":